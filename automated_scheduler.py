@@ -32,6 +32,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from core.logging_manager import LoggingManager
 from core.error_handler import ErrorHandler
 from core.config_manager import ConfigManager
+from core.jquants_client import get_shared_session
 
 
 class NotificationType(Enum):
@@ -103,6 +104,9 @@ class AutomatedScheduler:
         self.scheduler_thread = None
         self.stop_event = threading.Event()
 
+        # HTTPセッション（ルーティンAPI・ジョブ状態確認・Slack通知で接続を再利用）
+        self.http_session = get_shared_session()
+
         self.logger.info("自動スケジューラーが初期化されました")
 
     def _load_scheduler_config(self) -> SchedulerConfig:
@@ -291,7 +295,7 @@ class AutomatedScheduler:
                     }
 
                     # API呼び出し
-                    response = requests.post(
+                    response = self.http_session.post(
                         api_url,
                         json=data,
                         timeout=self.scheduler_config.timeout,
@@ -345,7 +349,7 @@ class AutomatedScheduler:
         while elapsed_time < max_wait_time:
             try:
                 # ジョブ状態確認
-                response = requests.get(f"http://localhost:5057/routine/jobs/{job_id}")
+                response = self.http_session.get(f"http://localhost:5057/routine/jobs/{job_id}")
 
                 if response.status_code == 200:
                     job_data = response.json()
@@ -659,7 +663,7 @@ class AutomatedScheduler:
             }
 
             # Slack送信
-            response = requests.post(
+            response = self.http_session.post(
                 self.notification_config.slack_webhook_url,
                 json=slack_message,
                 timeout=30,
@@ -5,16 +5,24 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 from sklearn.linear_model import LinearRegression
 import warnings
 
+from .feature_store import FeatureStore
+from .indicator_engine import IndicatorEngine
+
 warnings.filterwarnings("ignore")
 
 logger = logging.getLogger(__name__)
 
+# 高度な特徴量の定義を変えたら更新する（キャッシュ済みの特徴量を使わないため）
+ADVANCED_FEATURE_SPEC_VERSION = "article_method_analyzer.advanced_features/1"
+# 末尾だけ再計算するときのウォームアップ行数（MACD の EMA が収束する長さ）
+ADVANCED_FEATURE_LOOKBACK = 600
+
 
 @dataclass
 class ArticleMethodResult:
@@ -363,8 +371,10 @@ class ArticleMethodAnalyzer:
 class ImprovedMethodAnalyzer:
     """改善された手法を分析するクラス"""
 
-    def __init__(self):
+    def __init__(self, feature_store: Optional[FeatureStore] = None):
         self.logger = logging.getLogger(__name__)
+        # 省略時はインスタンスごとに作成（同じデータの特徴量を作り直さない）
+        self.feature_store = feature_store or FeatureStore()
 
     def analyze_improved_method(self, data: pd.DataFrame) -> ImprovedMethodResult:
         """
@@ -472,53 +482,77 @@ class ImprovedMethodAnalyzer:
             position_sizing="動的",
         )
 
-    def _create_advanced_features(self, data: pd.DataFrame) -> pd.DataFrame:
-        """高度な特徴量の作成"""
+    def _create_advanced_features(
+        self, data: pd.DataFrame, symbol: Optional[str] = None
+    ) -> pd.DataFrame:
+        """高度な特徴量の作成（同じデータの特徴量はストアから取得し、末尾の変更分だけ再計算）"""
+        return self.feature_store.get_or_compute(
+            data,
+            self._build_advanced_features,
+            ADVANCED_FEATURE_SPEC_VERSION,
+            symbol=symbol,
+            lookback=ADVANCED_FEATURE_LOOKBACK,
+        )
+
+    def _build_advanced_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """高度な特徴量の計算"""
+        data = data.copy()
+        # 移動平均・ボラティリティ・各指標の中間結果を共有する
+        engine = IndicatorEngine.from_frame(data)
+
         # 基本特徴量
         data["Price_Change"] = data["Close"].pct_change()
         data["Volume_Change"] = data["Volume"].pct_change()
-        data["Price_MA5"] = data["Close"].rolling(window=5).mean()
-        data["Price_MA20"] = data["Close"].rolling(window=20).mean()
+        data["Price_MA5"] = engine.sma(5)
+        data["Price_MA20"] = engine.sma(20)
 
         # RSI
-        data["RSI"] = self._calculate_rsi(data["Close"])
+        data["RSI"] = self._calculate_rsi(data["Close"], engine=engine)
 
         # MACD
-        data["MACD"] = self._calculate_macd(data["Close"])
+        data["MACD"] = self._calculate_macd(data["Close"], engine=engine)
 
         # ボリンジャーバンド
-        bb_upper, bb_lower = self._calculate_bollinger_bands(data["Close"])
+        bb_upper, bb_lower = self._calculate_bollinger_bands(data["Close"], engine=engine)
         data["BB_Upper"] = bb_upper
         data["BB_Lower"] = bb_lower
 
         # ATR
-        data["ATR"] = self._calculate_atr(data)
+        data["ATR"] = self._calculate_atr(data, engine=engine)
 
         # ボラティリティ
-        data["Volatility"] = data["Close"].rolling(window=20).std()
+        data["Volatility"] = engine.rolling_std("close", 20)
 
         return data
 
-    def _calculate_rsi(self, prices: pd.Series, window: int = 14) -> pd.Series:
+    def _calculate_rsi(
+        self,
+        prices: pd.Series,
+        window: int = 14,
+        engine: Optional[IndicatorEngine] = None,
+    ) -> pd.Series:
         """RSI計算"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        engine = engine or IndicatorEngine(close=prices)
+        return pd.Series(engine.rsi(window), index=prices.index)
 
     def _calculate_macd(
-        self, prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9
+        self,
+        prices: pd.Series,
+        fast: int = 12,
+        slow: int = 26,
+        signal: int = 9,
+        engine: Optional[IndicatorEngine] = None,
     ) -> pd.Series:
         """MACD計算"""
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
-        macd = ema_fast - ema_slow
-        return macd
+        engine = engine or IndicatorEngine(close=prices)
+        return pd.Series(engine.macd(fast, slow, signal)[0], index=prices.index)
 
     def _calculate_bollinger_bands(
-        self, prices: pd.Series, window: int = 20, num_std: float = 2
+        self,
+        prices: pd.Series,
+        window: int = 20,
+        num_std: float = 2,
+        engine: Optional[IndicatorEngine] = None,
     ) -> Tuple[pd.Series, pd.Series]:
         """ボリンジャーバンド計算"""
         if len(prices) < window:
@@ -527,8 +561,9 @@ class ImprovedMethodAnalyzer:
             lower_band = prices * 0.9  # 10%下
             return upper_band, lower_band
 
-        rolling_mean = prices.rolling(window=window).mean()
-        rolling_std = prices.rolling(window=window).std()
+        engine = engine or IndicatorEngine(close=prices)
+        rolling_mean = pd.Series(engine.rolling_mean("close", window), index=prices.index)
+        rolling_std = pd.Series(engine.rolling_std("close", window), index=prices.index)
 
         # NaN値を適切に処理
         rolling_std = rolling_std.fillna(
@@ -544,15 +579,15 @@ class ImprovedMethodAnalyzer:
 
         return upper_band, lower_band
 
-    def _calculate_atr(self, data: pd.DataFrame, window: int = 14) -> pd.Series:
+    def _calculate_atr(
+        self,
+        data: pd.DataFrame,
+        window: int = 14,
+        engine: Optional[IndicatorEngine] = None,
+    ) -> pd.Series:
         """ATR計算"""
-        high_low = data["High"] - data["Low"]
-        high_close = np.abs(data["High"] - data["Close"].shift())
-        low_close = np.abs(data["Low"] - data["Close"].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        atr = true_range.rolling(window=window).mean()
-        return atr
+        engine = engine or IndicatorEngine.from_frame(data)
+        return pd.Series(engine.atr(window), index=data.index)
 
     def _calculate_confidence_scores(
         self, X_test: pd.DataFrame, models: Dict
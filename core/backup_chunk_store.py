@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+コンテンツアドレス方式のバックアップストア
+銘柄の時系列を月単位のチャンクに分割し、内容ハッシュをキーとして保存する
+バックアップはチャンク参照のマニフェストのみで表現され、変更のない月は再利用される
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+
+
+class BackupChunkStore:
+    """コンテンツアドレス型バックアップストアクラス"""
+
+    CHUNK_DIR = "chunks"
+    MANIFEST_PREFIX = "backup_"
+    MANIFEST_SUFFIX = ".manifest.json"
+    UNDATED_MONTH = "undated"
+
+    def __init__(self, backup_dir: Path, logger=None):
+        """
+        初期化
+
+        Args:
+            backup_dir: バックアップディレクトリ
+            logger: ロガーインスタンス
+        """
+        self.backup_dir = Path(backup_dir)
+        self.chunk_dir = self.backup_dir / self.CHUNK_DIR
+        self.chunk_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        # 存在確認済みのチャンクハッシュ（stat呼び出しの削減）
+        self._known_chunks: Set[str] = set()
+
+    # ---- チャンク ----
+
+    @staticmethod
+    def _month_key(record: Dict[str, Any]) -> str:
+        """レコードの月キー（YYYY-MM）"""
+        date = record.get("date", record.get("Date"))
+        if not date:
+            return BackupChunkStore.UNDATED_MONTH
+        return str(date)[:7]
+
+    @staticmethod
+    def _encode_chunk(rows: List[Dict[str, Any]]) -> bytes:
+        """チャンクの正規化シリアライズ（同一内容は同一バイト列になる）"""
+        return json.dumps(
+            rows, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+
+    def _chunk_path(self, chunk_hash: str) -> Path:
+        """チャンクファイルのパス（先頭2文字で分散）"""
+        return self.chunk_dir / chunk_hash[:2] / f"{chunk_hash}.json"
+
+    def _write_chunk(self, chunk_hash: str, payload: bytes) -> bool:
+        """
+        チャンクの書き込み（既存の場合はスキップ）
+
+        Returns:
+            bool: 新規に書き込んだ場合True
+        """
+        if chunk_hash in self._known_chunks:
+            return False
+        path = self._chunk_path(chunk_hash)
+        if path.exists():
+            self._known_chunks.add(chunk_hash)
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+        self._known_chunks.add(chunk_hash)
+        return True
+
+    def _read_chunk(self, chunk_hash: str) -> List[Dict[str, Any]]:
+        """チャンクの読み込み（内容ハッシュを検証）"""
+        with open(self._chunk_path(chunk_hash), "rb") as f:
+            payload = f.read()
+        if hashlib.sha256(payload).hexdigest() != chunk_hash:
+            raise ValueError(f"チャンクのハッシュが一致しません: {chunk_hash}")
+        return json.loads(payload)
+
+    # ---- マニフェスト ----
+
+    def _symbol_dir(self, symbol: str) -> Path:
+        """銘柄のマニフェストディレクトリ（パス区切りなどを含む銘柄名は置き換える）"""
+        safe_symbol = re.sub(r"[^0-9A-Za-z_-]", "_", str(symbol))
+        return self.backup_dir / safe_symbol
+
+    def list_backups(self, symbol: str) -> List[Path]:
+        """銘柄のマニフェスト一覧（古い順）"""
+        symbol_dir = self._symbol_dir(symbol)
+        if not symbol_dir.exists():
+            return []
+        return sorted(
+            symbol_dir.glob(f"{self.MANIFEST_PREFIX}*{self.MANIFEST_SUFFIX}")
+        )
+
+    def _write_manifest(self, manifest_path: Path, manifest: Dict[str, Any]):
+        """マニフェストの書き込み（一時ファイル経由で置き換え）"""
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = manifest_path.with_name(
+            f".{manifest_path.name}.{uuid.uuid4().hex}.tmp"
+        )
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, manifest_path)
+
+    def _load_manifest(self, manifest_path: Path) -> Dict[str, Any]:
+        """マニフェストの読み込み"""
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # ---- バックアップ・リストア ----
+
+    def save(self, symbol: str, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        バックアップの保存
+
+        Args:
+            symbol: 銘柄コード
+            data: 時系列データ
+
+        Returns:
+            Dict[str, Any]: マニフェストのパスとチャンクの書き込み・再利用件数
+        """
+        # 月単位にグループ化（出現順を保持してリストア時に元の並びを再現）
+        months: Dict[str, List[Dict[str, Any]]] = {}
+        for record in data:
+            months.setdefault(self._month_key(record), []).append(record)
+
+        chunks = []
+        written = 0
+        # チャンクとマニフェストを同じロック内で書き込み、参照前のチャンクが
+        # collect_garbage で回収されないようにする
+        with self._lock:
+            for month, rows in months.items():
+                payload = self._encode_chunk(rows)
+                chunk_hash = hashlib.sha256(payload).hexdigest()
+                if self._write_chunk(chunk_hash, payload):
+                    written += 1
+                chunks.append({"month": month, "hash": chunk_hash, "rows": len(rows)})
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            manifest = {
+                "symbol": symbol,
+                "timestamp": timestamp,
+                "row_count": len(data),
+                "chunks": chunks,
+            }
+            manifest_path = self._symbol_dir(symbol) / (
+                f"{self.MANIFEST_PREFIX}{timestamp}{self.MANIFEST_SUFFIX}"
+            )
+            self._write_manifest(manifest_path, manifest)
+
+        return {
+            "manifest_file": str(manifest_path),
+            "timestamp": timestamp,
+            "chunks_written": written,
+            "chunks_reused": len(chunks) - written,
+        }
+
+    def restore(
+        self, symbol: str, manifest_path: Optional[Path] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        バックアップの復元
+
+        Args:
+            symbol: 銘柄コード
+            manifest_path: マニフェストのパス（省略時は最新）
+
+        Returns:
+            List[Dict[str, Any]]: 復元した時系列データ
+        """
+        if manifest_path is None:
+            backups = self.list_backups(symbol)
+            if not backups:
+                raise FileNotFoundError(f"バックアップがありません: {symbol}")
+            manifest_path = backups[-1]
+
+        manifest = self._load_manifest(Path(manifest_path))
+        data: List[Dict[str, Any]] = []
+        for chunk in manifest["chunks"]:
+            data.extend(self._read_chunk(chunk["hash"]))
+        return data
+
+    def prune(self, symbol: str, keep: int) -> int:
+        """
+        古いマニフェストの削除（チャンクは collect_garbage で回収）
+
+        Args:
+            symbol: 銘柄コード
+            keep: 保持するマニフェスト数
+
+        Returns:
+            int: 削除したマニフェスト数
+        """
+        backups = self.list_backups(symbol)
+        excess = backups[: max(len(backups) - keep, 0)]
+        for manifest_path in excess:
+            manifest_path.unlink()
+        return len(excess)
+
+    def collect_garbage(self) -> int:
+        """
+        どのマニフェストからも参照されないチャンクの削除
+
+        Returns:
+            int: 削除したチャンク数
+        """
+        with self._lock:
+            referenced: Set[str] = set()
+            for manifest_path in self.backup_dir.glob(
+                f"*/{self.MANIFEST_PREFIX}*{self.MANIFEST_SUFFIX}"
+            ):
+                try:
+                    manifest = self._load_manifest(manifest_path)
+                except (OSError, ValueError) as e:
+                    # 読めないマニフェストがある場合は安全側に倒して回収しない
+                    self.logger.warning(f"マニフェスト読み込みエラー {manifest_path}: {e}")
+                    return 0
+                referenced.update(chunk["hash"] for chunk in manifest["chunks"])
+
+            removed = 0
+            for chunk_path in self.chunk_dir.glob("*/*.json"):
+                if chunk_path.stem not in referenced:
+                    chunk_path.unlink()
+                    self._known_chunks.discard(chunk_path.stem)
+                    removed += 1
+            return removed
+
+    def disk_usage(self) -> Dict[str, int]:
+        """チャンク・マニフェストのディスク使用量（バイト）"""
+        chunk_bytes = sum(p.stat().st_size for p in self.chunk_dir.glob("*/*.json"))
+        manifest_bytes = sum(
+            p.stat().st_size
+            for p in self.backup_dir.glob(
+                f"*/{self.MANIFEST_PREFIX}*{self.MANIFEST_SUFFIX}"
+            )
+        )
+        return {"chunk_bytes": chunk_bytes, "manifest_bytes": manifest_bytes}
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+列指向バイナリ株価ストア
+OHLCVを型付き配列として銘柄ごとに保持し、辞書を経由せずにDataFrameを返す
+pyarrowが利用可能な場合はParquet、利用できない場合は圧縮NumPyアーカイブを使用
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+ENGINE_PARQUET = "parquet"
+ENGINE_NPZ = "npz"
+
+# 保存するOHLCV列（レコードのキー -> DataFrameの列名）
+PRICE_COLUMNS = {
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "volume": "Volume",
+}
+_BASE_FIELDS = ("date", "code", "open", "high", "low", "close", "volume")
+
+
+class ColumnarPriceStore:
+    """列指向株価ストアクラス"""
+
+    def __init__(self, store_dir: Path, logger=None, engine: Optional[str] = None):
+        """
+        初期化
+
+        Args:
+            store_dir: 保存ディレクトリ
+            logger: ロガーインスタンス
+            engine: "parquet" または "npz"（省略時は利用可能なものを自動選択）
+        """
+        if engine is None:
+            engine = ENGINE_PARQUET if PYARROW_AVAILABLE else ENGINE_NPZ
+        if engine == ENGINE_PARQUET and not PYARROW_AVAILABLE:
+            raise ValueError("Parquet形式にはpyarrowが必要です")
+        if engine not in (ENGINE_PARQUET, ENGINE_NPZ):
+            raise ValueError(f"未対応のエンジン: {engine}")
+
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logger or logging.getLogger(__name__)
+        self.engine = engine
+
+    def _file_path(self, symbol: str) -> Path:
+        """銘柄ファイルのパス"""
+        safe_symbol = re.sub(r"[^0-9A-Za-z_-]", "_", str(symbol))
+        return self.store_dir / f"{safe_symbol}.{self.engine}"
+
+    def _to_columns(self, records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """レコードのリストを型付き配列に変換（日付順にソート済みであること）"""
+        columns = {
+            "date": pd.to_datetime([item["date"] for item in records]).values.astype(
+                "datetime64[D]"
+            ),
+            "code": np.array(
+                [str(item.get("code", "")) for item in records], dtype=str
+            ),
+        }
+        for key in ("open", "high", "low", "close"):
+            columns[key] = np.array(
+                [item.get(key, 0.0) for item in records], dtype=np.float64
+            )
+        columns["volume"] = np.array(
+            [item.get("volume", 0) for item in records], dtype=np.int64
+        )
+
+        # 追加フィールドはJSON文字列として保持（エクスポート時の復元用）
+        extras = [
+            {k: v for k, v in item.items() if k not in _BASE_FIELDS} for item in records
+        ]
+        if any(extras):
+            columns["extra"] = np.array(
+                [json.dumps(e, ensure_ascii=False) if e else "" for e in extras],
+                dtype=str,
+            )
+        return columns
+
+    def write(self, symbol: str, records: List[Dict[str, Any]]) -> bool:
+        """
+        銘柄データの書き込み
+
+        Args:
+            symbol: 銘柄コード
+            records: 日付順の株価データ
+
+        Returns:
+            bool: 保存成功フラグ
+        """
+        try:
+            columns = self._to_columns(records)
+            file_path = self._file_path(symbol)
+            temp_path = file_path.with_suffix(".tmp")
+
+            if self.engine == ENGINE_PARQUET:
+                table = pa.table(columns)
+                pq.write_table(table, temp_path, compression="zstd")
+            else:
+                with open(temp_path, "wb") as f:
+                    np.savez_compressed(f, **columns)
+            temp_path.replace(file_path)
+            return True
+        except Exception as e:
+            self.logger.error(f"列指向データ保存エラー {symbol}: {e}")
+            return False
+
+    def _read_columns(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """型付き配列の読み込み"""
+        file_path = self._file_path(symbol)
+        if not file_path.exists():
+            return None
+
+        if self.engine == ENGINE_PARQUET:
+            table = pq.read_table(file_path)
+            columns = {
+                name: table.column(name).to_numpy() for name in table.column_names
+            }
+            columns["date"] = columns["date"].astype("datetime64[D]")
+            return columns
+
+        with np.load(file_path, allow_pickle=False) as archive:
+            return {name: archive[name] for name in archive.files}
+
+    def _slice_bounds(
+        self, dates: np.ndarray, start_date: Optional[str], end_date: Optional[str]
+    ) -> slice:
+        """日付範囲に対応するスライス（二分探索）"""
+        lo = (
+            int(np.searchsorted(dates, np.datetime64(start_date, "D"), side="left"))
+            if start_date
+            else 0
+        )
+        hi = (
+            int(np.searchsorted(dates, np.datetime64(end_date, "D"), side="right"))
+            if end_date
+            else len(dates)
+        )
+        return slice(lo, hi)
+
+    def read_frame(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        銘柄データをDataFrameとして取得
+
+        Args:
+            symbol: 銘柄コード
+            start_date: 開始日（YYYY-MM-DD）
+            end_date: 終了日（YYYY-MM-DD）
+
+        Returns:
+            pd.DataFrame: Date インデックス、Open/High/Low/Close/Volume 列
+        """
+        columns = self._read_columns(symbol)
+        if columns is None:
+            return empty_price_frame()
+
+        window = self._slice_bounds(columns["date"], start_date, end_date)
+        frame = pd.DataFrame(
+            {name: columns[key][window] for key, name in PRICE_COLUMNS.items()},
+            index=pd.DatetimeIndex(
+                columns["date"][window].astype("datetime64[ns]"), name="Date"
+            ),
+        )
+        return frame
+
+    def read_records(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """銘柄データをレコード形式で取得（JSONエクスポート互換）"""
+        columns = self._read_columns(symbol)
+        if columns is None:
+            return []
+
+        window = self._slice_bounds(columns["date"], start_date, end_date)
+        dates = np.datetime_as_string(columns["date"][window], unit="D").tolist()
+        codes = columns["code"][window].tolist()
+        values = {key: columns[key][window].tolist() for key in PRICE_COLUMNS}
+        extras = columns["extra"][window].tolist() if "extra" in columns else None
+
+        records = []
+        for i, date in enumerate(dates):
+            item = {"date": date, "code": codes[i]}
+            for key in PRICE_COLUMNS:
+                item[key] = values[key][i]
+            if extras and extras[i]:
+                item.update(json.loads(extras[i]))
+            records.append(item)
+        return records
+
+    def delete(self, symbol: str) -> bool:
+        """銘柄データの削除"""
+        file_path = self._file_path(symbol)
+        if file_path.exists():
+            file_path.unlink()
+            return True
+        return False
+
+
+def empty_price_frame() -> pd.DataFrame:
+    """空の株価DataFrame"""
+    return pd.DataFrame(
+        {name: pd.Series(dtype="float64") for name in PRICE_COLUMNS.values()},
+        index=pd.DatetimeIndex([], dtype="datetime64[ns]", name="Date"),
+    )
+
+
+def records_to_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """レコードのリストを株価DataFrameに変換"""
+    if not records:
+        return empty_price_frame()
+    frame = pd.DataFrame.from_records(
+        records, columns=["date"] + list(PRICE_COLUMNS.keys())
+    )
+    frame.index = pd.DatetimeIndex(
+        pd.to_datetime(frame.pop("date")).astype("datetime64[ns]"), name="Date"
+    )
+    return frame.rename(columns=PRICE_COLUMNS)
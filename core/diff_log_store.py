@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+追記専用の差分ログストア
+JSON Lines形式のセグメントに追記し、サイズ・経過時間でローテーションする
+各セグメントにはオフセットインデックスを併設し、時刻・銘柄で直接シークできる
+"""
+
+import json
+import logging
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# インデックス行: (timestamp, symbol, offset, length)
+IndexRow = Tuple[str, str, int, int]
+
+
+class DiffLogStore:
+    """追記専用差分ログストアクラス"""
+
+    SEGMENT_PREFIX = "diff_"
+    SEGMENT_SUFFIX = ".jsonl"
+    INDEX_SUFFIX = ".idx"
+
+    def __init__(
+        self,
+        log_dir: Path,
+        logger=None,
+        max_segment_bytes: int = 5 * 1024 * 1024,
+        max_segment_age_hours: float = 24.0,
+        max_segments: int = 30,
+    ):
+        """
+        初期化
+
+        Args:
+            log_dir: ログディレクトリ
+            logger: ロガーインスタンス
+            max_segment_bytes: セグメントの最大サイズ（超過でローテーション）
+            max_segment_age_hours: セグメントの最大経過時間（超過でローテーション）
+            max_segments: 保持するセグメント数の上限
+        """
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = timedelta(hours=max_segment_age_hours)
+        self.max_segments = max_segments
+
+        self._lock = threading.Lock()
+        # セグメント名 -> (インデックスファイルサイズ, インデックス行, 時刻順か)
+        self._index_cache: Dict[str, Tuple[int, List[IndexRow], bool]] = {}
+
+    # ---- セグメント管理 ----
+
+    def _segments(self) -> List[Path]:
+        """セグメントファイルの一覧（古い順）"""
+        return sorted(self.log_dir.glob(f"{self.SEGMENT_PREFIX}*{self.SEGMENT_SUFFIX}"))
+
+    def _segment_path(self, sequence: int) -> Path:
+        """セグメントファイルのパス"""
+        return (
+            self.log_dir / f"{self.SEGMENT_PREFIX}{sequence:06d}{self.SEGMENT_SUFFIX}"
+        )
+
+    def _index_path(self, segment: Path) -> Path:
+        """インデックスファイルのパス"""
+        return segment.with_suffix(self.INDEX_SUFFIX)
+
+    def _sequence(self, segment: Path) -> int:
+        """セグメント番号"""
+        return int(segment.stem[len(self.SEGMENT_PREFIX) :])
+
+    @property
+    def active_segment(self) -> Path:
+        """現在の書き込み先セグメント"""
+        segments = self._segments()
+        return segments[-1] if segments else self._segment_path(1)
+
+    def _needs_rotation(self, segment: Path, now: datetime) -> bool:
+        """ローテーション要否の判定"""
+        if not segment.exists():
+            return False
+        if segment.stat().st_size >= self.max_segment_bytes:
+            return True
+        index = self._load_index(segment)
+        if index:
+            opened_at = datetime.fromisoformat(index[0][0])
+            return now - opened_at >= self.max_segment_age
+        return False
+
+    def _rotate(self, segment: Path) -> Path:
+        """新しいセグメントの開始と古いセグメントの削除"""
+        new_segment = self._segment_path(self._sequence(segment) + 1)
+        segments = self._segments()
+        excess = len(segments) + 1 - self.max_segments
+        for old_segment in segments[: max(excess, 0)]:
+            self._remove_segment(old_segment)
+        return new_segment
+
+    def _remove_segment(self, segment: Path):
+        """セグメントとインデックスの削除"""
+        for path in (segment, self._index_path(segment)):
+            if path.exists():
+                path.unlink()
+        self._index_cache.pop(segment.name, None)
+
+    def _load_index(self, segment: Path) -> List[IndexRow]:
+        """インデックスの読み込み（サイズが変わらない限りキャッシュを使用）"""
+        index_path = self._index_path(segment)
+        if not index_path.exists():
+            return []
+
+        size = index_path.stat().st_size
+        cached = self._index_cache.get(segment.name)
+        if cached and cached[0] == size:
+            return cached[1]
+
+        rows: List[IndexRow] = []
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 4:
+                    rows.append((parts[0], parts[1], int(parts[2]), int(parts[3])))
+        # 時刻を指定した追記・別プロセスからの追記では時刻順にならない場合がある
+        is_sorted = all(rows[i][0] <= rows[i + 1][0] for i in range(len(rows) - 1))
+        self._index_cache[segment.name] = (size, rows, is_sorted)
+        return rows
+
+    def _is_sorted(self, segment: Path) -> bool:
+        """セグメントのインデックスが時刻順か（_load_index 後に使用）"""
+        cached = self._index_cache.get(segment.name)
+        return cached[2] if cached else True
+
+    # ---- 書き込み ----
+
+    def append(self, entry: Dict[str, Any]) -> bool:
+        """エントリの追記"""
+        return self.append_many([entry]) == 1
+
+    def append_many(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        複数エントリの一括追記
+
+        Args:
+            entries: timestamp と symbol を含むエントリのリスト
+
+        Returns:
+            int: 追記件数
+        """
+        if not entries:
+            return 0
+
+        with self._lock:
+            segment = self.active_segment
+            if self._needs_rotation(segment, datetime.now()):
+                segment = self._rotate(segment)
+
+            index_lines = []
+            with open(segment, "ab") as f:
+                for entry in entries:
+                    timestamp = entry.get("timestamp") or datetime.now().isoformat()
+                    entry["timestamp"] = timestamp
+                    symbol = str(entry.get("symbol", ""))
+                    line = (
+                        json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+                        + "\n"
+                    ).encode("utf-8")
+                    offset = f.tell()
+                    f.write(line)
+                    index_lines.append(
+                        f"{timestamp}\t{symbol}\t{offset}\t{len(line)}\n"
+                    )
+
+            with open(self._index_path(segment), "a", encoding="utf-8") as f:
+                f.writelines(index_lines)
+
+        return len(entries)
+
+    # ---- 読み込み ----
+
+    def _read_rows(self, segment: Path, rows: List[IndexRow]) -> List[Dict[str, Any]]:
+        """インデックス行に対応するエントリをシークして読み込み"""
+        entries = []
+        with open(segment, "rb") as f:
+            for _, _, offset, length in rows:
+                f.seek(offset)
+                entries.append(json.loads(f.read(length)))
+        return entries
+
+    def iter_entries(
+        self, symbol: Optional[str] = None, since: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        エントリの走査（古い順）
+
+        Args:
+            symbol: 銘柄コード（指定時は該当銘柄のみ）
+            since: この時刻より後のエントリのみ（ISO形式）
+        """
+        for segment in self._segments():
+            index = self._load_index(segment)
+            if since and self._is_sorted(segment):
+                index = index[bisect_right(index, since, key=lambda row: row[0]) :]
+            elif since:
+                index = [row for row in index if row[0] > since]
+            rows = [row for row in index if symbol is None or row[1] == symbol]
+            if rows:
+                yield from self._read_rows(segment, rows)
+
+    def tail(
+        self, symbol: Optional[str] = None, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        最新エントリの取得（古い順で返す）
+
+        Args:
+            symbol: 銘柄コード（指定時は該当銘柄のみ）
+            limit: 取得件数制限
+        """
+        if limit <= 0:
+            return []
+
+        collected: List[Dict[str, Any]] = []
+        for segment in reversed(self._segments()):
+            rows = [
+                row
+                for row in self._load_index(segment)
+                if symbol is None or row[1] == symbol
+            ]
+            rows = rows[-(limit - len(collected)) :]
+            collected = self._read_rows(segment, rows) + collected
+            if len(collected) >= limit:
+                break
+        return collected
+
+    def prune(self, before: str) -> int:
+        """
+        指定時刻より前のエントリのみを含むセグメントの削除
+
+        Args:
+            before: 基準時刻（ISO形式）
+
+        Returns:
+            int: 削除したセグメント数
+        """
+        removed = 0
+        with self._lock:
+            for segment in self._segments():
+                index = self._load_index(segment)
+                if index and max(row[0] for row in index) >= before:
+                    break
+                self._remove_segment(segment)
+                removed += 1
+        return removed
+
+    def count(self) -> int:
+        """総エントリ数"""
+        return sum(len(self._load_index(segment)) for segment in self._segments())
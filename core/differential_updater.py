@@ -5,14 +5,26 @@ jQuantsから取得されたデータの差分更新を管理
 """
 
 import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 import logging
 from pathlib import Path
 import hashlib
 from dataclasses import dataclass
 from enum import Enum
-from .json_data_manager import JSONDataManager
+
+import numpy as np
+import pandas as pd
+
+from .backup_chunk_store import BackupChunkStore
+from .json_data_manager import STORAGE_MODE_SINGLE, JSONDataManager
+
+# 差分計算用DataFrameで、欠損を含む列に項目が存在したかを保持する列の接頭辞
+_PRESENT_PREFIX = "\x00present:"
 
 
 class UpdateStatus(Enum):
@@ -94,6 +106,8 @@ class UpdateConfig:
     enable_compression: bool = False
     enable_backup: bool = True
     max_data_age_days: int = 30
+    enable_vectorized_diff: bool = True
+    batch_workers: int = 1
 
 
 @dataclass
@@ -116,8 +130,45 @@ class DataHashCalculator:
     """データハッシュ計算クラス"""
 
     @staticmethod
-    def calculate_data_hash(data: List[Dict[str, Any]]) -> str:
-        """データのハッシュ値を計算"""
+    def calculate_data_hash(
+        data: List[Dict[str, Any]], frame: Optional[pd.DataFrame] = None
+    ) -> str:
+        """
+        データのハッシュ値を計算
+
+        差分計算用DataFrameの行ハッシュから求める（全件をJSON化しない）。
+        DataFrameに変換できないデータのみJSON文字列から計算する。
+
+        Args:
+            data: ハッシュ対象のデータ
+            frame: data から作成済みの差分計算用DataFrame（省略時は作成する）
+        """
+        try:
+            if frame is None:
+                frame = DiffCalculator._to_diff_frame(data)
+            if frame is not None:
+                return DataHashCalculator._frame_hash(frame)
+        except Exception:
+            pass
+        return DataHashCalculator._json_hash(data)
+
+    @staticmethod
+    def _frame_hash(frame: pd.DataFrame) -> str:
+        """列名・型と行ごとのハッシュから計算（列順によらず、数値は小数6桁に丸める）"""
+        columns = sorted(frame.columns)
+        values = frame[columns].round(6)
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps([[column, str(values[column].dtype)] for column in columns]).encode(
+                "utf-8"
+            )
+        )
+        digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _json_hash(data: List[Dict[str, Any]]) -> str:
+        """JSON文字列からのハッシュ値（DataFrameに変換できないデータ用）"""
         try:
             # データを正規化してハッシュ計算
             normalized_data = DataHashCalculator._normalize_data(data)
@@ -144,11 +195,18 @@ class DataHashCalculator:
 class DiffCalculator:
     """差分計算クラス（メモリ最適化版）"""
 
-    def __init__(self, logger=None, max_cache_size=100):
+    def __init__(
+        self, logger=None, max_cache_size=100, vectorized=True, vectorized_min_rows=1000
+    ):
         self.logger = logger
         self._diff_cache = {}
         self.max_cache_size = max_cache_size
         self._cache_access_count = {}
+        self._cache_lock = threading.Lock()
+        # vectorized: 日付で揃えたDataFrame上で差分を計算する
+        # （合計行数が少ない場合は従来方式。ハッシュはどちらもDataFrameの行ハッシュから計算）
+        self.vectorized = vectorized
+        self.vectorized_min_rows = vectorized_min_rows
 
     def calculate_comprehensive_diff(
         self, existing_data: List[Dict[str, Any]], new_data: List[Dict[str, Any]]
@@ -156,22 +214,33 @@ class DiffCalculator:
         """包括的差分計算"""
         start_time = datetime.now()
 
-        # データのハッシュ計算
-        existing_hash = DataHashCalculator.calculate_data_hash(existing_data)
-        new_hash = DataHashCalculator.calculate_data_hash(new_data)
+        # 差分計算用DataFrameを一度だけ作成し、ハッシュも行ハッシュから求める
+        # （ハッシュは差分の計算方式・件数によらず同じ値になる）
+        frames = self._prepare_frames(existing_data, new_data)
+        if frames is not None:
+            existing_hash = DataHashCalculator.calculate_data_hash(existing_data, frames[0])
+            new_hash = DataHashCalculator.calculate_data_hash(new_data, frames[1])
+        else:
+            existing_hash = DataHashCalculator.calculate_data_hash(existing_data)
+            new_hash = DataHashCalculator.calculate_data_hash(new_data)
 
         # キャッシュヒットなら即返却（メモリ最適化版）
         cache_key = (existing_hash, new_hash)
-        cached = self._diff_cache.get(cache_key)
-        if cached:
-            # アクセス回数を更新
-            self._cache_access_count[cache_key] = (
-                self._cache_access_count.get(cache_key, 0) + 1
-            )
-            return cached
+        with self._cache_lock:
+            cached = self._diff_cache.get(cache_key)
+            if cached:
+                # アクセス回数を更新
+                self._cache_access_count[cache_key] = (
+                    self._cache_access_count.get(cache_key, 0) + 1
+                )
+                return cached
 
         # 差分計算の実行
-        diff_counts = self._calculate_diff_counts(existing_data, new_data)
+        diff_counts = None
+        if frames is not None and self._use_vectorized(existing_data, new_data):
+            diff_counts = self._vectorized_diff_counts(*frames)
+        if diff_counts is None:
+            diff_counts = self._calculate_diff_counts(existing_data, new_data)
 
         # 処理時間の計算
         processing_time = (datetime.now() - start_time).total_seconds()
@@ -190,11 +259,12 @@ class DiffCalculator:
         )
 
         # キャッシュ保存（メモリ最適化版）
-        self._diff_cache[cache_key] = result
-        self._cache_access_count[cache_key] = 1
+        with self._cache_lock:
+            self._diff_cache[cache_key] = result
+            self._cache_access_count[cache_key] = 1
 
-        # キャッシュサイズ制限の適用
-        self._enforce_cache_limit()
+            # キャッシュサイズ制限の適用
+            self._enforce_cache_limit()
 
         return result
 
@@ -249,6 +319,145 @@ class DiffCalculator:
                 self.logger.error(f"差分カウント計算エラー: {e}")
             return {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
 
+    def _prepare_frames(
+        self, existing_data: List[Dict[str, Any]], new_data: List[Dict[str, Any]]
+    ) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """差分・ハッシュ計算用のDataFrameの作成（変換できない入力は None）"""
+        try:
+            existing_frame = self._to_diff_frame(existing_data)
+            new_frame = self._to_diff_frame(new_data)
+            if existing_frame is None or new_frame is None:
+                return None
+            return existing_frame, new_frame
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(
+                    f"ベクトル化差分を使用できないため従来方式で計算: {e}"
+                )
+            return None
+
+    def _use_vectorized(
+        self, existing_data: List[Dict[str, Any]], new_data: List[Dict[str, Any]]
+    ) -> bool:
+        """ベクトル化差分を使うか（合計行数が少ない場合は従来方式）"""
+        return (
+            self.vectorized
+            and len(existing_data) + len(new_data) >= self.vectorized_min_rows
+        )
+
+    @staticmethod
+    def _to_diff_frame(data: List[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+        """差分計算用DataFrameへの変換（列名は小文字に正規化）"""
+        if not isinstance(data, list):
+            return None
+        if not data:
+            return pd.DataFrame({"date": pd.Series([], dtype=object)})
+
+        frame = pd.DataFrame.from_records(data)
+        keys = list(frame.columns)
+        frame.columns = [str(column).lower() for column in frame.columns]
+        # date/Date の混在や日付欠損は従来方式と結果が変わるため対象外
+        if (
+            frame.columns.duplicated().any()
+            or "date" not in frame.columns
+            or frame["date"].isna().any()
+        ):
+            return None
+
+        # int/float の違いで差分扱いにならないよう数値列は float64 に揃える
+        for column in frame.columns:
+            if column != "date" and pd.api.types.is_numeric_dtype(frame[column]):
+                frame[column] = frame[column].astype(np.float64)
+
+        # 欠損は「項目なし」と「値が None」を区別するため、欠損を含む列は項目の有無も持つ
+        for key, column in zip(keys, list(frame.columns)):
+            if column != "date" and frame[column].isna().any():
+                frame[_PRESENT_PREFIX + column] = np.fromiter(
+                    (key in item for item in data), dtype=bool, count=len(data)
+                )
+        return frame
+
+    @staticmethod
+    def _key_present(
+        frame: pd.DataFrame, dates: pd.Index, columns: List[str]
+    ) -> np.ndarray:
+        """日付 × 列ごとの項目の有無（欠損のない列はすべて存在）"""
+        present = np.ones((len(dates), len(columns)), dtype=bool)
+        for i, column in enumerate(columns):
+            if _PRESENT_PREFIX + column in frame.columns:
+                present[:, i] = frame.loc[dates, _PRESENT_PREFIX + column].to_numpy(
+                    dtype=bool
+                )
+        return present
+
+    def _vectorized_diff_counts(
+        self, existing_frame: pd.DataFrame, new_frame: pd.DataFrame
+    ) -> Optional[Dict[str, int]]:
+        """日付で揃えた配列演算による差分カウントの計算"""
+        try:
+            # 同一日付は後勝ち（従来の辞書化と同じ）
+            existing = existing_frame.drop_duplicates("date", keep="last").set_index(
+                "date"
+            )
+            new = new_frame.drop_duplicates("date", keep="last").set_index("date")
+            common = existing.index.intersection(new.index)
+
+            updated = 0
+            columns = [
+                column
+                for column in existing.columns
+                if column in new.columns and not column.startswith(_PRESENT_PREFIX)
+            ]
+            if len(common) and columns:
+                old_values = existing.loc[common, columns]
+                new_values = new.loc[common, columns]
+                old_null, new_null = old_values.isna(), new_values.isna()
+                # 片側だけ欠損（None から値への訂正など）は、両側に項目があれば変更
+                # （片側にしかない項目は比較しない。従来の _has_changes と同じ）
+                null_changed = (
+                    (old_null.to_numpy() != new_null.to_numpy())
+                    & self._key_present(existing, common, columns)
+                    & self._key_present(new, common, columns)
+                ).any(axis=1)
+                comparable = ~old_null & ~new_null
+                old_values = old_values.where(comparable)
+                new_values = new_values.where(comparable)
+
+                same_dtype = [
+                    column
+                    for column in columns
+                    if old_values[column].dtype == new_values[column].dtype
+                ]
+                changed = null_changed.copy()
+                if same_dtype:
+                    changed |= (
+                        pd.util.hash_pandas_object(
+                            old_values[same_dtype], index=False
+                        ).to_numpy()
+                        != pd.util.hash_pandas_object(
+                            new_values[same_dtype], index=False
+                        ).to_numpy()
+                    )
+                # 型の異なる列はハッシュが一致しないため要素比較
+                for column in columns:
+                    if column not in same_dtype:
+                        changed |= (
+                            (old_values[column] != new_values[column])
+                            & comparable[column]
+                        ).to_numpy()
+                updated = int(changed.sum())
+
+            return {
+                "added": len(new) - len(common),
+                "updated": updated,
+                "removed": len(existing) - len(common),
+                "unchanged": len(common) - updated,
+            }
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"ベクトル化差分計算エラー（従来方式で再計算）: {e}")
+            return None
+
     def _has_changes(self, existing: Dict[str, Any], new: Dict[str, Any]) -> bool:
         """変更の有無を判定"""
         for key in existing:
@@ -369,33 +578,70 @@ class DataValidator:
 class DifferentialUpdater:
     """差分更新システム（リファクタリング版）"""
 
-    def __init__(self, data_dir: str, logger=None, error_handler=None):
+    def __init__(
+        self,
+        data_dir: str,
+        logger=None,
+        error_handler=None,
+        enable_mmap=False,
+        storage_mode: str = STORAGE_MODE_SINGLE,
+    ):
         """初期化（メモリ最適化版）"""
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logger or logging.getLogger(__name__)
         self.error_handler = error_handler
-        self.json_manager = JSONDataManager(str(self.data_dir), self.logger)
+        # enable_mmap: 更新後にメモリマップ配列も書き出す（バックテスト共有読み込み用）
+        # storage_mode: JSONDataManager のストレージモード（既定は stock_data.json の単一ファイル）
+        self.json_manager = JSONDataManager(
+            str(self.data_dir),
+            self.logger,
+            enable_mmap=enable_mmap,
+            storage_mode=storage_mode,
+        )
         self.config = UpdateConfig()
+        # バックアップ: 月単位チャンクをハッシュで共有し、更新ごとはマニフェストのみ追加
+        self.backup_store = BackupChunkStore(self.data_dir / "backups", self.logger)
 
         # コンポーネントの初期化（メモリ制限付き）
         self.hash_calculator = DataHashCalculator()
         self.diff_calculator = DiffCalculator(
-            self.logger, max_cache_size=50
+            self.logger,
+            max_cache_size=50,
+            vectorized=self.config.enable_vectorized_diff,
         )  # キャッシュサイズ制限
         self.validator = DataValidator(self.logger)
 
         # 統計情報の初期化
         self.update_stats = UpdateStats()
 
+        # 銘柄単位の更新ロック（同一銘柄の並行更新を直列化）
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._symbol_locks_guard = threading.Lock()
+
         # メモリ最適化設定
         self.memory_optimization_enabled = True
         self.max_memory_usage_mb = 200  # 最大メモリ使用量
 
+    def _get_symbol_lock(self, symbol: str) -> threading.Lock:
+        """銘柄単位の更新ロックの取得"""
+        with self._symbol_locks_guard:
+            lock = self._symbol_locks.get(symbol)
+            if lock is None:
+                lock = self._symbol_locks[symbol] = threading.Lock()
+            return lock
+
     def update_stock_data(
         self, symbol: str, new_data: List[Dict[str, Any]], source: str = "api"
     ) -> Dict[str, Any]:
         """株価データの差分更新"""
+        with self._get_symbol_lock(symbol):
+            return self._update_stock_data(symbol, new_data, source)
+
+    def _update_stock_data(
+        self, symbol: str, new_data: List[Dict[str, Any]], source: str
+    ) -> Dict[str, Any]:
+        """株価データの差分更新（銘柄ロック取得済み）"""
         try:
             # データ検証
             validation_result = self._validate_data_integrity(new_data, [])
@@ -471,11 +717,10 @@ class DifferentialUpdater:
     def _log_diff_update(
         self, symbol: str, diff_result: DiffResult, source: str
     ) -> None:
-        """差分更新ログの記録"""
+        """差分更新ログの記録（時刻はストアが追記時に付与）"""
         try:
             log_entry = {
                 "symbol": symbol,
-                "timestamp": datetime.now().isoformat(),
                 "source": source,
                 "diff": {
                     "added_count": diff_result.added_count,
@@ -873,20 +1118,6 @@ class DifferentialUpdater:
         except Exception:
             return True
 
-    def _backup_data(self, symbol: str, data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """データバックアップ"""
-        try:
-            backup_dir = self._create_backup_dir(symbol)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = backup_dir / f"backup_{timestamp}.json"
-
-            with open(backup_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
-            return {"success": True, "backup_file": str(backup_file)}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-
     def _create_backup_dir(self, symbol: str) -> Path:
         """バックアップディレクトリ作成"""
         backup_dir = self.data_dir / "backups" / symbol
@@ -929,28 +1160,55 @@ class DifferentialUpdater:
             "timestamp": datetime.now().isoformat(),
         }
 
-    def batch_update(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """バッチ更新"""
-        try:
-            results = []
-            successful = 0
-            failed = 0
+    def batch_update(
+        self, updates: List[Dict[str, Any]], max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        バッチ更新
 
-            for update in updates:
-                symbol = update.get("symbol")
-                data = update.get("data", [])
-                source = update.get("source", "batch")
+        Args:
+            updates: symbol・data・source を含む更新のリスト
+            max_workers: 並列ワーカー数（省略時は config.batch_workers、1 以下は逐次）
 
-                result = self.update_stock_data(symbol, data, source)
-                results.append(result)
+        Returns:
+            Dict[str, Any]: 更新結果のサマリー（timing に集計時間を含む）
+        """
+        try:
+            workers = max_workers or self.config.batch_workers
+            started = time.perf_counter()
+            committed = True
 
-                if result.get("success") is True:
-                    successful += 1
-                else:
-                    failed += 1
+            if workers <= 1:
+                timed_results = [self._timed_update(update) for update in updates]
+            else:
+                # 同一銘柄の更新は1タスクにまとめて入力順に処理し、
+                # 共有ファイルへの書き込みは最後に1回だけコミットする
+                groups: "OrderedDict[Any, List[int]]" = OrderedDict()
+                for index, update in enumerate(updates):
+                    groups.setdefault(update.get("symbol"), []).append(index)
+
+                timed_results = [None] * len(updates)
+                self.json_manager.begin_batch()
+                try:
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        futures = [
+                            executor.submit(self._run_symbol_updates, updates, indices)
+                            for indices in groups.values()
+                        ]
+                        for future in futures:
+                            for index, timed_result in future.result():
+                                timed_results[index] = timed_result
+                finally:
+                    committed = self.json_manager.commit_batch()
+
+            results = [result for result, _ in timed_results]
+            durations = [elapsed for _, elapsed in timed_results]
+            successful = sum(1 for result in results if result.get("success") is True)
+            failed = len(results) - successful
+            total_time = time.perf_counter() - started
 
             return {
-                "success": failed == 0,
+                "success": failed == 0 and bool(committed),
                 "status": "completed",
                 "total": len(updates),
                 "successful": successful,
@@ -958,12 +1216,124 @@ class DifferentialUpdater:
                 "success_count": successful,
                 "error_count": failed,
                 "results": results,
+                "timing": {
+                    "workers": max(workers, 1),
+                    "total_time": total_time,
+                    "update_time_total": sum(durations),
+                    "avg_update_time": (
+                        sum(durations) / len(durations) if durations else 0.0
+                    ),
+                    "max_update_time": max(durations, default=0.0),
+                    "updates_per_second": (
+                        len(updates) / total_time if total_time > 0 else 0.0
+                    ),
+                },
             }
         except Exception as e:
             if self.logger:
                 self.logger.error(f"バッチ更新エラー: {e}")
             return {"success": False, "status": "error", "error": str(e)}
 
+    def ingest(
+        self,
+        bars: Iterable[Dict[str, Any]],
+        source: str = "stream",
+        chunk_size: int = 10000,
+    ) -> Dict[str, Any]:
+        """
+        日次データのストリーミング取り込み
+
+        複数銘柄の新しい日足をイテレータ/ジェネレータで受け取り、chunk_size 件ごとに
+        銘柄別にまとめて追記する。既存データとは末尾ウィンドウのみで差分を取るため、
+        処理コストは履歴の長さではなく新しい日足の件数に比例する
+
+        Args:
+            bars: code・date を含む日足データのイテラブル
+            source: データソース
+            chunk_size: まとめて処理する日足の件数
+
+        Returns:
+            Dict[str, Any]: 取り込み結果のサマリー
+        """
+        started = time.perf_counter()
+        summary = {
+            "success": True,
+            "total_bars": 0,
+            "skipped_bars": 0,
+            "added": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "symbols": set(),
+            "failed_symbols": [],
+        }
+
+        buffer: Dict[str, List[Dict[str, Any]]] = {}
+        buffered = 0
+        self.json_manager.begin_batch()
+        try:
+            for bar in bars:
+                summary["total_bars"] += 1
+                symbol = bar.get("code") if isinstance(bar, dict) else None
+                if not symbol:
+                    summary["skipped_bars"] += 1
+                    continue
+
+                buffer.setdefault(str(symbol), []).append(bar)
+                buffered += 1
+                if buffered >= chunk_size:
+                    self._flush_ingest_buffer(buffer, source, summary)
+                    buffer = {}
+                    buffered = 0
+
+            self._flush_ingest_buffer(buffer, source, summary)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"ストリーミング取り込みエラー: {e}")
+            summary["success"] = False
+            summary["error"] = str(e)
+        finally:
+            if not self.json_manager.commit_batch():
+                summary["success"] = False
+
+        summary["symbols"] = len(summary["symbols"])
+        summary["processing_time"] = time.perf_counter() - started
+        summary["timestamp"] = datetime.now().isoformat()
+        return summary
+
+    def _flush_ingest_buffer(
+        self,
+        buffer: Dict[str, List[Dict[str, Any]]],
+        source: str,
+        summary: Dict[str, Any],
+    ):
+        """取り込みバッファの銘柄別追記"""
+        for symbol, rows in buffer.items():
+            with self._get_symbol_lock(symbol):
+                result = self.json_manager.append_stock_data(symbol, rows, source)
+
+            summary["symbols"].add(symbol)
+            if not result.get("success"):
+                summary["success"] = False
+                summary["failed_symbols"].append(symbol)
+                continue
+            summary["added"] += result.get("added_count", 0)
+            summary["updated"] += result.get("updated_count", 0)
+            summary["unchanged"] += result.get("unchanged_count", 0)
+
+    def _run_symbol_updates(
+        self, updates: List[Dict[str, Any]], indices: List[int]
+    ) -> List[Tuple[int, Tuple[Dict[str, Any], float]]]:
+        """同一銘柄の更新を入力順に処理（並列バッチのワーカー処理）"""
+        return [(index, self._timed_update(updates[index])) for index in indices]
+
+    def _timed_update(self, update: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        """1件の更新と所要時間の計測"""
+        started = time.perf_counter()
+        result = self.update_stock_data(
+            update.get("symbol"), update.get("data", []), update.get("source", "batch")
+        )
+        return result, time.perf_counter() - started
+
     def get_update_history(
         self, symbol: str = None, limit: int = 100
     ) -> List[Dict[str, Any]]:
@@ -1065,25 +1435,48 @@ class DifferentialUpdater:
             raise
 
     def _create_backup(self, symbol: str, data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """データバックアップ作成"""
+        """データバックアップ作成（月単位チャンクの重複排除・マニフェストのみ追加）"""
         try:
-            backup_dir = self._create_backup_dir(symbol)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = backup_dir / f"backup_{timestamp}.json"
-
-            with open(backup_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
+            saved = self.backup_store.save(symbol, data)
             return {
                 "success": True,
-                "backup_file": str(backup_file),
-                "timestamp": timestamp,
+                "backup_file": saved["manifest_file"],
+                "timestamp": saved["timestamp"],
+                "chunks_written": saved["chunks_written"],
+                "chunks_reused": saved["chunks_reused"],
             }
         except Exception as e:
             if self.logger:
                 self.logger.error(f"バックアップ作成エラー: {e}")
             return {"success": False, "error": str(e)}
 
+    def restore_backup(
+        self, symbol: str, backup_file: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        バックアップの復元
+
+        Args:
+            symbol: 銘柄コード
+            backup_file: マニフェストまたは旧形式のバックアップファイル（省略時は最新）
+
+        Returns:
+            List[Dict[str, Any]]: 復元した時系列データ（失敗時は空リスト）
+        """
+        try:
+            if backup_file and not str(backup_file).endswith(
+                BackupChunkStore.MANIFEST_SUFFIX
+            ):
+                # 旧形式（全件コピー）のバックアップ
+                with open(backup_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            manifest = Path(backup_file) if backup_file else None
+            return self.backup_store.restore(symbol, manifest)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"バックアップ復元エラー {symbol}: {e}")
+            return []
+
     def _backup_data(self, symbol: str, data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """データバックアップ（エイリアス）"""
         return self._create_backup(symbol, data)
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+特徴量行列のキャッシュ（フィーチャーストア）
+学習・シグナル生成・バックテストのたびに同じデータから特徴量を作り直さないよう、
+(銘柄, データ内容のハッシュ, 特徴量定義のバージョン) ごとに結果を保持する
+メモリ上は LRU で保持し、追い出したものは列指向ファイルに退避する
+末尾の行だけが追加・変更された場合は、末尾とウォームアップ分だけを再計算する
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+ENGINE_PARQUET = "parquet"
+ENGINE_NPZ = "npz"
+
+_META_KEY = b"feature_store"
+_ROW_HASH_COLUMN = "__row_hashes__"
+
+
+@dataclass
+class FeatureEntry:
+    """キャッシュした特徴量（入力の行ごとのハッシュを含む）"""
+
+    data_hash: str
+    schema: str
+    row_hashes: np.ndarray
+    features: pd.DataFrame
+
+    @property
+    def cells(self) -> int:
+        return int(self.features.size)
+
+
+def row_hashes(data: pd.DataFrame) -> np.ndarray:
+    """行ごとのハッシュ（インデックスを含む）"""
+    return pd.util.hash_pandas_object(data, index=True).to_numpy(dtype=np.uint64)
+
+
+def frame_schema(data: pd.DataFrame) -> str:
+    """列名と型"""
+    return json.dumps([[str(c), str(t)] for c, t in data.dtypes.items()])
+
+
+def data_hash(data: pd.DataFrame, hashes: Optional[np.ndarray] = None) -> str:
+    """データ内容のハッシュ（列名・型・全行の値）"""
+    hashes = row_hashes(data) if hashes is None else hashes
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(frame_schema(data).encode("utf-8"))
+    digest.update(hashes.tobytes())
+    return digest.hexdigest()
+
+
+def _common_prefix(cached: np.ndarray, current: np.ndarray) -> int:
+    """先頭から一致している行数"""
+    length = min(len(cached), len(current))
+    changed = np.flatnonzero(cached[:length] != current[:length])
+    return int(changed[0]) if len(changed) else length
+
+
+def _rows_match(left: pd.DataFrame, right: pd.DataFrame) -> bool:
+    """再計算した行がキャッシュと一致するか（浮動小数点の誤差は許容）"""
+    if list(left.columns) != list(right.columns):
+        return False
+    for column in left.columns:
+        a, b = left[column].to_numpy(), right[column].to_numpy()
+        if a.dtype.kind in "biuf" and b.dtype.kind in "biuf":
+            matched = np.allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True)
+        else:
+            matched = bool(pd.Series(a).equals(pd.Series(b)))
+        if not matched:
+            return False
+    return True
+
+
+class FeatureStore:
+    """特徴量行列の LRU キャッシュクラス（セル数で容量を制限）"""
+
+    def __init__(
+        self,
+        max_cells: int = 2_000_000,
+        spill_dir: Optional[Path] = None,
+        engine: Optional[str] = None,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            max_cells: メモリ上に保持する総セル数（行数 × 列数）の上限
+            spill_dir: 追い出した特徴量の退避先（省略時は退避しない）
+            engine: 退避形式 "parquet" または "npz"（省略時は利用可能なものを自動選択）
+            logger: ロガーインスタンス
+        """
+        if engine is None:
+            engine = ENGINE_PARQUET if PYARROW_AVAILABLE else ENGINE_NPZ
+        if engine == ENGINE_PARQUET and not PYARROW_AVAILABLE:
+            raise ValueError("Parquet形式にはpyarrowが必要です")
+        if engine not in (ENGINE_PARQUET, ENGINE_NPZ):
+            raise ValueError(f"未対応のエンジン: {engine}")
+
+        self.max_cells = max_cells
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.engine = engine
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._entries: "OrderedDict[Tuple[str, str], FeatureEntry]" = OrderedDict()
+        self._total_cells = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self.disk_loads = 0
+
+    def get_or_compute(
+        self,
+        data: pd.DataFrame,
+        compute: Callable[[pd.DataFrame], pd.DataFrame],
+        spec_version: str,
+        symbol: Optional[str] = None,
+        lookback: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        特徴量の取得（キャッシュになければ計算して登録）
+
+        Args:
+            data: 入力データ（行の順序どおりに特徴量を計算するもの）
+            compute: 入力データから特徴量を計算する関数（入力と同じ行数を返すこと）
+            spec_version: 特徴量定義のバージョン（定義を変えたら更新する）
+            symbol: 銘柄コード（省略時は先頭行の内容で識別する）
+            lookback: 末尾だけを再計算するときに前に含めるウォームアップ行数
+                （累積系の列を含むなど、有限の行数で再現できない場合は None）
+
+        Returns:
+            pd.DataFrame: 特徴量（呼び出し側で変更してよいコピー）
+        """
+        hashes = row_hashes(data)
+        current_hash = data_hash(data, hashes)
+        if symbol is None:
+            symbol = f"row0:{hashes[0]:016x}" if len(hashes) else "empty"
+        key = (spec_version, str(symbol))
+
+        entry = self._lookup(key)
+        if entry is not None and entry.data_hash == current_hash:
+            with self._lock:
+                self.hits += 1
+            return entry.features.copy()
+
+        schema = frame_schema(data)
+        features = None
+        if entry is not None and lookback is not None and entry.schema == schema:
+            features = self._recompute_tail(data, compute, entry, hashes, lookback)
+        if features is None:
+            with self._lock:
+                self.misses += 1
+            features = compute(data)
+        else:
+            with self._lock:
+                self.partial_hits += 1
+
+        self._store(key, FeatureEntry(current_hash, schema, hashes, features.copy()))
+        return features
+
+    def _recompute_tail(
+        self,
+        data: pd.DataFrame,
+        compute: Callable[[pd.DataFrame], pd.DataFrame],
+        entry: FeatureEntry,
+        hashes: np.ndarray,
+        lookback: int,
+    ) -> Optional[pd.DataFrame]:
+        """
+        変更のなかった先頭はキャッシュを使い、変更行以降だけを再計算
+
+        変更行の直前の lookback 行（照合範囲）も、さらに前の lookback 行を
+        ウォームアップとして再計算し、照合範囲全体がキャッシュと一致しなければ
+        None を返す（ウォームアップが足りない場合に誤った値をつながないため）
+        """
+        unchanged = _common_prefix(entry.row_hashes, hashes)
+        overlap = max(lookback, 1)
+        start = unchanged - lookback - overlap
+        if unchanged == 0 or start < 0 or len(entry.features) != len(entry.row_hashes):
+            return None
+
+        tail = compute(data.iloc[start:])
+        verified = unchanged - start
+        if len(tail) != len(data) - start or not _rows_match(
+            tail.iloc[verified - overlap : verified],
+            entry.features.iloc[unchanged - overlap : unchanged],
+        ):
+            return None
+        return pd.concat([entry.features.iloc[:unchanged], tail.iloc[verified:]])
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[FeatureEntry]:
+        """メモリ、なければ退避ファイルから取得"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._load_spill(key)
+        if entry is not None:
+            with self._lock:
+                self.disk_loads += 1
+            self._store(key, entry)
+        return entry
+
+    def _store(self, key: Tuple[str, str], entry: FeatureEntry):
+        """メモリに登録し、上限を超えた分を古い順に追い出す"""
+        evicted = []
+        with self._lock:
+            self._remove(key)
+            if entry.cells > self.max_cells:
+                evicted.append((key, entry))
+            else:
+                self._entries[key] = entry
+                self._total_cells += entry.cells
+            while self._total_cells > self.max_cells:
+                oldest_key = next(iter(self._entries))
+                evicted.append((oldest_key, self._entries[oldest_key]))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+        # 登録した内容より古い退避ファイルは不要
+        if self.spill_dir is not None and not any(k == key for k, _ in evicted):
+            self._spill_path(key).unlink(missing_ok=True)
+        for evicted_key, evicted_entry in evicted:
+            self._spill(evicted_key, evicted_entry)
+
+    def _remove(self, key: Tuple[str, str]):
+        """エントリの削除（ロック取得済みであること）"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_cells -= entry.cells
+
+    def _spill_path(self, key: Tuple[str, str]) -> Path:
+        """退避ファイルのパス"""
+        safe = [re.sub(r"[^0-9A-Za-z_.-]", "_", part) for part in key]
+        return self.spill_dir / f"{safe[0]}__{safe[1]}.{self.engine}"
+
+    def _spill(self, key: Tuple[str, str], entry: FeatureEntry) -> bool:
+        """特徴量を列指向ファイルに退避"""
+        if self.spill_dir is None:
+            return False
+        file_path = self._spill_path(key)
+        temp_path = file_path.with_suffix(".tmp")
+        meta = {"key": list(key), "data_hash": entry.data_hash, "schema": entry.schema}
+        try:
+            if self.engine == ENGINE_PARQUET:
+                table = pa.Table.from_pandas(entry.features, preserve_index=True)
+                table = table.append_column(_ROW_HASH_COLUMN, pa.array(entry.row_hashes))
+                table = table.replace_schema_metadata(
+                    {**(table.schema.metadata or {}), _META_KEY: json.dumps(meta)}
+                )
+                pq.write_table(table, temp_path, compression="zstd")
+            else:
+                arrays = self._to_arrays(entry.features)
+                if arrays is None:
+                    return False
+                meta["columns"] = list(entry.features.columns)
+                meta["index_name"] = entry.features.index.name
+                arrays["__meta__"] = np.array(json.dumps(meta, ensure_ascii=False))
+                arrays[_ROW_HASH_COLUMN] = entry.row_hashes
+                with open(temp_path, "wb") as f:
+                    np.savez(f, **arrays)
+            temp_path.replace(file_path)
+        except Exception as e:
+            self.logger.warning(f"特徴量の退避エラー {key}: {e}")
+            temp_path.unlink(missing_ok=True)
+            return False
+        with self._lock:
+            self.spills += 1
+        return True
+
+    @staticmethod
+    def _to_arrays(features: pd.DataFrame) -> Optional[Dict[str, np.ndarray]]:
+        """NumPy アーカイブに保存できる列の配列（文字列・オブジェクト列を含む場合は None）"""
+        if not all(isinstance(column, str) for column in features.columns):
+            return None
+        arrays = {"__index__": features.index.to_numpy()}
+        for i, column in enumerate(features.columns):
+            arrays[f"c{i}"] = features[column].to_numpy()
+        if any(array.dtype.kind not in "biufcmM" for array in arrays.values()):
+            return None
+        return arrays
+
+    def _load_spill(self, key: Tuple[str, str]) -> Optional[FeatureEntry]:
+        """退避ファイルの読み込み"""
+        if self.spill_dir is None:
+            return None
+        file_path = self._spill_path(key)
+        if not file_path.exists():
+            return None
+        try:
+            if self.engine == ENGINE_PARQUET:
+                table = pq.read_table(file_path)
+                meta = json.loads(table.schema.metadata[_META_KEY])
+                hashes = table.column(_ROW_HASH_COLUMN).to_numpy()
+                features = table.drop([_ROW_HASH_COLUMN]).to_pandas()
+            else:
+                with np.load(file_path, allow_pickle=False) as archive:
+                    meta = json.loads(str(archive["__meta__"]))
+                    hashes = archive[_ROW_HASH_COLUMN]
+                    features = pd.DataFrame(
+                        {
+                            column: archive[f"c{i}"]
+                            for i, column in enumerate(meta["columns"])
+                        },
+                        index=pd.Index(archive["__index__"], name=meta["index_name"]),
+                    )
+        except Exception as e:
+            self.logger.warning(f"特徴量の退避ファイル読み込みエラー {key}: {e}")
+            return None
+        if meta.get("key") != list(key):
+            return None
+        return FeatureEntry(
+            meta["data_hash"], meta["schema"], hashes.astype(np.uint64), features
+        )
+
+    def invalidate(self, spec_version: Optional[str] = None):
+        """キャッシュの無効化（spec_version 省略時は全件、退避ファイルも削除）"""
+        with self._lock:
+            keys = [k for k in self._entries if spec_version in (None, k[0])]
+            for key in keys:
+                self._remove(key)
+        if self.spill_dir is not None:
+            for file_path in self.spill_dir.glob(f"*.{self.engine}"):
+                if spec_version is None or file_path.name.startswith(
+                    re.sub(r"[^0-9A-Za-z_.-]", "_", spec_version) + "__"
+                ):
+                    file_path.unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キャッシュ統計の取得"""
+        with self._lock:
+            requests = self.hits + self.partial_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "cells": self._total_cells,
+                "max_cells": self.max_cells,
+                "hits": self.hits,
+                "partial_hits": self.partial_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "disk_loads": self.disk_loads,
+                "hit_rate": (self.hits + self.partial_hits) / requests if requests else 0.0,
+            }
+
+
+# プロセス内で共有するストア（退避なし、インスタンスを持たない関数から使う）
+_shared_store: Optional[FeatureStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    """
+    プロセス共有の特徴量ストアの取得
+
+    各計算クラスは既定でインスタンスごとのストアを持つため、
+    クラス間で共有する場合は feature_store=get_feature_store() のように渡す
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = FeatureStore()
+        return _shared_store
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+増分取得プランナー
+保存済みの最終日付と取引カレンダーから銘柄ごとの不足期間だけを取得対象にする
+最新営業日まで保存済みの銘柄は取得しない
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from .trading_calendar import TradingCalendar
+
+
+@dataclass
+class FetchWindow:
+    """銘柄ごとの取得期間"""
+
+    code: str
+    date_from: str
+    date_to: str
+    # 保存済みの最終日付（新規銘柄はNone）
+    last_date: Optional[str] = None
+
+    @property
+    def params(self) -> Dict[str, str]:
+        """daily_quotes のクエリパラメータ"""
+        return {"code": self.code, "from": self.date_from, "to": self.date_to}
+
+
+@dataclass
+class FetchPlan:
+    """取得計画"""
+
+    target_date: str
+    windows: List[FetchWindow] = field(default_factory=list)
+    up_to_date: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, int]:
+        """計画のサマリー"""
+        return {
+            "to_fetch": len(self.windows),
+            "up_to_date": len(self.up_to_date),
+            "new_symbols": sum(1 for w in self.windows if w.last_date is None),
+        }
+
+
+class IncrementalFetchPlanner:
+    """増分取得プランナークラス"""
+
+    def __init__(
+        self, calendar: TradingCalendar, initial_days: int = 30, logger=None
+    ):
+        """
+        初期化
+
+        Args:
+            calendar: 取引カレンダー
+            initial_days: 保存データがない銘柄の取得日数（従来の固定30日に相当）
+            logger: ロガーインスタンス
+        """
+        self.calendar = calendar
+        self.initial_days = initial_days
+        self.logger = logger or logging.getLogger(__name__)
+
+    def plan(
+        self,
+        last_dates: Dict[str, Optional[str]],
+        as_of: Optional[date] = None,
+    ) -> FetchPlan:
+        """
+        取得計画の作成
+
+        Args:
+            last_dates: 銘柄コード -> 保存済み最終日付（JSONDataManager.get_last_dates）
+            as_of: 基準日（省略時は本日。休業日なら直近の営業日まで）
+
+        Returns:
+            FetchPlan: 銘柄ごとの不足期間と最新の銘柄
+        """
+        as_of = as_of or datetime.now().date()
+        initial_from = as_of - timedelta(days=self.initial_days)
+        self.calendar.ensure(initial_from, as_of)
+
+        target = self.calendar.previous_trading_day(as_of)
+        target_str = target.isoformat()
+        plan = FetchPlan(target_date=target_str)
+
+        for code, last_date in last_dates.items():
+            if last_date and last_date[:10] >= target_str:
+                plan.up_to_date.append(code)
+                continue
+            if last_date:
+                date_from = self.calendar.next_trading_day(last_date[:10])
+            else:
+                date_from = self.calendar.next_trading_day(initial_from, inclusive=True)
+            plan.windows.append(
+                FetchWindow(code, date_from.isoformat(), target_str, last_date)
+            )
+
+        self.logger.info(f"増分取得計画 ({target_str}時点): {plan.summary()}")
+        return plan
@@ -5,7 +5,7 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import logging
@@ -16,10 +16,18 @@ from sklearn.neural_network import MLPRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import warnings
 
+from .feature_store import FeatureStore
+from .indicator_engine import IndicatorEngine
+
 warnings.filterwarnings("ignore")
 
 logger = logging.getLogger(__name__)
 
+# 特徴量の定義を変えたら更新する（キャッシュ済みの特徴量を使わないため）
+FEATURE_SPEC_VERSION = "improved_trading_system.features/1"
+# 末尾だけ再計算するときのウォームアップ行数（MACD の EMA が収束する長さ）
+FEATURE_LOOKBACK = 600
+
 
 @dataclass
 class TradingSignal:
@@ -73,6 +81,7 @@ class ImprovedTradingSystem:
         commission_rate: float = 0.002,
         slippage_rate: float = 0.001,
         max_position_size: float = 0.1,
+        feature_store: Optional[FeatureStore] = None,
     ):
         """
         初期化
@@ -82,12 +91,15 @@ class ImprovedTradingSystem:
             commission_rate: 手数料率（デフォルト0.2%）
             slippage_rate: スリッページ率（デフォルト0.1%）
             max_position_size: 最大ポジションサイズ（デフォルト10%）
+            feature_store: 特徴量のキャッシュ（省略時はインスタンスごとに作成）
         """
         self.reliability_threshold = reliability_threshold
         self.commission_rate = commission_rate
         self.slippage_rate = slippage_rate
         self.max_position_size = max_position_size
         self.total_cost_rate = commission_rate + slippage_rate
+        # 学習・シグナル生成・バックテストで同じデータの特徴量を作り直さない
+        self.feature_store = feature_store or FeatureStore()
 
         self.logger = logging.getLogger(__name__)
 
@@ -197,9 +209,23 @@ class ImprovedTradingSystem:
             self.logger.error(f"モデル学習でエラー: {e}")
             raise
 
-    def _create_features(self, data: pd.DataFrame) -> pd.DataFrame:
-        """特徴量の作成"""
+    def _create_features(
+        self, data: pd.DataFrame, symbol: Optional[str] = None
+    ) -> pd.DataFrame:
+        """特徴量の作成（同じデータの特徴量はストアから取得し、末尾の変更分だけ再計算）"""
+        return self.feature_store.get_or_compute(
+            data,
+            self._build_features,
+            FEATURE_SPEC_VERSION,
+            symbol=symbol,
+            lookback=FEATURE_LOOKBACK,
+        )
+
+    def _build_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """特徴量の計算"""
         df = data.copy()
+        # 移動平均・ボラティリティ・各指標の中間結果を共有する
+        engine = IndicatorEngine.from_frame(df)
 
         # 基本価格特徴量
         df["Price_Change"] = df["Close"].pct_change()
@@ -208,10 +234,10 @@ class ImprovedTradingSystem:
         df["Price_Change_10"] = df["Close"].pct_change(10)
 
         # 移動平均
-        df["MA_5"] = df["Close"].rolling(window=5).mean()
-        df["MA_10"] = df["Close"].rolling(window=10).mean()
-        df["MA_20"] = df["Close"].rolling(window=20).mean()
-        df["MA_50"] = df["Close"].rolling(window=50).mean()
+        df["MA_5"] = engine.sma(5)
+        df["MA_10"] = engine.sma(10)
+        df["MA_20"] = engine.sma(20)
+        df["MA_50"] = engine.sma(50)
 
         # 移動平均乖離率（ゼロ除算を避ける）
         df["MA5_Deviation"] = np.where(
@@ -225,26 +251,28 @@ class ImprovedTradingSystem:
         )
 
         # ボラティリティ
-        df["Volatility_5"] = df["Close"].rolling(window=5).std()
-        df["Volatility_20"] = df["Close"].rolling(window=20).std()
-        df["Volatility_50"] = df["Close"].rolling(window=50).std()
+        df["Volatility_5"] = engine.rolling_std("close", 5)
+        df["Volatility_20"] = engine.rolling_std("close", 20)
+        df["Volatility_50"] = engine.rolling_std("close", 50)
 
         # 出来高特徴量
         df["Volume_Change"] = df["Volume"].pct_change()
-        df["Volume_MA_5"] = df["Volume"].rolling(window=5).mean()
-        df["Volume_MA_20"] = df["Volume"].rolling(window=20).mean()
+        df["Volume_MA_5"] = engine.sma(5, "volume")
+        df["Volume_MA_20"] = engine.sma(20, "volume")
         df["Volume_Ratio"] = np.where(
             df["Volume_MA_20"] != 0, df["Volume"] / df["Volume_MA_20"], 1
         )
 
         # テクニカル指標
-        df["RSI"] = self._calculate_rsi(df["Close"])
-        df["MACD"] = self._calculate_macd(df["Close"])
-        df["MACD_Signal"] = df["MACD"].ewm(span=9).mean()
+        df["RSI"] = self._calculate_rsi(df["Close"], engine=engine)
+        df["MACD"] = self._calculate_macd(df["Close"], engine=engine)
+        df["MACD_Signal"] = engine.macd()[1]
         df["MACD_Histogram"] = df["MACD"] - df["MACD_Signal"]
 
         # ボリンジャーバンド
-        bb_upper, bb_lower, bb_middle = self._calculate_bollinger_bands(df["Close"])
+        bb_upper, bb_lower, bb_middle = self._calculate_bollinger_bands(
+            df["Close"], engine=engine
+        )
         df["BB_Upper"] = bb_upper
         df["BB_Lower"] = bb_lower
         df["BB_Middle"] = bb_middle
@@ -256,19 +284,19 @@ class ImprovedTradingSystem:
         )
 
         # ATR
-        df["ATR"] = self._calculate_atr(df)
+        df["ATR"] = self._calculate_atr(df, engine=engine)
 
         # ストキャスティクス
-        df["Stoch_K"], df["Stoch_D"] = self._calculate_stochastic(df)
+        df["Stoch_K"], df["Stoch_D"] = self._calculate_stochastic(df, engine=engine)
 
         # ウィリアムズ%R
-        df["Williams_R"] = self._calculate_williams_r(df)
+        df["Williams_R"] = self._calculate_williams_r(df, engine=engine)
 
         # CCI
-        df["CCI"] = self._calculate_cci(df)
+        df["CCI"] = self._calculate_cci(df, engine=engine)
 
         # ADX
-        df["ADX"] = self._calculate_adx(df)
+        df["ADX"] = self._calculate_adx(df, engine=engine)
 
         # 価格位置
         df["Price_Position_20"] = df["Close"].rolling(window=20).rank(pct=True)
@@ -279,26 +307,33 @@ class ImprovedTradingSystem:
 
         return df
 
-    def _calculate_rsi(self, prices: pd.Series, window: int = 14) -> pd.Series:
+    def _calculate_rsi(
+        self,
+        prices: pd.Series,
+        window: int = 14,
+        engine: Optional[IndicatorEngine] = None,
+    ) -> pd.Series:
         """RSI計算"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        engine = engine or IndicatorEngine(close=prices)
+        return pd.Series(engine.rsi(window), index=prices.index)
 
     def _calculate_macd(
-        self, prices: pd.Series, fast: int = 12, slow: int = 26
+        self,
+        prices: pd.Series,
+        fast: int = 12,
+        slow: int = 26,
+        engine: Optional[IndicatorEngine] = None,
     ) -> pd.Series:
         """MACD計算"""
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
-        macd = ema_fast - ema_slow
-        return macd
+        engine = engine or IndicatorEngine(close=prices)
+        return pd.Series(engine.macd(fast, slow)[0], index=prices.index)
 
     def _calculate_bollinger_bands(
-        self, prices: pd.Series, window: int = 20, num_std: float = 2
+        self,
+        prices: pd.Series,
+        window: int = 20,
+        num_std: float = 2,
+        engine: Optional[IndicatorEngine] = None,
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """ボリンジャーバンド計算"""
         # データが少ない場合は適応的にウィンドウサイズを調整
@@ -307,35 +342,42 @@ class ImprovedTradingSystem:
             # データが2未満の場合は単純な価格を返す
             return prices, prices, prices
 
-        rolling_mean = prices.rolling(window=actual_window).mean()
-        rolling_std = prices.rolling(window=actual_window).std()
-        upper_band = rolling_mean + (rolling_std * num_std)
-        lower_band = rolling_mean - (rolling_std * num_std)
+        engine = engine or IndicatorEngine(close=prices)
+        upper_band, rolling_mean, lower_band = engine.bollinger_bands(
+            actual_window, num_std
+        )
+        rolling_std = engine.rolling_std("close", actual_window)
+        price = engine.series("close")
 
         # NaN値を適切に処理し、upper > lowerを保証
-        for i in range(len(prices)):
-            if (
-                pd.isna(upper_band.iloc[i])
-                or pd.isna(lower_band.iloc[i])
-                or pd.isna(rolling_mean.iloc[i])
-            ):
-                upper_band.iloc[i] = prices.iloc[i] * 1.01  # 少し高く設定
-                lower_band.iloc[i] = prices.iloc[i] * 0.99  # 少し低く設定
-                rolling_mean.iloc[i] = prices.iloc[i]
-            elif upper_band.iloc[i] <= lower_band.iloc[i]:
-                # upper <= lowerの場合は調整
-                mid = rolling_mean.iloc[i]
-                std_val = (
-                    abs(rolling_std.iloc[i])
-                    if not pd.isna(rolling_std.iloc[i])
-                    else prices.iloc[i] * 0.01
-                )
-                upper_band.iloc[i] = mid + std_val * num_std
-                lower_band.iloc[i] = mid - std_val * num_std
+        missing = np.isnan(upper_band) | np.isnan(lower_band) | np.isnan(rolling_mean)
+        inverted = ~missing & (upper_band <= lower_band)
+        # upper <= lowerの場合は標準偏差の絶対値で調整
+        std_val = np.where(np.isnan(rolling_std), price * 0.01, np.abs(rolling_std))
+        upper_band = np.where(
+            missing,
+            price * 1.01,  # 少し高く設定
+            np.where(inverted, rolling_mean + std_val * num_std, upper_band),
+        )
+        lower_band = np.where(
+            missing,
+            price * 0.99,  # 少し低く設定
+            np.where(inverted, rolling_mean - std_val * num_std, lower_band),
+        )
+        rolling_mean = np.where(missing, price, rolling_mean)
 
-        return upper_band, lower_band, rolling_mean
+        return (
+            pd.Series(upper_band, index=prices.index),
+            pd.Series(lower_band, index=prices.index),
+            pd.Series(rolling_mean, index=prices.index),
+        )
 
-    def _calculate_atr(self, data: pd.DataFrame, window: int = 14) -> pd.Series:
+    def _calculate_atr(
+        self,
+        data: pd.DataFrame,
+        window: int = 14,
+        engine: Optional[IndicatorEngine] = None,
+    ) -> pd.Series:
         """ATR計算"""
         # データが少ない場合は適応的にウィンドウサイズを調整
         actual_window = min(window, len(data))
@@ -343,27 +385,24 @@ class ImprovedTradingSystem:
             # データが2未満の場合は単純な高値-安値を返す
             return data["High"] - data["Low"]
 
-        high_low = data["High"] - data["Low"]
-        high_close = np.abs(data["High"] - data["Close"].shift())
-        low_close = np.abs(data["Low"] - data["Close"].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        atr = true_range.rolling(window=actual_window).mean()
+        engine = engine or IndicatorEngine.from_frame(data)
         # NaN値を0で埋める
-        atr = atr.fillna(0)
-        return atr
+        return pd.Series(engine.atr(actual_window), index=data.index).fillna(0)
 
     def _calculate_stochastic(
-        self, data: pd.DataFrame, k_window: int = 14, d_window: int = 3
+        self,
+        data: pd.DataFrame,
+        k_window: int = 14,
+        d_window: int = 3,
+        engine: Optional[IndicatorEngine] = None,
     ) -> Tuple[pd.Series, pd.Series]:
         """ストキャスティクス計算"""
-        lowest_low = data["Low"].rolling(window=k_window).min()
-        highest_high = data["High"].rolling(window=k_window).max()
-        # ゼロ除算を避ける
-        denominator = highest_high - lowest_low
-        k_percent = np.where(
-            denominator != 0, 100 * (data["Close"] - lowest_low) / denominator, 50
-        )
+        engine = engine or IndicatorEngine.from_frame(data)
+        lowest_low = engine.rolling_min("low", k_window)
+        highest_high = engine.rolling_max("high", k_window)
+        # ゼロ除算を避ける（値幅がない場合は中立値50）
+        k_percent, _ = engine.stochastic(k_window, d_window)
+        k_percent = np.where(highest_high - lowest_low != 0, k_percent, 50)
         k_percent = pd.Series(k_percent, index=data.index)
         d_percent = k_percent.rolling(window=d_window).mean()
         # NaN値を50で埋める（中立値）
@@ -371,36 +410,42 @@ class ImprovedTradingSystem:
         d_percent = d_percent.fillna(50)
         return k_percent, d_percent
 
-    def _calculate_williams_r(self, data: pd.DataFrame, window: int = 14) -> pd.Series:
+    def _calculate_williams_r(
+        self,
+        data: pd.DataFrame,
+        window: int = 14,
+        engine: Optional[IndicatorEngine] = None,
+    ) -> pd.Series:
         """ウィリアムズ%R計算"""
-        highest_high = data["High"].rolling(window=window).max()
-        lowest_low = data["Low"].rolling(window=window).min()
-        # ゼロ除算を避ける
-        denominator = highest_high - lowest_low
-        williams_r = np.where(
-            denominator != 0, -100 * (highest_high - data["Close"]) / denominator, -50
+        engine = engine or IndicatorEngine.from_frame(data)
+        denominator = engine.rolling_max("high", window) - engine.rolling_min(
+            "low", window
         )
+        # ゼロ除算を避ける
+        williams_r = np.where(denominator != 0, engine.williams_r(window), -50)
         williams_r = pd.Series(williams_r, index=data.index)
         # NaN値を-50で埋める（中立値）
         williams_r = williams_r.fillna(-50)
         return williams_r
 
-    def _calculate_cci(self, data: pd.DataFrame, window: int = 20) -> pd.Series:
+    def _calculate_cci(
+        self,
+        data: pd.DataFrame,
+        window: int = 20,
+        engine: Optional[IndicatorEngine] = None,
+    ) -> pd.Series:
         """CCI計算"""
-        typical_price = (data["High"] + data["Low"] + data["Close"]) / 3
-        sma = typical_price.rolling(window=window).mean()
-        mad = typical_price.rolling(window=window).apply(
-            lambda x: np.mean(np.abs(x - x.mean()))
-        )
-        # ゼロ除算を避ける
-        denominator = 0.015 * mad
-        cci = np.where(denominator != 0, (typical_price - sma) / denominator, 0)
-        cci = pd.Series(cci, index=data.index)
-        # NaN値を0で埋める
-        cci = cci.fillna(0)
-        return cci
+        engine = engine or IndicatorEngine.from_frame(data)
+        cci = engine.cci(window)
+        # ゼロ除算（平均偏差が0）とNaN値は0で埋める
+        return pd.Series(np.where(np.isfinite(cci), cci, 0), index=data.index)
 
-    def _calculate_adx(self, data: pd.DataFrame, window: int = 14) -> pd.Series:
+    def _calculate_adx(
+        self,
+        data: pd.DataFrame,
+        window: int = 14,
+        engine: Optional[IndicatorEngine] = None,
+    ) -> pd.Series:
         """ADX計算"""
         # データが少ない場合は適応的にウィンドウサイズを調整
         actual_window = min(window, len(data))
@@ -408,33 +453,19 @@ class ImprovedTradingSystem:
             # データが2未満の場合は0を返す
             return pd.Series([0] * len(data), index=data.index)
 
-        high_diff = data["High"].diff()
-        low_diff = data["Low"].diff()
-
-        plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0)
-        minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0)
-
-        plus_dm = pd.Series(plus_dm, index=data.index)
-        minus_dm = pd.Series(minus_dm, index=data.index)
-
-        atr = self._calculate_atr(data, actual_window)
-
-        # ゼロ除算を避ける
-        plus_di = np.where(
-            atr != 0, 100 * (plus_dm.rolling(window=actual_window).mean() / atr), 0
-        )
-        minus_di = np.where(
-            atr != 0, 100 * (minus_dm.rolling(window=actual_window).mean() / atr), 0
-        )
-
-        plus_di = pd.Series(plus_di, index=data.index)
-        minus_di = pd.Series(minus_di, index=data.index)
+        engine = engine or IndicatorEngine.from_frame(data)
+        plus_di, minus_di = engine.directional_indicators(actual_window)
+        # ゼロ除算を避ける（ATRが0・未計算の場合は0）
+        atr = np.nan_to_num(engine.atr(actual_window))
+        plus_di = np.where(atr != 0, plus_di, 0)
+        minus_di = np.where(atr != 0, minus_di, 0)
 
         # ゼロ除算を避ける
         denominator = plus_di + minus_di
-        dx = np.where(
-            denominator != 0, 100 * np.abs(plus_di - minus_di) / denominator, 0
-        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dx = np.where(
+                denominator != 0, 100 * np.abs(plus_di - minus_di) / denominator, 0
+            )
         dx = pd.Series(dx, index=data.index)
         adx = dx.rolling(window=actual_window).mean()
 
@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+共通テクニカル指標エンジン
+TechnicalAnalysis / ImprovedTradingSystem / ImprovedMethodAnalyzer の指標計算を一本化する
+入力を NumPy 配列として一度だけ取り出し、True Range・ローリング最大/最小・EMA などの
+中間結果をキャッシュして、同じ入力から複数の指標を計算する際に再計算しない
+ローリング統計は pandas の rolling(window) と同じく、窓内に欠損があれば NaN とする
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+# 入力系列名 -> DataFrame の列名の候補（小文字・先頭大文字の両方に対応）
+FRAME_COLUMNS = {
+    "close": ("close", "Close"),
+    "high": ("high", "High"),
+    "low": ("low", "Low"),
+    "volume": ("volume", "Volume"),
+}
+
+# calculate_technical_indicators の出力列 -> (メソッド名, 引数, 複数出力時の位置, 必要な入力)
+STANDARD_INDICATORS: Dict[str, Tuple[str, Dict[str, Any], Optional[int], Tuple[str, ...]]] = {
+    "sma_5": ("sma", {"window": 5}, None, ("close",)),
+    "sma_10": ("sma", {"window": 10}, None, ("close",)),
+    "sma_20": ("sma", {"window": 20}, None, ("close",)),
+    "sma_50": ("sma", {"window": 50}, None, ("close",)),
+    "rsi": ("rsi", {}, None, ("close",)),
+    "macd": ("macd", {}, 0, ("close",)),
+    "macd_signal": ("macd", {}, 1, ("close",)),
+    "macd_histogram": ("macd", {}, 2, ("close",)),
+    "bb_upper": ("bollinger_bands", {}, 0, ("high", "low", "close")),
+    "bb_middle": ("bollinger_bands", {}, 1, ("high", "low", "close")),
+    "bb_lower": ("bollinger_bands", {}, 2, ("high", "low", "close")),
+    "stoch_k": ("stochastic", {}, 0, ("high", "low", "close")),
+    "stoch_d": ("stochastic", {}, 1, ("high", "low", "close")),
+    "obv": ("obv", {}, None, ("high", "low", "close", "volume")),
+    "vwap": ("vwap", {}, None, ("high", "low", "close", "volume")),
+}
+
+
+# 2次元入力のローリング計算で一度に展開する窓の要素数の上限（一時配列のメモリを抑える）
+ROLLING_BLOCK_ELEMENTS = 4_000_000
+
+
+def _as_array(values) -> np.ndarray:
+    """float64 の配列に変換（1次元: 日付、2次元: 日付 × 銘柄）"""
+    if isinstance(values, (pd.Series, pd.Index, pd.DataFrame)):
+        values = values.to_numpy(dtype=float, na_value=np.nan)
+    array = np.asarray(values, dtype=float)
+    if array.ndim == 0 or array.ndim > 2:
+        raise ValueError(f"1次元または2次元の入力を指定してください: {array.shape}")
+    return array
+
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    """1行後ろにずらした配列（先頭は NaN）"""
+    result = np.full(values.shape, np.nan)
+    result[1:] = values[:-1]
+    return result
+
+
+def _rolling(values: np.ndarray, window: int, reducer: Callable) -> np.ndarray:
+    """
+    ローリング集計（先頭 window-1 件と窓内に欠損を含む位置は NaN）
+
+    2次元入力は銘柄（列）ごとに独立に集計する
+
+    Args:
+        values: 入力配列（1次元、または 日付 × 銘柄 の2次元）
+        window: 窓の大きさ
+        reducer: 最後の軸を窓とする配列を受け取り、窓ごとの値を返す関数
+    """
+    if window < 1:
+        raise ValueError(f"window は1以上で指定してください: {window}")
+    result = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return result
+    if values.ndim == 1:
+        blocks = [slice(None)]
+    else:
+        # 窓の展開で一時配列が大きくなりすぎないよう、銘柄をまとめて分割する
+        width = max(1, ROLLING_BLOCK_ELEMENTS // (len(values) * window))
+        blocks = [
+            (slice(None), slice(start, start + width))
+            for start in range(0, values.shape[1], width)
+        ]
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        for block in blocks:
+            windows = sliding_window_view(values[block], window, axis=0)
+            result[block][window - 1 :] = reducer(windows)
+    return result
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """pandas と同じ除算（0除算は inf / NaN、警告なし）"""
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        return numerator / denominator
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """ローリング平均"""
+    return _rolling(values, window, lambda w: w.mean(axis=-1))
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """ローリング標準偏差（pandas と同じく既定は不偏標準偏差）"""
+    if window <= ddof:
+        return np.full(values.shape, np.nan)
+    return _rolling(values, window, lambda w: w.std(axis=-1, ddof=ddof))
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """ローリング最大値"""
+    return _rolling(values, window, lambda w: w.max(axis=-1))
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """ローリング最小値"""
+    return _rolling(values, window, lambda w: w.min(axis=-1))
+
+
+def rolling_mean_deviation(values: np.ndarray, window: int) -> np.ndarray:
+    """ローリング平均絶対偏差（CCI用）"""
+    return _rolling(
+        values,
+        window,
+        lambda w: np.abs(w - w.mean(axis=-1, keepdims=True)).mean(axis=-1),
+    )
+
+
+def ewm_mean(values: np.ndarray, span: float) -> np.ndarray:
+    """
+    指数移動平均（pandas の ewm(span=span).mean() と同じ adjust=True の重み付け）
+
+    重み付き和と重みの和をそれぞれ1次の IIR フィルタで求めて割る。
+    欠損は重みに含めず、欠損位置では直前の値を引き継ぐ（pandas と同じ）。
+    2次元入力は銘柄（列）ごとに独立に計算する
+    """
+    if span < 1:
+        raise ValueError(f"span は1以上で指定してください: {span}")
+    if len(values) == 0:
+        return np.full(values.shape, np.nan)
+    valid = ~np.isnan(values)
+    if not np.isfinite(values[valid]).all():
+        # 無限大を含む場合の伝播は pandas の実装に合わせる
+        frame = pd.DataFrame(values) if values.ndim == 2 else pd.Series(values)
+        return frame.ewm(span=span).mean().to_numpy()
+    beta = 1.0 - 2.0 / (span + 1.0)
+    coefficients = ([1.0], [1.0, -beta])
+    weighted = lfilter(*coefficients, np.where(valid, values, 0.0), axis=0)
+    weights = lfilter(*coefficients, valid.astype(float), axis=0)
+    result = np.full(values.shape, np.nan)
+    started = weights > 0
+    result[started] = weighted[started] / weights[started]
+    return result
+
+
+def wilder_mean(values: np.ndarray, window: int, start: int = 0) -> np.ndarray:
+    """
+    Wilder の平滑化移動平均（RSI・ATR の原典の平滑化）
+
+    start 行目から window 件の単純平均を初期値とし、以降は
+    avg = (1 - 1/window) * avg + (1/window) * value で更新する（欠損以降は NaN）
+    """
+    if window < 1:
+        raise ValueError(f"window は1以上で指定してください: {window}")
+    result = np.full(values.shape, np.nan)
+    first = start + window - 1
+    if len(values) <= first:
+        return result
+    alpha = 1.0 / window
+    seed = values[start : first + 1].mean(axis=0)
+    result[first] = seed
+    if len(values) > first + 1:
+        result[first + 1 :] = lfilter(
+            [alpha],
+            [1.0, alpha - 1.0],
+            values[first + 1 :],
+            axis=0,
+            zi=np.expand_dims((1.0 - alpha) * np.asarray(seed), 0),
+        )[0]
+    return result
+
+
+def cumsum(values: np.ndarray) -> np.ndarray:
+    """累積和（pandas の cumsum と同じく欠損は飛ばし、欠損位置は NaN）"""
+    with np.errstate(invalid="ignore", over="ignore"):
+        result = np.nancumsum(values, axis=0)
+    result[np.isnan(values)] = np.nan
+    return result
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True Range（先頭は前日終値がないため高値-安値）"""
+    previous_close = _shift(close)
+    return np.fmax(
+        np.fmax(high - low, np.abs(high - previous_close)),
+        np.abs(low - previous_close),
+    )
+
+
+IndicatorSpec = Union[str, Tuple[str, Dict[str, Any]], Tuple[str, Dict[str, Any], Optional[int]]]
+
+
+class IndicatorEngine:
+    """
+    共通テクニカル指標エンジン
+
+    入力系列（close / high / low / volume）を配列で保持し、
+    中間結果と指標を (種類, 入力, パラメータ) をキーにキャッシュする。
+    指標メソッドは入力と同じ形の NumPy 配列を返す。
+    入力が 日付 × 銘柄 の2次元配列の場合は、銘柄（列）ごとに独立に計算する。
+    """
+
+    def __init__(
+        self,
+        close=None,
+        high=None,
+        low=None,
+        volume=None,
+        index: Optional[pd.Index] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            close: 終値（1次元、または 日付 × 銘柄 の2次元）
+            high: 高値
+            low: 安値
+            volume: 出来高
+            index: 結果を Series / DataFrame で返す際のインデックス
+                （省略時は pandas の入力のインデックス）
+        """
+        self._series: Dict[str, np.ndarray] = {}
+        self._cache: Dict[Hashable, Any] = {}
+        shape = None
+        for name, values in (
+            ("close", close),
+            ("high", high),
+            ("low", low),
+            ("volume", volume),
+        ):
+            if values is None:
+                continue
+            if index is None and isinstance(values, (pd.Series, pd.DataFrame)):
+                index = values.index
+            array = _as_array(values)
+            if shape is not None and array.shape != shape:
+                raise ValueError("入力系列の長さが一致しません")
+            shape = array.shape
+            self._series[name] = array
+        self.shape = shape or (0,)
+        self.length = self.shape[0]
+        self.index = index if index is not None else pd.RangeIndex(self.length)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IndicatorEngine":
+        """DataFrame から作成（close / Close など小文字・先頭大文字の列名に対応）"""
+        inputs = {}
+        for name, candidates in FRAME_COLUMNS.items():
+            for column in candidates:
+                if column in df.columns:
+                    inputs[name] = df[column]
+                    break
+        return cls(index=df.index, **inputs)
+
+    # ---- 入力と中間結果 -------------------------------------------------
+
+    def has(self, *names: str) -> bool:
+        """入力系列がそろっているか"""
+        return all(name in self._series for name in names)
+
+    def series(self, name: str) -> np.ndarray:
+        """入力系列・登録済みの派生系列"""
+        try:
+            return self._series[name]
+        except KeyError:
+            raise ValueError(f"系列 {name} がありません") from None
+
+    def _cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _derived(self, name: str, compute: Callable[[], np.ndarray]) -> str:
+        """派生系列を登録し、その名前を返す（ローリング計算の入力にできる）"""
+        if name not in self._series:
+            self._series[name] = compute()
+        return name
+
+    def rolling_mean(self, name: str, window: int) -> np.ndarray:
+        """系列のローリング平均"""
+        return self._cached(
+            ("mean", name, window), lambda: rolling_mean(self.series(name), window)
+        )
+
+    def rolling_std(self, name: str, window: int) -> np.ndarray:
+        """系列のローリング標準偏差"""
+        return self._cached(
+            ("std", name, window), lambda: rolling_std(self.series(name), window)
+        )
+
+    def rolling_max(self, name: str, window: int) -> np.ndarray:
+        """系列のローリング最大値"""
+        return self._cached(
+            ("max", name, window), lambda: rolling_max(self.series(name), window)
+        )
+
+    def rolling_min(self, name: str, window: int) -> np.ndarray:
+        """系列のローリング最小値"""
+        return self._cached(
+            ("min", name, window), lambda: rolling_min(self.series(name), window)
+        )
+
+    def ewm(self, name: str, span: float) -> np.ndarray:
+        """系列の指数移動平均"""
+        return self._cached(("ewm", name, span), lambda: ewm_mean(self.series(name), span))
+
+    def diff(self, name: str = "close") -> np.ndarray:
+        """前日差（先頭は NaN）"""
+        return self.series(
+            self._derived(
+                f"diff:{name}",
+                lambda: self.series(name) - _shift(self.series(name)),
+            )
+        )
+
+    def true_range(self) -> np.ndarray:
+        """True Range"""
+        return self.series(
+            self._derived(
+                "tr",
+                lambda: true_range(
+                    self.series("high"), self.series("low"), self.series("close")
+                ),
+            )
+        )
+
+    def typical_price(self) -> np.ndarray:
+        """典型価格 (高値 + 安値 + 終値) / 3"""
+        return self.series(
+            self._derived(
+                "tp",
+                lambda: (self.series("high") + self.series("low") + self.series("close"))
+                / 3,
+            )
+        )
+
+    def directional_movement(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        方向性移動 (+DM, -DM)
+
+        +DM は高値の上昇幅が安値の下落幅より大きく正の場合のみ、
+        -DM は安値の下落幅が（採用後の）+DM より大きく正の場合のみ採用し、それ以外は0
+        """
+
+        def compute():
+            up = self.diff("high")
+            down = -self.diff("low")
+            plus = np.where((up > down) & (up > 0), up, 0.0)
+            minus = np.where((down > plus) & (down > 0), down, 0.0)
+            self._series["dm_plus"] = plus
+            self._series["dm_minus"] = minus
+            return plus, minus
+
+        return self._cached(("dm",), compute)
+
+    # ---- 指標 ----------------------------------------------------------
+
+    def sma(self, window: int, name: str = "close") -> np.ndarray:
+        """単純移動平均"""
+        return self.rolling_mean(name, window)
+
+    def ema(self, span: float, name: str = "close") -> np.ndarray:
+        """指数移動平均"""
+        return self.ewm(name, span)
+
+    def rsi(self, window: int = 14) -> np.ndarray:
+        """RSI（上昇幅・下落幅の単純移動平均による）"""
+
+        def compute():
+            self.rsi_components()
+            rs = _divide(self.rolling_mean("gain", window), self.rolling_mean("loss", window))
+            return 100 - _divide(100, 1 + rs)
+
+        return self._cached(("rsi", window), compute)
+
+    def wilder_rsi(self, window: int = 14) -> np.ndarray:
+        """RSI（上昇幅・下落幅を Wilder の平滑化で平均する原典の定義）"""
+
+        def compute():
+            self.rsi_components()
+            gain = self._cached(
+                ("wilder", "gain", window),
+                lambda: wilder_mean(self.series("gain"), window, start=1),
+            )
+            loss = self._cached(
+                ("wilder", "loss", window),
+                lambda: wilder_mean(self.series("loss"), window, start=1),
+            )
+            return 100 - _divide(100, 1 + _divide(gain, loss))
+
+        return self._cached(("wilder_rsi", window), compute)
+
+    def rsi_components(self) -> Tuple[np.ndarray, np.ndarray]:
+        """前日比の上昇幅・下落幅（先頭は0）"""
+        delta = self.diff("close")
+        gain = self._derived("gain", lambda: np.where(delta > 0, delta, 0.0))
+        loss = self._derived("loss", lambda: np.where(delta < 0, -delta, 0.0))
+        return self.series(gain), self.series(loss)
+
+    def macd(
+        self, fast: int = 12, slow: int = 26, signal: int = 9
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """MACD (MACD線, シグナル, ヒストグラム)"""
+
+        def compute():
+            line = self._derived(
+                f"macd:{fast}:{slow}", lambda: self.ewm("close", fast) - self.ewm("close", slow)
+            )
+            signal_line = self.ewm(line, signal)
+            return self.series(line), signal_line, self.series(line) - signal_line
+
+        return self._cached(("macd", fast, slow, signal), compute)
+
+    def bollinger_bands(
+        self, window: int = 20, num_std: float = 2
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ボリンジャーバンド (上限, 移動平均, 下限)"""
+
+        def compute():
+            middle = self.rolling_mean("close", window)
+            std = self.rolling_std("close", window)
+            return middle + std * num_std, middle, middle - std * num_std
+
+        return self._cached(("bollinger", window, num_std), compute)
+
+    def stochastic(
+        self, k_window: int = 14, d_window: int = 3
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """ストキャスティクス (%K, %D)"""
+
+        def compute():
+            lowest = self.rolling_min("low", k_window)
+            highest = self.rolling_max("high", k_window)
+            k = self._derived(
+                f"stoch_k:{k_window}",
+                lambda: 100 * _divide(self.series("close") - lowest, highest - lowest),
+            )
+            return self.series(k), self.rolling_mean(k, d_window)
+
+        return self._cached(("stochastic", k_window, d_window), compute)
+
+    def williams_r(self, window: int = 14) -> np.ndarray:
+        """Williams %R"""
+
+        def compute():
+            highest = self.rolling_max("high", window)
+            lowest = self.rolling_min("low", window)
+            return -100 * _divide(highest - self.series("close"), highest - lowest)
+
+        return self._cached(("williams_r", window), compute)
+
+    def atr(self, window: int = 14) -> np.ndarray:
+        """ATR（True Range の単純移動平均）"""
+        self.true_range()
+        return self.rolling_mean("tr", window)
+
+    def cci(self, window: int = 20) -> np.ndarray:
+        """CCI"""
+
+        def compute():
+            self.typical_price()
+            deviation = self._cached(
+                ("mean_deviation", "tp", window),
+                lambda: rolling_mean_deviation(self.series("tp"), window),
+            )
+            return _divide(
+                self.series("tp") - self.rolling_mean("tp", window), 0.015 * deviation
+            )
+
+        return self._cached(("cci", window), compute)
+
+    def directional_indicators(self, window: int = 14) -> Tuple[np.ndarray, np.ndarray]:
+        """方向性指標 (+DI, -DI)"""
+
+        def compute():
+            self.directional_movement()
+            atr = self.atr(window)
+            plus = 100 * _divide(self.rolling_mean("dm_plus", window), atr)
+            minus = 100 * _divide(self.rolling_mean("dm_minus", window), atr)
+            return plus, minus
+
+        return self._cached(("di", window), compute)
+
+    def adx(self, window: int = 14) -> np.ndarray:
+        """ADX（DX の単純移動平均）"""
+
+        def compute():
+            plus, minus = self.directional_indicators(window)
+            dx = self._derived(
+                f"dx:{window}", lambda: 100 * _divide(np.abs(plus - minus), plus + minus)
+            )
+            return self.rolling_mean(dx, window)
+
+        return self._cached(("adx", window), compute)
+
+    def obv(self) -> np.ndarray:
+        """
+        OBV（前日比の符号 × 出来高の累積和、先頭は初日の出来高）
+
+        終値が変わらない日・前日比が求まらない日（欠損）は出来高を加減しない
+        """
+
+        def compute():
+            if self.length == 0:
+                return np.full(self.shape, np.nan)
+            volume = self.series("volume")
+            direction = np.sign(np.nan_to_num(self.diff("close"), nan=0.0))
+            steps = np.where(direction != 0, direction * volume, 0.0)
+            steps[0] = volume[0]
+            return np.cumsum(steps, axis=0)
+
+        return self._cached(("obv",), compute)
+
+    def vwap(self) -> np.ndarray:
+        """VWAP（典型価格の出来高加重の累積平均）"""
+
+        def compute():
+            volume = self.series("volume")
+            with np.errstate(invalid="ignore", over="ignore"):
+                traded = self.typical_price() * volume
+            return _divide(cumsum(traded), cumsum(volume))
+
+        return self._cached(("vwap",), compute)
+
+    # ---- まとめて計算 --------------------------------------------------
+
+    def compute(self, spec: Dict[str, IndicatorSpec]) -> Dict[str, np.ndarray]:
+        """
+        指標の一括計算（中間結果は指標間で共有）
+
+        Args:
+            spec: 出力名 -> メソッド名、または (メソッド名, 引数[, 複数出力時の位置])
+
+        Returns:
+            Dict[str, np.ndarray]: 出力名 -> 指標値
+        """
+        results = {}
+        for output, item in spec.items():
+            if isinstance(item, str):
+                item = (item, {})
+            method, kwargs = item[0], item[1]
+            position = item[2] if len(item) > 2 else None
+            value = getattr(self, method)(**kwargs)
+            results[output] = value if position is None else value[position]
+        return results
+
+    def to_series(self, values: np.ndarray, name: Optional[Hashable] = None) -> pd.Series:
+        """入力と同じインデックスの Series に変換"""
+        return pd.Series(values, index=self.index, name=name)
+
+    def to_frame(self, spec: Dict[str, IndicatorSpec]) -> pd.DataFrame:
+        """指標の一括計算結果を DataFrame で返す"""
+        return pd.DataFrame(self.compute(spec), index=self.index)
+
+
+def standard_indicator_spec(available: Iterable[str]) -> Dict[str, IndicatorSpec]:
+    """入力系列に応じた calculate_technical_indicators の出力指定"""
+    available = set(available)
+    return {
+        output: (method, kwargs, position)
+        for output, (method, kwargs, position, required) in STANDARD_INDICATORS.items()
+        if available.issuperset(required)
+    }
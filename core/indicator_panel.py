@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+複数銘柄（パネル）のテクニカル指標一括計算
+縦持ち（1行 = 銘柄・日付の価格）または横持ち（日付 × 銘柄）の価格から、
+全銘柄の指標を IndicatorEngine で列ごとに一度に計算する
+各銘柄の系列は先頭（上場日・取得開始日）をそろえて並べてから計算するため、
+ウォームアップ期間の NaN は銘柄ごとに付き、他の銘柄の値が混ざることはない
+"""
+
+from typing import Dict, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .indicator_engine import IndicatorEngine, IndicatorSpec, standard_indicator_spec
+
+PANEL_INPUTS = ("close", "high", "low", "volume")
+
+
+def _first_valid_rows(matrix: np.ndarray) -> np.ndarray:
+    """列ごとの最初の非欠損行（すべて欠損の列は行数）"""
+    valid = ~np.isnan(matrix)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(matrix))
+
+
+def _aligned_positions(shape, offsets: np.ndarray):
+    """先頭をそろえた行位置 -> 元の行位置の対応（範囲外は除く）"""
+    rows = np.arange(shape[0])[:, None] + offsets[None, :]
+    columns = np.broadcast_to(np.arange(shape[1]), shape)
+    inside = rows < shape[0]
+    return rows, columns, inside
+
+
+def align_start(matrix: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """列ごとに offsets 行分上に詰める（末尾は NaN）"""
+    rows, columns, inside = _aligned_positions(matrix.shape, offsets)
+    aligned = np.full(matrix.shape, np.nan)
+    aligned[inside] = matrix[rows[inside], columns[inside]]
+    return aligned
+
+
+def restore_start(aligned: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """align_start の逆変換（詰めた分の先頭行は NaN）"""
+    rows, columns, inside = _aligned_positions(aligned.shape, offsets)
+    matrix = np.full(aligned.shape, np.nan)
+    matrix[rows[inside], columns[inside]] = aligned[inside]
+    return matrix
+
+
+def calculate_panel_indicators(
+    prices: Union[pd.DataFrame, Mapping[str, pd.DataFrame]],
+    spec: Optional[Dict[str, IndicatorSpec]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    横持ち（日付 × 銘柄）の価格から全銘柄の指標を計算
+
+    各銘柄は終値の最初の非欠損日を起点として計算する（上場前の期間は NaN）
+
+    Args:
+        prices: 終値の DataFrame、または入力名（close / high / low / volume）-> DataFrame
+            （high などは終値と同じ日付・銘柄に合わせる）
+        spec: 出力名 -> 指標の指定（省略時は calculate_technical_indicators と同じ列）
+
+    Returns:
+        Dict[str, pd.DataFrame]: 出力名 -> 日付 × 銘柄 の指標値
+    """
+    frames = {"close": prices} if isinstance(prices, pd.DataFrame) else dict(prices)
+    unknown = set(frames) - set(PANEL_INPUTS)
+    if unknown or "close" not in frames:
+        raise ValueError(f"入力は close を含む {PANEL_INPUTS} で指定してください: {sorted(frames)}")
+    close = frames["close"]
+    matrices = {
+        name: frame.reindex(index=close.index, columns=close.columns).to_numpy(
+            dtype=float, na_value=np.nan
+        )
+        for name, frame in frames.items()
+    }
+
+    offsets = _first_valid_rows(matrices["close"])
+    engine = IndicatorEngine(
+        **{name: align_start(matrix, offsets) for name, matrix in matrices.items()}
+    )
+    results = engine.compute(spec or standard_indicator_spec(matrices))
+    return {
+        output: pd.DataFrame(
+            restore_start(values, offsets), index=close.index, columns=close.columns
+        )
+        for output, values in results.items()
+    }
+
+
+def calculate_long_panel_indicators(
+    df: pd.DataFrame,
+    symbol_column: str = "code",
+    date_column: Optional[str] = "date",
+    spec: Optional[Dict[str, IndicatorSpec]] = None,
+) -> pd.DataFrame:
+    """
+    縦持ちの価格から全銘柄の指標を計算し、指標列を追加した DataFrame を返す
+
+    銘柄ごとに日付順（date_column が None の場合は行の順）に並べた系列で計算するため、
+    銘柄ごとに calculate_technical_indicators を呼んだ結果と一致する
+
+    Args:
+        df: 銘柄コード・（日付）・close / high / low / volume の列を持つ DataFrame
+        symbol_column: 銘柄コードの列名
+        date_column: 日付の列名
+        spec: 出力名 -> 指標の指定（省略時は calculate_technical_indicators と同じ列）
+
+    Returns:
+        pd.DataFrame: 元の行順のまま指標列を追加したコピー
+    """
+    columns = [name for name in PANEL_INPUTS if name in df.columns]
+    if "close" not in columns:
+        raise ValueError("close 列がありません")
+    result = df.copy()
+    if df.empty:
+        return result
+
+    symbols, _ = pd.factorize(df[symbol_column], sort=True)
+    if (symbols < 0).any():
+        raise ValueError(f"{symbol_column} 列に欠損があります")
+    if date_column is None:
+        order = np.argsort(symbols, kind="stable")
+    else:
+        dates = pd.to_datetime(df[date_column]).to_numpy()
+        order = np.lexsort((dates, symbols))
+    symbols = symbols[order]
+    # 銘柄内での通し番号（銘柄ごとの先頭を0行目にそろえる）
+    starts = np.r_[0, np.flatnonzero(np.diff(symbols)) + 1]
+    positions = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+
+    shape = (positions.max() + 1, symbols.max() + 1)
+    inputs = {}
+    for name in columns:
+        matrix = np.full(shape, np.nan)
+        matrix[positions, symbols] = df[name].to_numpy(dtype=float, na_value=np.nan)[order]
+        inputs[name] = matrix
+
+    engine = IndicatorEngine(**inputs)
+    for output, values in engine.compute(spec or standard_indicator_spec(columns)).items():
+        column = np.empty(len(order))
+        column[order] = values[positions, symbols]
+        result[output] = column
+    return result
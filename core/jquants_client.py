@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+J-Quants API 共有HTTPクライアント
+プロセス内で接続プール付きのセッションを1つ共有し、IDトークンは複数プロセスで共有する
+キャッシュファイルで管理する（有効期限の手前で1プロセスだけが更新する）
+"""
+
+import base64
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import fcntl
+except ImportError:  # Windows ではプロセス内のロックのみ
+    fcntl = None
+
+# 環境変数でローカルのリプレイサーバー等に向け先を切り替えられる
+JQUANTS_BASE_URL = os.getenv("JQUANTS_API_BASE_URL", "https://api.jquants.com/v1")
+DEFAULT_TOKEN_CACHE_FILE = Path("data/token_cache.json")
+# IDトークンの有効期限（JWTから読めない場合の想定値）
+ID_TOKEN_LIFETIME_SECONDS = 24 * 60 * 60
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_pool_maxsize = 0
+_session_lock = threading.Lock()
+
+
+def get_shared_session(pool_maxsize: int = 16) -> requests.Session:
+    """
+    プロセス共有の接続プール付きセッションを取得
+
+    Keep-Alive で接続を再利用するため、スクリプト・スケジューラーは
+    requests.Session() を個別に作らずこのセッションを使う。
+    fork 後の子プロセスでは接続を共有しないよう作り直す。
+    作成済みのプールより大きい接続数を指定された場合は、その大きさの
+    アダプターに付け替える（小さい指定ではプールを縮めない）。
+
+    Args:
+        pool_maxsize: ホストごとの最大接続数
+
+    Returns:
+        requests.Session: 共有セッション
+    """
+    global _session, _session_pid, _session_pool_maxsize
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            session.headers.update(
+                {
+                    "Content-Type": "application/json",
+                    "User-Agent": "jQuants-Stock-Prediction/1.0",
+                }
+            )
+            _session = session
+            _session_pid = os.getpid()
+            _session_pool_maxsize = 0
+        if pool_maxsize > _session_pool_maxsize:
+            # 使用中の接続は旧アダプターに残るため閉じずに付け替える
+            adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session_pool_maxsize = pool_maxsize
+        return _session
+
+
+def token_expiry(id_token: str) -> Optional[float]:
+    """
+    JWT形式のIDトークンから有効期限（UNIX時刻）を取得
+
+    Args:
+        id_token: IDトークン
+
+    Returns:
+        Optional[float]: 有効期限（JWTでない・exp がない場合はNone）
+    """
+    try:
+        parts = id_token.split(".")
+        if len(parts) != 3:
+            return None
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp else None
+    except Exception:
+        return None
+
+
+class TokenCache:
+    """プロセス間で共有するIDトークンキャッシュクラス"""
+
+    def __init__(
+        self,
+        cache_file: Path = DEFAULT_TOKEN_CACHE_FILE,
+        refresh_margin_seconds: float = 300,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            cache_file: キャッシュファイルのパス
+            refresh_margin_seconds: 有効期限の何秒前から更新するか（従来の5分前更新）
+            logger: ロガーインスタンス
+        """
+        self.cache_file = Path(cache_file)
+        self.lock_file = self.cache_file.with_name(self.cache_file.name + ".lock")
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.logger = logger or logging.getLogger(__name__)
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._memory: Dict[str, Any] = {}
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """キャッシュ更新用の排他ロック（スレッド間・プロセス間、同一スレッドでは再入可）"""
+        with self._thread_lock:
+            if fcntl is None or self._lock_depth > 0:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_file, "a") as handle:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def load(self) -> Dict[str, Any]:
+        """キャッシュの読み込み（未作成・破損時は空）"""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"トークンキャッシュ読み込みエラー: {e}")
+            return {}
+
+    def save(self, id_token: str, refresh_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        トークンの保存（一時ファイル経由で置き換え）
+
+        Args:
+            id_token: IDトークン
+            refresh_token: リフレッシュトークン（省略時は既存の値を維持）
+
+        Returns:
+            Dict[str, Any]: 保存したキャッシュ内容
+        """
+        with self.locked():
+            now = time.time()
+            if refresh_token is None:
+                refresh_token = self.load().get("refresh_token")
+            cache = {
+                "id_token": id_token,
+                "refresh_token": refresh_token,
+                "cached_at": now,
+                "expires_at": token_expiry(id_token) or now + ID_TOKEN_LIFETIME_SECONDS,
+            }
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                dir=self.cache_file.parent, prefix=f".{self.cache_file.name}."
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(cache, f, ensure_ascii=False, indent=2)
+                os.chmod(temp_path, 0o600)
+                os.replace(temp_path, self.cache_file)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+            self._memory = cache
+            return cache
+
+    def clear(self) -> None:
+        """キャッシュの削除"""
+        with self.locked():
+            self._memory = {}
+            if self.cache_file.exists():
+                self.cache_file.unlink()
+
+    def _is_fresh(self, cache: Dict[str, Any]) -> bool:
+        """有効期限まで更新マージン以上残っているか"""
+        expires_at = cache.get("expires_at")
+        if not cache.get("id_token") or not isinstance(expires_at, (int, float)):
+            return False
+        return expires_at - time.time() > self.refresh_margin_seconds
+
+    def valid_id_token(self) -> Optional[str]:
+        """更新不要なIDトークン（なければNone）"""
+        if not self._is_fresh(self._memory):
+            self._memory = self.load()
+        return self._memory["id_token"] if self._is_fresh(self._memory) else None
+
+    def refresh_token(self) -> Optional[str]:
+        """キャッシュ済みのリフレッシュトークン"""
+        return (self._memory or self.load()).get("refresh_token")
+
+    def get_id_token(
+        self,
+        refresh: Callable[[str], Optional[str]],
+        login: Callable[[], Optional[Dict[str, str]]],
+        force_refresh: bool = False,
+    ) -> Optional[str]:
+        """
+        有効なIDトークンを取得（期限の手前ならリフレッシュ、失敗時は再ログイン）
+
+        更新はロック内で行い、待っている間に他プロセスが更新した場合はその結果を使う。
+
+        Args:
+            refresh: リフレッシュトークンからIDトークンを取得する関数
+            login: 新規認証して id_token / refresh_token を返す関数
+            force_refresh: キャッシュが有効でも更新する（401応答時など）
+
+        Returns:
+            Optional[str]: IDトークン（すべて失敗した場合はNone）
+        """
+        stale_token = None
+        if not force_refresh:
+            id_token = self.valid_id_token()
+            if id_token:
+                return id_token
+        else:
+            stale_token = self._memory.get("id_token") or self.load().get("id_token")
+
+        with self.locked():
+            cache = self.load()
+            if self._is_fresh(cache) and cache["id_token"] != stale_token:
+                self._memory = cache
+                return cache["id_token"]
+
+            refresh_token = cache.get("refresh_token")
+            if refresh_token:
+                id_token = refresh(refresh_token)
+                if id_token:
+                    self.logger.info("リフレッシュトークンでIDトークンを更新しました")
+                    return self.save(id_token, refresh_token)["id_token"]
+
+            tokens = login()
+            if not tokens or not tokens.get("id_token"):
+                return None
+            self.logger.info("新規認証でIDトークンを取得しました")
+            return self.save(tokens["id_token"], tokens.get("refresh_token"))["id_token"]
+
+
+_token_caches: Dict[Path, TokenCache] = {}
+
+
+def get_token_cache(cache_file: Path = DEFAULT_TOKEN_CACHE_FILE) -> TokenCache:
+    """キャッシュファイルごとに共有する TokenCache の取得"""
+    key = Path(cache_file).resolve()
+    with _session_lock:
+        if key not in _token_caches:
+            _token_caches[key] = TokenCache(cache_file)
+        return _token_caches[key]
+
+
+class JQuantsClient:
+    """共有セッションと共有トークンキャッシュを使う J-Quants API 認証クライアント"""
+
+    def __init__(
+        self,
+        email: Optional[str] = None,
+        password: Optional[str] = None,
+        base_url: str = JQUANTS_BASE_URL,
+        token_cache: Optional[TokenCache] = None,
+        session: Optional[requests.Session] = None,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            email: メールアドレス（省略時は JQUANTS_EMAIL）
+            password: パスワード（省略時は JQUANTS_PASSWORD）
+            base_url: APIのベースURL
+            token_cache: トークンキャッシュ（省略時は data/token_cache.json を共有）
+            session: HTTPセッション（省略時はプロセス共有セッション）
+            logger: ロガーインスタンス
+        """
+        self.email = email or os.getenv("JQUANTS_EMAIL")
+        self.password = password or os.getenv("JQUANTS_PASSWORD")
+        self.base_url = base_url.rstrip("/")
+        self.token_cache = token_cache or get_token_cache()
+        self.session = session or get_shared_session()
+        self.logger = logger or logging.getLogger(__name__)
+        self.timeout = 30
+
+    def refresh_id_token(self, refresh_token: str) -> Optional[str]:
+        """リフレッシュトークンでIDトークンを取得"""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/token/auth_refresh",
+                params={"refreshtoken": refresh_token},
+                timeout=self.timeout,
+            )
+            if response.status_code == 200:
+                return response.json().get("idToken")
+            self.logger.warning(f"トークン更新エラー: HTTP {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"トークン更新エラー: {e}")
+        return None
+
+    def login(self) -> Optional[Dict[str, str]]:
+        """メールアドレスとパスワードで新規認証"""
+        if not self.email or not self.password:
+            self.logger.error(
+                "認証情報が設定されていません (JQUANTS_EMAIL, JQUANTS_PASSWORD)"
+            )
+            return None
+        try:
+            response = self.session.post(
+                f"{self.base_url}/token/auth_user",
+                json={"mailaddress": self.email, "password": self.password},
+                timeout=self.timeout,
+            )
+            if response.status_code != 200:
+                self.logger.error(f"認証エラー: HTTP {response.status_code}")
+                return None
+            refresh_token = response.json().get("refreshToken")
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"認証エラー: {e}")
+            return None
+
+        if not refresh_token:
+            self.logger.error("リフレッシュトークンの取得に失敗しました")
+            return None
+        id_token = self.refresh_id_token(refresh_token)
+        if not id_token:
+            return None
+        return {"id_token": id_token, "refresh_token": refresh_token}
+
+    def get_id_token(self, force_refresh: bool = False) -> Optional[str]:
+        """
+        有効なIDトークンを取得（キャッシュが有効な間は認証APIを呼ばない）
+
+        Args:
+            force_refresh: キャッシュが有効でも更新する
+
+        Returns:
+            Optional[str]: IDトークン
+        """
+        return self.token_cache.get_id_token(
+            self.refresh_id_token, self.login, force_refresh=force_refresh
+        )
+
+    def auth_headers(self) -> Dict[str, str]:
+        """Authorizationヘッダー（トークンが取得できない場合は空）"""
+        id_token = self.get_id_token()
+        return {"Authorization": f"Bearer {id_token}"} if id_token else {}
+
+    def get(
+        self, path: str, params: Optional[Dict[str, Any]] = None, **kwargs
+    ) -> requests.Response:
+        """
+        認証付きGETリクエスト（401応答時は1度だけトークンを更新して再送）
+
+        Args:
+            path: エンドポイントパス（例: /listed/info）
+            params: クエリパラメータ
+            **kwargs: requests に渡す追加引数
+
+        Returns:
+            requests.Response: レスポンス
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        response = self.session.get(url, params=params, headers=self.auth_headers(), **kwargs)
+        if response.status_code == 401:
+            response.close()
+            id_token = self.get_id_token(force_refresh=True)
+            headers = {"Authorization": f"Bearer {id_token}"} if id_token else {}
+            response = self.session.get(url, params=params, headers=headers, **kwargs)
+        return response
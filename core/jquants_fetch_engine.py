@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+J-Quants API 非同期取得エンジン
+トークンバケットでリクエストレートを制御しつつ、同時実行数を制限して並行取得する
+429応答時はレートを半減して待機し、成功が続くと徐々に元のレートへ戻す
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+import requests
+
+from .jquants_client import JQUANTS_BASE_URL, get_shared_session
+from .streaming_json_parser import iter_json_array
+
+
+@dataclass
+class FetchRequest:
+    """取得リクエスト"""
+
+    key: str
+    path: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FetchStats:
+    """取得統計"""
+
+    requests: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    throttled: int = 0
+    elapsed_seconds: float = 0.0
+
+
+class TokenBucket:
+    """非同期トークンバケット（429応答に応じた適応的レート調整付き）"""
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: float,
+        min_rate_per_second: Optional[float] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            rate_per_second: トークン補充レート（リクエスト/秒）
+            capacity: バケット容量（バースト許容数）
+            min_rate_per_second: 429応答で下げる際の下限レート
+        """
+        self.max_rate = rate_per_second
+        self.rate = rate_per_second
+        self.min_rate = min_rate_per_second or rate_per_second / 16
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        # ロックはイベントループごとに作成（run_many を繰り返し呼ぶため）
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _refill(self, now: float):
+        """経過時間分のトークン補充"""
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """トークンを1つ取得（不足時は補充まで待機）"""
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def throttle(self, retry_after: float):
+        """429応答時: レートを半減し、retry_after秒間は払い出しを停止"""
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0
+        self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def recover(self):
+        """成功時: レートを上限まで段階的に回復"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class AsyncFetchEngine:
+    """J-Quants API 非同期取得エンジンクラス"""
+
+    def __init__(
+        self,
+        id_token: Optional[str] = None,
+        base_url: str = JQUANTS_BASE_URL,
+        rate_per_second: float = 10.0,
+        burst: int = 10,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        max_throttle_retries: int = 8,
+        backoff_seconds: float = 1.0,
+        timeout: float = 30.0,
+        session: Optional[requests.Session] = None,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            id_token: IDトークン（Authorizationヘッダーに設定）
+            base_url: APIのベースURL
+            rate_per_second: 定常リクエストレート（従来の100ms間隔に相当する10件/秒）
+            burst: バースト許容数
+            max_concurrency: 同時実行リクエスト数の上限
+            max_retries: 通信エラー・5xx応答の再試行回数
+            max_throttle_retries: 429応答の再試行回数
+            backoff_seconds: 再試行待機の基準秒数（指数的に増加）
+            timeout: リクエストタイムアウト秒数
+            session: 使用するrequests.Session（省略時はプロセス共有セッション）
+            logger: ロガーインスタンス
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.max_throttle_retries = max_throttle_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.stream_chunk_bytes = 64 * 1024
+        self.logger = logger or logging.getLogger(__name__)
+        self.limiter = TokenBucket(rate_per_second, burst)
+        self.stats = FetchStats()
+
+        # 共有セッションの既定ヘッダーは他のAPI呼び出しにも使われるため、
+        # Authorization はリクエストごとに付与する
+        self.session = session or get_shared_session(pool_maxsize=max(max_concurrency, 16))
+        self.headers = {"Authorization": f"Bearer {id_token}"} if id_token else {}
+
+    # ---- 単一リクエスト ----
+
+    def _url(self, path: str) -> str:
+        """エンドポイントURL"""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    @staticmethod
+    def _retry_after(response: requests.Response, default: float) -> float:
+        """Retry-Afterヘッダーの秒数（未指定・不正値は既定値）"""
+        try:
+            return max(float(response.headers.get("Retry-After", default)), 0.0)
+        except (TypeError, ValueError):
+            return default
+
+    async def _request(
+        self, path: str, params: Optional[Dict[str, Any]] = None, stream: bool = False
+    ) -> Optional[requests.Response]:
+        """
+        レート制限・再試行付きのGETリクエスト
+
+        Args:
+            path: エンドポイントパス（例: /prices/daily_quotes）
+            params: クエリパラメータ
+            stream: レスポンス本体を逐次読み込む
+
+        Returns:
+            Optional[requests.Response]: 200応答（失敗時はNone）
+        """
+        url = self._url(path)
+        attempts = 0
+        throttles = 0
+
+        while True:
+            await self.limiter.acquire()
+            self.stats.requests += 1
+            try:
+                response = await asyncio.to_thread(
+                    self.session.get,
+                    url,
+                    params=params,
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    stream=stream,
+                )
+            except requests.exceptions.RequestException as e:
+                response = None
+                error = str(e)
+
+            if response is not None and response.status_code == 200:
+                self.limiter.recover()
+                return response
+
+            if response is not None:
+                # 接続をプールへ戻す
+                response.close()
+
+            if response is not None and response.status_code == 429:
+                throttles += 1
+                self.stats.throttled += 1
+                if throttles > self.max_throttle_retries:
+                    self.logger.warning(f"レート制限の再試行上限に到達: {url} {params}")
+                    return None
+                wait = self._retry_after(
+                    response, self.backoff_seconds * 2 ** (throttles - 1)
+                )
+                self.logger.warning(f"レート制限 (429)、{wait:.1f}秒待機: {url}")
+                self.limiter.throttle(wait)
+                continue
+
+            if response is not None:
+                error = f"HTTP {response.status_code}"
+                # 4xx（429以外）は再試行しても結果が変わらない
+                if response.status_code < 500:
+                    self.logger.warning(f"API呼び出しエラー: {error} {url} {params}")
+                    return None
+
+            attempts += 1
+            if attempts > self.max_retries:
+                self.logger.warning(f"API呼び出し失敗: {error} {url} {params}")
+                return None
+            self.stats.retries += 1
+            await asyncio.sleep(self.backoff_seconds * 2 ** (attempts - 1))
+
+    async def fetch_json(
+        self, path: str, params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        JSONレスポンスの取得
+
+        Args:
+            path: エンドポイントパス（例: /prices/daily_quotes）
+            params: クエリパラメータ
+
+        Returns:
+            Optional[Dict[str, Any]]: レスポンスJSON（失敗時はNone）
+        """
+        response = await self._request(path, params)
+        return response.json() if response is not None else None
+
+    async def fetch_all_pages(
+        self, path: str, params: Optional[Dict[str, Any]], items_key: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        pagination_key を辿って全ページの要素を取得
+
+        Args:
+            path: エンドポイントパス
+            params: クエリパラメータ
+            items_key: 要素リストのキー（例: info, daily_quotes）
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 全ページの要素（失敗時はNone）
+        """
+        params = dict(params or {})
+        items: List[Dict[str, Any]] = []
+        while True:
+            data = await self.fetch_json(path, params)
+            if data is None:
+                return None
+            items.extend(data.get(items_key, []))
+            pagination_key = data.get("pagination_key")
+            if not pagination_key:
+                return items
+            params["pagination_key"] = pagination_key
+
+    def iter_batches(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        items_key: str,
+        batch_size: int = 500,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        pagination_key を辿りながら要素を逐次パースし、batch_size 件ずつ返す
+
+        レスポンス本体を response.json() で一括展開しないため、
+        ページの大きさや総件数に関わらず保持するのは1バッチ分のみ
+
+        Args:
+            path: エンドポイントパス
+            params: クエリパラメータ
+            items_key: 要素リストのキー（例: info, daily_quotes）
+            batch_size: 1バッチの件数
+
+        Yields:
+            List[Dict[str, Any]]: 要素のバッチ
+
+        Raises:
+            IOError: ページの取得に失敗した場合（それまでのバッチは返却済み）
+        """
+        params = dict(params or {})
+        batch: List[Dict[str, Any]] = []
+        while True:
+            response = asyncio.run(self._request(path, params, stream=True))
+            if response is None:
+                raise IOError(f"ページ取得に失敗しました: {path} {params}")
+
+            metadata: Dict[str, Any] = {}
+            with response:
+                for item in iter_json_array(
+                    response.iter_content(chunk_size=self.stream_chunk_bytes),
+                    items_key,
+                    metadata,
+                ):
+                    batch.append(item)
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+
+            pagination_key = metadata.get("pagination_key")
+            if not pagination_key:
+                break
+            params["pagination_key"] = pagination_key
+
+        if batch:
+            yield batch
+
+    # ---- 並行取得 ----
+
+    async def fetch_many(
+        self, fetch_requests: Iterable[FetchRequest]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        複数リクエストの並行取得
+
+        Args:
+            fetch_requests: 取得リクエストの一覧
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: キー -> レスポンスJSON（失敗時はNone）
+        """
+        fetch_requests = list(fetch_requests)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+
+        async def run(request: FetchRequest):
+            async with semaphore:
+                try:
+                    data = await self.fetch_json(request.path, request.params)
+                except Exception as e:
+                    self.logger.error(f"{request.key} の取得エラー: {e}")
+                    data = None
+            if data is None:
+                self.stats.failed += 1
+            else:
+                self.stats.succeeded += 1
+            return request.key, data
+
+        results = await asyncio.gather(*(run(request) for request in fetch_requests))
+        self.stats.elapsed_seconds += time.perf_counter() - started
+        return dict(results)
+
+    def run_many(
+        self, fetch_requests: Iterable[FetchRequest]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """fetch_many の同期呼び出し（スクリプト用）"""
+        return asyncio.run(self.fetch_many(fetch_requests))
+
+    def run_all_pages(
+        self, path: str, params: Optional[Dict[str, Any]], items_key: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """fetch_all_pages の同期呼び出し（スクリプト用）"""
+        return asyncio.run(self.fetch_all_pages(path, params, items_key))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得統計の取得"""
+        stats = self.stats
+        return {
+            "requests": stats.requests,
+            "succeeded": stats.succeeded,
+            "failed": stats.failed,
+            "retries": stats.retries,
+            "throttled": stats.throttled,
+            "elapsed_seconds": round(stats.elapsed_seconds, 3),
+            "current_rate_per_second": round(self.limiter.rate, 3),
+        }
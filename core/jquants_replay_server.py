@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+J-Quants API ローカルリプレイサーバー
+記録済みまたは合成した daily_quotes / listed/info / 認証応答をローカルで返す
+遅延・エラー率・429応答を設定でき、取得スループットやレート制限処理を
+実APIなしで（オフライン・CIで）計測できる
+"""
+
+import base64
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+@dataclass
+class ReplayConfig:
+    """リプレイサーバーの応答設定"""
+
+    # 応答遅延（ミリ秒）と揺らぎ幅
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    # 500応答を返す割合（0〜1）
+    error_rate: float = 0.0
+    # 無作為に429応答を返す割合（0〜1）
+    throttle_rate: float = 0.0
+    # 秒間リクエスト数の上限（超過分は429、None で無制限）
+    rate_limit_per_second: Optional[float] = None
+    # 429応答の Retry-After 秒数
+    retry_after_seconds: float = 1.0
+    # 1ページの件数（超過分は pagination_key で分割）
+    page_size: int = 1000
+    # Authorization ヘッダーを要求する
+    require_auth: bool = True
+    # 遅延・障害注入の乱数シード（同じ設定なら同じ順序で発生）
+    seed: int = 0
+
+
+def _replay_token(kind: str, lifetime_seconds: int) -> str:
+    """有効期限付きのJWT形式トークン（署名なし）"""
+
+    def encode(payload: Dict[str, Any]) -> str:
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    payload = {"sub": f"replay-{kind}", "exp": int(time.time()) + lifetime_seconds}
+    return f"{encode({'alg': 'none'})}.{encode(payload)}.replay"
+
+
+class ReplayDataset:
+    """リプレイ対象のデータセットクラス"""
+
+    def __init__(
+        self,
+        listed_info: List[Dict[str, Any]],
+        daily_quotes: List[Dict[str, Any]],
+        trading_calendar: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            listed_info: /listed/info の info 要素
+            daily_quotes: /prices/daily_quotes の daily_quotes 要素
+            trading_calendar: /markets/trading_calendar の要素（省略時は日足の日付から生成）
+        """
+        self.listed_info = listed_info
+        self.daily_quotes = sorted(daily_quotes, key=lambda q: (q["Date"], q["Code"]))
+        self._by_code: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_date: Dict[str, List[Dict[str, Any]]] = {}
+        for quote in self.daily_quotes:
+            self._by_code.setdefault(str(quote["Code"]), []).append(quote)
+            self._by_date.setdefault(quote["Date"], []).append(quote)
+        self.trading_calendar = trading_calendar or self._calendar_from_quotes()
+
+    def _calendar_from_quotes(self) -> List[Dict[str, Any]]:
+        """日足の日付を営業日とするカレンダー"""
+        if not self._by_date:
+            return []
+        day = date.fromisoformat(min(self._by_date))
+        end = date.fromisoformat(max(self._by_date))
+        calendar = []
+        while day <= end:
+            division = "1" if day.isoformat() in self._by_date else "0"
+            calendar.append({"Date": day.isoformat(), "HolidayDivision": division})
+            day += timedelta(days=1)
+        return calendar
+
+    @classmethod
+    def synthetic(
+        cls,
+        symbols: int = 50,
+        start: str = "2024-01-04",
+        trading_days: int = 60,
+        seed: int = 0,
+    ) -> "ReplayDataset":
+        """
+        合成データセットの生成（シードが同じなら同じ内容）
+
+        Args:
+            symbols: 銘柄数
+            start: 開始日
+            trading_days: 営業日数（土日は除く）
+            seed: 乱数シード
+        """
+        rng = random.Random(seed)
+        codes = [f"{1300 + i * 7:04d}0" for i in range(symbols)]
+        listed_info = [
+            {
+                "Date": start,
+                "Code": code,
+                "CompanyName": f"リプレイ銘柄{i + 1}",
+                "Sector17Code": str(1 + i % 17),
+                "Sector33Code": str(50 + (i % 33) * 50),
+                "MarketCode": "0111",
+            }
+            for i, code in enumerate(codes)
+        ]
+
+        days = []
+        day = date.fromisoformat(start)
+        while len(days) < trading_days:
+            if day.weekday() < 5:
+                days.append(day.isoformat())
+            day += timedelta(days=1)
+
+        quotes = []
+        for code in codes:
+            close = rng.uniform(500, 5000)
+            for day_str in days:
+                open_price = close
+                close = max(1.0, close * (1 + rng.gauss(0, 0.02)))
+                high = max(open_price, close) * (1 + rng.uniform(0, 0.01))
+                low = min(open_price, close) * (1 - rng.uniform(0, 0.01))
+                quotes.append(
+                    {
+                        "Date": day_str,
+                        "Code": code,
+                        "Open": round(open_price, 1),
+                        "High": round(high, 1),
+                        "Low": round(low, 1),
+                        "Close": round(close, 1),
+                        "Volume": rng.randint(10_000, 1_000_000),
+                        "AdjustmentFactor": 1.0,
+                    }
+                )
+        return cls(listed_info, quotes)
+
+    @classmethod
+    def from_directory(cls, directory: Path) -> "ReplayDataset":
+        """
+        記録済みレスポンスからデータセットを作成
+
+        listed_info.json（{"info": [...]}）と daily_quotes*.json
+        （{"daily_quotes": [...]}、複数可）、任意で trading_calendar.json を読み込む
+
+        Args:
+            directory: 記録済みレスポンスのディレクトリ
+        """
+        directory = Path(directory)
+
+        def load(path: Path, key: str) -> List[Dict[str, Any]]:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get(key, [])
+
+        listed_file = directory / "listed_info.json"
+        calendar_file = directory / "trading_calendar.json"
+        quotes = []
+        for quotes_file in sorted(directory.glob("daily_quotes*.json")):
+            quotes.extend(load(quotes_file, "daily_quotes"))
+        return cls(
+            load(listed_file, "info") if listed_file.exists() else [],
+            quotes,
+            load(calendar_file, "trading_calendar") if calendar_file.exists() else None,
+        )
+
+    def query_listed_info(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """/listed/info の検索"""
+        code = params.get("code")
+        if not code:
+            return self.listed_info
+        return [item for item in self.listed_info if str(item["Code"]).startswith(code)]
+
+    def query_daily_quotes(self, params: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+        """/prices/daily_quotes の検索（code と date のどちらもない場合はNone）"""
+        code = params.get("code")
+        if code:
+            quotes = [
+                quote
+                for key, rows in self._by_code.items()
+                if key.startswith(code)
+                for quote in rows
+            ]
+        elif params.get("date"):
+            quotes = self._by_date.get(_iso(params["date"]), [])
+        else:
+            return None
+        if params.get("from"):
+            quotes = [q for q in quotes if q["Date"] >= _iso(params["from"])]
+        if params.get("to"):
+            quotes = [q for q in quotes if q["Date"] <= _iso(params["to"])]
+        if code and params.get("date"):
+            quotes = [q for q in quotes if q["Date"] == _iso(params["date"])]
+        return quotes
+
+    def query_trading_calendar(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """/markets/trading_calendar の検索"""
+        calendar = self.trading_calendar
+        if params.get("from"):
+            calendar = [c for c in calendar if c["Date"] >= _iso(params["from"])]
+        if params.get("to"):
+            calendar = [c for c in calendar if c["Date"] <= _iso(params["to"])]
+        return calendar
+
+
+def _iso(value: str) -> str:
+    """YYYYMMDD / YYYY-MM-DD を YYYY-MM-DD に統一"""
+    text = value.replace("-", "")
+    return f"{text[:4]}-{text[4:6]}-{text[6:8]}"
+
+
+@dataclass
+class ReplayStats:
+    """リプレイサーバーの応答統計"""
+
+    requests: int = 0
+    ok: int = 0
+    throttled: int = 0
+    errors: int = 0
+    unauthorized: int = 0
+    by_path: Dict[str, int] = field(default_factory=dict)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """J-Quants API 互換のリクエストハンドラー"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        replay: "JQuantsReplayServer" = self.server.replay
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path[len(replay.path_prefix) :] if url.path.startswith(
+            replay.path_prefix
+        ) else url.path
+        if method == "POST":
+            # 本体は読み捨てる（Keep-Alive の次のリクエストに残さない）
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        fault = replay._admit(path)
+        if fault is not None:
+            status, body, headers = fault
+            self._send(status, body, headers)
+            return
+
+        handler = replay.routes.get((method, path))
+        if handler is None:
+            self._send(404, {"message": f"Not Found: {path}"})
+            return
+        if path.startswith("/token/"):
+            status, body = handler(params)
+        elif replay.config.require_auth and not self.headers.get(
+            "Authorization", ""
+        ).startswith("Bearer "):
+            replay._count("unauthorized")
+            status, body = 401, {"message": "The incoming token is invalid or expired."}
+        else:
+            status, body = handler(params)
+        if status == 200:
+            replay._count("ok")
+        self._send(status, body)
+
+    def _send(self, status: int, body: Dict[str, Any], headers=None):
+        payload = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        self.server.replay.logger.debug(format % args)
+
+
+class JQuantsReplayServer:
+    """J-Quants API ローカルリプレイサーバークラス"""
+
+    def __init__(
+        self,
+        dataset: Optional[ReplayDataset] = None,
+        config: Optional[ReplayConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            dataset: 応答データ（省略時は合成データ）
+            config: 遅延・障害注入の設定
+            host: 待ち受けアドレス
+            port: 待ち受けポート（0 で空きポート）
+            logger: ロガーインスタンス
+        """
+        self.dataset = dataset or ReplayDataset.synthetic()
+        self.config = config or ReplayConfig()
+        self.logger = logger or logging.getLogger(__name__)
+        self.path_prefix = "/v1"
+        self.stats = ReplayStats()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._window_started = time.monotonic()
+        self._window_count = 0
+        self.routes = {
+            ("POST", "/token/auth_user"): self._auth_user,
+            ("POST", "/token/auth_refresh"): self._auth_refresh,
+            ("GET", "/listed/info"): self._listed_info,
+            ("GET", "/prices/daily_quotes"): self._daily_quotes,
+            ("GET", "/markets/trading_calendar"): self._trading_calendar,
+        }
+        self._server = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self._server.daemon_threads = True
+        self._server.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """JQUANTS_API_BASE_URL に設定するベースURL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path_prefix}"
+
+    def start(self) -> "JQuantsReplayServer":
+        """バックグラウンドスレッドで起動"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self.logger.info(f"リプレイサーバー起動: {self.base_url}")
+        return self
+
+    def serve_forever(self):
+        """現在のスレッドで起動（Ctrl+C まで）"""
+        self.logger.info(f"リプレイサーバー起動: {self.base_url}")
+        self._server.serve_forever()
+
+    def stop(self):
+        """停止"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "JQuantsReplayServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """応答統計"""
+        with self._lock:
+            return {
+                "requests": self.stats.requests,
+                "ok": self.stats.ok,
+                "throttled": self.stats.throttled,
+                "errors": self.stats.errors,
+                "unauthorized": self.stats.unauthorized,
+                "by_path": dict(self.stats.by_path),
+            }
+
+    # ---- 障害注入 ----
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def _admit(self, path: str) -> Optional[Tuple[int, Dict[str, Any], Dict[str, str]]]:
+        """
+        遅延を入れ、レート超過・障害注入の対象なら応答内容を返す
+
+        Returns:
+            Optional[Tuple]: (ステータス, 本体, ヘッダー)。通常応答ならNone
+        """
+        config = self.config
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.by_path[path] = self.stats.by_path.get(path, 0) + 1
+            delay = config.latency_ms + self._rng.uniform(0, config.latency_jitter_ms)
+            throttle = self._rng.random() < config.throttle_rate
+            error = self._rng.random() < config.error_rate
+            if config.rate_limit_per_second:
+                now = time.monotonic()
+                if now - self._window_started >= 1.0:
+                    self._window_started = now
+                    self._window_count = 0
+                self._window_count += 1
+                throttle = throttle or self._window_count > config.rate_limit_per_second
+
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if throttle:
+            self._count("throttled")
+            headers = {"Retry-After": f"{config.retry_after_seconds:g}"}
+            return 429, {"message": "Rate limit exceeded"}, headers
+        if error:
+            self._count("errors")
+            return 500, {"message": "Internal Server Error (injected)"}, {}
+        return None
+
+    # ---- エンドポイント ----
+
+    def _page(
+        self, items: List[Dict[str, Any]], key: str, params: Dict[str, str]
+    ) -> Tuple[int, Dict[str, Any]]:
+        """pagination_key（開始位置）によるページ分割"""
+        offset = int(params.get("pagination_key") or 0)
+        end = offset + self.config.page_size
+        body: Dict[str, Any] = {key: items[offset:end]}
+        if end < len(items):
+            body["pagination_key"] = str(end)
+        return 200, body
+
+    def _auth_user(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        return 200, {"refreshToken": _replay_token("refresh", 7 * 24 * 60 * 60)}
+
+    def _auth_refresh(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        if not params.get("refreshtoken"):
+            return 400, {"message": "'refreshtoken' is required."}
+        return 200, {"idToken": _replay_token("id", 24 * 60 * 60)}
+
+    def _listed_info(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        return self._page(self.dataset.query_listed_info(params), "info", params)
+
+    def _daily_quotes(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        quotes = self.dataset.query_daily_quotes(params)
+        if quotes is None:
+            return 400, {"message": "This API requires at least 1 parameter as follows; 'date','code'."}
+        return self._page(quotes, "daily_quotes", params)
+
+    def _trading_calendar(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        return self._page(
+            self.dataset.query_trading_calendar(params), "trading_calendar", params
+        )
+
+
+def record_dataset(
+    directory: Path, listed_info: List[Dict[str, Any]], daily_quotes: List[Dict[str, Any]]
+):
+    """
+    取得済みレスポンスをリプレイ用に保存（ReplayDataset.from_directory で読み込める形式）
+
+    Args:
+        directory: 保存先ディレクトリ
+        listed_info: /listed/info の info 要素
+        daily_quotes: /prices/daily_quotes の daily_quotes 要素
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    recorded_at = datetime.now().isoformat()
+    for name, key, items in (
+        ("listed_info.json", "info", listed_info),
+        ("daily_quotes.json", "daily_quotes", daily_quotes),
+    ):
+        with open(directory / name, "w", encoding="utf-8") as f:
+            json.dump(
+                {key: items, "recorded_at": recorded_at}, f, ensure_ascii=False
+            )
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+ダッシュボード向けJSON成果物の書き出し
+インデントなしで書き出し、gzip / brotli の圧縮済みファイルを併せて出力する
+件数の多いフィードはページに分割し、成果物ごとのサイズ予算との比較を報告する
+brotli はパッケージが利用可能な場合のみ出力する
+"""
+
+import fnmatch
+import gzip
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_BROTLI = "br"
+COMPRESSION_SUFFIXES = {COMPRESSION_GZIP: ".gz", COMPRESSION_BROTLI: ".br"}
+
+# 転送サイズ（圧縮済みがあれば最小のもの）の予算（成果物名のパターン -> バイト数、先に一致したもの）
+DEFAULT_BUDGETS: Dict[str, int] = {
+    "stocks/*": 16 * 1024,
+    "metadata/*": 16 * 1024,
+    "listed_index*.json": 512 * 1024,
+    "*": 256 * 1024,
+}
+
+
+def encode_json(data: Any) -> bytes:
+    """インデントなしのJSONエンコード"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _atomic_write(path: Path, payload: bytes):
+    """一時ファイル経由の書き込み"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_file, "wb") as f:
+        f.write(payload)
+    os.replace(temp_file, path)
+
+
+@dataclass
+class ArtifactReport:
+    """成果物のサイズ報告"""
+
+    name: str
+    raw_bytes: int
+    budget_bytes: Optional[int]
+    compressed_bytes: Dict[str, int] = field(default_factory=dict)
+    pages: int = 1
+    # ページ分割時の最大ページの転送サイズ（予算はページごとに判定）
+    largest_page_bytes: Optional[int] = None
+
+    @property
+    def transfer_bytes(self) -> int:
+        """転送サイズ（圧縮済みがあれば最小のもの、ページ分割時は全ページの合計）"""
+        return min([self.raw_bytes, *self.compressed_bytes.values()])
+
+    @property
+    def over_budget(self) -> bool:
+        """予算超過か"""
+        if self.budget_bytes is None:
+            return False
+        return (self.largest_page_bytes or self.transfer_bytes) > self.budget_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式"""
+        return {
+            "name": self.name,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": dict(self.compressed_bytes),
+            "transfer_bytes": self.transfer_bytes,
+            "budget_bytes": self.budget_bytes,
+            "over_budget": self.over_budget,
+            "pages": self.pages,
+            "largest_page_bytes": self.largest_page_bytes,
+        }
+
+
+class JSONArtifactWriter:
+    """圧縮・ページ分割・サイズ予算付きのJSON成果物書き出しクラス"""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        compression: Iterable[str] = (COMPRESSION_GZIP, COMPRESSION_BROTLI),
+        budgets: Optional[Dict[str, int]] = None,
+        page_bytes: Optional[int] = None,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            output_dir: 出力ディレクトリ
+            compression: 併せて出力する圧縮形式（gzip / br）
+            budgets: 成果物名のパターン -> 転送サイズの予算（省略時は DEFAULT_BUDGETS）
+            page_bytes: この大きさを超えるフィードをページに分割する（None で分割しない）
+            logger: ロガーインスタンス
+        """
+        self.output_dir = Path(output_dir)
+        self.logger = logger or logging.getLogger(__name__)
+        self.compression = []
+        for name in compression:
+            if name not in COMPRESSION_SUFFIXES:
+                raise ValueError(f"未対応の圧縮形式です: {name}")
+            if name == COMPRESSION_BROTLI and not BROTLI_AVAILABLE:
+                self.logger.debug("brotli が利用できないため .br は出力しません")
+                continue
+            self.compression.append(name)
+        self.budgets = DEFAULT_BUDGETS if budgets is None else budgets
+        self.page_bytes = page_bytes
+        self.reports: List[ArtifactReport] = []
+
+    def budget_for(self, name: str) -> Optional[int]:
+        """成果物の予算（一致するパターンがなければNone）"""
+        for pattern, budget in self.budgets.items():
+            if fnmatch.fnmatch(name, pattern):
+                return budget
+        return None
+
+    @staticmethod
+    def _compress(name: str, payload: bytes) -> bytes:
+        if name == COMPRESSION_GZIP:
+            # mtime を固定し、内容が同じなら同じバイト列にする
+            return gzip.compress(payload, compresslevel=9, mtime=0)
+        return brotli.compress(payload, quality=11)
+
+    def _write_payload(self, name: str, payload: bytes) -> Dict[str, int]:
+        """本体と圧縮済みファイルの書き込み"""
+        _atomic_write(self.output_dir / name, payload)
+        return self._write_compressed(name, payload)
+
+    def _write_compressed(self, name: str, payload: bytes) -> Dict[str, int]:
+        """
+        圧縮済みファイル（<name>.gz / <name>.br）の書き込み
+
+        出力しない形式の既存ファイルは、本体と食い違わないよう削除する
+        """
+        path = self.output_dir / name
+        compressed = {}
+        for compression, suffix in COMPRESSION_SUFFIXES.items():
+            sibling = path.with_name(path.name + suffix)
+            if compression not in self.compression:
+                sibling.unlink(missing_ok=True)
+                continue
+            data = self._compress(compression, payload)
+            _atomic_write(sibling, data)
+            compressed[compression] = len(data)
+        return compressed
+
+    def _paginate(
+        self, name: str, data: Dict[str, Any], items_key: str, payload: bytes
+    ) -> List[Dict[str, Any]]:
+        """件数に比例させて page_bytes 以下を目安にページへ分割"""
+        items = data[items_key]
+        pages = -(-len(payload) // self.page_bytes)
+        per_page = max(1, -(-len(items) // pages))
+        chunks = [items[i : i + per_page] for i in range(0, len(items), per_page)]
+        stem = name[: -len(".json")] if name.endswith(".json") else name
+        # 1ページ目は <name>.json のまま（既存の読み込み側は1ページ目を受け取る）
+        page_files = [name] + [f"{stem}.page-{i + 1}.json" for i in range(1, len(chunks))]
+
+        documents = []
+        for i, chunk in enumerate(chunks):
+            document = {key: value for key, value in data.items() if key != items_key}
+            document[items_key] = chunk
+            document["pagination"] = {
+                "page": i + 1,
+                "pages": len(chunks),
+                "total_items": len(items),
+                "page_files": [Path(f).name for f in page_files],
+            }
+            documents.append(document)
+        return documents
+
+    def write(
+        self,
+        name: str,
+        data: Any,
+        items_key: Optional[str] = None,
+        record: bool = True,
+    ) -> ArtifactReport:
+        """
+        成果物の書き出し
+
+        page_bytes を超え items_key のリストを持つ場合、<name>.json は1ページ目と
+        pagination（全ページのファイル名）を持ち、2ページ目以降は
+        <name>.page-<n>.json に書き出す
+
+        Args:
+            name: 出力パス（output_dir からの相対パス）
+            data: JSONに変換できるデータ
+            items_key: ページ分割するリストのキー
+            record: サイズ報告に記録する
+
+        Returns:
+            ArtifactReport: サイズ報告（ページ分割時は全ページの合計）
+        """
+        payload = encode_json(data)
+        documents = None
+        if (
+            self.page_bytes
+            and items_key
+            and len(payload) > self.page_bytes
+            and isinstance(data, dict)
+            and isinstance(data.get(items_key), list)
+            and len(data[items_key]) > 1
+        ):
+            documents = self._paginate(name, data, items_key, payload)
+
+        if documents is None:
+            report = ArtifactReport(name, len(payload), self.budget_for(name))
+            report.compressed_bytes = self._write_payload(name, payload)
+        else:
+            report = ArtifactReport(name, 0, self.budget_for(name), pages=len(documents))
+            report.largest_page_bytes = 0
+            page_files = documents[0]["pagination"]["page_files"]
+            for i, document in enumerate(documents):
+                page_name = str(Path(name).with_name(page_files[i]))
+                page_payload = encode_json(document)
+                compressed = self._write_payload(page_name, page_payload)
+                report.raw_bytes += len(page_payload)
+                for compression, size in compressed.items():
+                    report.compressed_bytes[compression] = (
+                        report.compressed_bytes.get(compression, 0) + size
+                    )
+                report.largest_page_bytes = max(
+                    report.largest_page_bytes,
+                    min([len(page_payload), *compressed.values()]),
+                )
+
+        if record:
+            self.reports.append(report)
+        return report
+
+    def write_many(
+        self, artifacts: Dict[str, Any], max_workers: int = 8, record: bool = False
+    ) -> List[ArtifactReport]:
+        """
+        複数成果物の並行書き出し（銘柄別ファイルなど）
+
+        Args:
+            artifacts: 出力パス -> データ
+            max_workers: 書き込みスレッド数
+            record: 個々のサイズ報告を記録する（既定では予算超過のみ記録）
+
+        Returns:
+            List[ArtifactReport]: サイズ報告
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            reports = list(
+                executor.map(
+                    lambda item: self.write(item[0], item[1], record=False),
+                    artifacts.items(),
+                )
+            )
+        self.reports.extend(r for r in reports if record or r.over_budget)
+        return reports
+
+    def compress_existing(self, name: str) -> ArtifactReport:
+        """逐次書き出し済みのファイルに圧縮済みファイルを追加し、サイズを記録"""
+        payload = (self.output_dir / name).read_bytes()
+        report = ArtifactReport(name, len(payload), self.budget_for(name))
+        report.compressed_bytes = self._write_compressed(name, payload)
+        self.reports.append(report)
+        return report
+
+    def size_report(self) -> Dict[str, Any]:
+        """記録した成果物のサイズ報告"""
+        return {
+            "artifacts": [report.to_dict() for report in self.reports],
+            "total_raw_bytes": sum(r.raw_bytes for r in self.reports),
+            "total_transfer_bytes": sum(r.transfer_bytes for r in self.reports),
+            "over_budget": [r.name for r in self.reports if r.over_budget],
+        }
+
+    def log_report(self) -> Dict[str, Any]:
+        """サイズ報告のログ出力（予算超過は警告）"""
+        report = self.size_report()
+        for artifact in self.reports:
+            message = (
+                f"{artifact.name}: {artifact.raw_bytes:,} bytes"
+                f" (転送 {artifact.transfer_bytes:,} bytes"
+                f" / 予算 {artifact.budget_bytes or '-'}"
+                f"{', ' + str(artifact.pages) + 'ページ' if artifact.pages > 1 else ''})"
+            )
+            if artifact.over_budget:
+                self.logger.warning(f"サイズ予算超過 {message}")
+            else:
+                self.logger.info(message)
+        return report
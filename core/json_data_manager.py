@@ -6,31 +6,102 @@ jQuantsから取得されたデータをJSON形式で保持し、差分更新を
 
 import json
 import hashlib
+import re
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+from .columnar_price_store import ColumnarPriceStore, records_to_frame
+from .diff_log_store import DiffLogStore
+from .mmap_price_store import MmapPriceStore, MMAP_COLUMNS
+from .record_journal import RecordJournal
+from .stock_data_cache import file_token, get_shared_cache
+
+# ストレージモード
+STORAGE_MODE_SINGLE = "single"  # data/stock_data.json に全銘柄を保持
+STORAGE_MODE_SHARDED = "sharded"  # data/stocks/<銘柄>.json に銘柄ごとに保持
+STORAGE_MODE_COLUMNAR = "columnar"  # data/columnar/ に型付き配列で銘柄ごとに保持
+STORAGE_MODES = (STORAGE_MODE_SINGLE, STORAGE_MODE_SHARDED, STORAGE_MODE_COLUMNAR)
+
+# get_metadata の update_history に含める直近の更新件数
+UPDATE_HISTORY_LIMIT = 100
+# 単一ファイルのキャッシュで銘柄コード一覧を登録する部分名（銘柄コードと重複しない）
+_SYMBOLS_PART = "\x00symbols"
+
 
 class JSONDataManager:
     """JSON形式でのデータ管理クラス"""
 
-    def __init__(self, data_dir: str = "data", logger=None):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        logger=None,
+        storage_mode: str = STORAGE_MODE_SINGLE,
+        enable_mmap: bool = False,
+    ):
         """
         初期化
 
         Args:
             data_dir: データ保存ディレクトリ
             logger: ロガーインスタンス
+            storage_mode: ストレージモード（"single"、"sharded" または "columnar"）
+            enable_mmap: 保存時にメモリマップ用の配列ファイルも書き出すか
         """
+        if storage_mode not in STORAGE_MODES:
+            raise ValueError(f"未対応のストレージモード: {storage_mode}")
+
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.logger = logger or logging.getLogger(__name__)
+        self.storage_mode = storage_mode
+
+        # 解析済みデータのプロセス共有LRUキャッシュ
+        self.series_cache = get_shared_cache()
+
+        # 共有ファイル（単一ファイル・マニフェスト・メタデータ）の更新ロックと
+        # 一括コミット用の保留中書き込み
+        self._commit_lock = threading.RLock()
+        self._pending_commit: Optional[Dict[str, Any]] = None
+        self._batch_depth = 0
 
         # データファイルのパス
         self.stock_data_file = self.data_dir / "stock_data.json"
         self.metadata_file = self.data_dir / "metadata.json"
-        self.diff_log_file = self.data_dir / "diff_log.json"
+        self.legacy_diff_log_file = self.data_dir / "diff_log.json"
+
+        # 差分ログ（追記専用・セグメントローテーション）
+        self.diff_log_store = DiffLogStore(self.data_dir / "diff_log", self.logger)
+        self._import_legacy_diff_log()
+
+        # 銘柄別ストレージのパス
+        self.shard_dir = self.data_dir / "stocks"
+        self.columnar_dir = self.data_dir / "columnar"
+        self.columnar_store = None
+        self._manifest_journal: Optional[RecordJournal] = None
+        self._prepare_storage()
+
+        # 読み取り専用のメモリマップ配列（バックテスト等の共有読み込み用）
+        self.mmap_dir = self.data_dir / "mmap"
+        self.mmap_store = (
+            MmapPriceStore(self.mmap_dir, self.logger) if enable_mmap else None
+        )
+
+        # 銘柄ごとのデータソース・差分件数（追記専用、metadata.json は全体の集計のみ）
+        self.symbol_metadata_log = RecordJournal(
+            self.data_dir / "symbol_metadata.jsonl",
+            history_limit=UPDATE_HISTORY_LIMIT,
+            logger=self.logger,
+        )
 
         # メタデータの初期化
         self._initialize_metadata()
@@ -42,10 +113,48 @@ class JSONDataManager:
                 "created_at": datetime.now().isoformat(),
                 "last_updated": None,
                 "version": "1.0",
-                "data_sources": {},
-                "update_history": [],
+                "update_count": 0,
             }
             self._save_json(self.metadata_file, metadata)
+            return
+        self._import_legacy_symbol_metadata()
+
+    def _import_legacy_symbol_metadata(self):
+        """旧形式（metadata.json の data_sources）の銘柄メタデータを追記専用ログへ移行"""
+        metadata = self._load_json(self.metadata_file, {})
+        if not isinstance(metadata, dict) or "data_sources" not in metadata:
+            return
+        data_sources = metadata.pop("data_sources") or {}
+        metadata.pop("update_history", None)
+        records = [
+            dict(entry, symbol=symbol)
+            for symbol, entry in data_sources.items()
+            if isinstance(entry, dict)
+        ]
+        if records and not self.symbol_metadata_log.latest():
+            records.sort(key=lambda record: record.get("last_updated") or "")
+            self.symbol_metadata_log.replace_all(records)
+            self.logger.info(f"旧形式の銘柄メタデータを移行しました: {len(records)}銘柄")
+        self._save_json(self.metadata_file, metadata)
+
+    @property
+    def diff_log_file(self) -> Path:
+        """現在の差分ログセグメント"""
+        return self.diff_log_store.active_segment
+
+    def _import_legacy_diff_log(self):
+        """旧形式（diff_log.json）の差分ログを追記専用ログへ取り込み"""
+        if not self.legacy_diff_log_file.exists() or self.diff_log_store.count():
+            return
+        legacy_log = self._load_json(self.legacy_diff_log_file, [])
+        if isinstance(legacy_log, list):
+            imported = self.diff_log_store.append_many(
+                [entry for entry in legacy_log if isinstance(entry, dict)]
+            )
+            self.logger.info(f"旧形式の差分ログを取り込みました: {imported}件")
+        self.legacy_diff_log_file.replace(
+            self.legacy_diff_log_file.with_suffix(".json.migrated")
+        )
 
     def _save_json(self, file_path: Path, data: Any) -> bool:
         """JSONファイルの保存（最適化版）"""
@@ -91,6 +200,507 @@ class JSONDataManager:
                 self.logger.error(f"ハッシュ計算エラー: {e}")
             return hashlib.md5(str(data).encode("utf-8")).hexdigest()
 
+    def _prepare_storage(self):
+        """ストレージモードに応じた保存先の準備"""
+        if self.storage_mode == STORAGE_MODE_SINGLE:
+            return
+
+        if self.storage_mode == STORAGE_MODE_COLUMNAR:
+            self.columnar_store = ColumnarPriceStore(self.columnar_dir, self.logger)
+        else:
+            self.shard_dir.mkdir(exist_ok=True)
+
+        if (
+            not self.manifest_file.exists()
+            and not self.manifest_journal.journal_file.exists()
+            and self.stock_data_file.exists()
+        ):
+            self.logger.warning(
+                "単一ファイル形式のデータが存在します。"
+                f"migrate_storage('{self.storage_mode}') で移行してください"
+            )
+
+    @property
+    def manifest_file(self) -> Path:
+        """銘柄別ストレージのマニフェストファイル"""
+        if self.storage_mode == STORAGE_MODE_COLUMNAR:
+            return self.columnar_dir / "manifest.json"
+        return self.shard_dir / "manifest.json"
+
+    def _shard_path(self, symbol: str) -> Path:
+        """銘柄シャードファイルのパス"""
+        safe_symbol = re.sub(r"[^0-9A-Za-z_-]", "_", str(symbol))
+        return self.shard_dir / f"{safe_symbol}.json"
+
+    def _symbol_file(self, symbol: str) -> Path:
+        """銘柄別ストレージでの銘柄ファイルのパス"""
+        if self.storage_mode == STORAGE_MODE_COLUMNAR:
+            return self.columnar_store._file_path(symbol)
+        return self._shard_path(symbol)
+
+    @property
+    def manifest_journal(self) -> RecordJournal:
+        """
+        マニフェストの追記専用ジャーナル
+
+        一括コミット外の保存ではマニフェスト全体を書き直さず、銘柄エントリを
+        1行追記する。commit_batch・close で manifest.json へ反映して空にする
+        """
+        journal_file = self.manifest_file.with_name("manifest.journal.jsonl")
+        journal = self._manifest_journal
+        if journal is None or journal.journal_file != journal_file:
+            journal = RecordJournal(journal_file, logger=self.logger)
+            self._manifest_journal = journal
+        return journal
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """マニフェストの読み込み（ジャーナルに追記された銘柄エントリを反映）"""
+        manifest = self._load_json(self.manifest_file, None)
+        if not isinstance(manifest, dict) or "symbols" not in manifest:
+            manifest = {
+                "version": "1.0",
+                "storage_mode": self.storage_mode,
+                "symbols": {},
+            }
+        for symbol, record in self.manifest_journal.latest().items():
+            manifest["symbols"][symbol] = {
+                key: value for key, value in record.items() if key != "symbol"
+            }
+        return manifest
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> bool:
+        """
+        マニフェストの保存（コンパクト形式）
+
+        manifest は _load_manifest で読み込んだ（ジャーナル反映済みの）内容とし、
+        保存後はジャーナルを空にする
+        """
+        manifest["updated_at"] = datetime.now().isoformat()
+        try:
+            temp_path = self.manifest_file.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+            temp_path.replace(self.manifest_file)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"マニフェスト保存エラー {self.manifest_file}: {e}")
+            return False
+        return self.manifest_journal.replace_all([])
+
+    def compact_manifest(self) -> bool:
+        """マニフェストジャーナルの manifest.json への反映"""
+        if self.storage_mode == STORAGE_MODE_SINGLE:
+            return True
+        with self._commit_lock:
+            if not self.manifest_journal.latest():
+                return True
+            return self._save_manifest(self._load_manifest())
+
+    def close(self):
+        """終了処理（マニフェストジャーナルの反映）"""
+        self.compact_manifest()
+
+    def _manifest_entry(
+        self, symbol: str, data: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """マニフェストエントリの作成"""
+        return {
+            "file": self._symbol_file(symbol).name,
+            "total_records": len(data),
+            "start_date": data[0]["date"] if data else None,
+            "end_date": data[-1]["date"] if data else None,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    def _count_records(self, value: Any) -> int:
+        """キャッシュ容量計算用のレコード数"""
+        if isinstance(value, dict):
+            return sum(len(v) for v in value.values() if isinstance(v, list))
+        return len(value) if isinstance(value, list) else 1
+
+    def _load_cached(self, file_path: Path, loader, default: Any) -> Any:
+        """
+        解析済みデータをキャッシュ経由で読み込み
+
+        ファイルの mtime・サイズが変わっていなければ再解析しない。
+        キャッシュされたオブジェクトは共有されるため、呼び出し側で変更しないこと
+        """
+        token = file_token(file_path)
+        if token is None:
+            return default
+
+        cached = self.series_cache.get(file_path, token)
+        if cached is not None:
+            return cached
+
+        value = loader()
+        if value is None:
+            return default
+        self.series_cache.put(file_path, token, value, self._count_records(value))
+        return value
+
+    def _load_stock_data_file(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        単一ファイル形式の全銘柄データ（一括コミット中は保留分）
+
+        キャッシュには銘柄ごとに登録しているため、全銘柄がキャッシュにある場合のみ
+        再解析せずに組み立てる
+        """
+        pending = self._pending_commit
+        if pending is not None and "stock_data" in pending:
+            return pending["stock_data"]
+        token = file_token(self.stock_data_file)
+        if token is None:
+            return {}
+
+        symbols = self.series_cache.get(self.stock_data_file, token, _SYMBOLS_PART)
+        if symbols is not None:
+            stock_data = {}
+            for symbol in symbols:
+                data = self.series_cache.get(self.stock_data_file, token, symbol)
+                if data is None:
+                    break
+                stock_data[symbol] = data
+            else:
+                return stock_data
+
+        stock_data = self._load_json(self.stock_data_file, None)
+        if not isinstance(stock_data, dict):
+            return {}
+        self._cache_stock_data(token, stock_data)
+        return stock_data
+
+    def _cache_stock_data(self, token, stock_data: Dict[str, Any]):
+        """単一ファイルの内容を銘柄ごとのエントリとしてキャッシュへ登録"""
+        for symbol, data in stock_data.items():
+            self.series_cache.put(
+                self.stock_data_file, token, data, self._count_records(data), symbol
+            )
+        # 銘柄一覧は最後に登録し、追い出しの順番を銘柄データより後にする
+        self.series_cache.put(
+            self.stock_data_file, token, list(stock_data), 1, _SYMBOLS_PART
+        )
+
+    def _stock_data_symbols(self) -> List[str]:
+        """単一ファイル形式の銘柄コード一覧（銘柄データは読み込まない）"""
+        pending = self._pending_commit
+        if pending is None or "stock_data" not in pending:
+            token = file_token(self.stock_data_file)
+            if token is None:
+                return []
+            symbols = self.series_cache.get(self.stock_data_file, token, _SYMBOLS_PART)
+            if symbols is not None:
+                return list(symbols)
+        return list(self._load_stock_data_file().keys())
+
+    def _save_json_cached(self, file_path: Path, data: Any) -> bool:
+        """JSON保存とキャッシュへの書き込み反映"""
+        if self._save_json(file_path, data):
+            token = file_token(file_path)
+            if file_path == self.stock_data_file:
+                self._cache_stock_data(token, data)
+            else:
+                self.series_cache.put(file_path, token, data, self._count_records(data))
+            return True
+        self.series_cache.invalidate(file_path)
+        return False
+
+    def _load_symbol_data(self, symbol: str) -> List[Dict[str, Any]]:
+        """銘柄データの読み込み（ストレージモードに応じて必要な範囲のみ）"""
+        if self.storage_mode == STORAGE_MODE_SHARDED:
+            shard_path = self._shard_path(symbol)
+            return self._load_cached(
+                shard_path, lambda: self._load_json(shard_path, None), []
+            )
+        if self.storage_mode == STORAGE_MODE_COLUMNAR:
+            return self._load_cached(
+                self._symbol_file(symbol),
+                lambda: self.columnar_store.read_records(symbol),
+                [],
+            )
+
+        # 単一ファイルは銘柄単位でキャッシュし、キャッシュにない場合のみ全体を解析
+        pending = self._pending_commit
+        if pending is None or "stock_data" not in pending:
+            token = file_token(self.stock_data_file)
+            if token is None:
+                return []
+            cached = self.series_cache.get(self.stock_data_file, token, symbol)
+            if cached is not None:
+                return cached
+            stock_data = self._load_stock_data_file()
+            if symbol not in stock_data:
+                # 存在しない銘柄の問い合わせで毎回解析しないよう空の結果も登録
+                self.series_cache.put(self.stock_data_file, token, [], 1, symbol)
+            return stock_data.get(symbol, [])
+        return self._load_stock_data_file().get(symbol, [])
+
+    def _write_symbol_file(self, symbol: str, data: List[Dict[str, Any]]) -> bool:
+        """銘柄別ストレージへの銘柄ファイル書き込み"""
+        if self.storage_mode == STORAGE_MODE_COLUMNAR:
+            self.series_cache.invalidate(self._symbol_file(symbol))
+            return self.columnar_store.write(symbol, data)
+        return self._save_json_cached(self._shard_path(symbol), data)
+
+    def _delete_symbol_file(self, symbol: str):
+        """銘柄別ストレージの銘柄ファイル削除"""
+        symbol_file = self._symbol_file(symbol)
+        self.series_cache.invalidate(symbol_file)
+        if symbol_file.exists():
+            symbol_file.unlink()
+
+    def _store_symbol_data(self, symbol: str, data: List[Dict[str, Any]]) -> bool:
+        """銘柄データの書き込み"""
+        if self.storage_mode != STORAGE_MODE_SINGLE:
+            if not self._write_symbol_file(symbol, data):
+                return False
+            return self._record_manifest_entry(symbol, data)
+
+        with self._commit_lock:
+            pending = self._pending_commit
+            stock_data = self._load_stock_data_file()
+            if pending is None or "stock_data" not in pending:
+                # キャッシュ共有の辞書を変更しないようコピー（コミット前に他から見えないため）
+                stock_data = dict(stock_data)
+            stock_data[symbol] = data
+            if pending is not None:
+                # 単一ファイルの書き込みは一括コミット時に1回だけ行う
+                pending["stock_data"] = stock_data
+                return True
+            return self._save_json_cached(self.stock_data_file, stock_data)
+
+    def _record_manifest_entry(self, symbol: str, data: List[Dict[str, Any]]) -> bool:
+        """マニフェストへの銘柄エントリ反映（一括コミット中は保留、それ以外はジャーナルへ追記）"""
+        entry = self._manifest_entry(symbol, data)
+        with self._commit_lock:
+            if self._pending_commit is not None:
+                self._pending_commit["manifest"][symbol] = entry
+                return True
+            try:
+                return self.manifest_journal.append(dict(entry, symbol=symbol))
+            except OSError as e:
+                if self.logger:
+                    self.logger.error(f"マニフェストジャーナル追記エラー: {e}")
+                return False
+
+    def _append_json_array(self, file_path: Path, rows: List[Dict[str, Any]]) -> bool:
+        """
+        JSON配列ファイルの末尾への要素追記（ファイル全体を書き直さない）
+
+        末尾の "]" を追記内容で置き換える。失敗時は元の末尾に戻す
+        """
+        try:
+            with open(file_path, "r+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - 64))
+                tail = f.read()
+                end = tail.rstrip().rfind(b"]")
+                # 空配列や想定外の形式は全体書き込みに任せる
+                if end < 0 or tail[:end].rstrip().endswith(b"["):
+                    return False
+
+                position = size - len(tail) + end
+                payload = "".join(
+                    ",\n  " + json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+                    for row in rows
+                )
+                f.seek(position)
+                f.truncate()
+                try:
+                    f.write((payload + "\n]").encode("utf-8"))
+                except Exception:
+                    f.seek(position)
+                    f.truncate()
+                    f.write(tail[end:])
+                    raise
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"JSON追記エラー {file_path}: {e}")
+            return False
+
+    def _append_symbol_rows(
+        self,
+        symbol: str,
+        rows: List[Dict[str, Any]],
+        merged: List[Dict[str, Any]],
+    ) -> bool:
+        """末尾への新規行の保存（シャード形式では追記のみ）"""
+        if self.storage_mode == STORAGE_MODE_SHARDED and len(merged) > len(rows):
+            shard_path = self._shard_path(symbol)
+            if self._append_json_array(shard_path, rows):
+                self.series_cache.put(
+                    shard_path, file_token(shard_path), merged, len(merged)
+                )
+                return self._record_manifest_entry(symbol, merged)
+            self.series_cache.invalidate(shard_path)
+        return self._store_symbol_data(symbol, merged)
+
+    def begin_batch(self):
+        """
+        一括コミットの開始
+
+        コミットまでの間、単一ファイル・マニフェスト・メタデータ・差分ログへの
+        書き込みを保留する（銘柄ファイルは即時に書き込む）。入れ子呼び出し可
+        """
+        with self._commit_lock:
+            if self._pending_commit is None:
+                self._pending_commit = {"manifest": {}, "metadata": [], "diff_log": []}
+            self._batch_depth += 1
+
+    def commit_batch(self) -> bool:
+        """
+        保留中の書き込みを一括で反映
+
+        Returns:
+            bool: 反映成功フラグ（入れ子の内側では常に True）
+        """
+        with self._commit_lock:
+            if self._batch_depth > 1:
+                self._batch_depth -= 1
+                return True
+            self._batch_depth = 0
+            # 反映が終わるまでは読み込みも保留分を参照させる
+            pending = self._pending_commit
+
+            if not pending:
+                return True
+
+            try:
+                success = True
+                if "stock_data" in pending:
+                    success &= self._save_json_cached(
+                        self.stock_data_file, pending["stock_data"]
+                    )
+
+                if pending["manifest"]:
+                    manifest = self._load_manifest()
+                    manifest["symbols"].update(pending["manifest"])
+                    success &= self._save_manifest(manifest)
+                else:
+                    success &= self.compact_manifest()
+
+                if pending["metadata"]:
+                    self.symbol_metadata_log.append_many(pending["metadata"])
+                    success &= self._update_global_metadata(pending["metadata"])
+
+                if pending["diff_log"]:
+                    self.diff_log_store.append_many(pending["diff_log"])
+
+                if self.logger:
+                    self.logger.info(
+                        f"一括コミット完了: メタデータ{len(pending['metadata'])}件, "
+                        f"差分ログ{len(pending['diff_log'])}件"
+                    )
+                return bool(success)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"一括コミットエラー: {e}")
+                return False
+            finally:
+                self._pending_commit = None
+
+    @contextmanager
+    def batch_commit(self):
+        """一括コミットのコンテキストマネージャ"""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.commit_batch()
+
+    def migrate_storage(
+        self, storage_mode: str, remove_source: bool = False
+    ) -> Dict[str, Any]:
+        """
+        ストレージモードの移行
+
+        Args:
+            storage_mode: 移行先のストレージモード
+            remove_source: 移行後に移行元のデータを削除するか
+
+        Returns:
+            Dict[str, Any]: 移行結果
+        """
+        if storage_mode not in STORAGE_MODES:
+            return {
+                "success": False,
+                "error": f"未対応のストレージモード: {storage_mode}",
+            }
+
+        source_mode = self.storage_mode
+        try:
+            # 移行元が単一ファイルの場合は一度だけ読み込む
+            if source_mode == STORAGE_MODE_SINGLE:
+                source_data = self._load_stock_data_file()
+                symbols = list(source_data.keys())
+            else:
+                source_data = None
+                symbols = self.get_all_symbols()
+            source_dir = (
+                self.columnar_dir
+                if source_mode == STORAGE_MODE_COLUMNAR
+                else self.shard_dir
+            )
+
+            loaded = {
+                symbol: (
+                    source_data[symbol]
+                    if source_data is not None
+                    else self._load_symbol_data(symbol)
+                )
+                for symbol in symbols
+            }
+
+            self.storage_mode = storage_mode
+            self._prepare_storage()
+
+            if storage_mode == STORAGE_MODE_SINGLE:
+                migrated_data = {
+                    symbol: data
+                    for symbol, data in loaded.items()
+                    if isinstance(data, list)
+                }
+                if not self._save_json_cached(self.stock_data_file, migrated_data):
+                    raise IOError("単一ファイルの保存に失敗")
+                migrated = len(migrated_data)
+            else:
+                manifest = self._load_manifest()
+                migrated = 0
+                for symbol, data in loaded.items():
+                    if not isinstance(data, list):
+                        continue
+                    if not self._write_symbol_file(symbol, data):
+                        raise IOError(f"銘柄ファイル保存失敗: {symbol}")
+                    manifest["symbols"][symbol] = self._manifest_entry(symbol, data)
+                    migrated += 1
+                if not self._save_manifest(manifest):
+                    raise IOError("マニフェスト保存失敗")
+
+            if remove_source and source_mode != storage_mode:
+                if source_mode == STORAGE_MODE_SINGLE:
+                    self.series_cache.invalidate(self.stock_data_file)
+                    if self.stock_data_file.exists():
+                        self.stock_data_file.unlink()
+                else:
+                    shutil.rmtree(source_dir, ignore_errors=True)
+
+            if self.logger:
+                self.logger.info(
+                    f"ストレージ移行完了: {source_mode} -> {storage_mode} ({migrated}銘柄)"
+                )
+            return {"success": True, "migrated_symbols": migrated}
+
+        except Exception as e:
+            self.storage_mode = source_mode
+            if self.logger:
+                self.logger.error(f"ストレージ移行エラー: {e}")
+            return {"success": False, "error": str(e)}
+
+    def migrate_to_sharded(self, remove_source: bool = False) -> Dict[str, Any]:
+        """単一ファイル形式から銘柄別シャード形式への移行"""
+        return self.migrate_storage(STORAGE_MODE_SHARDED, remove_source)
+
     def save_stock_data(
         self, symbol: str, data: List[Dict[str, Any]], source: str = "jquants_api"
     ) -> bool:
@@ -107,21 +717,21 @@ class JSONDataManager:
         """
         try:
             # 既存データの読み込み
-            existing_data = self._load_json(self.stock_data_file, {})
+            existing_data = self._load_symbol_data(symbol)
 
             # データの正規化と検証
             normalized_data = self._normalize_stock_data(data)
 
             # 差分の計算
-            diff_result = self._calculate_diff(
-                existing_data.get(symbol, []), normalized_data
+            diff_result = self._calculate_diff(existing_data, normalized_data)
+            diff_result["last_date"] = (
+                normalized_data[-1]["date"] if normalized_data else None
             )
 
-            # データの更新
-            existing_data[symbol] = normalized_data
-
             # 保存
-            if self._save_json(self.stock_data_file, existing_data):
+            if self._store_symbol_data(symbol, normalized_data):
+                self._refresh_mmap(symbol, normalized_data)
+
                 # メタデータの更新
                 self._update_metadata(symbol, source, diff_result)
 
@@ -141,6 +751,96 @@ class JSONDataManager:
                 self.logger.error(f"株価データ保存エラー {symbol}: {e}")
             return False
 
+    def append_stock_data(
+        self, symbol: str, data: List[Dict[str, Any]], source: str = "stream"
+    ) -> Dict[str, Any]:
+        """
+        新しい日次データの追記
+
+        既存データのうち、受け取ったデータの最初の日付以降（末尾ウィンドウ）とだけ
+        差分を取り、追加・変更された行のみを保存・記録する。
+        末尾への追加のみの場合、シャード形式ではファイル末尾に追記する
+
+        Args:
+            symbol: 銘柄コード
+            data: 新しい株価データ（全期間である必要はない）
+            source: データソース
+
+        Returns:
+            Dict[str, Any]: 保存結果と追加・更新・変更なしの件数
+        """
+        try:
+            incoming = {item["date"]: item for item in self._normalize_stock_data(data)}
+            result = {
+                "success": True,
+                "symbol": symbol,
+                "added_count": 0,
+                "updated_count": 0,
+                "unchanged_count": 0,
+            }
+            if not incoming:
+                return result
+
+            new_rows = [incoming[date] for date in sorted(incoming)]
+            existing = self._load_symbol_data(symbol)
+            lo, _ = self._date_bounds(existing, new_rows[0]["date"])
+            tail = {item["date"]: item for item in existing[lo:]}
+
+            added = []
+            updated = []
+            for row in new_rows:
+                old_row = tail.get(row["date"])
+                if old_row is None:
+                    added.append(row)
+                elif self._calculate_hash(old_row) != self._calculate_hash(row):
+                    updated.append({"date": row["date"], "old": old_row, "new": row})
+            result["added_count"] = len(added)
+            result["updated_count"] = len(updated)
+            result["unchanged_count"] = len(new_rows) - len(added) - len(updated)
+
+            if not added and not updated:
+                result["total_records"] = len(existing)
+                return result
+
+            if not updated and (
+                not existing or added[0]["date"] > existing[-1]["date"]
+            ):
+                merged = existing + added
+                stored = self._append_symbol_rows(symbol, added, merged)
+            else:
+                tail.update((row["date"], row) for row in added)
+                tail.update((change["date"], change["new"]) for change in updated)
+                merged = existing[:lo] + [tail[date] for date in sorted(tail)]
+                stored = self._store_symbol_data(symbol, merged)
+
+            if not stored:
+                result["success"] = False
+                result["error"] = "データ保存に失敗"
+                return result
+
+            diff_result = {
+                "added_count": len(added),
+                "updated_count": len(updated),
+                "removed_count": 0,
+                "added": added,
+                "updated": updated,
+                "removed": [],
+                "total_old": len(existing),
+                "total_new": len(merged),
+                "last_date": merged[-1]["date"],
+            }
+            self._refresh_mmap(symbol, merged)
+            self._update_metadata(symbol, source, diff_result)
+            self._log_diff(symbol, diff_result)
+
+            result["total_records"] = len(merged)
+            return result
+
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"株価データ追記エラー {symbol}: {e}")
+            return {"success": False, "symbol": symbol, "error": str(e)}
+
     def _normalize_stock_data(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """株価データの正規化"""
         normalized = []
@@ -269,60 +969,104 @@ class JSONDataManager:
         }
 
     def _update_metadata(self, symbol: str, source: str, diff_result: Dict[str, Any]):
-        """メタデータの更新"""
-        metadata = self._load_json(self.metadata_file, {})
+        """
+        メタデータの更新
 
-        # データソース情報の更新
-        if "data_sources" not in metadata:
-            metadata["data_sources"] = {}
+        銘柄ごとの記録は追記専用ログへ1行追記し、metadata.json には
+        最終更新時刻・更新件数のみを書き込む（一括コミット中は保留）
+        """
+        record = self._metadata_record(
+            symbol, source, diff_result, datetime.now().isoformat()
+        )
+        with self._commit_lock:
+            if self._pending_commit is not None:
+                self._pending_commit["metadata"].append(record)
+                return
+
+            self.symbol_metadata_log.append(record)
+            self._update_global_metadata([record])
 
-        metadata["data_sources"][symbol] = {
+    def _metadata_record(
+        self,
+        symbol: str,
+        source: str,
+        diff_result: Dict[str, Any],
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        """銘柄メタデータログの1行"""
+        return {
+            "symbol": symbol,
             "source": source,
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": timestamp,
             "total_records": diff_result.get("total_new", 0),
-            "last_diff": diff_result,
+            # 増分取得の起点となる保存済みの最終日付
+            "last_date": diff_result.get("last_date"),
+            # レコード本体は差分ログに保持し、メタデータには件数のみを残す
+            "last_diff": {
+                key: value
+                for key, value in diff_result.items()
+                if not isinstance(value, list) and key != "last_date"
+            },
         }
 
-        # 更新履歴の記録
-        if "update_history" not in metadata:
-            metadata["update_history"] = []
-
-        metadata["update_history"].append(
-            {
-                "timestamp": datetime.now().isoformat(),
-                "symbol": symbol,
-                "source": source,
-                "diff_summary": {
-                    "added": diff_result["added_count"],
-                    "updated": diff_result["updated_count"],
-                    "removed": diff_result["removed_count"],
-                },
-            }
-        )
-
-        # 履歴の保持（最新100件）
-        metadata["update_history"] = metadata["update_history"][-100:]
+    def _update_global_metadata(self, records: List[Dict[str, Any]]) -> bool:
+        """metadata.json の全体集計（最終更新時刻・更新件数）の更新"""
+        metadata = self._load_json(self.metadata_file, {})
+        metadata["last_updated"] = records[-1]["last_updated"]
+        metadata["update_count"] = metadata.get("update_count", 0) + len(records)
+        return self._save_json(self.metadata_file, metadata)
 
-        metadata["last_updated"] = datetime.now().isoformat()
+    def _data_sources(self) -> Dict[str, Dict[str, Any]]:
+        """銘柄ごとの最新のデータソース情報"""
+        return {
+            symbol: {key: value for key, value in record.items() if key != "symbol"}
+            for symbol, record in self.symbol_metadata_log.latest().items()
+        }
 
-        self._save_json(self.metadata_file, metadata)
+    @staticmethod
+    def _history_entry(record: Dict[str, Any]) -> Dict[str, Any]:
+        """銘柄メタデータログの1行から更新履歴の1件を作成"""
+        last_diff = record.get("last_diff", {})
+        return {
+            "timestamp": record.get("last_updated"),
+            "symbol": record.get("symbol"),
+            "source": record.get("source"),
+            "diff_summary": {
+                "added": last_diff.get("added_count", 0),
+                "updated": last_diff.get("updated_count", 0),
+                "removed": last_diff.get("removed_count", 0),
+            },
+        }
 
     def _log_diff(self, symbol: str, diff_result: Dict[str, Any]):
-        """差分ログの記録"""
-        diff_log = self._load_json(self.diff_log_file, [])
-
+        """差分ログの記録（追記のみ、時刻はストアが追記時に付与）"""
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
             "symbol": symbol,
             "diff": diff_result,
         }
+        self.add_diff_log_entry(log_entry)
 
-        diff_log.append(log_entry)
+    def add_diff_log_entry(self, log_entry: Dict[str, Any]) -> bool:
+        """
+        差分ログへのエントリ追記
 
-        # ログの保持（最新1000件）
-        diff_log = diff_log[-1000:]
+        Args:
+            log_entry: symbol を含むログエントリ（timestamp 省略時は現在時刻）
 
-        self._save_json(self.diff_log_file, diff_log)
+        Returns:
+            bool: 記録成功フラグ
+        """
+        try:
+            with self._commit_lock:
+                if self._pending_commit is not None:
+                    log_entry.setdefault("timestamp", datetime.now().isoformat())
+                    self._pending_commit["diff_log"].append(log_entry)
+                    return True
+            return self.diff_log_store.append(log_entry)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"差分ログ記録エラー: {e}")
+            return False
 
     def save_data(self, filename: str, data: List[Dict[str, Any]]) -> bool:
         """
@@ -359,29 +1103,136 @@ class JSONDataManager:
             end_date: 終了日（YYYY-MM-DD）
 
         Returns:
-            List[Dict[str, Any]]: 株価データのリスト
+            List[Dict[str, Any]]: 株価データのリスト（呼び出し側で変更してよいコピー）
         """
         try:
-            stock_data = self._load_json(self.stock_data_file, {})
-            data = stock_data.get(symbol, [])
-
-            if start_date or end_date:
-                filtered_data = []
-                for item in data:
-                    item_date = item["date"]
-                    if start_date and item_date < start_date:
-                        continue
-                    if end_date and item_date > end_date:
-                        continue
-                    filtered_data.append(item)
-                return filtered_data
+            data = self._load_symbol_data(symbol)
+            lo, hi = (
+                self._date_bounds(data, start_date, end_date)
+                if start_date or end_date
+                else (0, len(data))
+            )
 
-            return data
+            # キャッシュ共有のレコードを返さないようコピー
+            return [dict(item) for item in data[lo:hi]]
 
         except Exception as e:
             self.logger.error(f"株価データ取得エラー {symbol}: {e}")
             return []
 
+    def _date_bounds(
+        self,
+        data: List[Dict[str, Any]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Tuple[int, int]:
+        """
+        日付範囲に対応するインデックス範囲（二分探索）
+
+        保存データは _normalize_stock_data により日付昇順に並んでいるため、
+        日付キーで O(log n) の範囲特定ができる
+        """
+        lo = (
+            bisect_left(data, start_date, key=lambda item: item["date"])
+            if start_date
+            else 0
+        )
+        hi = (
+            bisect_right(data, end_date, lo=lo, key=lambda item: item["date"])
+            if end_date
+            else len(data)
+        )
+        return lo, max(lo, hi)
+
+    def get_stock_frame(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        株価データをDataFrameとして取得
+
+        列指向モードでは型付き配列から直接構築し、辞書への変換を行わない
+
+        Args:
+            symbol: 銘柄コード
+            start_date: 開始日（YYYY-MM-DD）
+            end_date: 終了日（YYYY-MM-DD）
+
+        Returns:
+            pd.DataFrame: Date インデックス、Open/High/Low/Close/Volume 列
+        """
+        try:
+            if self.storage_mode == STORAGE_MODE_COLUMNAR:
+                return self.columnar_store.read_frame(symbol, start_date, end_date)
+            return records_to_frame(self.get_stock_data(symbol, start_date, end_date))
+        except Exception as e:
+            self.logger.error(f"株価DataFrame取得エラー {symbol}: {e}")
+            return records_to_frame([])
+
+    def _refresh_mmap(self, symbol: str, data: List[Dict[str, Any]]):
+        """メモリマップ配列の更新（有効時のみ）"""
+        if self.mmap_store is None:
+            return
+        if data:
+            self.mmap_store.write(symbol, data)
+        else:
+            self.mmap_store.delete(symbol)
+
+    def build_mmap_store(self) -> int:
+        """
+        全銘柄のメモリマップ配列を作成
+
+        Returns:
+            int: 書き出した銘柄数
+        """
+        if self.mmap_store is None:
+            self.mmap_store = MmapPriceStore(self.mmap_dir, self.logger)
+
+        written = 0
+        for symbol in self.get_all_symbols():
+            data = self._load_symbol_data(symbol)
+            if data and self.mmap_store.write(symbol, data):
+                written += 1
+        return written
+
+    def get_price_arrays(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        株価データをNumPy配列として取得
+
+        メモリマップが有効な場合は読み取り専用のゼロコピービューを返す
+
+        Args:
+            symbol: 銘柄コード
+            start_date: 開始日（YYYY-MM-DD）
+            end_date: 終了日（YYYY-MM-DD）
+
+        Returns:
+            Dict[str, np.ndarray]: "date" と open/high/low/close/volume の配列
+        """
+        if self.mmap_store is not None:
+            arrays = self.mmap_store.get_arrays(symbol, start_date, end_date)
+            if arrays is not None:
+                return arrays
+
+        data = self.get_stock_data(symbol, start_date, end_date)
+        arrays = {
+            "date": np.array(
+                [str(item["date"])[:10] for item in data], dtype="datetime64[D]"
+            )
+        }
+        for key in MMAP_COLUMNS:
+            arrays[key] = np.array(
+                [float(item.get(key) or 0.0) for item in data], dtype=np.float64
+            )
+        return arrays
+
     def get_latest_data(self, symbol: str, days: int = 30) -> List[Dict[str, Any]]:
         """
         最新の株価データの取得
@@ -394,12 +1245,13 @@ class JSONDataManager:
             List[Dict[str, Any]]: 最新の株価データ
         """
         try:
-            data = self.get_stock_data(symbol)
-
-            # 日付順でソートして最新のデータを取得
-            data.sort(key=lambda x: x["date"], reverse=True)
+            if days <= 0:
+                return []
 
-            return data[:days]
+            # 保存データは日付昇順のため末尾から取得（新しい順で返す）
+            # 全期間をコピーせず、返す行だけをコピーする
+            latest = self._load_symbol_data(symbol)[-days:]
+            return [dict(item) for item in reversed(latest)]
 
         except Exception as e:
             self.logger.error(f"最新データ取得エラー {symbol}: {e}")
@@ -420,8 +1272,7 @@ class JSONDataManager:
         """
         try:
             # メタデータから最終更新時刻を取得
-            metadata = self._load_json(self.metadata_file, {})
-            symbol_metadata = metadata.get("data_sources", {}).get(symbol, {})
+            symbol_metadata = self.symbol_metadata_log.get(symbol) or {}
 
             if not last_update:
                 last_update = symbol_metadata.get("last_updated")
@@ -434,25 +1285,25 @@ class JSONDataManager:
                     "last_update": None,
                 }
 
-            # 差分ログから該当期間の変更を取得
-            diff_log = self._load_json(self.diff_log_file, [])
-            relevant_diffs = [
-                entry
-                for entry in diff_log
-                if entry["symbol"] == symbol and entry["timestamp"] > last_update
-            ]
+            # 差分ログのインデックスから該当期間・銘柄のエントリのみを取得
+            relevant_diffs = list(
+                self.diff_log_store.iter_entries(symbol=symbol, since=last_update)
+            )
 
             if not relevant_diffs:
                 return {"is_full_update": False, "data": [], "last_update": last_update}
 
-            # 差分データの構築
-            incremental_data = []
+            # 差分データの構築（同一日付は新しい変更を優先し、日付昇順に整列）
+            changes_by_date = {}
             for diff_entry in relevant_diffs:
-                diff = diff_entry["diff"]
-                incremental_data.extend(diff.get("added", []))
-                incremental_data.extend(
-                    [item["new"] for item in diff.get("updated", [])]
-                )
+                diff = diff_entry.get("diff", {})
+                for item in diff.get("added", []):
+                    changes_by_date[item["date"]] = item
+                for item in diff.get("updated", []):
+                    changes_by_date[item["new"]["date"]] = item["new"]
+            incremental_data = [
+                changes_by_date[date] for date in sorted(changes_by_date)
+            ]
 
             return {
                 "is_full_update": False,
@@ -469,8 +1320,56 @@ class JSONDataManager:
             }
 
     def get_metadata(self) -> Dict[str, Any]:
-        """メタデータの取得"""
-        return self._load_json(self.metadata_file, {})
+        """
+        メタデータの取得
+
+        metadata.json の全体集計に、銘柄メタデータログから組み立てた
+        data_sources（銘柄ごとの最新）と update_history（直近の更新）を加える
+        """
+        metadata = self._load_json(self.metadata_file, {})
+        data_sources = self._data_sources()
+        if not metadata and not data_sources:
+            return metadata
+        metadata["data_sources"] = data_sources
+        metadata["update_history"] = [
+            self._history_entry(record) for record in self.symbol_metadata_log.history()
+        ]
+        return metadata
+
+    def get_last_dates(
+        self, symbols: Optional[List[str]] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        銘柄ごとの保存済み最終日付の取得
+
+        銘柄メタデータログの last_date を優先し、記録がない銘柄はシャード形式の
+        マニフェスト、最後に銘柄データ本体から求める
+
+        Args:
+            symbols: 銘柄コードのリスト（省略時は全銘柄）
+
+        Returns:
+            Dict[str, Optional[str]]: 銘柄コード -> 最終日付（データなしはNone）
+        """
+        data_sources = self.symbol_metadata_log.latest()
+        manifest_symbols = (
+            self._load_manifest().get("symbols", {})
+            if self.storage_mode != STORAGE_MODE_SINGLE
+            else {}
+        )
+        if symbols is None:
+            symbols = self.get_all_symbols()
+
+        last_dates: Dict[str, Optional[str]] = {}
+        for symbol in symbols:
+            last_date = (data_sources.get(symbol) or {}).get("last_date")
+            if last_date is None and symbol in manifest_symbols:
+                last_date = manifest_symbols[symbol].get("end_date")
+            if last_date is None:
+                data = self._load_symbol_data(symbol)
+                last_date = data[-1]["date"] if data else None
+            last_dates[symbol] = last_date
+        return last_dates
 
     def get_diff_log(
         self, symbol: Optional[str] = None, limit: int = 100
@@ -486,12 +1385,7 @@ class JSONDataManager:
             List[Dict[str, Any]]: 差分ログ
         """
         try:
-            diff_log = self._load_json(self.diff_log_file, [])
-
-            if symbol:
-                diff_log = [entry for entry in diff_log if entry["symbol"] == symbol]
-
-            return diff_log[-limit:]
+            return self.diff_log_store.tail(symbol=symbol, limit=limit)
 
         except Exception as e:
             self.logger.error(f"差分ログ取得エラー: {e}")
@@ -514,29 +1408,24 @@ class JSONDataManager:
                 cutoff_str = cutoff_date.strftime("%Y-%m-%d")
 
             # 株価データのクリーンアップ
-            stock_data = self._load_json(self.stock_data_file, {})
-            cleaned_data = {}
-
-            for symbol, data in stock_data.items():
-                if isinstance(data, list):
-                    cleaned_symbol_data = [
-                        item
-                        for item in data
-                        if isinstance(item, dict) and item.get("date", "") >= cutoff_str
-                    ]
-                    if cleaned_symbol_data:
-                        cleaned_data[symbol] = cleaned_symbol_data
-
-            self._save_json(self.stock_data_file, cleaned_data)
-
-            # 差分ログのクリーンアップ
-            diff_log = self._load_json(self.diff_log_file, [])
-            cleaned_log = [
-                entry
-                for entry in diff_log
-                if datetime.fromisoformat(entry["timestamp"]) >= cutoff_date
-            ]
-            self._save_json(self.diff_log_file, cleaned_log)
+            if self.storage_mode != STORAGE_MODE_SINGLE:
+                self._cleanup_symbol_files(cutoff_str)
+            else:
+                stock_data = self._load_stock_data_file()
+                cleaned_data = {}
+
+                for symbol, data in stock_data.items():
+                    if isinstance(data, list):
+                        cleaned_symbol_data = self._filter_by_cutoff(data, cutoff_str)
+                        if cleaned_symbol_data:
+                            cleaned_data[symbol] = cleaned_symbol_data
+                        if len(cleaned_symbol_data) != len(data):
+                            self._refresh_mmap(symbol, cleaned_symbol_data)
+
+                self._save_json_cached(self.stock_data_file, cleaned_data)
+
+            # 差分ログのクリーンアップ（基準日より前のセグメントを削除）
+            self.diff_log_store.prune(cutoff_date.isoformat())
 
             if self.logger:
                 self.logger.info(
@@ -549,30 +1438,70 @@ class JSONDataManager:
                 self.logger.error(f"データクリーンアップエラー: {e}")
             return False
 
-    def export_data(self, symbol: str, output_file: str) -> bool:
+    def _filter_by_cutoff(
+        self, data: List[Dict[str, Any]], cutoff_str: str
+    ) -> List[Dict[str, Any]]:
+        """基準日以降のレコードのみを抽出"""
+        return [
+            item
+            for item in data
+            if isinstance(item, dict) and item.get("date", "") >= cutoff_str
+        ]
+
+    def _cleanup_symbol_files(self, cutoff_str: str):
+        """銘柄ファイルのクリーンアップ（基準日より古いレコードを含む銘柄のみ書き換え）"""
+        manifest = self._load_manifest()
+
+        for symbol, entry in list(manifest["symbols"].items()):
+            start_date = entry.get("start_date")
+            if start_date and start_date >= cutoff_str:
+                continue
+
+            data = self._load_symbol_data(symbol)
+            cleaned_symbol_data = self._filter_by_cutoff(data, cutoff_str)
+
+            if cleaned_symbol_data:
+                self._write_symbol_file(symbol, cleaned_symbol_data)
+                manifest["symbols"][symbol] = self._manifest_entry(
+                    symbol, cleaned_symbol_data
+                )
+            else:
+                self._delete_symbol_file(symbol)
+                del manifest["symbols"][symbol]
+            self._refresh_mmap(symbol, cleaned_symbol_data)
+
+        self._save_manifest(manifest)
+
+    def export_data(
+        self,
+        symbol: str,
+        output_file: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> bool:
         """
         データのエクスポート
 
         Args:
             symbol: 銘柄コード
             output_file: 出力ファイルパス
+            start_date: 開始日（YYYY-MM-DD、省略時は全期間）
+            end_date: 終了日（YYYY-MM-DD、省略時は全期間）
 
         Returns:
             bool: エクスポート成功フラグ
         """
         try:
-            data = self.get_stock_data(symbol)
+            data = self.get_stock_data(symbol, start_date, end_date)
 
             if not data:
                 self.logger.warning(f"エクスポート対象データがありません: {symbol}")
                 return False
 
-            metadata = self.get_metadata()
-
             export_data = {
                 "symbol": symbol,
                 "exported_at": datetime.now().isoformat(),
-                "metadata": metadata.get("data_sources", {}).get(symbol, {}),
+                "metadata": self._data_sources().get(symbol, {}),
                 "data": data,
             }
 
@@ -594,15 +1523,26 @@ class JSONDataManager:
     def get_statistics(self) -> Dict[str, Any]:
         """データ統計の取得"""
         try:
-            stock_data = self._load_json(self.stock_data_file, {})
-            metadata = self._load_json(self.metadata_file, {})
+            metadata = self.get_metadata()
+
+            if self.storage_mode != STORAGE_MODE_SINGLE:
+                # 銘柄別ストレージではマニフェストのみから集計
+                symbols = self._load_manifest()["symbols"]
+                total_records = sum(
+                    entry.get("total_records", 0) for entry in symbols.values()
+                )
+            else:
+                symbols = self._load_stock_data_file()
+                total_records = sum(len(data) for data in symbols.values())
 
             stats = {
-                "total_symbols": len(stock_data),
-                "total_records": sum(len(data) for data in stock_data.values()),
+                "total_symbols": len(symbols),
+                "total_records": total_records,
+                "storage_mode": self.storage_mode,
+                "cache": self.series_cache.get_stats(),
                 "last_updated": metadata.get("last_updated"),
                 "data_sources": metadata.get("data_sources", {}),
-                "symbols": list(stock_data.keys()),
+                "symbols": list(symbols.keys()),
             }
 
             return stats
@@ -614,8 +1554,9 @@ class JSONDataManager:
     def get_all_symbols(self) -> List[str]:
         """全銘柄コードの取得"""
         try:
-            stock_data = self._load_json(self.stock_data_file, {})
-            return list(stock_data.keys())
+            if self.storage_mode != STORAGE_MODE_SINGLE:
+                return list(self._load_manifest()["symbols"].keys())
+            return self._stock_data_symbols()
         except Exception as e:
             self.logger.error(f"銘柄コード取得エラー: {e}")
             return []
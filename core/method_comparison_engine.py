@@ -17,6 +17,7 @@ from .article_method_analyzer import (
     ImprovedMethodAnalyzer,
     MethodComparison,
 )
+from .feature_store import FeatureStore
 from .improved_trading_system import ImprovedTradingSystem
 
 logger = logging.getLogger(__name__)
@@ -50,9 +51,10 @@ class MethodComparisonEngine:
 
         self.logger = logging.getLogger(__name__)
 
-        # 分析エンジンの初期化
+        # 分析エンジンの初期化（同じデータの特徴量は分析・取引システム間で共有）
+        self.feature_store = FeatureStore()
         self.article_analyzer = ArticleMethodAnalyzer()
-        self.improved_analyzer = ImprovedMethodAnalyzer()
+        self.improved_analyzer = ImprovedMethodAnalyzer(feature_store=self.feature_store)
         self.comparison = MethodComparison()
 
         # 改善された取引システム
@@ -61,6 +63,7 @@ class MethodComparisonEngine:
             commission_rate=0.002,
             slippage_rate=0.001,
             max_position_size=0.1,
+            feature_store=self.feature_store,
         )
 
     def run_comprehensive_comparison(self, data: pd.DataFrame) -> ComparisonReport:
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+メモリマップ株価ストア（読み取り専用ビュー）
+銘柄ごとに日付とOHLCVを1つの構造化配列（.npy）として保存し、np.load(mmap_mode="r") で開く
+複数のワーカープロセスがページキャッシュを共有し、日付範囲をコピーなしで切り出せる
+"""
+
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# OHLCVの列順
+MMAP_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# 日付とOHLCVを1レコードにまとめた構造化配列の型（1ファイルの置き換えで一貫して更新する）
+MMAP_DTYPE = np.dtype(
+    [("date", "datetime64[D]")] + [(key, np.float64) for key in MMAP_COLUMNS]
+)
+
+
+class MmapPriceStore:
+    """メモリマップ株価ストアクラス"""
+
+    def __init__(self, store_dir: Path, logger=None):
+        """
+        初期化
+
+        Args:
+            store_dir: 保存ディレクトリ
+            logger: ロガーインスタンス
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        # 銘柄 -> (ファイルの (inode, mtime_ns, サイズ), 構造化配列のメモリマップ)
+        self._maps: Dict[str, Tuple[Tuple[int, int, int], np.ndarray]] = {}
+
+    def _path(self, symbol: str) -> Path:
+        """構造化配列ファイルのパス"""
+        safe_symbol = re.sub(r"[^0-9A-Za-z_-]", "_", str(symbol))
+        return self.store_dir / f"{safe_symbol}.prices.npy"
+
+    def write(self, symbol: str, records: List[Dict[str, Any]]) -> bool:
+        """
+        銘柄データの書き込み
+
+        日付とOHLCVを1ファイルにまとめて置き換え（rename）で更新するため、
+        読み取り側が日付とOHLCVの食い違った組を参照することはなく、
+        読み取り中のプロセスは古いマップを引き続き安全に参照できる
+
+        Args:
+            symbol: 銘柄コード
+            records: 日付順の株価データ
+
+        Returns:
+            bool: 保存成功フラグ
+        """
+        try:
+            prices = np.empty(len(records), dtype=MMAP_DTYPE)
+            prices["date"] = np.array(
+                [str(item["date"])[:10] for item in records], dtype="datetime64[D]"
+            )
+            for key in MMAP_COLUMNS:
+                prices[key] = [float(item.get(key) or 0.0) for item in records]
+
+            path = self._path(symbol)
+            temp_path = path.with_name(path.name + ".tmp")
+            with open(temp_path, "wb") as f:
+                np.save(f, prices)
+            os.replace(temp_path, path)
+            return True
+        except Exception as e:
+            self.logger.error(f"メモリマップデータ保存エラー {symbol}: {e}")
+            return False
+
+    def _open(self, symbol: str) -> Optional[np.ndarray]:
+        """メモリマップの取得（ファイル置き換え時は開き直す）"""
+        path = self._path(symbol)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        token = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._maps.get(symbol)
+            if cached and cached[0] == token:
+                return cached[1]
+
+            prices = np.load(path, mmap_mode="r")
+            self._maps[symbol] = (token, prices)
+            return prices
+
+    def get_arrays(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        日付範囲のOHLCVをゼロコピーのビューとして取得
+
+        Args:
+            symbol: 銘柄コード
+            start_date: 開始日（YYYY-MM-DD）
+            end_date: 終了日（YYYY-MM-DD）
+
+        Returns:
+            Optional[Dict[str, np.ndarray]]: "date" と各OHLCV列の読み取り専用ビュー
+        """
+        prices = self._open(symbol)
+        if prices is None:
+            return None
+
+        dates = prices["date"]
+        lo = (
+            int(np.searchsorted(dates, np.datetime64(start_date, "D"), side="left"))
+            if start_date
+            else 0
+        )
+        hi = (
+            int(np.searchsorted(dates, np.datetime64(end_date, "D"), side="right"))
+            if end_date
+            else len(dates)
+        )
+
+        return {key: prices[key][lo:hi] for key in ("date",) + MMAP_COLUMNS}
+
+    def delete(self, symbol: str) -> bool:
+        """銘柄データの削除"""
+        with self._lock:
+            self._maps.pop(symbol, None)
+        path = self._path(symbol)
+        if not path.exists():
+            return False
+        path.unlink()
+        return True
+
+    def symbols(self) -> List[str]:
+        """保存済み銘柄の一覧"""
+        return sorted(
+            path.name[: -len(".prices.npy")]
+            for path in self.store_dir.glob("*.prices.npy")
+        )
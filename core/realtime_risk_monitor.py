@@ -15,6 +15,8 @@ import time
 from queue import Queue, Empty
 import warnings
 
+from .streaming_indicators import LiveIndicators
+
 warnings.filterwarnings("ignore")
 
 
@@ -95,6 +97,9 @@ class RealtimeRiskMonitor:
         self.alert_history = []
         self.snapshot_history = []
 
+        # 銘柄ごとの価格指標（update_risk_data のたびに逐次更新）
+        self.live_indicators = {}  # {symbol: LiveIndicators}
+
         # コールバック関数
         self.alert_callbacks = []
         self.data_callbacks = []
@@ -187,6 +192,9 @@ class RealtimeRiskMonitor:
     ):
         """リスクデータ更新"""
         try:
+            # 価格指標の逐次更新（履歴を再計算しない）
+            self.live_indicators.setdefault(symbol, LiveIndicators()).update(current_price)
+
             # リスクスナップショット作成
             snapshot = self._create_risk_snapshot(
                 symbol, current_price, position_size, risk_metrics, market_data
@@ -254,7 +262,7 @@ class RealtimeRiskMonitor:
                     avg_var_95 = 0.0
                     max_drawdown = 0.0
 
-                return {
+                status = {
                     "status": "monitoring",
                     "total_snapshots": len(recent_snapshots),
                     "total_alerts": total_alerts,
@@ -268,6 +276,9 @@ class RealtimeRiskMonitor:
                         else None
                     ),
                 }
+                if symbol and symbol in self.live_indicators:
+                    status["price_indicators"] = self.live_indicators[symbol].to_dict()
+                return status
             else:
                 return {"status": "no_data"}
 
@@ -589,6 +600,19 @@ class RealtimeRiskMonitor:
 
         return list(set(recommendations))  # 重複除去
 
+    def snapshot_live_indicators(self) -> Dict[str, Dict[str, Any]]:
+        """銘柄ごとの価格指標の状態（JSON に保存できる形式）"""
+        return {
+            symbol: live.snapshot() for symbol, live in self.live_indicators.items()
+        }
+
+    def restore_live_indicators(self, states: Dict[str, Dict[str, Any]]):
+        """snapshot_live_indicators で保存した状態から復元"""
+        self.live_indicators = {
+            symbol: LiveIndicators.from_snapshot(state)
+            for symbol, state in states.items()
+        }
+
     def _add_to_history(self, snapshot: RiskSnapshot, alerts: List[RiskAlert]):
         """履歴に追加"""
         # スナップショット履歴
@@ -5,7 +5,7 @@
 """
 
 import numpy as np
-from typing import Dict, Any, List, Callable
+from typing import Dict, Any, List, Callable, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
@@ -16,6 +16,8 @@ from queue import Queue, Empty
 import warnings
 from concurrent.futures import ThreadPoolExecutor
 
+from .streaming_indicators import LiveIndicators, StreamingATR
+
 # talibの代わりにpandasとnumpyを使用
 warnings.filterwarnings("ignore")
 
@@ -115,27 +117,12 @@ class VolatilityCalculator:
             if len(high) < period or len(low) < period or len(close) < period:
                 return 0.0
 
-            # 高値、安値、終値をnumpy配列に変換
-            high_array = np.array(high[-period:])
-            low_array = np.array(low[-period:])
-            close_array = np.array(close[-period:])
-
-            # True Range計算
-            tr1 = high_array - low_array
-            tr2 = np.abs(high_array - np.roll(close_array, 1))
-            tr3 = np.abs(low_array - np.roll(close_array, 1))
-
-            # 最初の要素は前の終値がないため除外
-            tr2[0] = 0
-            tr3[0] = 0
-
-            # True Rangeの最大値
-            true_range = np.maximum(tr1, np.maximum(tr2, tr3))
+            # 先頭の足の True Range にも前日終値を使うため1本多く渡す
+            atr = StreamingATR.from_history(
+                high[-(period + 1) :], low[-(period + 1) :], close[-(period + 1) :], period
+            ).value
 
-            # ATR計算（単純移動平均）
-            atr = np.mean(true_range)
-
-            return float(atr)
+            return float(atr) if atr is not None else 0.0
 
         except Exception as e:
             self.logger.error(f"ATR計算エラー: {e}")
@@ -283,6 +270,7 @@ class RealtimeStopLossSystem:
 
         # データ管理
         self.price_data = {}  # {symbol: [price_data]}
+        self.live_indicators = {}  # {symbol: LiveIndicators}（1足ごとに逐次更新）
         self.stop_loss_settings = {}  # {symbol: StopLossSettings}
         self.active_positions = {}  # {symbol: position_data}
         self.positions = {}  # テスト用のポジション管理
@@ -417,15 +405,12 @@ class RealtimeStopLossSystem:
                 self.logger.warning(f"価格データが不足しています: {symbol}")
                 return False
 
-            # ボラティリティ計算
-            prices = [p["price"] for p in price_data]
+            # ボラティリティ計算（レジーム判定の長期30本があれば足りる）
+            prices = [p["price"] for p in price_data[-30:]]
             volatility = self.volatility_calculator.calculate_volatility(prices)
 
-            # ATR計算
-            highs = [p.get("high", p["price"]) for p in price_data]
-            lows = [p.get("low", p["price"]) for p in price_data]
-            closes = [p["price"] for p in price_data]
-            atr = self.volatility_calculator.calculate_atr(highs, lows, closes)
+            # ATR計算（逐次更新している値を使う）
+            atr = float(self._sync_live_indicators(symbol).atr.value or 0.0)
 
             # ボラティリティレジーム判定
             volatility_regime = self.volatility_calculator.calculate_volatility_regime(
@@ -507,6 +492,7 @@ class RealtimeStopLossSystem:
             # 価格データ保存
             if symbol not in self.price_data:
                 self.price_data[symbol] = []
+            live = self._sync_live_indicators(symbol)
 
             self.price_data[symbol].append(
                 {
@@ -518,6 +504,12 @@ class RealtimeStopLossSystem:
                 }
             )
 
+            # 指標の逐次更新（履歴と食い違っていれば履歴から作り直す）
+            record = self.price_data[symbol][-1]
+            live.update(
+                record["price"], record["high"], record["low"], self._record_key(record)
+            )
+
             # 履歴制限
             max_history = self.config["monitoring"]["max_price_history"]
             if len(self.price_data[symbol]) > max_history:
@@ -535,6 +527,51 @@ class RealtimeStopLossSystem:
         except Exception as e:
             self.logger.error(f"価格データ更新エラー: {e}")
 
+    @staticmethod
+    def _record_key(record: Dict[str, Any]) -> Optional[str]:
+        """価格データ1件の識別子（タイムスタンプ）"""
+        timestamp = record.get("timestamp")
+        return timestamp.isoformat() if isinstance(timestamp, datetime) else None
+
+    def _sync_live_indicators(self, symbol: str) -> LiveIndicators:
+        """
+        逐次更新中の指標を取得
+
+        最後に取り込んだ足が価格データの末尾と一致しない場合
+        （価格データが直接差し替えられた場合など）は、価格データから作り直す
+        """
+        records = self.price_data.get(symbol, [])
+        live = self.live_indicators.get(symbol)
+        key = self._record_key(records[-1]) if records else None
+        if live is None or key is None or live.last_key != key:
+            live = LiveIndicators.from_history(
+                [p["price"] for p in records],
+                [p.get("high", p["price"]) for p in records],
+                [p.get("low", p["price"]) for p in records],
+                key=key,
+            )
+            self.live_indicators[symbol] = live
+        return live
+
+    def get_live_indicators(self, symbol: str) -> Dict[str, Any]:
+        """逐次更新中の指標値（EMA・RSI・ATR など）"""
+        if symbol not in self.price_data:
+            return {}
+        return self._sync_live_indicators(symbol).to_dict()
+
+    def snapshot_live_indicators(self) -> Dict[str, Dict[str, Any]]:
+        """逐次更新中の指標の状態（JSON に保存できる形式）"""
+        return {
+            symbol: live.snapshot() for symbol, live in self.live_indicators.items()
+        }
+
+    def restore_live_indicators(self, states: Dict[str, Dict[str, Any]]):
+        """snapshot_live_indicators で保存した状態から復元"""
+        self.live_indicators = {
+            symbol: LiveIndicators.from_snapshot(state)
+            for symbol, state in states.items()
+        }
+
     def check_stop_loss_conditions(
         self, symbol: str, current_price: float
     ) -> List[PriceAlert]:
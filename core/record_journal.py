@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+キー単位の追記専用レコードジャーナル
+1件の更新を JSON Lines の1行として追記し、読み込み時にキーごとの最新レコードを復元する
+読み込みは前回位置からの差分のみを解析し、行数が増えたら最新レコードのみに書き直す
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Any, Iterable, List, Optional
+
+
+class RecordJournal:
+    """キーごとの最新レコードを保持する追記専用ジャーナルクラス"""
+
+    def __init__(
+        self,
+        journal_file: Path,
+        key: str = "symbol",
+        history_limit: int = 0,
+        compact_factor: int = 4,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            journal_file: ジャーナルファイル（JSON Lines）
+            key: レコードを識別するキー
+            history_limit: 最新レコードとは別に保持する直近の追記レコード数
+            compact_factor: 行数がキー数のこの倍数を超えたら書き直す
+            logger: ロガーインスタンス
+        """
+        self.journal_file = Path(journal_file)
+        self.key = key
+        self.history_limit = history_limit
+        self.compact_factor = compact_factor
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        # キー -> 最新レコード、直近の追記レコード、読み込み済みの行数と位置
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=history_limit or None)
+        self._lines = 0
+        self._inode: Optional[int] = None
+        self._offset = 0
+
+    # ---- 読み込み ----
+
+    def _refresh(self):
+        """前回読み込み位置以降の追記分を反映（書き直された場合は全体を読み直す）"""
+        try:
+            stat = self.journal_file.stat()
+        except FileNotFoundError:
+            self._reset_state(None)
+            return
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._reset_state(stat.st_ino)
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.journal_file, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        # 書き込み途中の末尾行は次回に読む
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                self.logger.warning(f"不完全なジャーナル行を無視: {self.journal_file}")
+                continue
+            self._apply(record)
+        self._offset += end
+
+    def _reset_state(self, inode: Optional[int]):
+        self._latest = {}
+        self._history.clear()
+        self._lines = 0
+        self._inode = inode
+        self._offset = 0
+
+    def _apply(self, record: Dict[str, Any]):
+        self._latest[str(record.get(self.key))] = record
+        if self.history_limit:
+            self._history.append(record)
+        self._lines += 1
+
+    def latest(self) -> Dict[str, Dict[str, Any]]:
+        """キーごとの最新レコード（返した辞書は変更してよい）"""
+        with self._lock:
+            self._refresh()
+            return dict(self._latest)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """キーの最新レコード"""
+        with self._lock:
+            self._refresh()
+            return self._latest.get(str(key))
+
+    def history(self) -> List[Dict[str, Any]]:
+        """直近の追記レコード（古い順、最大 history_limit 件）"""
+        with self._lock:
+            self._refresh()
+            return list(self._history)
+
+    # ---- 書き込み ----
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """レコードの追記"""
+        return self.append_many([record]) == 1
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        複数レコードの一括追記（1回の書き込み）
+
+        Returns:
+            int: 追記件数
+        """
+        records = list(records)
+        if not records:
+            return 0
+
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in records
+        ).encode("utf-8")
+        with self._lock:
+            self._refresh()
+            with open(self.journal_file, "ab") as f:
+                f.write(payload)
+            self._refresh()
+            if self._lines > self.compact_factor * len(self._latest) + self.history_limit:
+                self.compact()
+        return len(records)
+
+    def replace_all(self, records: Iterable[Dict[str, Any]]) -> bool:
+        """全レコードの置き換え（移行・再構築用）"""
+        with self._lock:
+            self._reset_state(None)
+            for record in records:
+                self._apply(record)
+            return self._rewrite()
+
+    def compact(self) -> bool:
+        """キーごとの最新レコードと直近の追記レコードのみに書き直す"""
+        with self._lock:
+            self._refresh()
+            return self._rewrite()
+
+    def _rewrite(self) -> bool:
+        recent = {id(record) for record in self._history}
+        records = [r for r in self._latest.values() if id(r) not in recent]
+        records.extend(self._history)
+        temp_file = self.journal_file.with_name(f".{self.journal_file.name}.tmp")
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                    f.write("\n")
+            os.replace(temp_file, self.journal_file)
+        except OSError as e:
+            self.logger.error(f"ジャーナル書き直しエラー {self.journal_file}: {e}")
+            return False
+        self._reset_state(None)
+        self._refresh()
+        return True
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+静的サイト向けデータの差分公開
+前回公開時のマニフェストと内容ハッシュを比較し、変更のあったファイルのみを書き換える
+マニフェストには各ファイルのハッシュを記録し、キャッシュ無効化（?v=<hash>）に使う
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+from .json_artifact_writer import COMPRESSION_SUFFIXES, JSONArtifactWriter
+from .structured_data_builder import write_json
+
+MANIFEST_VERSION = 1
+
+# 実行のたびに変わる生成時刻（ハッシュ計算から除外し、内容が同じなら書き換えない）
+# 最終取引日・予測日などデータに由来する日時は内容として扱う
+VOLATILE_KEYS = frozenset({"generated_at", "last_updated"})
+
+
+def _strip_volatile(value: Any, volatile_keys: frozenset) -> Any:
+    """日時項目を再帰的に除いたコピー"""
+    if isinstance(value, dict):
+        return {
+            key: _strip_volatile(item, volatile_keys)
+            for key, item in value.items()
+            if key not in volatile_keys
+        }
+    if isinstance(value, list):
+        return [_strip_volatile(item, volatile_keys) for item in value]
+    return value
+
+
+def content_hash(data: Any, volatile_keys: Iterable[str] = VOLATILE_KEYS) -> str:
+    """
+    内容ハッシュ（キー順・日時項目に依存しない SHA-256 の先頭16桁）
+
+    Args:
+        data: JSONに変換できるデータ
+        volatile_keys: ハッシュ計算から除外するキー
+
+    Returns:
+        str: 16進数のハッシュ
+    """
+    canonical = json.dumps(
+        _strip_volatile(data, frozenset(volatile_keys)),
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class PublishResult:
+    """差分公開の結果"""
+
+    written: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: List[str] = field(default_factory=list)
+    bytes_written: int = 0
+
+    @property
+    def changed(self) -> bool:
+        """書き換え・削除があったか"""
+        return bool(self.written or self.removed)
+
+    def summary(self) -> Dict[str, int]:
+        """結果のサマリー"""
+        return {
+            "written": len(self.written),
+            "unchanged": self.unchanged,
+            "removed": len(self.removed),
+            "bytes_written": self.bytes_written,
+        }
+
+
+class IncrementalPublisher:
+    """内容ハッシュによる差分公開クラス"""
+
+    def __init__(
+        self,
+        output_dir: Path = Path("web-app/public/data"),
+        manifest_name: str = "manifest.json",
+        volatile_keys: Iterable[str] = VOLATILE_KEYS,
+        writer: Optional[JSONArtifactWriter] = None,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            output_dir: 公開先ディレクトリ
+            manifest_name: マニフェストのファイル名（output_dir からの相対パス）
+            volatile_keys: ハッシュ計算から除外するキー
+            writer: 書き出しに使う JSONArtifactWriter（圧縮済みファイルも出力する。
+                ページ分割したファイルはマニフェストで管理しないため page_bytes は指定しない）
+            logger: ロガーインスタンス
+        """
+        self.output_dir = Path(output_dir)
+        self.manifest_file = self.output_dir / manifest_name
+        self.volatile_keys = frozenset(volatile_keys)
+        self.writer = writer
+        self.logger = logger or logging.getLogger(__name__)
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """前回公開時のマニフェスト（ない場合・壊れている場合は空）"""
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {"files": {}}
+        except Exception as e:
+            self.logger.warning(f"マニフェスト読み込みエラー、全ファイルを書き換えます: {e}")
+            return {"files": {}}
+        manifest.setdefault("files", {})
+        return manifest
+
+    def _write(self, relative_path: str, data: Any) -> int:
+        """1ファイルの書き込み（書き込みバイト数を返す）"""
+        if self.writer is not None:
+            return self.writer.write(relative_path, data).raw_bytes
+        path = self.output_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return write_json(path, data)
+
+    def publish(
+        self, files: Dict[str, Any], prune: bool = True, dry_run: bool = False
+    ) -> PublishResult:
+        """
+        差分公開
+
+        前回のマニフェストとハッシュが一致し、ファイルが残っているものは書き換えない。
+        前回公開したが今回含まれないファイルは prune=True のとき削除する
+        （マニフェストに記録のないファイルには触れない）。
+
+        Args:
+            files: 出力パス（output_dir からの相対パス） -> 内容
+            prune: 前回公開分のうち今回含まれないファイルを削除する
+            dry_run: 書き込まずに結果のみを返す
+
+        Returns:
+            PublishResult: 書き換え・削除したファイル
+        """
+        previous = self.load_manifest()["files"]
+        result = PublishResult()
+        entries: Dict[str, Dict[str, Any]] = {}
+
+        for relative_path in sorted(files):
+            data = files[relative_path]
+            digest = content_hash(data, self.volatile_keys)
+            path = self.output_dir / relative_path
+            old = previous.get(relative_path)
+            if old and old.get("hash") == digest and path.exists():
+                entries[relative_path] = old
+                result.unchanged += 1
+                continue
+
+            size = 0 if dry_run else self._write(relative_path, data)
+            entries[relative_path] = {"hash": digest, "size": size}
+            result.written.append(relative_path)
+            result.bytes_written += size
+
+        for relative_path in sorted(set(previous) - set(files)):
+            if not prune:
+                entries[relative_path] = previous[relative_path]
+                continue
+            if not dry_run:
+                path = self.output_dir / relative_path
+                path.unlink(missing_ok=True)
+                for suffix in COMPRESSION_SUFFIXES.values():
+                    path.with_name(path.name + suffix).unlink(missing_ok=True)
+            result.removed.append(relative_path)
+
+        # 変更がなければマニフェストも書き換えない（デプロイ差分を出さない）
+        if result.changed and not dry_run:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            write_json(
+                self.manifest_file,
+                {
+                    "version": MANIFEST_VERSION,
+                    "generated_at": datetime.now().isoformat(),
+                    "files": dict(sorted(entries.items())),
+                },
+            )
+
+        self.logger.info(f"差分公開 ({self.output_dir}): {result.summary()}")
+        return result
+
+    def cache_busted_path(self, relative_path: str) -> Optional[str]:
+        """マニフェストのハッシュを付けたパス（未公開のファイルはNone）"""
+        entry = self.load_manifest()["files"].get(relative_path)
+        if entry is None:
+            return None
+        return f"{relative_path}?v={entry['hash']}"
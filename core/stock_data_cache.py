@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+解析済み株価データのプロセス共有LRUキャッシュ
+JSONDataManager の全インスタンスで共有し、ファイルの mtime・サイズで無効化する
+全銘柄を含むファイルは銘柄ごとのエントリ（part）に分けて登録し、銘柄単位で追い出す
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple, Union
+
+# ファイル状態のトークン: (mtime_ns, size)
+FileToken = Tuple[int, int]
+# キャッシュキー: (ファイルパス, ファイル内の部分名。ファイル全体は None)
+CacheKey = Tuple[str, Optional[str]]
+
+
+def file_token(path: Path) -> Optional[FileToken]:
+    """ファイル状態のトークン（存在しない場合は None）"""
+    try:
+        stat = path.stat()
+    except (FileNotFoundError, OSError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ParsedDataCache:
+    """解析済みデータのLRUキャッシュクラス（レコード数で容量を制限）"""
+
+    def __init__(self, max_records: int = 500_000):
+        """
+        初期化
+
+        Args:
+            max_records: 保持する総レコード数の上限
+        """
+        self.max_records = max_records
+        self._entries: "OrderedDict[CacheKey, Tuple[FileToken, Any, int]]" = OrderedDict()
+        # ファイルパス -> 登録済みの部分名（同じファイルのエントリをまとめて破棄するため）
+        self._parts: Dict[str, Set[Optional[str]]] = {}
+        self._total_records = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(
+        self,
+        path: Union[str, Path],
+        token: Optional[FileToken],
+        part: Optional[str] = None,
+    ) -> Optional[Any]:
+        """
+        キャッシュの取得
+
+        Args:
+            path: 読み込み元ファイル
+            token: 現在のファイル状態トークン
+            part: ファイル内の部分名（銘柄コードなど、省略時はファイル全体）
+
+        Returns:
+            Optional[Any]: トークンが一致する場合は解析済みデータ
+        """
+        key = (str(path), part)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and token is not None and entry[0] == token:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                # ファイルが更新されているため破棄
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        path: Union[str, Path],
+        token: Optional[FileToken],
+        value: Any,
+        size: int,
+        part: Optional[str] = None,
+    ):
+        """
+        キャッシュへの登録
+
+        同じファイルの古いトークンで登録された部分は破棄する。
+
+        Args:
+            path: 読み込み元ファイル
+            token: 登録時点のファイル状態トークン
+            value: 解析済みデータ
+            size: レコード数（容量計算に使用）
+            part: ファイル内の部分名（銘柄コードなど、省略時はファイル全体）
+        """
+        key = (str(path), part)
+        with self._lock:
+            self._remove(key)
+            if token is None or size > self.max_records:
+                return
+
+            # 同じファイルの部分は常に同じトークンのため、1件だけ確認すればよい
+            parts = self._parts.get(key[0])
+            if parts and self._entries[(key[0], next(iter(parts)))][0] != token:
+                for other in list(parts):
+                    self._remove((key[0], other))
+            self._entries[key] = (token, value, size)
+            self._parts.setdefault(key[0], set()).add(part)
+            self._total_records += size
+            while self._total_records > self.max_records:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None):
+        """キャッシュの無効化（path 指定時はそのファイルの全部分、省略時は全件）"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._parts.clear()
+                self._total_records = 0
+            else:
+                for part in list(self._parts.get(str(path), ())):
+                    self._remove((str(path), part))
+
+    def _remove(self, key: CacheKey):
+        """エントリの削除（ロック取得済みであること）"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_records -= entry[2]
+            parts = self._parts[key[0]]
+            parts.discard(key[1])
+            if not parts:
+                del self._parts[key[0]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キャッシュ統計の取得"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "records": self._total_records,
+                "max_records": self.max_records,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+# プロセス内で共有するキャッシュ
+_shared_cache = ParsedDataCache()
+
+
+def get_shared_cache() -> ParsedDataCache:
+    """プロセス共有キャッシュの取得"""
+    return _shared_cache
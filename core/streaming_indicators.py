@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+ストリーミング（逐次更新）テクニカル指標
+リアルタイム監視で新しい足が届くたびに履歴全体を再計算せず、1足あたり O(1) で更新する
+各指標は snapshot() で JSON に変換できる状態を返し、from_snapshot() で復元できる
+from_history() は IndicatorEngine（一括計算）の結果から状態を作り、以降は逐次更新する
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .indicator_engine import IndicatorEngine, wilder_mean
+
+
+def _is_missing(value) -> bool:
+    return value is None or value != value
+
+
+def _optional(value) -> Optional[float]:
+    """NaN を None に変換"""
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class StreamingEMA:
+    """指数移動平均（pandas の ewm(span).mean()・IndicatorEngine.ema と同じ重み付け）"""
+
+    def __init__(self, span: float):
+        if span < 1:
+            raise ValueError(f"span は1以上で指定してください: {span}")
+        self.span = span
+        self.beta = 1.0 - 2.0 / (span + 1.0)
+        self.weighted = 0.0
+        self.weights = 0.0
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.weighted / self.weights if self.weights > 0 else None
+
+    def update(self, value: float) -> Optional[float]:
+        """1件追加（欠損は重みに含めず、前回の値を引き継ぐ）"""
+        self.weighted *= self.beta
+        self.weights *= self.beta
+        if not _is_missing(value):
+            self.weighted += value
+            self.weights += 1.0
+        return self.value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"span": self.span, "weighted": self.weighted, "weights": self.weights}
+
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any]) -> "StreamingEMA":
+        ema = cls(state["span"])
+        ema.weighted = state["weighted"]
+        ema.weights = state["weights"]
+        return ema
+
+    @classmethod
+    def from_history(cls, values: Sequence[float], span: float) -> "StreamingEMA":
+        """履歴から作成（重み付き和を一括計算）"""
+        ema = cls(span)
+        values = np.asarray(values, dtype=float)
+        if len(values):
+            valid = ~np.isnan(values)
+            decay = ema.beta ** np.arange(len(values) - 1, -1, -1)
+            ema.weighted = float(np.sum(decay[valid] * values[valid]))
+            ema.weights = float(np.sum(decay[valid]))
+        return ema
+
+
+class RollingStats:
+    """
+    ローリング平均・分散（Welford 法による追加・削除）
+
+    窓から外れた値を差し引く更新を繰り返すと誤差が蓄積するため、
+    refresh_interval 回ごとに窓内の値から計算し直す
+    """
+
+    def __init__(self, window: int, refresh_interval: int = 10_000):
+        if window < 1:
+            raise ValueError(f"window は1以上で指定してください: {window}")
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self.values: deque = deque()
+        self.mean_value = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def mean(self) -> Optional[float]:
+        """窓がそろうまでは None"""
+        return self.mean_value if self.ready else None
+
+    def variance(self, ddof: int = 1) -> Optional[float]:
+        if not self.ready or self.window <= ddof:
+            return None
+        return max(self.m2, 0.0) / (self.window - ddof)
+
+    def std(self, ddof: int = 1) -> Optional[float]:
+        variance = self.variance(ddof)
+        return None if variance is None else math.sqrt(variance)
+
+    def _recompute(self):
+        array = np.fromiter(self.values, dtype=float, count=len(self.values))
+        self.mean_value = float(array.mean()) if len(array) else 0.0
+        self.m2 = float(((array - self.mean_value) ** 2).sum()) if len(array) else 0.0
+
+    def update(self, value: float) -> Optional[float]:
+        """1件追加（窓から外れた値は削除）"""
+        if _is_missing(value):
+            return self.mean
+        self.values.append(value)
+        count = len(self.values)
+        delta = value - self.mean_value
+        self.mean_value += delta / count
+        self.m2 += delta * (value - self.mean_value)
+        if count > self.window:
+            removed = self.values.popleft()
+            count -= 1
+            delta = removed - self.mean_value
+            self.mean_value -= delta / count
+            self.m2 -= delta * (removed - self.mean_value)
+        self.updates += 1
+        if self.updates % self.refresh_interval == 0:
+            self._recompute()
+        return self.mean
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "values": list(self.values),
+            "mean": self.mean_value,
+            "m2": self.m2,
+            "updates": self.updates,
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any]) -> "RollingStats":
+        stats = cls(state["window"])
+        stats.values = deque(state["values"])
+        stats.mean_value = state["mean"]
+        stats.m2 = state["m2"]
+        stats.updates = state.get("updates", 0)
+        return stats
+
+    @classmethod
+    def from_history(cls, values: Sequence[float], window: int) -> "RollingStats":
+        """履歴の末尾 window 件から作成（欠損は除く）"""
+        stats = cls(window)
+        values = np.asarray(values, dtype=float)
+        stats.values = deque(values[~np.isnan(values)][-window:].tolist())
+        stats._recompute()
+        return stats
+
+
+class RollingExtreme:
+    """ローリング最大値・最小値（単調キューにより1件あたり償却 O(1)）"""
+
+    def __init__(self, window: int, mode: str = "max"):
+        if window < 1:
+            raise ValueError(f"window は1以上で指定してください: {window}")
+        if mode not in ("max", "min"):
+            raise ValueError(f"mode は max / min で指定してください: {mode}")
+        self.window = window
+        self.mode = mode
+        # (通し番号, 値) を値の単調な順に保持する
+        self.queue: deque = deque()
+        self.count = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.window
+
+    @property
+    def value(self) -> Optional[float]:
+        """窓がそろうまでは None"""
+        return self.queue[0][1] if self.ready and self.queue else None
+
+    def _dominates(self, new: float, old: float) -> bool:
+        return new >= old if self.mode == "max" else new <= old
+
+    def update(self, value: float) -> Optional[float]:
+        """1件追加"""
+        if _is_missing(value):
+            return self.value
+        while self.queue and self._dominates(value, self.queue[-1][1]):
+            self.queue.pop()
+        self.queue.append((self.count, value))
+        self.count += 1
+        while self.queue[0][0] <= self.count - 1 - self.window:
+            self.queue.popleft()
+        return self.value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "mode": self.mode,
+            "queue": [list(item) for item in self.queue],
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any]) -> "RollingExtreme":
+        extreme = cls(state["window"], state["mode"])
+        extreme.queue = deque((int(i), v) for i, v in state["queue"])
+        extreme.count = state["count"]
+        return extreme
+
+    @classmethod
+    def from_history(
+        cls, values: Sequence[float], window: int, mode: str = "max"
+    ) -> "RollingExtreme":
+        """履歴の末尾 window 件から作成（欠損は除く）"""
+        extreme = cls(window, mode)
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        extreme.count = max(len(values) - window, 0)
+        for value in values[-window:]:
+            extreme.update(float(value))
+        return extreme
+
+
+class StreamingWilderRSI:
+    """RSI（Wilder の平滑化、IndicatorEngine.wilder_rsi と同じ定義）"""
+
+    def __init__(self, window: int = 14):
+        if window < 1:
+            raise ValueError(f"window は1以上で指定してください: {window}")
+        self.window = window
+        self.previous: Optional[float] = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0  # 前日比の件数
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count < self.window:
+            return None
+        if self.avg_loss == 0:
+            return None if self.avg_gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+    def update(self, close: float) -> Optional[float]:
+        """終値を1件追加"""
+        if _is_missing(close):
+            return self.value
+        if self.previous is not None:
+            delta = close - self.previous
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            self.count += 1
+            if self.count <= self.window:
+                # 最初の window 件は単純平均
+                self.avg_gain += gain / self.window
+                self.avg_loss += loss / self.window
+            else:
+                alpha = 1.0 / self.window
+                self.avg_gain = alpha * gain + (1.0 - alpha) * self.avg_gain
+                self.avg_loss = alpha * loss + (1.0 - alpha) * self.avg_loss
+        self.previous = close
+        return self.value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "previous": self.previous,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any]) -> "StreamingWilderRSI":
+        rsi = cls(state["window"])
+        rsi.previous = state["previous"]
+        rsi.avg_gain = state["avg_gain"]
+        rsi.avg_loss = state["avg_loss"]
+        rsi.count = state["count"]
+        return rsi
+
+    @classmethod
+    def from_history(cls, close: Sequence[float], window: int = 14) -> "StreamingWilderRSI":
+        """終値の履歴から作成（平滑化は IndicatorEngine で一括計算）"""
+        rsi = cls(window)
+        close = np.asarray(close, dtype=float)
+        close = close[~np.isnan(close)]
+        if len(close) == 0:
+            return rsi
+        if len(close) <= window:
+            # 初期値の単純平均が求まるまでは逐次追加
+            for value in close:
+                rsi.update(float(value))
+            return rsi
+        gain, loss = IndicatorEngine(close=close).rsi_components()
+        rsi.previous = float(close[-1])
+        rsi.count = len(close) - 1
+        rsi.avg_gain = float(wilder_mean(gain, window, start=1)[-1])
+        rsi.avg_loss = float(wilder_mean(loss, window, start=1)[-1])
+        return rsi
+
+
+class StreamingATR:
+    """ATR（True Range の単純移動平均、IndicatorEngine.atr と同じ定義）"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.previous_close: Optional[float] = None
+        self.ranges = RollingStats(window)
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.ranges.mean
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        """1足追加（先頭の足は前日終値がないため高値-安値）"""
+        if _is_missing(high) or _is_missing(low) or _is_missing(close):
+            return self.value
+        true_range = high - low
+        if self.previous_close is not None:
+            true_range = max(
+                true_range,
+                abs(high - self.previous_close),
+                abs(low - self.previous_close),
+            )
+        self.previous_close = close
+        return self.ranges.update(true_range)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "previous_close": self.previous_close,
+            "ranges": self.ranges.snapshot(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any]) -> "StreamingATR":
+        atr = cls(state["window"])
+        atr.previous_close = state["previous_close"]
+        atr.ranges = RollingStats.from_snapshot(state["ranges"])
+        return atr
+
+    @classmethod
+    def from_history(
+        cls,
+        high: Sequence[float],
+        low: Sequence[float],
+        close: Sequence[float],
+        window: int = 14,
+    ) -> "StreamingATR":
+        """履歴から作成（True Range は IndicatorEngine で一括計算）"""
+        atr = cls(window)
+        engine = IndicatorEngine(close=close, high=high, low=low)
+        if engine.length:
+            atr.ranges = RollingStats.from_history(engine.true_range(), window)
+            atr.previous_close = _optional(engine.series("close")[-1])
+        return atr
+
+
+class LiveIndicators:
+    """1銘柄のリアルタイム監視用の指標セット（EMA・RSI・ATR・ローリング統計・高値/安値）"""
+
+    def __init__(
+        self,
+        ema_span: int = 20,
+        rsi_window: int = 14,
+        atr_window: int = 14,
+        stats_window: int = 20,
+        extreme_window: int = 20,
+    ):
+        self.ema = StreamingEMA(ema_span)
+        self.rsi = StreamingWilderRSI(rsi_window)
+        self.atr = StreamingATR(atr_window)
+        self.stats = RollingStats(stats_window)
+        self.high = RollingExtreme(extreme_window, "max")
+        self.low = RollingExtreme(extreme_window, "min")
+        self.bars = 0
+        # 最後に取り込んだ足の識別子（呼び出し側の履歴との同期確認用）
+        self.last_key: Optional[str] = None
+
+    def update(
+        self,
+        close: float,
+        high: Optional[float] = None,
+        low: Optional[float] = None,
+        key: Optional[str] = None,
+    ) -> Dict[str, Optional[float]]:
+        """1足追加（高値・安値がなければ終値で代用）"""
+        high = close if high is None else high
+        low = close if low is None else low
+        self.ema.update(close)
+        self.rsi.update(close)
+        self.atr.update(high, low, close)
+        self.stats.update(close)
+        self.high.update(high)
+        self.low.update(low)
+        self.bars += 1
+        self.last_key = key
+        return self.to_dict()
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        """現在の指標値（未確定のものは None）"""
+        return {
+            "ema": self.ema.value,
+            "rsi": self.rsi.value,
+            "atr": self.atr.value,
+            "mean": self.stats.mean,
+            "std": self.stats.std(),
+            "rolling_high": self.high.value,
+            "rolling_low": self.low.value,
+            "bars": self.bars,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ema": self.ema.snapshot(),
+            "rsi": self.rsi.snapshot(),
+            "atr": self.atr.snapshot(),
+            "stats": self.stats.snapshot(),
+            "high": self.high.snapshot(),
+            "low": self.low.snapshot(),
+            "bars": self.bars,
+            "last_key": self.last_key,
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any]) -> "LiveIndicators":
+        live = cls.__new__(cls)
+        live.ema = StreamingEMA.from_snapshot(state["ema"])
+        live.rsi = StreamingWilderRSI.from_snapshot(state["rsi"])
+        live.atr = StreamingATR.from_snapshot(state["atr"])
+        live.stats = RollingStats.from_snapshot(state["stats"])
+        live.high = RollingExtreme.from_snapshot(state["high"])
+        live.low = RollingExtreme.from_snapshot(state["low"])
+        live.bars = state["bars"]
+        live.last_key = state.get("last_key")
+        return live
+
+    @classmethod
+    def from_history(
+        cls,
+        close: Sequence[float],
+        high: Optional[Sequence[float]] = None,
+        low: Optional[Sequence[float]] = None,
+        key: Optional[str] = None,
+        **windows,
+    ) -> "LiveIndicators":
+        """履歴から作成（以降は update で逐次更新）"""
+        live = cls(**windows)
+        high = close if high is None else high
+        low = close if low is None else low
+        live.ema = StreamingEMA.from_history(close, live.ema.span)
+        live.rsi = StreamingWilderRSI.from_history(close, live.rsi.window)
+        live.atr = StreamingATR.from_history(high, low, close, live.atr.window)
+        live.stats = RollingStats.from_history(close, live.stats.window)
+        live.high = RollingExtreme.from_history(high, live.high.window, "max")
+        live.low = RollingExtreme.from_history(low, live.low.window, "min")
+        live.bars = len(close)
+        live.last_key = key
+        return live
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+ストリーミングJSONパーサー
+APIレスポンス本体を全件読み込まずに、指定キーの配列要素を受信しながら1件ずつ取り出す
+配列以外のトップレベル項目（pagination_key など）は配列の読み終わり後に取得できる
+"""
+
+import codecs
+import json
+import re
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class StreamingArrayParser:
+    """トップレベルの1配列を逐次パースするクラス"""
+
+    def __init__(self, items_key: str):
+        """
+        初期化
+
+        Args:
+            items_key: 要素を取り出す配列のキー（例: daily_quotes, info）
+        """
+        self.items_key = items_key
+        self._key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(items_key))
+        self._decoder = json.JSONDecoder()
+        self._decode_bytes = codecs.getincrementaldecoder("utf-8")().decode
+        self._buffer = ""
+        self._prefix = ""
+        self._suffix = ""
+        # 0: 配列の開始待ち / 1: 要素の読み込み中 / 2: 配列の終了後
+        self._state = 0
+        self.item_count = 0
+
+    def feed(self, chunk: bytes) -> Iterator[Dict[str, Any]]:
+        """
+        受信データの追加
+
+        Args:
+            chunk: レスポンス本体の断片
+
+        Yields:
+            Dict[str, Any]: 読み終えた配列要素
+        """
+        self._buffer += self._decode_bytes(chunk)
+        yield from self._drain()
+
+    def _drain(self) -> Iterator[Dict[str, Any]]:
+        """バッファから取り出せる要素をすべて返す"""
+        if self._state == 0:
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                return
+            self._prefix = self._buffer[: match.start()]
+            self._buffer = self._buffer[match.end() :]
+            self._state = 1
+
+        if self._state == 1:
+            position = 0
+            buffer = self._buffer
+            while True:
+                position = _WHITESPACE.match(buffer, position).end()
+                if position >= len(buffer):
+                    break
+                if buffer[position] == ",":
+                    position += 1
+                    continue
+                if buffer[position] == "]":
+                    self._suffix = buffer[position + 1 :]
+                    self._state = 2
+                    self._buffer = ""
+                    return
+                try:
+                    item, end = self._decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # 要素の途中までしか受信していない
+                    break
+                position = end
+                self.item_count += 1
+                yield item
+            self._buffer = buffer[position:]
+            return
+
+        self._suffix += self._buffer
+        self._buffer = ""
+
+    def metadata(self) -> Dict[str, Any]:
+        """配列以外のトップレベル項目（配列の読み終わり後に呼び出す）"""
+        if self._state == 0:
+            # 配列を含まないレスポンス（エラー応答など）
+            text = self._buffer.strip()
+            return json.loads(text) if text else {}
+        if self._state != 2:
+            raise ValueError(f"配列 '{self.items_key}' の終端を受信していません")
+        document = json.loads(f'{self._prefix}"{self.items_key}":[]{self._suffix}')
+        document.pop(self.items_key, None)
+        return document
+
+
+def iter_json_array(
+    chunks: Iterable[bytes], items_key: str, metadata: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    受信チャンクから配列要素を逐次取り出す
+
+    Args:
+        chunks: レスポンス本体のチャンク（例: response.iter_content()）
+        items_key: 要素を取り出す配列のキー
+        metadata: 指定時は読み終わり後に配列以外のトップレベル項目を格納する
+
+    Yields:
+        Dict[str, Any]: 配列要素
+    """
+    parser = StreamingArrayParser(items_key)
+    for chunk in chunks:
+        if chunk:
+            yield from parser.feed(chunk)
+    if metadata is not None:
+        metadata.update(parser.metadata())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+構造化データ一括生成
+全銘柄の日足を1つのDataFrameにまとめ、groupby 1回で各銘柄のサマリー項目を計算する
+銘柄別JSONファイルはスレッドプールで並行に、インデントなしで書き出す
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+STRUCTURE_VERSION = "2.0"
+
+# 銘柄サマリーの列と既定値（generate_stock_data_structure の入力と同じフラットな項目）
+SUMMARY_DEFAULTS: Dict[str, Any] = {
+    "name": "",
+    "sector": "",
+    "last_price": 0,
+    "change": 0,
+    "change_percent": 0,
+    "volume": 0,
+    "average_volume": 0,
+    "volume_ratio": 1.0,
+    "sma_5": 0,
+    "sma_25": 0,
+    "sma_75": 0,
+    "rsi": 50,
+    "macd": 0,
+    "bollinger_upper": 0,
+    "bollinger_lower": 0,
+    "predicted_price": 0,
+    "confidence": 0,
+    "model_used": "",
+    "volatility": 0,
+    "beta": 1.0,
+    "sharpe_ratio": 0,
+    "max_drawdown": 0,
+    "data_quality": "good",
+}
+
+# 日時の既定値はその銘柄の最終取引日（同じデータからは実行時刻によらず同じ内容を作る）
+TIMESTAMP_FIELDS = (
+    "updated_at",
+    "prediction_date",
+    "created_at",
+    "last_trade_date",
+)
+
+
+def quotes_to_frame(prices_by_code: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """
+    銘柄別の daily_quotes を1つのDataFrameに変換
+
+    Args:
+        prices_by_code: 銘柄コード -> daily_quotes の要素（日付昇順）
+
+    Returns:
+        pd.DataFrame: code, date, open, close, volume 列（銘柄内は元の順序）
+    """
+    rows = [
+        (code, quote.get("Date"), quote.get("Open"), quote.get("Close"), quote.get("Volume"))
+        for code, quotes in prices_by_code.items()
+        for quote in quotes
+    ]
+    frame = pd.DataFrame(rows, columns=["code", "date", "open", "close", "volume"])
+    for column in ("open", "close"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype(float)
+    frame["volume"] = pd.to_numeric(frame["volume"], errors="coerce")
+    return frame
+
+
+def summarize_quotes(quotes: pd.DataFrame) -> pd.DataFrame:
+    """
+    全銘柄の日足から銘柄ごとのサマリー項目を一括計算
+
+    移動平均は終値のある直近N日の平均（N日に満たない場合は直近終値、
+    sma_75 は sma_25）、騰落率は終値のある直近2日から計算する
+
+    Args:
+        quotes: quotes_to_frame の形式のDataFrame
+
+    Returns:
+        pd.DataFrame: 銘柄コードをインデックスとするサマリー項目
+    """
+    if quotes.empty:
+        return pd.DataFrame(columns=list(SUMMARY_DEFAULTS)).rename_axis("code")
+
+    latest = quotes.groupby("code", sort=False).tail(1).set_index("code")
+    latest_close = latest["close"].fillna(0.0)
+
+    # 終値・出来高が欠損または0の日は計算から除く
+    closes = quotes.loc[quotes["close"].fillna(0) != 0, ["code", "close"]]
+    grouped = closes.groupby("code", sort=False)["close"]
+    position = closes.groupby("code", sort=False).cumcount(ascending=False)
+    count = grouped.size().reindex(latest.index, fill_value=0)
+    last_valid = grouped.last().reindex(latest.index).fillna(0.0)
+    prev_valid = closes.loc[position == 1].set_index("code")["close"].reindex(latest.index)
+
+    def sma(window: int) -> pd.Series:
+        mean = closes.loc[position < window].groupby("code", sort=False)["close"].mean()
+        mean = mean.reindex(latest.index)
+        return mean.where(count >= window, last_valid)
+
+    sma_5 = sma(5).round(2)
+    sma_25 = sma(25)
+    sma_75 = sma(75).where(count >= 75, sma_25).round(2)
+    volumes = quotes.loc[quotes["volume"].fillna(0) != 0]
+    average_volume = (
+        volumes.groupby("code", sort=False)["volume"].mean().reindex(latest.index).fillna(0)
+    )
+
+    summary = pd.DataFrame(
+        {
+            "last_price": latest_close,
+            "change": latest_close - latest["open"].fillna(0.0),
+            "change_percent": ((last_valid - prev_valid) / prev_valid * 100).fillna(0),
+            "volume": latest["volume"].fillna(0).astype(np.int64),
+            "average_volume": average_volume,
+            "sma_5": sma_5,
+            "sma_25": sma_25.round(2),
+            "sma_75": sma_75,
+            "bollinger_upper": (sma_25.round(2) * 1.02).round(2),
+            "bollinger_lower": (sma_25.round(2) * 0.98).round(2),
+            "predicted_price": (latest_close * 1.02).round(2),
+            "updated_at": latest["date"],
+            "last_trade_date": latest["date"],
+        }
+    )
+    summary.index.name = "code"
+    return summary
+
+
+def _nest(code: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """フラットなサマリー項目を銘柄データ構造に変換"""
+    return {
+        "code": code,
+        "name": record["name"],
+        "sector": record["sector"],
+        "current_price": {
+            "last_price": record["last_price"],
+            "change": record["change"],
+            "change_percent": record["change_percent"],
+            "updated_at": record["updated_at"],
+        },
+        "volume": {
+            "current_volume": record["volume"],
+            "average_volume": record["average_volume"],
+            "volume_ratio": record["volume_ratio"],
+        },
+        "technical_indicators": {
+            "sma_5": record["sma_5"],
+            "sma_25": record["sma_25"],
+            "sma_75": record["sma_75"],
+            "rsi": record["rsi"],
+            "macd": record["macd"],
+            "bollinger_upper": record["bollinger_upper"],
+            "bollinger_lower": record["bollinger_lower"],
+        },
+        "prediction": {
+            "predicted_price": record["predicted_price"],
+            "confidence": record["confidence"],
+            "model_used": record["model_used"],
+            "prediction_date": record["prediction_date"],
+        },
+        "risk_metrics": {
+            "volatility": record["volatility"],
+            "beta": record["beta"],
+            "sharpe_ratio": record["sharpe_ratio"],
+            "max_drawdown": record["max_drawdown"],
+        },
+        "metadata": {
+            "created_at": record["created_at"],
+            "updated_at": record["updated_at"],
+            "data_quality": record["data_quality"],
+            "last_trade_date": record["last_trade_date"],
+        },
+    }
+
+
+def _to_python(value: Any) -> Any:
+    """NumPy のスカラーをJSONに書ける型へ変換"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def build_stock_structures(summary: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """
+    銘柄サマリーのDataFrameから銘柄データ構造を作成
+
+    列がない項目・欠損値は SUMMARY_DEFAULTS（日時は最終取引日、不明なら空文字）で補う
+
+    Args:
+        summary: 銘柄コードをインデックスとするサマリー項目
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 銘柄コード -> 銘柄データ
+    """
+    frame = summary.reindex(
+        columns=list(SUMMARY_DEFAULTS) + list(TIMESTAMP_FIELDS)
+    ).astype(object)
+    for column, default in SUMMARY_DEFAULTS.items():
+        frame[column] = frame[column].where(frame[column].notna(), default)
+    trade_date = frame["last_trade_date"].where(frame["last_trade_date"].notna(), "")
+    for column in TIMESTAMP_FIELDS:
+        frame[column] = frame[column].where(frame[column].notna(), trade_date)
+
+    columns = list(frame.columns)
+    return {
+        str(code): _nest(
+            str(code), {column: _to_python(value) for column, value in zip(columns, values)}
+        )
+        for code, values in zip(frame.index, frame.itertuples(index=False, name=None))
+    }
+
+
+def build_structured_data(
+    stocks: Dict[str, Dict[str, Any]], update_type: str, generated_at: Optional[str] = None
+) -> Dict[str, Any]:
+    """全銘柄の構造化データ（stock_data.json の内容）"""
+    return {
+        "metadata": {
+            "generated_at": generated_at or datetime.now().isoformat(),
+            "version": STRUCTURE_VERSION,
+            "data_source": "jquants",
+            "total_stocks": len(stocks),
+            "structure_version": STRUCTURE_VERSION,
+            "update_type": update_type,
+        },
+        "stocks": stocks,
+    }
+
+
+def build_stock_file(
+    code: str, stock_info: Dict[str, Any], generated_at: Optional[str] = None
+) -> Dict[str, Any]:
+    """銘柄別ファイル（stocks/<code>.json）の内容"""
+    return {
+        "metadata": {
+            "code": code,
+            "generated_at": generated_at or datetime.now().isoformat(),
+            "version": STRUCTURE_VERSION,
+        },
+        "stock": stock_info,
+    }
+
+
+def _index_entry(code: str, stock_info: Dict[str, Any]) -> Dict[str, Any]:
+    """インデックスの1銘柄分"""
+    current_price = stock_info.get("current_price", {})
+    return {
+        "code": code,
+        "name": stock_info.get("name", ""),
+        "sector": stock_info.get("sector", ""),
+        "last_price": current_price.get("last_price", 0),
+        "change_percent": current_price.get("change_percent", 0),
+        "updated_at": current_price.get("updated_at", ""),
+        "file_path": f"stocks/{code}.json",
+    }
+
+
+def build_index(structured_data: Dict[str, Any]) -> Dict[str, Any]:
+    """インデックス（index.json の内容、価格の降順）"""
+    stocks = structured_data.get("stocks", {})
+    entries = [_index_entry(code, stock_info) for code, stock_info in stocks.items()]
+    entries.sort(key=lambda x: x["last_price"], reverse=True)
+    return {
+        "metadata": {
+            "generated_at": datetime.now().isoformat(),
+            "version": STRUCTURE_VERSION,
+            "total_stocks": len(stocks),
+            "last_updated": structured_data.get("metadata", {}).get("generated_at", ""),
+        },
+        "stocks": entries,
+    }
+
+
+def build_index_shards(
+    structured_data: Dict[str, Any], prefix_length: int = 2
+) -> Dict[str, Dict[str, Any]]:
+    """
+    銘柄コードの先頭 prefix_length 桁ごとに分割したインデックス
+
+    価格の変動で並び順が変わらないよう各シャードはコード順とし、
+    1銘柄の更新で書き換わるのはその銘柄を含むシャードのみになる
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 出力パス -> 内容（ルートの index.json はシャード一覧）
+    """
+    stocks = structured_data.get("stocks", {})
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for code in sorted(stocks):
+        grouped.setdefault(code[:prefix_length], []).append(
+            _index_entry(code, stocks[code])
+        )
+
+    files: Dict[str, Dict[str, Any]] = {
+        f"index/{key}.json": {"shard": key, "stocks": entries}
+        for key, entries in grouped.items()
+    }
+    files["index.json"] = {
+        "metadata": {
+            "generated_at": datetime.now().isoformat(),
+            "version": STRUCTURE_VERSION,
+            "total_stocks": len(stocks),
+            "last_updated": structured_data.get("metadata", {}).get("generated_at", ""),
+        },
+        "shards": [
+            {"key": key, "file_path": f"index/{key}.json", "count": len(entries)}
+            for key, entries in grouped.items()
+        ],
+    }
+    return files
+
+
+def write_json(path: Path, data: Any) -> int:
+    """
+    インデントなしのJSON書き込み（一時ファイル経由で置き換え）
+
+    Returns:
+        int: 書き込みバイト数
+    """
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    temp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_file, "wb") as f:
+        f.write(payload)
+    os.replace(temp_file, path)
+    return len(payload)
+
+
+def write_stock_files(
+    stocks: Dict[str, Dict[str, Any]],
+    stocks_dir: Path,
+    max_workers: int = 8,
+    logger=None,
+) -> int:
+    """
+    銘柄別ファイル（stocks/<code>.json）の並行書き込み
+
+    Args:
+        stocks: 銘柄コード -> 銘柄データ
+        stocks_dir: 出力ディレクトリ
+        max_workers: 書き込みスレッド数
+        logger: ロガーインスタンス
+
+    Returns:
+        int: 書き込みファイル数
+    """
+    logger = logger or logging.getLogger(__name__)
+    stocks_dir = Path(stocks_dir)
+    stocks_dir.mkdir(parents=True, exist_ok=True)
+    generated_at = datetime.now().isoformat()
+
+    def write(item) -> int:
+        code, stock_info = item
+        individual_data = build_stock_file(code, stock_info, generated_at)
+        return write_json(stocks_dir / f"{code}.json", individual_data)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        total_bytes = sum(executor.map(write, stocks.items()))
+
+    logger.info(f"個別ファイル生成: {len(stocks)}ファイル ({total_bytes:,} bytes)")
+    return len(stocks)
+
+
+def listed_info_frame(stock_list: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """/listed/info の要素から name, sector 列のDataFrameを作成"""
+    frame = pd.DataFrame(
+        [
+            (stock.get("Code", ""), stock.get("CompanyName", ""), stock.get("Sector17Code", ""))
+            for stock in stock_list
+            if stock.get("Code")
+        ],
+        columns=["code", "name", "sector"],
+    )
+    return frame.drop_duplicates("code").set_index("code")
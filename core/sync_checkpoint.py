@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+銘柄単位の同期チェックポイントジャーナル
+全銘柄同期の途中で停止しても、完了済み銘柄と取得済み日付から再開できるようにする
+ワーカーごとに別ファイルへ追記し、読み込み時に全ワーカー分を統合する
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+
+class SyncCheckpointJournal:
+    """追記専用の同期チェックポイントジャーナルクラス"""
+
+    JOURNAL_SUFFIX = ".jsonl"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    def __init__(
+        self, journal_dir: Path, job_name: str, worker_id: str = "0", logger=None
+    ):
+        """
+        初期化
+
+        Args:
+            journal_dir: ジャーナルディレクトリ
+            job_name: ジョブ名（例: sync_stock_data）
+            worker_id: ワーカー識別子（ワーカーごとに別ファイルへ追記）
+            logger: ロガーインスタンス
+        """
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.job_name = job_name
+        self.worker_id = str(worker_id)
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # 銘柄コード -> 最新レコード
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    @property
+    def journal_file(self) -> Path:
+        """このワーカーの書き込み先"""
+        return self.journal_dir / f"{self.job_name}.{self.worker_id}{self.JOURNAL_SUFFIX}"
+
+    def _journal_files(self) -> List[Path]:
+        """ジョブの全ワーカーのジャーナル"""
+        return sorted(self.journal_dir.glob(f"{self.job_name}.*{self.JOURNAL_SUFFIX}"))
+
+    # ---- 読み込み ----
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        全ワーカーのジャーナルを再生して銘柄ごとの最新状態を復元
+
+        書き込み途中で停止した末尾の不完全な行は読み飛ばす。
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 銘柄コード -> 最新レコード
+        """
+        records: Dict[str, Dict[str, Any]] = {}
+        for journal_file in self._journal_files():
+            with open(journal_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        self.logger.warning(f"不完全なチェックポイント行を無視: {journal_file}")
+                        continue
+                    current = records.get(record["symbol"])
+                    if current is None or record["timestamp"] >= current["timestamp"]:
+                        records[record["symbol"]] = record
+        with self._lock:
+            self._records = records
+        return records
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """銘柄の最新レコード"""
+        return self._records.get(symbol)
+
+    def last_date(self, symbol: str) -> Optional[str]:
+        """銘柄の取得済み最終日付"""
+        record = self._records.get(symbol)
+        return record.get("last_date") if record else None
+
+    def is_current(self, symbol: str, target_date: str) -> bool:
+        """
+        銘柄が target_date まで同期済みか
+
+        Args:
+            symbol: 銘柄コード
+            target_date: 同期対象期間の終了日（YYYY-MM-DD）
+        """
+        record = self._records.get(symbol)
+        return bool(
+            record
+            and record["status"] == self.STATUS_DONE
+            and (record.get("synced_through") or "") >= target_date
+        )
+
+    def pending(self, symbols: Iterable[str], target_date: str) -> List[str]:
+        """target_date まで同期されていない銘柄（入力順を維持）"""
+        return [s for s in symbols if not self.is_current(s, target_date)]
+
+    # ---- 書き込み ----
+
+    def _append(self, record: Dict[str, Any]):
+        """レコードを追記し、ディスクへ同期"""
+        record["timestamp"] = datetime.now().isoformat()
+        record["worker"] = self.worker_id
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._records[record["symbol"]] = record
+
+    def mark_done(self, symbol: str, last_date: Optional[str], synced_through: str):
+        """
+        銘柄の同期完了を記録
+
+        ジャーナルには再開判定に必要な識別子と日付のみを記録する。
+        取得結果は save_result で銘柄別ファイルに保存する。
+
+        Args:
+            symbol: 銘柄コード
+            last_date: 取得できた最終日付
+            synced_through: 同期対象期間の終了日
+        """
+        self._append(
+            {
+                "symbol": symbol,
+                "status": self.STATUS_DONE,
+                "last_date": last_date,
+                "synced_through": synced_through,
+            }
+        )
+
+    def mark_failed(self, symbol: str, error: str):
+        """銘柄の同期失敗を記録（最終日付は前回完了時の値を維持）"""
+        self._append(
+            {
+                "symbol": symbol,
+                "status": self.STATUS_FAILED,
+                "last_date": self.last_date(symbol),
+                "error": error,
+            }
+        )
+
+    # ---- 取得結果 ----
+
+    @property
+    def results_dir(self) -> Path:
+        """完了済み銘柄の取得結果の保存先（ジョブ内で共有）"""
+        return self.journal_dir / f"{self.job_name}.results"
+
+    def _result_file(self, symbol: str) -> Path:
+        return self.results_dir / f"{symbol}.json"
+
+    def save_result(self, symbol: str, data: Any):
+        """
+        再開時に再利用する取得結果を銘柄別ファイルへ保存
+
+        mark_done の前に呼び出し、完了済みの銘柄には必ず結果が残るようにする。
+        """
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        result_file = self._result_file(symbol)
+        temp_file = result_file.with_suffix(f".{self.worker_id}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, result_file)
+
+    def load_result(self, symbol: str) -> Optional[Any]:
+        """完了済み銘柄の取得結果（未保存・読み込み失敗時は None）"""
+        record = self._records.get(symbol)
+        if not record or record["status"] != self.STATUS_DONE:
+            return None
+        try:
+            with open(self._result_file(symbol), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"取得結果の読み込みに失敗: {symbol}: {e}")
+            return None
+
+    def stored_results(self) -> List[str]:
+        """取得結果を保存済みの銘柄（ジョブ内の全ワーカー分）"""
+        if not self.results_dir.exists():
+            return []
+        return sorted(path.stem for path in self.results_dir.glob("*.json"))
+
+    def discard_result(self, symbol: str):
+        """ストレージへ取り込み済みの取得結果を削除（完了の記録は残す）"""
+        self._result_file(symbol).unlink(missing_ok=True)
+
+    def compact(self):
+        """このワーカーのジャーナルを銘柄ごとの最新レコードのみに書き直す"""
+        with self._lock:
+            own = [r for r in self._records.values() if r.get("worker") == self.worker_id]
+            temp_file = self.journal_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                for record in own:
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                    f.write("\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.journal_file)
+
+    def reset(self, all_workers: bool = False):
+        """
+        ジャーナルと取得結果を削除（最初から同期し直す場合）
+
+        Args:
+            all_workers: True の場合はジョブの全ワーカー分を削除する
+                （False の場合は compact と同様に自ワーカー分のみ）
+        """
+        with self._lock:
+            if all_workers:
+                for journal_file in self._journal_files():
+                    journal_file.unlink(missing_ok=True)
+                shutil.rmtree(self.results_dir, ignore_errors=True)
+                self._records = {}
+                return
+            own = [s for s, r in self._records.items() if r.get("worker") == self.worker_id]
+            for symbol in own:
+                self._result_file(symbol).unlink(missing_ok=True)
+                del self._records[symbol]
+            self.journal_file.unlink(missing_ok=True)
+
+    def summary(self) -> Dict[str, int]:
+        """状態ごとの銘柄数"""
+        counts = {self.STATUS_DONE: 0, self.STATUS_FAILED: 0}
+        for record in self._records.values():
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+        return counts
+
+    # ---- 並列ワーカー ----
+
+    @staticmethod
+    def partition(
+        symbols: List[str], worker_index: int, worker_count: int
+    ) -> List[str]:
+        """
+        銘柄リストを重複のない連続範囲に分割し、ワーカーの担当分を返す
+
+        Args:
+            symbols: 銘柄コード（全ワーカーで同じ順序であること）
+            worker_index: ワーカー番号（0始まり）
+            worker_count: ワーカー数
+
+        Returns:
+            List[str]: 担当銘柄
+        """
+        if worker_count < 1 or not 0 <= worker_index < worker_count:
+            raise ValueError(
+                f"不正なワーカー指定です: {worker_index}/{worker_count}"
+            )
+        size = -(-len(symbols) // worker_count)
+        return symbols[worker_index * size : (worker_index + 1) * size]
@@ -1,11 +1,17 @@
 """
 テクニカル分析ライブラリ（pandas-ta代替）
 Python 3.11対応の自作実装
+指標の計算は core.indicator_engine.IndicatorEngine に一本化している
 """
 
 import pandas as pd
-import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
+
+from .feature_store import FeatureStore, get_feature_store
+from .indicator_engine import IndicatorEngine, standard_indicator_spec
+
+# calculate_technical_indicators の出力を変えたら更新する（キャッシュ済みの結果を使わないため）
+INDICATOR_SPEC_VERSION = "technical_analysis.indicators/1"
 
 
 class TechnicalAnalysis:
@@ -14,44 +20,42 @@ class TechnicalAnalysis:
     @staticmethod
     def sma(data: pd.Series, window: int) -> pd.Series:
         """単純移動平均（Simple Moving Average）"""
-        return data.rolling(window=window).mean()
+        engine = IndicatorEngine(close=data)
+        return engine.to_series(engine.sma(window), data.name)
 
     @staticmethod
     def ema(data: pd.Series, window: int) -> pd.Series:
         """指数移動平均（Exponential Moving Average）"""
-        return data.ewm(span=window).mean()
+        engine = IndicatorEngine(close=data)
+        return engine.to_series(engine.ema(window), data.name)
 
     @staticmethod
     def rsi(data: pd.Series, window: int = 14) -> pd.Series:
         """RSI（Relative Strength Index）"""
-        delta = data.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        engine = IndicatorEngine(close=data)
+        return engine.to_series(engine.rsi(window), data.name)
 
     @staticmethod
     def macd(
         data: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """MACD（Moving Average Convergence Divergence）"""
-        ema_fast = TechnicalAnalysis.ema(data, fast)
-        ema_slow = TechnicalAnalysis.ema(data, slow)
-        macd_line = ema_fast - ema_slow
-        signal_line = TechnicalAnalysis.ema(macd_line, signal)
-        histogram = macd_line - signal_line
-        return macd_line, signal_line, histogram
+        engine = IndicatorEngine(close=data)
+        return tuple(
+            engine.to_series(values, data.name)
+            for values in engine.macd(fast, slow, signal)
+        )
 
     @staticmethod
     def bollinger_bands(
         data: pd.Series, window: int = 20, std_dev: float = 2
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """ボリンジャーバンド"""
-        sma = TechnicalAnalysis.sma(data, window)
-        std = data.rolling(window=window).std()
-        upper = sma + (std * std_dev)
-        lower = sma - (std * std_dev)
-        return upper, sma, lower
+        engine = IndicatorEngine(close=data)
+        return tuple(
+            engine.to_series(values, data.name)
+            for values in engine.bollinger_bands(window, std_dev)
+        )
 
     @staticmethod
     def stochastic(
@@ -62,96 +66,57 @@ class TechnicalAnalysis:
         d_window: int = 3,
     ) -> Tuple[pd.Series, pd.Series]:
         """ストキャスティクス"""
-        lowest_low = low.rolling(window=k_window).min()
-        highest_high = high.rolling(window=k_window).max()
-        k_percent = 100 * ((close - lowest_low) / (highest_high - lowest_low))
-        d_percent = k_percent.rolling(window=d_window).mean()
-        return k_percent, d_percent
+        engine = IndicatorEngine(close=close, high=high, low=low)
+        k_percent, d_percent = engine.stochastic(k_window, d_window)
+        return engine.to_series(k_percent), engine.to_series(d_percent)
 
     @staticmethod
     def atr(
         high: pd.Series, low: pd.Series, close: pd.Series, window: int = 14
     ) -> pd.Series:
         """ATR（Average True Range）"""
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return true_range.rolling(window=window).mean()
+        engine = IndicatorEngine(close=close, high=high, low=low)
+        return engine.to_series(engine.atr(window))
 
     @staticmethod
     def williams_r(
         high: pd.Series, low: pd.Series, close: pd.Series, window: int = 14
     ) -> pd.Series:
         """Williams %R"""
-        highest_high = high.rolling(window=window).max()
-        lowest_low = low.rolling(window=window).min()
-        return -100 * ((highest_high - close) / (highest_high - lowest_low))
+        engine = IndicatorEngine(close=close, high=high, low=low)
+        return engine.to_series(engine.williams_r(window))
 
     @staticmethod
     def cci(
         high: pd.Series, low: pd.Series, close: pd.Series, window: int = 20
     ) -> pd.Series:
         """CCI（Commodity Channel Index）"""
-        typical_price = (high + low + close) / 3
-        sma_tp = typical_price.rolling(window=window).mean()
-        mean_deviation = typical_price.rolling(window=window).apply(
-            lambda x: np.mean(np.abs(x - x.mean()))
-        )
-        return (typical_price - sma_tp) / (0.015 * mean_deviation)
+        engine = IndicatorEngine(close=close, high=high, low=low)
+        return engine.to_series(engine.cci(window))
 
     @staticmethod
     def adx(
         high: pd.Series, low: pd.Series, close: pd.Series, window: int = 14
     ) -> pd.Series:
         """ADX（Average Directional Index）"""
-        # True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-
-        # Directional Movement
-        dm_plus = high.diff()
-        dm_minus = -low.diff()
-
-        dm_plus = dm_plus.where((dm_plus > dm_minus) & (dm_plus > 0), 0)
-        dm_minus = dm_minus.where((dm_minus > dm_plus) & (dm_minus > 0), 0)
-
-        # Smoothed values
-        atr = tr.rolling(window=window).mean()
-        di_plus = 100 * (dm_plus.rolling(window=window).mean() / atr)
-        di_minus = 100 * (dm_minus.rolling(window=window).mean() / atr)
-
-        dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus)
-        return dx.rolling(window=window).mean()
+        engine = IndicatorEngine(close=close, high=high, low=low)
+        return engine.to_series(engine.adx(window))
 
     @staticmethod
     def obv(close: pd.Series, volume: pd.Series) -> pd.Series:
         """OBV（On-Balance Volume）"""
         if len(close) == 0 or len(volume) == 0:
             return pd.Series(dtype=float)
-
-        obv = pd.Series(index=close.index, dtype=float)
-        obv.iloc[0] = volume.iloc[0]
-
-        for i in range(1, len(close)):
-            if close.iloc[i] > close.iloc[i - 1]:
-                obv.iloc[i] = obv.iloc[i - 1] + volume.iloc[i]
-            elif close.iloc[i] < close.iloc[i - 1]:
-                obv.iloc[i] = obv.iloc[i - 1] - volume.iloc[i]
-            else:
-                obv.iloc[i] = obv.iloc[i - 1]
-
-        return obv
+        engine = IndicatorEngine(close=close, volume=volume)
+        return engine.to_series(engine.obv())
 
     @staticmethod
     def vwap(
         high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series
     ) -> pd.Series:
         """VWAP（Volume Weighted Average Price）"""
-        typical_price = (high + low + close) / 3
-        return (typical_price * volume).cumsum() / volume.cumsum()
+        engine = IndicatorEngine(close=close, high=high, low=low, volume=volume)
+        return engine.to_series(engine.vwap())
 
     @staticmethod
     def ichimoku(
@@ -199,48 +164,30 @@ class TechnicalAnalysis:
         return {"resistance": resistance.dropna(), "support": support.dropna()}
 
 
-def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    """データフレームにテクニカル指標を追加"""
-    result = df.copy()
+def calculate_technical_indicators(
+    df: pd.DataFrame,
+    symbol: Optional[str] = None,
+    feature_store: Optional[FeatureStore] = None,
+) -> pd.DataFrame:
+    """
+    データフレームにテクニカル指標を追加
 
-    if "close" in df.columns:
-        # 移動平均
-        result["sma_5"] = TechnicalAnalysis.sma(df["close"], 5)
-        result["sma_10"] = TechnicalAnalysis.sma(df["close"], 10)
-        result["sma_20"] = TechnicalAnalysis.sma(df["close"], 20)
-        result["sma_50"] = TechnicalAnalysis.sma(df["close"], 50)
-
-        # RSI
-        result["rsi"] = TechnicalAnalysis.rsi(df["close"])
-
-        # MACD
-        macd, signal, histogram = TechnicalAnalysis.macd(df["close"])
-        result["macd"] = macd
-        result["macd_signal"] = signal
-        result["macd_histogram"] = histogram
-
-    if all(col in df.columns for col in ["high", "low", "close"]):
-        # ボリンジャーバンド
-        bb_upper, bb_middle, bb_lower = TechnicalAnalysis.bollinger_bands(df["close"])
-        result["bb_upper"] = bb_upper
-        result["bb_middle"] = bb_middle
-        result["bb_lower"] = bb_lower
-
-        # ストキャスティクス
-        if "high" in df.columns and "low" in df.columns:
-            k_percent, d_percent = TechnicalAnalysis.stochastic(
-                df["high"], df["low"], df["close"]
-            )
-            result["stoch_k"] = k_percent
-            result["stoch_d"] = d_percent
-
-    if all(col in df.columns for col in ["high", "low", "close", "volume"]):
-        # OBV
-        result["obv"] = TechnicalAnalysis.obv(df["close"], df["volume"])
-
-        # VWAP
-        result["vwap"] = TechnicalAnalysis.vwap(
-            df["high"], df["low"], df["close"], df["volume"]
-        )
+    同じデータの結果は特徴量ストア（省略時はプロセス共有のもの）から取得する
+    （OBV・VWAP は全期間の累積のため、末尾だけの再計算は行わない）
+    """
+    store = feature_store or get_feature_store()
+    return store.get_or_compute(
+        df, _compute_technical_indicators, INDICATOR_SPEC_VERSION, symbol=symbol
+    )
+
+
+def _compute_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """テクニカル指標の一括計算（中間結果を共有する）"""
+    result = df.copy()
+    columns = [col for col in ("close", "high", "low", "volume") if col in df.columns]
+    engine = IndicatorEngine(index=df.index, **{col: df[col] for col in columns})
+    # 移動平均・RSI・MACD・ボリンジャーバンド・ストキャスティクス・OBV・VWAP
+    for column, values in engine.compute(standard_indicator_spec(columns)).items():
+        result[column] = values
 
     return result
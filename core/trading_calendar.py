@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+取引カレンダー（営業日判定）
+J-Quants の /markets/trading_calendar をファイルにキャッシュして営業日を判定する
+キャッシュ範囲外の日付は土日・年末年始（12/31〜1/3）を休業日として扱う
+"""
+
+import json
+import logging
+import os
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+
+DateLike = Union[str, date, datetime]
+
+# HolidayDivision: 0=非営業日, 1=営業日, 2=東証半日立会日, 3=非営業日(祝日取引あり)
+TRADING_DIVISIONS = {"1", "2"}
+
+
+def _to_date(value: DateLike) -> date:
+    """日付への変換（YYYY-MM-DD / YYYYMMDD / date / datetime）"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).replace("-", "")[:8]
+    return datetime.strptime(text, "%Y%m%d").date()
+
+
+class TradingCalendar:
+    """キャッシュ付き取引カレンダークラス"""
+
+    def __init__(
+        self,
+        cache_file: Path = Path("data/trading_calendar.json"),
+        fetcher: Optional[Callable[[str, str], Optional[List[Dict[str, Any]]]]] = None,
+        logger=None,
+    ):
+        """
+        初期化
+
+        Args:
+            cache_file: キャッシュファイルのパス
+            fetcher: (from, to) を受け取り trading_calendar の要素を返す関数
+            logger: ロガーインスタンス
+        """
+        self.cache_file = Path(cache_file)
+        self.fetcher = fetcher
+        self.logger = logger or logging.getLogger(__name__)
+        # 日付（YYYY-MM-DD） -> HolidayDivision
+        self._divisions: Dict[str, str] = {}
+        # キャッシュ済みの連続した期間（開始日, 終了日）の昇順リスト
+        self._ranges: List[Tuple[date, date]] = []
+        self._load()
+
+    def _load(self):
+        """キャッシュの読み込み"""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                self._divisions = json.load(f).get("divisions", {})
+        except FileNotFoundError:
+            self._divisions = {}
+        except Exception as e:
+            self.logger.warning(f"取引カレンダーキャッシュ読み込みエラー: {e}")
+            self._divisions = {}
+        self._rebuild_ranges()
+
+    def _rebuild_ranges(self):
+        """キャッシュ済みの日付を連続した期間にまとめる"""
+        ranges: List[Tuple[date, date]] = []
+        for day in sorted(_to_date(key) for key in self._divisions):
+            if ranges and day - ranges[-1][1] <= timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+        self._ranges = ranges
+
+    def _save(self):
+        """キャッシュの保存（一時ファイル経由で置き換え）"""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.cache_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {"updated_at": datetime.now().isoformat(), "divisions": self._divisions},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+                sort_keys=True,
+            )
+        os.replace(temp_file, self.cache_file)
+
+    def covers(self, start: DateLike, end: DateLike) -> bool:
+        """start〜end がキャッシュ済みか（途中に未取得の日がある場合は False）"""
+        start, end = _to_date(start), _to_date(end)
+        position = bisect_right(self._ranges, (start, date.max)) - 1
+        return position >= 0 and self._ranges[position][1] >= end
+
+    def update(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        trading_calendar の要素をキャッシュへ反映
+
+        Args:
+            entries: {"Date": ..., "HolidayDivision": ...} のリスト
+
+        Returns:
+            int: 反映件数
+        """
+        for entry in entries:
+            self._divisions[_to_date(entry["Date"]).isoformat()] = str(
+                entry["HolidayDivision"]
+            )
+        if entries:
+            self._rebuild_ranges()
+            self._save()
+        return len(entries)
+
+    def ensure(self, start: DateLike, end: DateLike) -> bool:
+        """
+        start〜end がキャッシュになければ取得してキャッシュする
+
+        Returns:
+            bool: 範囲のカレンダーが利用可能か（取得失敗時は既定規則で判定）
+        """
+        if self.covers(start, end):
+            return True
+        if self.fetcher is None:
+            return False
+        entries = self.fetcher(_to_date(start).isoformat(), _to_date(end).isoformat())
+        if entries is None:
+            self.logger.warning("取引カレンダーの取得に失敗、土日・年末年始のみで判定します")
+            return False
+        self.update(entries)
+        return self.covers(start, end)
+
+    # ---- 判定 ----
+
+    def is_trading_day(self, day: DateLike) -> bool:
+        """営業日か"""
+        day = _to_date(day)
+        division = self._divisions.get(day.isoformat())
+        if division is not None:
+            return division in TRADING_DIVISIONS
+        if day.weekday() >= 5:
+            return False
+        return not (
+            (day.month == 12 and day.day == 31) or (day.month == 1 and day.day <= 3)
+        )
+
+    def previous_trading_day(self, day: DateLike, inclusive: bool = True) -> date:
+        """day 以前（inclusive=False なら前日以前）の直近営業日"""
+        day = _to_date(day)
+        if not inclusive:
+            day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def next_trading_day(self, day: DateLike, inclusive: bool = False) -> date:
+        """day より後（inclusive=True なら当日以降）の直近営業日"""
+        day = _to_date(day)
+        if not inclusive:
+            day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def trading_days(self, start: DateLike, end: DateLike) -> List[date]:
+        """start〜end（両端含む）の営業日"""
+        day, end = _to_date(start), _to_date(end)
+        days = []
+        while day <= end:
+            if self.is_trading_day(day):
+                days.append(day)
+            day += timedelta(days=1)
+        return days
@@ -252,7 +252,7 @@ class RoutineAnalysisAPI:
             for stock_code in stock_codes:
                 try:
                     # データ取得
-                    stock_data = self.json_manager.get_stock_data(stock_code)
+                    stock_data = self.json_manager.get_stock_frame(stock_code)
                     if stock_data is None or stock_data.empty:
                         continue
 
@@ -310,7 +310,7 @@ class RoutineAnalysisAPI:
             ).items():
                 try:
                     # 株式データ取得
-                    stock_data = self.json_manager.get_stock_data(stock_code)
+                    stock_data = self.json_manager.get_stock_frame(stock_code)
                     if stock_data is None or stock_data.empty:
                         continue
 
@@ -344,12 +344,12 @@ class RoutineAnalysisAPI:
             if risk_assessment["stock_risk_metrics"]:
                 portfolio_data = {
                     stock_code: {
-                        "stock_data": self.json_manager.get_stock_data(stock_code),
+                        "stock_data": self.json_manager.get_stock_frame(stock_code),
                         "current_price": (
-                            self.json_manager.get_stock_data(stock_code)["Close"].iloc[
+                            self.json_manager.get_stock_frame(stock_code)["Close"].iloc[
                                 -1
                             ]
-                            if not self.json_manager.get_stock_data(stock_code).empty
+                            if not self.json_manager.get_stock_frame(stock_code).empty
                             else 0
                         ),
                         "position_size": 1.0,  # 仮のポジションサイズ
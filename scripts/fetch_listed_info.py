@@ -12,9 +12,15 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import logging
 
+# プロジェクトルートをパスに追加
+sys.path.append(str(Path(__file__).parent.parent))
+
 # 認証管理クラスのインポート
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from jquants_auth_manager import JQuantsAuthManager
+from core.jquants_client import JQUANTS_BASE_URL, get_shared_session
+from core.jquants_fetch_engine import AsyncFetchEngine, FetchRequest
+from core.json_artifact_writer import JSONArtifactWriter
 
 # ログ設定
 os.makedirs("logs", exist_ok=True)
@@ -32,10 +38,26 @@ logger = logging.getLogger(__name__)
 class ListedInfoFetcher:
     """上場銘柄一覧取得クラス"""
 
-    def __init__(self):
+    def __init__(self, compression=("gzip", "br"), stock_compression=()):
+        """
+        初期化
+
+        Args:
+            compression: 一覧・インデックスに併せて出力する圧縮形式（空で出力しない）
+            stock_compression: 個別銘柄ファイルに併せて出力する圧縮形式
+                （銘柄数分のファイルが増えるため既定では出力しない）
+        """
         self.data_dir = Path("docs/data")
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
+        # インデントなし・圧縮済みファイル併記・サイズ予算付きの書き出し
+        self.artifact_writer = JSONArtifactWriter(
+            self.data_dir, compression=compression, logger=logger
+        )
+        self.stock_writer = JSONArtifactWriter(
+            self.data_dir, compression=stock_compression, logger=logger
+        )
+
         # ログディレクトリの作成
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
@@ -48,136 +70,135 @@ class ListedInfoFetcher:
         if not self.id_token:
             raise ValueError("有効なIDトークンの取得に失敗しました")
 
-    def fetch_listed_info(self, date=None, code=None):
-        """上場銘柄一覧を取得（ページング対応）"""
-        url = "https://api.jquants.com/v1/listed/info"
-
-        headers = {
-            "Authorization": f"Bearer {self.id_token}",
-            "Content-Type": "application/json",
-            "User-Agent": "jQuants-Stock-Prediction/1.0",
-        }
+        # 並行取得エンジン（1000リクエスト/時間制限に基づく従来の100ms間隔相当のレート）
+        self.fetch_engine = AsyncFetchEngine(
+            id_token=self.id_token, rate_per_second=10.0, max_concurrency=8, logger=logger
+        )
 
+    def iter_listed_info(self, date=None, code=None, batch_size=500):
+        """上場銘柄一覧を逐次取得（ページを一括展開せず batch_size 件ずつ返す）"""
         params = {}
         if date:
             params["date"] = date
         if code:
             params["code"] = code
 
-        logger.info(f"上場銘柄一覧取得開始: {url}")
-        logger.info(f"パラメータ: {params}")
+        logger.info(f"上場銘柄一覧取得開始: /listed/info パラメータ: {params}")
+        return self.fetch_engine.iter_batches(
+            "/listed/info", params, "info", batch_size=batch_size
+        )
 
+    def fetch_listed_info(self, date=None, code=None):
+        """上場銘柄一覧を取得（ページング対応）"""
         all_info = []
-        pagination_key = None
-        page_count = 0
-        max_pages = 50  # 最大ページ数を制限
-
         try:
-            while page_count < max_pages:
-                if pagination_key:
-                    params["pagination_key"] = pagination_key
-
-                response = requests.get(url, headers=headers, params=params, timeout=30)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    page_info = data.get("info", [])
-                    all_info.extend(page_info)
-
-                    logger.info(
-                        f"ページ {page_count + 1} 取得成功: {len(page_info)}銘柄 (累計: {len(all_info)}銘柄)"
-                    )
-
-                    # ページングキーをチェック
-                    pagination_key = data.get("pagination_key")
-                    if not pagination_key:
-                        logger.info("ページング完了")
-                        break
-
-                    page_count += 1
-                else:
-                    logger.error(f"取得エラー: HTTP {response.status_code}")
-                    logger.error(f"レスポンス: {response.text}")
-                    break
-
-            if all_info:
-                result = {"info": all_info}
-                logger.info(f"全ページ取得成功: 総計 {len(all_info)}銘柄")
-                return result
-            else:
-                logger.error("データが取得できませんでした")
-                return None
+            for batch in self.iter_listed_info(date, code):
+                all_info.extend(batch)
+                logger.info(f"取得中: 累計 {len(all_info)}銘柄")
+        except IOError as e:
+            logger.error(f"取得エラー: {e}")
+
+        if all_info:
+            logger.info(f"全ページ取得成功: 総計 {len(all_info)}銘柄")
+            return {"info": all_info}
+        logger.error("データが取得できませんでした")
+        return None
+
+    @staticmethod
+    def _price_date_range(days):
+        """価格データの取得期間（開始日, 終了日）"""
+        # サブスクリプション期間内の日付を使用（2023-07-11 ~ 2025-07-11）
+        # 現在の日付が範囲外の場合は、サブスクリプション期間内の最新日付を使用
+        subscription_end = datetime(2025, 7, 11)
+        current_date = datetime.now()
+
+        if current_date > subscription_end:
+            # サブスクリプション期間内の最新日付を使用
+            end_date = subscription_end
+            start_date = end_date - timedelta(days=days)
+        else:
+            # 現在の日付が範囲内の場合は通常通り
+            end_date = current_date
+            start_date = end_date - timedelta(days=days)
+
+        return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _summarize_quotes(code, quotes):
+        """最新の四本値から価格サマリーを作成（無効な場合はNone）"""
+        if not quotes:
+            logger.warning(f"銘柄 {code}: 価格データが見つかりません")
+            return None
+
+        latest_quote = quotes[-1]
+        # データの妥当性チェック
+        close_price = latest_quote.get("Close")
+        open_price = latest_quote.get("Open")
+        volume = latest_quote.get("Volume")
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"リクエストエラー: {e}")
+        if close_price is None or close_price <= 0:
+            logger.warning(f"銘柄 {code}: 無効な価格データ")
             return None
 
+        change = float(close_price) - float(open_price) if open_price else 0
+        change_percent = (
+            (change / float(open_price)) * 100 if open_price and open_price != 0 else 0
+        )
+        return {
+            "current_price": float(close_price),
+            "change": change,
+            "change_percent": change_percent,
+            "volume": int(volume) if volume else 0,
+            "updated_at": latest_quote.get("Date", datetime.now().isoformat()),
+        }
+
+    def fetch_price_data_concurrently(self, codes, days=7):
+        """複数銘柄の価格サマリーを並行取得（取得できなかった銘柄はNone）"""
+        start_str, end_str = self._price_date_range(days)
+        responses = self.fetch_engine.run_many(
+            FetchRequest(
+                key=code,
+                path="/prices/daily_quotes",
+                params={"code": code, "from": start_str, "to": end_str},
+            )
+            for code in codes
+        )
+        logger.info(f"価格データ並行取得完了: {self.fetch_engine.get_stats()}")
+
+        results = {}
+        for code in codes:
+            data = responses.get(code)
+            try:
+                results[code] = (
+                    self._summarize_quotes(code, data.get("daily_quotes", []))
+                    if data
+                    else None
+                )
+            except (TypeError, ValueError) as e:
+                logger.warning(f"銘柄 {code} の価格データ取得エラー: {e}")
+                results[code] = None
+        return results
+
     def get_stock_price_data(self, code, days=7):
         """個別銘柄の価格データ取得"""
         try:
-            # サブスクリプション期間内の日付を使用（2023-07-11 ~ 2025-07-11）
-            # 現在の日付が範囲外の場合は、サブスクリプション期間内の最新日付を使用
-            subscription_end = datetime(2025, 7, 11)
-            current_date = datetime.now()
-
-            if current_date > subscription_end:
-                # サブスクリプション期間内の最新日付を使用
-                end_date = subscription_end
-                start_date = end_date - timedelta(days=days)
-            else:
-                # 現在の日付が範囲内の場合は通常通り
-                end_date = current_date
-                start_date = end_date - timedelta(days=days)
-
-            start_str = start_date.strftime("%Y-%m-%d")
-            end_str = end_date.strftime("%Y-%m-%d")
+            start_str, end_str = self._price_date_range(days)
 
             headers = {
                 "Authorization": f"Bearer {self.id_token}",
                 "Content-Type": "application/json",
             }
-            url = "https://api.jquants.com/v1/prices/daily_quotes"
+            url = f"{JQUANTS_BASE_URL}/prices/daily_quotes"
             params = {"code": code, "from": start_str, "to": end_str}
 
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = get_shared_session().get(
+                url, headers=headers, params=params, timeout=30
+            )
 
             # HTTPステータスコードの詳細チェック
             if response.status_code == 200:
                 data = response.json()
-                quotes = data.get("daily_quotes", [])
-
-                if quotes:
-                    latest_quote = quotes[-1]
-                    # データの妥当性チェック
-                    close_price = latest_quote.get("Close")
-                    open_price = latest_quote.get("Open")
-                    volume = latest_quote.get("Volume")
-
-                    if close_price is not None and close_price > 0:
-                        change = (
-                            float(close_price) - float(open_price) if open_price else 0
-                        )
-                        change_percent = (
-                            (change / float(open_price)) * 100
-                            if open_price and open_price != 0
-                            else 0
-                        )
-
-                        return {
-                            "current_price": float(close_price),
-                            "change": change,
-                            "change_percent": change_percent,
-                            "volume": int(volume) if volume else 0,
-                            "updated_at": latest_quote.get(
-                                "Date", datetime.now().isoformat()
-                            ),
-                        }
-                    else:
-                        logger.warning(f"銘柄 {code}: 無効な価格データ")
-                        return None
-                else:
-                    logger.warning(f"銘柄 {code}: 価格データが見つかりません")
-                    return None
+                return self._summarize_quotes(code, data.get("daily_quotes", []))
             elif response.status_code == 404:
                 logger.warning(f"銘柄 {code}: データが見つかりません (404)")
                 return None
@@ -245,24 +266,22 @@ class ListedInfoFetcher:
         selected_stocks = all_stocks
         logger.info(f"全銘柄選択: {len(selected_stocks)}銘柄")
 
-        # 構造化データの作成（バッチ処理対応）
-        batch_size = 10  # バッチサイズを設定
         # 全銘柄を処理（制限を解除）
         target_stocks = selected_stocks
         logger.info(f"全銘柄を処理します: {len(target_stocks)}銘柄")
+
+        # 価格データの並行取得（レート制限はエンジン側で制御）
+        prices_by_code = self.fetch_price_data_concurrently(
+            [stock["code"] for stock in target_stocks if stock["code"]]
+        )
+
         for i, stock in enumerate(target_stocks):
             code = stock["code"]
             logger.info(
                 f"処理中: {i + 1}/{len(target_stocks)} - {stock['name']} ({code})"
             )
 
-            # 価格データの取得（修正版）
-            price_data = None
-            try:
-                price_data = self.get_stock_price_data(code)
-            except Exception as e:
-                logger.warning(f"銘柄 {code} の価格データ取得に失敗: {e}")
-                price_data = None
+            price_data = prices_by_code.get(code)
 
             processed_data["stocks"][code] = {
                 "code": code,
@@ -288,128 +307,192 @@ class ListedInfoFetcher:
                 },
             }
 
-            # API制限を考慮した待機（レート制限対応）
-            import time
-
-            time.sleep(0.1)  # 1000リクエスト/時間制限に基づく最適化
-
         processed_data["metadata"]["total_stocks"] = len(processed_data["stocks"])
         logger.info(f"処理完了: {len(processed_data['stocks'])}銘柄")
 
         return processed_data
 
-    def save_structured_data(self, data):
-        """構造化データの保存"""
-        try:
-            # メインファイルの保存
-            main_file = self.data_dir / "listed_info.json"
-            with open(main_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+    @staticmethod
+    def _stock_file(code, stock_info):
+        """個別銘柄ファイルの内容"""
+        return {
+            "metadata": {
+                "code": code,
+                "generated_at": datetime.now().isoformat(),
+                "version": "2.0",
+                "type": "listed_info",
+            },
+            "stock": stock_info,
+        }
 
-            logger.info(f"メインファイル保存完了: {main_file}")
+    def _save_stock_file(self, code, stock_info):
+        """個別銘柄ファイルの保存（予算超過のみサイズ報告に記録）"""
+        report = self.stock_writer.write(
+            f"stocks/{code}_listed.json", self._stock_file(code, stock_info), record=False
+        )
+        if report.over_budget:
+            self.artifact_writer.reports.append(report)
+
+    @staticmethod
+    def _index_entry(code, stock_info):
+        """インデックスの1銘柄分"""
+        return {
+            "code": code,
+            "name": stock_info["name"],
+            "sector": stock_info["sector"],
+            "market": stock_info["market"],
+            "currentPrice": stock_info.get("currentPrice"),
+            "change": stock_info.get("change"),
+            "changePercent": stock_info.get("changePercent"),
+            "volume": stock_info.get("volume"),
+            "updated_at": stock_info["metadata"]["updated_at"],
+            "file_path": f"stocks/{code}_listed.json",
+        }
 
-            # 個別銘柄ファイルの保存
-            stocks_dir = self.data_dir / "stocks"
-            stocks_dir.mkdir(exist_ok=True)
-
-            for code, stock_info in data["stocks"].items():
-                individual_file = stocks_dir / f"{code}_listed.json"
-                individual_data = {
-                    "metadata": {
-                        "code": code,
-                        "generated_at": datetime.now().isoformat(),
-                        "version": "2.0",
-                        "type": "listed_info",
-                    },
-                    "stock": stock_info,
-                }
+    def _save_index_and_metadata(self, index_entries, metadata, main_file):
+        """インデックスファイル・メタデータファイルの保存"""
+        index_data = {
+            "metadata": {
+                "generated_at": datetime.now().isoformat(),
+                "version": "2.0",
+                "total_stocks": len(index_entries),
+                "last_updated": metadata["generated_at"],
+                "data_type": "listed_info",
+            },
+            "stocks": index_entries,
+        }
 
-                with open(individual_file, "w", encoding="utf-8") as f:
-                    json.dump(individual_data, f, ensure_ascii=False, indent=2)
+        # セクター順でソート
+        index_data["stocks"].sort(key=lambda x: (x["sector"], x["name"]))
 
-            logger.info(f"個別銘柄ファイル保存完了: {len(data['stocks'])}ファイル")
+        index_file = self.data_dir / "listed_index.json"
+        self.artifact_writer.write("listed_index.json", index_data, items_key="stocks")
 
-            # インデックスファイルの生成
-            index_data = {
-                "metadata": {
-                    "generated_at": datetime.now().isoformat(),
-                    "version": "2.0",
-                    "total_stocks": len(data["stocks"]),
-                    "last_updated": data["metadata"]["generated_at"],
-                    "data_type": "listed_info",
-                },
-                "stocks": [],
-            }
+        logger.info(f"インデックスファイル保存完了: {index_file}")
 
-            for code, stock_info in data["stocks"].items():
-                index_data["stocks"].append(
-                    {
-                        "code": code,
-                        "name": stock_info["name"],
-                        "sector": stock_info["sector"],
-                        "market": stock_info["market"],
-                        "currentPrice": stock_info.get("currentPrice"),
-                        "change": stock_info.get("change"),
-                        "changePercent": stock_info.get("changePercent"),
-                        "volume": stock_info.get("volume"),
-                        "updated_at": stock_info["metadata"]["updated_at"],
-                        "file_path": f"stocks/{code}_listed.json",
-                    }
-                )
+        # メタデータファイルの生成
+        metadata_dir = self.data_dir / "metadata"
+        metadata_dir.mkdir(exist_ok=True)
 
-            # セクター順でソート
-            index_data["stocks"].sort(key=lambda x: (x["sector"], x["name"]))
+        basic_metadata = {
+            "last_updated": metadata["generated_at"],
+            "total_stocks": metadata["total_stocks"],
+            "data_source": metadata["data_source"],
+            "version": metadata["version"],
+            "file_size": main_file.stat().st_size,
+            "update_status": "success",
+            "data_type": "listed_info",
+        }
 
-            index_file = self.data_dir / "listed_index.json"
-            with open(index_file, "w", encoding="utf-8") as f:
-                json.dump(index_data, f, ensure_ascii=False, indent=2)
+        metadata_file = metadata_dir / "listed_info.json"
+        self.artifact_writer.write("metadata/listed_info.json", basic_metadata)
 
-            logger.info(f"インデックスファイル保存完了: {index_file}")
+        logger.info(f"メタデータファイル保存完了: {metadata_file}")
+        self.artifact_writer.log_report()
 
-            # メタデータファイルの生成
-            metadata_dir = self.data_dir / "metadata"
-            metadata_dir.mkdir(exist_ok=True)
+    def save_structured_data(self, data):
+        """構造化データの保存"""
+        try:
+            # メインファイルの保存
+            main_file = self.data_dir / "listed_info.json"
+            self.artifact_writer.write("listed_info.json", data)
 
-            basic_metadata = {
-                "last_updated": data["metadata"]["generated_at"],
-                "total_stocks": data["metadata"]["total_stocks"],
-                "data_source": data["metadata"]["data_source"],
-                "version": data["metadata"]["version"],
-                "file_size": main_file.stat().st_size,
-                "update_status": "success",
-                "data_type": "listed_info",
-            }
+            logger.info(f"メインファイル保存完了: {main_file}")
 
-            metadata_file = metadata_dir / "listed_info.json"
-            with open(metadata_file, "w", encoding="utf-8") as f:
-                json.dump(basic_metadata, f, ensure_ascii=False, indent=2)
+            # 個別銘柄ファイルの保存（並行書き込み）
+            reports = self.stock_writer.write_many(
+                {
+                    f"stocks/{code}_listed.json": self._stock_file(code, stock_info)
+                    for code, stock_info in data["stocks"].items()
+                }
+            )
+            self.artifact_writer.reports.extend(r for r in reports if r.over_budget)
 
-            logger.info(f"メタデータファイル保存完了: {metadata_file}")
+            logger.info(f"個別銘柄ファイル保存完了: {len(data['stocks'])}ファイル")
+
+            # インデックス・メタデータファイルの生成
+            index_entries = [
+                self._index_entry(code, stock_info)
+                for code, stock_info in data["stocks"].items()
+            ]
+            self._save_index_and_metadata(index_entries, data["metadata"], main_file)
 
         except Exception as e:
             logger.error(f"データ保存エラー: {e}")
             raise
 
+    def fetch_and_save_streaming(self, batch_size=500):
+        """
+        上場銘柄一覧の逐次取得・保存
+
+        ページをバッチ単位でパースし、価格データの取得・構造化・ファイル書き込みまでを
+        バッチごとに行う。メインファイルも逐次書き出すため、保持するのは1バッチ分と
+        インデックス用の要約のみで、銘柄数に関わらずピークメモリは一定
+
+        Args:
+            batch_size: 1バッチの銘柄数
+
+        Returns:
+            int: 保存した銘柄数
+        """
+        main_file = self.data_dir / "listed_info.json"
+        temp_file = main_file.with_name(f".{main_file.name}.tmp")
+        metadata = {
+            "generated_at": datetime.now().isoformat(),
+            "version": "2.0",
+            "data_source": "jquants_listed_info",
+            "total_stocks": 0,
+            "structure_version": "2.0",
+            "update_type": "listed_info",
+        }
+        index_entries = []
+
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                f.write('{"stocks":{')
+                for batch in self.iter_listed_info(batch_size=batch_size):
+                    processed = self.process_listed_data({"info": batch})
+                    if not processed:
+                        continue
+                    for code, stock_info in processed["stocks"].items():
+                        if index_entries:
+                            f.write(",")
+                        f.write(json.dumps(code, ensure_ascii=False) + ":")
+                        f.write(
+                            json.dumps(stock_info, ensure_ascii=False, separators=(",", ":"))
+                        )
+                        self._save_stock_file(code, stock_info)
+                        index_entries.append(self._index_entry(code, stock_info))
+                    logger.info(f"逐次保存中: 累計 {len(index_entries)}銘柄")
+
+                metadata["total_stocks"] = len(index_entries)
+                f.write('},"metadata":')
+                f.write(json.dumps(metadata, ensure_ascii=False, separators=(",", ":")))
+                f.write("}")
+        except BaseException:
+            temp_file.unlink(missing_ok=True)
+            raise
+
+        if not index_entries:
+            temp_file.unlink(missing_ok=True)
+            return 0
+
+        os.replace(temp_file, main_file)
+        self.artifact_writer.compress_existing("listed_info.json")
+        logger.info(f"メインファイル保存完了: {main_file}")
+        self._save_index_and_metadata(index_entries, metadata, main_file)
+        return len(index_entries)
+
     def run_fetch(self):
         """上場銘柄一覧取得の実行"""
         try:
             logger.info("=== 上場銘柄一覧取得開始 ===")
 
-            # 上場銘柄一覧の取得
-            listed_data = self.fetch_listed_info()
-            if not listed_data:
+            # 上場銘柄一覧の逐次取得・処理・保存
+            if not self.fetch_and_save_streaming():
                 logger.error("上場銘柄一覧の取得に失敗しました")
                 return False
 
-            # データの処理
-            processed_data = self.process_listed_data(listed_data)
-            if not processed_data:
-                logger.error("データの処理に失敗しました")
-                return False
-
-            # データの保存
-            self.save_structured_data(processed_data)
-
             logger.info("=== 上場銘柄一覧取得完了 ===")
             return True
 
@@ -420,8 +503,26 @@ class ListedInfoFetcher:
 
 def main():
     """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="jQuants API上場銘柄一覧取得スクリプト")
+    parser.add_argument(
+        "--no-compress",
+        action="store_true",
+        help="一覧・インデックスの gzip / brotli の圧縮済みファイルを出力しない",
+    )
+    parser.add_argument(
+        "--compress-stock-files",
+        action="store_true",
+        help="個別銘柄ファイルにも gzip / brotli の圧縮済みファイルを出力する",
+    )
+    args = parser.parse_args()
+
     try:
-        fetcher = ListedInfoFetcher()
+        fetcher = ListedInfoFetcher(
+            compression=() if args.no_compress else ("gzip", "br"),
+            stock_compression=("gzip", "br") if args.compress_stock_files else (),
+        )
         success = fetcher.run_fetch()
 
         if success:
@@ -4,12 +4,27 @@
 jQuantsデータを効率的に管理するための構造化されたJSONファイルを生成
 """
 
-import json
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 import logging
 
+import pandas as pd
+
+# プロジェクトルートをパスに追加
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.json_artifact_writer import JSONArtifactWriter
+from core.static_site_publisher import IncrementalPublisher, PublishResult
+from core.structured_data_builder import (
+    build_index,
+    build_index_shards,
+    build_stock_file,
+    build_stock_structures,
+    build_structured_data,
+)
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,9 +33,19 @@ logger = logging.getLogger(__name__)
 class StructuredDataGenerator:
     """構造化されたデータ生成クラス"""
 
-    def __init__(self):
+    def __init__(self, compression=("gzip", "br"), page_bytes=None):
+        """
+        初期化
+
+        Args:
+            compression: 併せて出力する圧縮形式（gzip / br、空で出力しない）
+            page_bytes: この大きさを超えるインデックスをページに分割する（None で分割しない）
+        """
         self.data_dir = Path("docs/data")
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.artifact_writer = JSONArtifactWriter(
+            self.data_dir, compression=compression, page_bytes=page_bytes, logger=logger
+        )
 
         # サブディレクトリの作成
         self.stocks_dir = self.data_dir / "stocks"
@@ -32,136 +57,28 @@ class StructuredDataGenerator:
     def generate_stock_data_structure(
         self, stock_data: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """株価データの構造化"""
-        structured_data = {
-            "metadata": {
-                "generated_at": datetime.now().isoformat(),
-                "version": "2.0",
-                "data_source": "jquants",
-                "total_stocks": len(stock_data),
-                "structure_version": "2.0",
-                "update_type": "full",
-            },
-            "stocks": {},
-        }
-
-        for code, stock_info in stock_data.items():
-            structured_data["stocks"][code] = {
-                "code": code,
-                "name": stock_info.get("name", ""),
-                "sector": stock_info.get("sector", ""),
-                "current_price": {
-                    "last_price": stock_info.get("last_price", 0),
-                    "change": stock_info.get("change", 0),
-                    "change_percent": stock_info.get("change_percent", 0),
-                    "updated_at": stock_info.get(
-                        "updated_at", datetime.now().isoformat()
-                    ),
-                },
-                "volume": {
-                    "current_volume": stock_info.get("volume", 0),
-                    "average_volume": stock_info.get("average_volume", 0),
-                    "volume_ratio": stock_info.get("volume_ratio", 1.0),
-                },
-                "technical_indicators": {
-                    "sma_5": stock_info.get("sma_5", 0),
-                    "sma_25": stock_info.get("sma_25", 0),
-                    "sma_75": stock_info.get("sma_75", 0),
-                    "rsi": stock_info.get("rsi", 50),
-                    "macd": stock_info.get("macd", 0),
-                    "bollinger_upper": stock_info.get("bollinger_upper", 0),
-                    "bollinger_lower": stock_info.get("bollinger_lower", 0),
-                },
-                "prediction": {
-                    "predicted_price": stock_info.get("predicted_price", 0),
-                    "confidence": stock_info.get("confidence", 0),
-                    "model_used": stock_info.get("model_used", ""),
-                    "prediction_date": stock_info.get(
-                        "prediction_date", datetime.now().isoformat()
-                    ),
-                },
-                "risk_metrics": {
-                    "volatility": stock_info.get("volatility", 0),
-                    "beta": stock_info.get("beta", 1.0),
-                    "sharpe_ratio": stock_info.get("sharpe_ratio", 0),
-                    "max_drawdown": stock_info.get("max_drawdown", 0),
-                },
-                "metadata": {
-                    "created_at": stock_info.get(
-                        "created_at", datetime.now().isoformat()
-                    ),
-                    "updated_at": stock_info.get(
-                        "updated_at", datetime.now().isoformat()
-                    ),
-                    "data_quality": stock_info.get("data_quality", "good"),
-                    "last_trade_date": stock_info.get(
-                        "last_trade_date", datetime.now().isoformat()
-                    ),
-                },
-            }
-
-        return structured_data
+        """株価データの構造化（全銘柄を1つのDataFrameで一括変換）"""
+        generated_at = datetime.now().isoformat()
+        summary = pd.DataFrame.from_dict(stock_data, orient="index", dtype=object)
+        stocks = build_stock_structures(summary)
+        return build_structured_data(stocks, "full", generated_at)
 
     def generate_individual_stock_files(self, structured_data: Dict[str, Any]):
-        """個別銘柄ファイルの生成"""
+        """個別銘柄ファイルの生成（並行書き込み）"""
         stocks = structured_data.get("stocks", {})
-
-        for code, stock_info in stocks.items():
-            individual_file = self.stocks_dir / f"{code}.json"
-
-            individual_data = {
-                "metadata": {
-                    "code": code,
-                    "generated_at": datetime.now().isoformat(),
-                    "version": "2.0",
-                },
-                "stock": stock_info,
+        generated_at = datetime.now().isoformat()
+        self.artifact_writer.write_many(
+            {
+                f"stocks/{code}.json": build_stock_file(code, stock_info, generated_at)
+                for code, stock_info in stocks.items()
             }
+        )
 
-            with open(individual_file, "w", encoding="utf-8") as f:
-                json.dump(individual_data, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"個別ファイル生成: {code}.json")
+        logger.info(f"個別ファイル生成: {len(stocks)}ファイル")
 
     def generate_index_file(self, structured_data: Dict[str, Any]):
         """インデックスファイルの生成"""
-        index_data = {
-            "metadata": {
-                "generated_at": datetime.now().isoformat(),
-                "version": "2.0",
-                "total_stocks": len(structured_data.get("stocks", {})),
-                "last_updated": structured_data.get("metadata", {}).get(
-                    "generated_at", ""
-                ),
-            },
-            "stocks": [],
-        }
-
-        for code, stock_info in structured_data.get("stocks", {}).items():
-            index_data["stocks"].append(
-                {
-                    "code": code,
-                    "name": stock_info.get("name", ""),
-                    "sector": stock_info.get("sector", ""),
-                    "last_price": stock_info.get("current_price", {}).get(
-                        "last_price", 0
-                    ),
-                    "change_percent": stock_info.get("current_price", {}).get(
-                        "change_percent", 0
-                    ),
-                    "updated_at": stock_info.get("current_price", {}).get(
-                        "updated_at", ""
-                    ),
-                    "file_path": f"stocks/{code}.json",
-                }
-            )
-
-        # 価格順でソート
-        index_data["stocks"].sort(key=lambda x: x["last_price"], reverse=True)
-
-        index_file = self.data_dir / "index.json"
-        with open(index_file, "w", encoding="utf-8") as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
+        self.artifact_writer.write("index.json", build_index(structured_data), items_key="stocks")
 
         logger.info("インデックスファイル生成: index.json")
 
@@ -179,15 +96,11 @@ class StructuredDataGenerator:
             "update_status": "success",
         }
 
-        metadata_file = self.metadata_dir / "basic.json"
-        with open(metadata_file, "w", encoding="utf-8") as f:
-            json.dump(basic_metadata, f, ensure_ascii=False, indent=2)
+        self.artifact_writer.write("metadata/basic.json", basic_metadata)
 
         # 統計メタデータ
         stats = self._calculate_statistics(structured_data)
-        stats_file = self.metadata_dir / "statistics.json"
-        with open(stats_file, "w", encoding="utf-8") as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
+        self.artifact_writer.write("metadata/statistics.json", stats)
 
         logger.info("メタデータファイル生成完了")
 
@@ -251,6 +164,52 @@ class StructuredDataGenerator:
             "total_stocks": len(stocks),
         }
 
+    def build_site_files(self, structured_data: Dict[str, Any]) -> Dict[str, Any]:
+        """公開ファイル一式（出力パス -> 内容）"""
+        metadata = structured_data.get("metadata", {})
+        files: Dict[str, Any] = {"stock_data.json": structured_data}
+        for code, stock_info in structured_data.get("stocks", {}).items():
+            files[f"stocks/{code}.json"] = build_stock_file(
+                code, stock_info, metadata.get("generated_at")
+            )
+        files.update(build_index_shards(structured_data))
+        files["metadata/basic.json"] = {
+            "last_updated": metadata.get("generated_at", ""),
+            "total_stocks": metadata.get("total_stocks", 0),
+            "data_source": metadata.get("data_source", ""),
+            "version": metadata.get("version", ""),
+            "update_status": "success",
+        }
+        files["metadata/statistics.json"] = self._calculate_statistics(structured_data)
+        return files
+
+    def publish_site(
+        self,
+        stock_data: Dict[str, Any],
+        output_dir: Path = Path("web-app/public/data"),
+        prune: bool = True,
+    ) -> PublishResult:
+        """
+        静的サイト向けの差分公開
+
+        前回公開時から内容が変わった銘柄ファイル・インデックスシャードのみを書き換え、
+        ハッシュ付きのマニフェスト（manifest.json）を出力する
+
+        Args:
+            stock_data: 銘柄コード -> サマリー項目
+            output_dir: 公開先ディレクトリ
+            prune: 前回公開したが今回含まれない銘柄のファイルを削除する
+
+        Returns:
+            PublishResult: 書き換え・削除したファイル
+        """
+        structured_data = self.generate_stock_data_structure(stock_data)
+        writer = JSONArtifactWriter(
+            output_dir, compression=self.artifact_writer.compression, logger=logger
+        )
+        publisher = IncrementalPublisher(output_dir, writer=writer, logger=logger)
+        return publisher.publish(self.build_site_files(structured_data), prune=prune)
+
     def generate_all_files(self, stock_data: Dict[str, Any]):
         """全ファイルの生成"""
         logger.info("構造化データ生成開始")
@@ -259,9 +218,7 @@ class StructuredDataGenerator:
         structured_data = self.generate_stock_data_structure(stock_data)
 
         # メインファイルの保存
-        main_file = self.data_dir / "stock_data.json"
-        with open(main_file, "w", encoding="utf-8") as f:
-            json.dump(structured_data, f, ensure_ascii=False, indent=2)
+        self.artifact_writer.write("stock_data.json", structured_data)
 
         # 個別ファイルの生成
         self.generate_individual_stock_files(structured_data)
@@ -272,11 +229,34 @@ class StructuredDataGenerator:
         # メタデータファイルの生成
         self.generate_metadata_files(structured_data)
 
+        # サイズ予算との比較
+        size_report = self.artifact_writer.log_report()
+
         logger.info("構造化データ生成完了")
+        return size_report
 
 
 def main():
     """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="構造化JSONデータ生成")
+    parser.add_argument(
+        "--publish-dir",
+        type=Path,
+        help="差分公開先（例: web-app/public/data）。変更のあったファイルのみ書き換える",
+    )
+    parser.add_argument(
+        "--no-prune", action="store_true", help="公開対象から外れたファイルを削除しない"
+    )
+    parser.add_argument(
+        "--no-compress", action="store_true", help="gzip / brotli の圧縮済みファイルを出力しない"
+    )
+    parser.add_argument(
+        "--page-kb", type=int, help="この大きさ(KB)を超えるインデックスをページに分割する"
+    )
+    args = parser.parse_args()
+
     # サンプルデータ（実際の実装ではjQuantsから取得）
     sample_data = {
         "7203": {
@@ -307,9 +287,15 @@ def main():
         },
     }
 
-    generator = StructuredDataGenerator()
+    generator = StructuredDataGenerator(
+        compression=() if args.no_compress else ("gzip", "br"),
+        page_bytes=args.page_kb * 1024 if args.page_kb else None,
+    )
     generator.generate_all_files(sample_data)
 
+    if args.publish_dir:
+        generator.publish_site(sample_data, args.publish_dir, prune=not args.no_prune)
+
 
 if __name__ == "__main__":
     main()
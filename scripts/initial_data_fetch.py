@@ -4,15 +4,12 @@
 jQuants APIから本日時点でのデータを取得してJSONファイルとして保存
 """
 
-import json
 import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any, List
 import logging
-import requests
-import time
 
 # プロジェクトルートをパスに追加
 project_root = Path(__file__).parent.parent
@@ -21,6 +18,19 @@ sys.path.append(str(project_root))
 # 必要モジュールのインポート（リンター対応）
 from core.config_manager import ConfigManager
 from core.error_handler import ErrorHandler
+from core.jquants_client import JQUANTS_BASE_URL, JQuantsClient, get_shared_session
+from core.jquants_fetch_engine import AsyncFetchEngine, FetchRequest
+from core.structured_data_builder import (
+    build_index,
+    build_stock_structures,
+    build_structured_data,
+    listed_info_frame,
+    quotes_to_frame,
+    summarize_quotes,
+    write_json,
+    write_stock_files,
+)
+from core.sync_checkpoint import SyncCheckpointJournal
 
 # ログ設定
 os.makedirs("logs", exist_ok=True)
@@ -47,7 +57,7 @@ class InitialDataFetcher:
         log_dir.mkdir(exist_ok=True)
 
         # jQuants API設定
-        self.base_url = "https://api.jquants.com/v1"
+        self.base_url = JQUANTS_BASE_URL
         self._setup_credentials()
 
         # 設定管理の初期化
@@ -56,15 +66,40 @@ class InitialDataFetcher:
         # エラーハンドラーの初期化
         self.error_handler = ErrorHandler()
 
-        # セッション管理
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Content-Type": "application/json",
-                "User-Agent": "jQuants-Stock-Prediction/1.0",
-            }
+        # セッション管理（接続プール付きの共有セッション）
+        self.session = get_shared_session()
+        # 認証クライアント（IDトークンは他のスクリプトと共有キャッシュ）
+        self.jquants_client = JQuantsClient(
+            email=self.email,
+            password=self.password,
+            base_url=self.base_url,
+            session=self.session,
+            logger=logger,
         )
 
+        # 並行取得設定（トークンバケットで従来の100ms間隔相当のレートに制御）
+        self.rate_per_second = 10.0
+        self.max_concurrency = 8
+        self.fetch_engine = None
+
+        # チェックポイント（停止時に完了済み銘柄から再開する）
+        self.checkpoint_dir = Path("data/checkpoints")
+        self.checkpoint_chunk_size = 200
+        self.resume = True
+
+    def _get_fetch_engine(self) -> AsyncFetchEngine:
+        """並行取得エンジンの取得（認証後のIDトークンで初期化）"""
+        if self.fetch_engine is None:
+            self.fetch_engine = AsyncFetchEngine(
+                id_token=self.id_token,
+                base_url=self.base_url,
+                rate_per_second=self.rate_per_second,
+                max_concurrency=self.max_concurrency,
+                session=self.session,
+                logger=logger,
+            )
+        return self.fetch_engine
+
     def _setup_credentials(self) -> None:
         """認証情報の設定"""
         self.email = os.getenv("JQUANTS_EMAIL")
@@ -79,41 +114,17 @@ class InitialDataFetcher:
                 logger.info("IDトークンが設定されています")
                 return True
 
-            if not self.email or not self.password:
-                logger.error("認証情報が設定されていません")
-                logger.error(
-                    "環境変数 JQUANTS_EMAIL, JQUANTS_PASSWORD または JQUANTS_ID_TOKEN を設定してください"
-                )
-                return False
-
-            # リフレッシュトークンの取得
-            logger.info("リフレッシュトークンを取得中...")
-            auth_url = f"{self.base_url}/token/auth_user"
-            auth_data = {"mailaddress": self.email, "password": self.password}
-
-            response = self.session.post(auth_url, json=auth_data, timeout=30)
-            response.raise_for_status()
-
-            auth_result = response.json()
-            refresh_token = auth_result.get("refreshToken")
-
-            if not refresh_token:
-                logger.error("リフレッシュトークンの取得に失敗しました")
-                return False
-
-            # IDトークンの取得
-            logger.info("IDトークンを取得中...")
-            token_url = f"{self.base_url}/token/auth_refresh"
-            token_data = {"refreshtoken": refresh_token}
-
-            response = self.session.post(token_url, json=token_data, timeout=30)
-            response.raise_for_status()
-
-            token_result = response.json()
-            self.id_token = token_result.get("idToken")
+            # 共有キャッシュのトークンが有効なら認証APIを呼ばない
+            self.id_token = self.jquants_client.get_id_token()
 
             if not self.id_token:
-                logger.error("IDトークンの取得に失敗しました")
+                if not self.email or not self.password:
+                    logger.error("認証情報が設定されていません")
+                    logger.error(
+                        "環境変数 JQUANTS_EMAIL, JQUANTS_PASSWORD または JQUANTS_ID_TOKEN を設定してください"
+                    )
+                else:
+                    logger.error("IDトークンの取得に失敗しました")
                 return False
 
             logger.info("認証が完了しました")
@@ -173,201 +184,116 @@ class InitialDataFetcher:
             logger.error(f"銘柄 {code} の価格データ取得エラー: {e}")
             return []
 
+    def fetch_stock_prices_concurrently(
+        self, codes: List[str], days: int = 30
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """複数銘柄の価格データを並行取得（取得できなかった銘柄は空リスト）"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        params = {
+            "from": start_date.strftime("%Y-%m-%d"),
+            "to": end_date.strftime("%Y-%m-%d"),
+        }
+
+        engine = self._get_fetch_engine()
+        responses = engine.run_many(
+            FetchRequest(
+                key=code, path="/markets/daily_quotes", params={"code": code, **params}
+            )
+            for code in codes
+        )
+        logger.info(f"価格データ並行取得完了: {engine.get_stats()}")
+        return {
+            code: (responses.get(code) or {}).get("daily_quotes", []) for code in codes
+        }
+
+    def fetch_stock_prices_with_checkpoint(
+        self, codes: List[str], days: int = 30
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        チェックポイント付きで価格データを取得
+
+        本日分まで取得済みの銘柄は保存済みの取得結果を再利用し、未取得の銘柄のみを
+        チャンク単位で取得する。銘柄ごとに完了を記録するため、途中で停止しても
+        再実行時は続きから取得する。
+        """
+        journal = SyncCheckpointJournal(self.checkpoint_dir, "initial_fetch", logger=logger)
+        if not self.resume:
+            journal.reset(all_workers=True)
+        journal.compact()
+
+        end_str = datetime.now().strftime("%Y-%m-%d")
+        pending = journal.pending(codes, end_str)
+        if len(pending) < len(codes):
+            logger.info(
+                f"チェックポイントから再開: {len(codes) - len(pending)}銘柄は取得済み"
+            )
+
+        for start in range(0, len(pending), self.checkpoint_chunk_size):
+            chunk = pending[start : start + self.checkpoint_chunk_size]
+            prices_by_code = self.fetch_stock_prices_concurrently(chunk, days=days)
+            for code in chunk:
+                quotes = prices_by_code.get(code, [])
+                if quotes:
+                    journal.save_result(code, quotes)
+                    journal.mark_done(code, quotes[-1].get("Date"), end_str)
+                else:
+                    journal.mark_failed(code, "価格データ取得失敗")
+
+        return {code: journal.load_result(code) or [] for code in codes}
+
     def process_stock_data(
         self, stock_list: List[Dict[str, Any]], max_stocks: int = None
     ) -> Dict[str, Any]:
-        """株価データの処理"""
+        """株価データの処理（全銘柄の日足を1つのDataFrameで一括集計）"""
         if max_stocks is None:
             max_stocks = len(stock_list)  # 全銘柄を処理
         logger.info(f"株価データの処理開始 (最大{max_stocks}銘柄)")
-
-        processed_data = {
-            "metadata": {
-                "generated_at": datetime.now().isoformat(),
-                "version": "2.0",
-                "data_source": "jquants",
-                "total_stocks": 0,
-                "structure_version": "2.0",
-                "update_type": "initial",
-            },
-            "stocks": {},
-        }
+        generated_at = datetime.now().isoformat()
 
         # 主要銘柄の選択（時価総額順など）
-        selected_stocks = stock_list[:max_stocks]
-
-        for i, stock in enumerate(selected_stocks):
-            code = stock.get("Code", "")
-            name = stock.get("CompanyName", "")
-            sector = stock.get("Sector17Code", "")
-
-            if not code:
-                continue
-
-            logger.info(f"処理中: {i + 1}/{len(selected_stocks)} - {name} ({code})")
-
-            # 価格データの取得
-            price_data = self.get_stock_prices(code, days=30)
-
-            if not price_data:
-                logger.warning(f"銘柄 {code} の価格データが取得できませんでした")
-                continue
-
-            # 最新データの取得
-            latest_data = price_data[-1] if price_data else {}
-
-            # 技術指標の計算（簡易版）
-            prices = [
-                float(quote.get("Close", 0))
-                for quote in price_data
-                if quote.get("Close")
-            ]
-            volumes = [
-                int(quote.get("Volume", 0))
-                for quote in price_data
-                if quote.get("Volume")
-            ]
-
-            # 移動平均の計算
-            sma_5 = (
-                sum(prices[-5:]) / 5
-                if len(prices) >= 5
-                else prices[-1] if prices else 0
-            )
-            sma_25 = (
-                sum(prices[-25:]) / 25
-                if len(prices) >= 25
-                else prices[-1] if prices else 0
-            )
+        listed = listed_info_frame(stock_list[:max_stocks])
 
-            # 変動率の計算
-            if len(prices) >= 2:
-                change_percent = ((prices[-1] - prices[-2]) / prices[-2]) * 100
-            else:
-                change_percent = 0
-
-            # 構造化データの作成
-            processed_data["stocks"][code] = {
-                "code": code,
-                "name": name,
-                "sector": sector,
-                "current_price": {
-                    "last_price": float(latest_data.get("Close", 0)),
-                    "change": float(latest_data.get("Close", 0))
-                    - float(latest_data.get("Open", 0)),
-                    "change_percent": change_percent,
-                    "updated_at": latest_data.get("Date", datetime.now().isoformat()),
-                },
-                "volume": {
-                    "current_volume": int(latest_data.get("Volume", 0)),
-                    "average_volume": sum(volumes) / len(volumes) if volumes else 0,
-                    "volume_ratio": 1.0,
-                },
-                "technical_indicators": {
-                    "sma_5": round(sma_5, 2),
-                    "sma_25": round(sma_25, 2),
-                    "sma_75": (
-                        round(sum(prices[-75:]) / 75, 2)
-                        if len(prices) >= 75
-                        else round(sma_25, 2)
-                    ),
-                    "rsi": 50,  # 簡易版のため固定値
-                    "macd": 0,  # 簡易版のため固定値
-                    "bollinger_upper": round(sma_25 * 1.02, 2),
-                    "bollinger_lower": round(sma_25 * 0.98, 2),
-                },
-                "prediction": {
-                    "predicted_price": round(
-                        float(latest_data.get("Close", 0)) * 1.02, 2
-                    ),
-                    "confidence": 0.75,
-                    "model_used": "Initial",
-                    "prediction_date": datetime.now().isoformat(),
-                },
-                "risk_metrics": {
-                    "volatility": 0.2,
-                    "beta": 1.0,
-                    "sharpe_ratio": 0.5,
-                    "max_drawdown": -0.1,
-                },
-                "metadata": {
-                    "created_at": datetime.now().isoformat(),
-                    "updated_at": datetime.now().isoformat(),
-                    "data_quality": "good",
-                    "last_trade_date": latest_data.get(
-                        "Date", datetime.now().isoformat()
-                    ),
-                },
-            }
+        # 価格データの並行取得（レート制限はエンジン側で制御、取得済み銘柄は再利用）
+        prices_by_code = self.fetch_stock_prices_with_checkpoint(
+            list(listed.index), days=30
+        )
+        missing = [code for code in listed.index if not prices_by_code.get(code)]
+        for code in missing:
+            logger.warning(f"銘柄 {code} の価格データが取得できませんでした")
 
-            # API制限を考慮した待機
-            time.sleep(0.1)
+        summary = summarize_quotes(quotes_to_frame(prices_by_code))
+        summary = summary.join(listed, how="inner").reindex(
+            [code for code in listed.index if code in summary.index]
+        )
+        # 簡易版のため固定値
+        summary["confidence"] = 0.75
+        summary["model_used"] = "Initial"
+        summary["volatility"] = 0.2
+        summary["sharpe_ratio"] = 0.5
+        summary["max_drawdown"] = -0.1
 
-        processed_data["metadata"]["total_stocks"] = len(processed_data["stocks"])
-        logger.info(f"株価データの処理完了: {len(processed_data['stocks'])}銘柄")
+        stocks = build_stock_structures(summary)
+        processed_data = build_structured_data(stocks, "initial", generated_at)
+        logger.info(f"株価データの処理完了: {len(stocks)}銘柄")
 
         return processed_data
 
     def save_structured_data(self, data: Dict[str, Any]):
-        """構造化データの保存"""
+        """構造化データの保存（インデントなし、銘柄別ファイルは並行書き込み）"""
         try:
             # メインファイルの保存
             main_file = self.data_dir / "stock_data.json"
-            with open(main_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            main_size = write_json(main_file, data)
 
             logger.info(f"メインファイル保存完了: {main_file}")
 
             # 個別銘柄ファイルの保存
-            stocks_dir = self.data_dir / "stocks"
-            stocks_dir.mkdir(exist_ok=True)
-
-            for code, stock_info in data["stocks"].items():
-                individual_file = stocks_dir / f"{code}.json"
-                individual_data = {
-                    "metadata": {
-                        "code": code,
-                        "generated_at": datetime.now().isoformat(),
-                        "version": "2.0",
-                    },
-                    "stock": stock_info,
-                }
-
-                with open(individual_file, "w", encoding="utf-8") as f:
-                    json.dump(individual_data, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"個別銘柄ファイル保存完了: {len(data['stocks'])}ファイル")
+            write_stock_files(data["stocks"], self.data_dir / "stocks", logger=logger)
 
             # インデックスファイルの生成
-            index_data = {
-                "metadata": {
-                    "generated_at": datetime.now().isoformat(),
-                    "version": "2.0",
-                    "total_stocks": len(data["stocks"]),
-                    "last_updated": data["metadata"]["generated_at"],
-                },
-                "stocks": [],
-            }
-
-            for code, stock_info in data["stocks"].items():
-                index_data["stocks"].append(
-                    {
-                        "code": code,
-                        "name": stock_info["name"],
-                        "sector": stock_info["sector"],
-                        "last_price": stock_info["current_price"]["last_price"],
-                        "change_percent": stock_info["current_price"]["change_percent"],
-                        "updated_at": stock_info["current_price"]["updated_at"],
-                        "file_path": f"stocks/{code}.json",
-                    }
-                )
-
-            # 価格順でソート
-            index_data["stocks"].sort(key=lambda x: x["last_price"], reverse=True)
-
             index_file = self.data_dir / "index.json"
-            with open(index_file, "w", encoding="utf-8") as f:
-                json.dump(index_data, f, ensure_ascii=False, indent=2)
+            write_json(index_file, build_index(data))
 
             logger.info(f"インデックスファイル保存完了: {index_file}")
 
@@ -380,13 +306,12 @@ class InitialDataFetcher:
                 "total_stocks": data["metadata"]["total_stocks"],
                 "data_source": data["metadata"]["data_source"],
                 "version": data["metadata"]["version"],
-                "file_size": main_file.stat().st_size,
+                "file_size": main_size,
                 "update_status": "success",
             }
 
             metadata_file = metadata_dir / "basic.json"
-            with open(metadata_file, "w", encoding="utf-8") as f:
-                json.dump(basic_metadata, f, ensure_ascii=False, indent=2)
+            write_json(metadata_file, basic_metadata)
 
             logger.info(f"メタデータファイル保存完了: {metadata_file}")
 
@@ -394,8 +319,14 @@ class InitialDataFetcher:
             logger.error(f"データ保存エラー: {e}")
             raise
 
-    def run_initial_fetch(self):
-        """初回データ取得の実行"""
+    def run_initial_fetch(self, resume: bool = True):
+        """
+        初回データ取得の実行
+
+        Args:
+            resume: チェックポイントから再開する（False で全銘柄を取得し直す）
+        """
+        self.resume = resume
         try:
             logger.info("=== 初回データ取得開始 ===")
 
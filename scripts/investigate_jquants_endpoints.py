@@ -15,6 +15,9 @@ import logging
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from jquants_auth_manager import JQuantsAuthManager
 
+# JQUANTS_API_BASE_URL でローカルのリプレイサーバーに向け先を切り替えられる
+BASE_URL = os.getenv("JQUANTS_API_BASE_URL", "https://api.jquants.com/v1")
+
 # ログ設定
 os.makedirs("logs", exist_ok=True)
 logging.basicConfig(
@@ -106,107 +109,107 @@ class JQuantsEndpointInvestigator:
             # 基本情報系
             {
                 "name": "上場銘柄一覧",
-                "url": "https://api.jquants.com/v1/listed/info",
+                "url": f"{BASE_URL}/listed/info",
                 "params": None,
             },
             {
                 "name": "上場銘柄一覧（特定銘柄）",
-                "url": "https://api.jquants.com/v1/listed/info",
+                "url": f"{BASE_URL}/listed/info",
                 "params": {"code": "7203"},
             },
             # 株価データ系
             {
                 "name": "株価四本値",
-                "url": "https://api.jquants.com/v1/prices/daily_quotes",
+                "url": f"{BASE_URL}/prices/daily_quotes",
                 "params": {"code": "7203", "from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "前場四本値",
-                "url": "https://api.jquants.com/v1/prices/prices_am",
+                "url": f"{BASE_URL}/prices/prices_am",
                 "params": {"code": "7203", "date": "2025-10-01"},
             },
             # 市場データ系
             {
                 "name": "投資部門別情報",
-                "url": "https://api.jquants.com/v1/markets/trades_spec",
+                "url": f"{BASE_URL}/markets/trades_spec",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "信用取引週末残高",
-                "url": "https://api.jquants.com/v1/markets/weekly_margin_interest",
+                "url": f"{BASE_URL}/markets/weekly_margin_interest",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "業種別空売り比率",
-                "url": "https://api.jquants.com/v1/markets/short_selling",
+                "url": f"{BASE_URL}/markets/short_selling",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "空売り残高報告",
-                "url": "https://api.jquants.com/v1/markets/short_selling_positions",
+                "url": f"{BASE_URL}/markets/short_selling_positions",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "日々公表信用取引残高",
-                "url": "https://api.jquants.com/v1/markets/daily_margin_interest",
+                "url": f"{BASE_URL}/markets/daily_margin_interest",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "売買内訳データ",
-                "url": "https://api.jquants.com/v1/markets/breakdown",
+                "url": f"{BASE_URL}/markets/breakdown",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "取引カレンダー",
-                "url": "https://api.jquants.com/v1/markets/trading_calendar",
+                "url": f"{BASE_URL}/markets/trading_calendar",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             # 指数データ系
             {
                 "name": "指数四本値",
-                "url": "https://api.jquants.com/v1/indices",
+                "url": f"{BASE_URL}/indices",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "TOPIX指数四本値",
-                "url": "https://api.jquants.com/v1/indices/topix",
+                "url": f"{BASE_URL}/indices/topix",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             # 財務情報系
             {
                 "name": "財務情報",
-                "url": "https://api.jquants.com/v1/fins/statements",
+                "url": f"{BASE_URL}/fins/statements",
                 "params": {"code": "7203"},
             },
             {
                 "name": "財務諸表(BS/PL)",
-                "url": "https://api.jquants.com/v1/fins/fs_details",
+                "url": f"{BASE_URL}/fins/fs_details",
                 "params": {"code": "7203"},
             },
             {
                 "name": "配当金情報",
-                "url": "https://api.jquants.com/v1/fins/dividend",
+                "url": f"{BASE_URL}/fins/dividend",
                 "params": {"code": "7203"},
             },
             {
                 "name": "決算発表予定日",
-                "url": "https://api.jquants.com/v1/fins/announcement",
+                "url": f"{BASE_URL}/fins/announcement",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             # デリバティブ系
             {
                 "name": "日経225オプション四本値",
-                "url": "https://api.jquants.com/v1/option/index_option",
+                "url": f"{BASE_URL}/option/index_option",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "先物四本値",
-                "url": "https://api.jquants.com/v1/derivatives/futures",
+                "url": f"{BASE_URL}/derivatives/futures",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
             {
                 "name": "オプション四本値",
-                "url": "https://api.jquants.com/v1/derivatives/options",
+                "url": f"{BASE_URL}/derivatives/options",
                 "params": {"from": "2025-09-01", "to": "2025-10-01"},
             },
         ]
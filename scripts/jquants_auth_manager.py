@@ -5,12 +5,17 @@ IDトークンの有効性チェックと自動再取得機能（強化版）
 """
 
 import os
+import sys
 import requests
 import logging
 from datetime import datetime
 from typing import Optional, Dict
 from pathlib import Path
 
+# プロジェクトルートをパスに追加
+sys.path.append(str(Path(__file__).parent.parent))
+from core.jquants_client import JQUANTS_BASE_URL, get_shared_session, get_token_cache
+
 # ログ設定
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -28,9 +33,9 @@ class JQuantsAuthManager:
         self.refresh_token = os.getenv("JQUANTS_REFRESH_TOKEN")
 
         # APIエンドポイント
-        self.auth_url = "https://api.jquants.com/v1/token/auth_user"
-        self.refresh_url = "https://api.jquants.com/v1/token/auth_refresh"
-        self.test_url = "https://api.jquants.com/v1/listed/info"
+        self.auth_url = f"{JQUANTS_BASE_URL}/token/auth_user"
+        self.refresh_url = f"{JQUANTS_BASE_URL}/token/auth_refresh"
+        self.test_url = f"{JQUANTS_BASE_URL}/listed/info"
 
         # トークン有効期限（秒）
         self.token_expiry_buffer = 300  # 5分前から更新
@@ -39,11 +44,12 @@ class JQuantsAuthManager:
         self.max_retries = 3
         self.retry_delay = 2  # 秒
 
-        # トークンキャッシュファイル
-        self.token_cache_file = Path("data/token_cache.json")
-        self.data_dir = Path("data")
-        if not self.data_dir.exists():
-            self.data_dir.mkdir(parents=True, exist_ok=True)
+        # トークンキャッシュ（他のスクリプト・プロセスと共有）
+        self.token_cache = get_token_cache()
+        self.token_cache_file = self.token_cache.cache_file
+
+        # セッション管理（接続プール付きの共有セッション）
+        self.session = get_shared_session()
 
     def is_token_valid(self) -> bool:
         """IDトークンの有効性をチェック"""
@@ -97,7 +103,7 @@ class JQuantsAuthManager:
 
         try:
             headers = {"Authorization": f"Bearer {self.id_token}"}
-            response = requests.get(self.test_url, headers=headers, timeout=10)
+            response = self.session.get(self.test_url, headers=headers, timeout=10)
 
             if response.status_code == 200:
                 logger.info("APIテスト成功: トークンは有効です")
@@ -124,7 +130,7 @@ class JQuantsAuthManager:
             # 認証リクエスト
             auth_data = {"mailaddress": self.email, "password": self.password}
 
-            response = requests.post(self.auth_url, json=auth_data, timeout=30)
+            response = self.session.post(self.auth_url, json=auth_data, timeout=30)
             response.raise_for_status()
 
             auth_result = response.json()
@@ -137,7 +143,7 @@ class JQuantsAuthManager:
             logger.info("リフレッシュトークンを取得しました")
 
             # IDトークンを取得
-            refresh_response = requests.post(
+            refresh_response = self.session.post(
                 f"{self.refresh_url}?refreshtoken={refresh_token}", timeout=30
             )
             refresh_response.raise_for_status()
@@ -169,7 +175,7 @@ class JQuantsAuthManager:
         try:
             logger.info("リフレッシュトークンでIDトークンを更新中...")
 
-            response = requests.post(
+            response = self.session.post(
                 f"{self.refresh_url}?refreshtoken={self.refresh_token}", timeout=30
             )
             response.raise_for_status()
@@ -191,35 +197,35 @@ class JQuantsAuthManager:
             logger.error(f"予期しないエラー: {e}")
             return None
 
-    def get_valid_token(self) -> Optional[str]:
-        """有効なIDトークンを取得（必要に応じて更新）"""
-        # 1. 現在のトークンが有効かチェック
-        if self.is_token_valid() and self.test_token_with_api():
-            logger.info("現在のトークンは有効です")
-            return self.id_token
+    def _refresh_with(self, refresh_token: str) -> Optional[str]:
+        """キャッシュ済みのリフレッシュトークンでIDトークンを更新"""
+        self.refresh_token = refresh_token
+        return self.refresh_id_token()
+
+    def _authenticate(self) -> Optional[Dict[str, str]]:
+        """キャッシュにないトークンの取得（環境変数のトークン → 新規認証）"""
+        if self.id_token and self.is_token_valid():
+            return {"id_token": self.id_token, "refresh_token": self.refresh_token}
 
-        # 2. リフレッシュトークンで更新を試行
         if self.refresh_token:
             logger.info("リフレッシュトークンで更新を試行...")
             new_id_token = self.refresh_id_token()
             if new_id_token:
-                # 更新されたトークンをテスト
-                self.id_token = new_id_token
-                if self.test_token_with_api():
-                    logger.info("リフレッシュトークンでの更新に成功しました")
-                    return new_id_token
+                return {"id_token": new_id_token, "refresh_token": self.refresh_token}
 
-        # 3. メールアドレスとパスワードで新規取得
         logger.info("メールアドレスとパスワードで新規認証を試行...")
-        new_tokens = self.get_new_tokens()
-        if new_tokens:
-            self.id_token = new_tokens["id_token"]
-            self.refresh_token = new_tokens["refresh_token"]
-
-            # 新しいトークンをテスト
-            if self.test_token_with_api():
-                logger.info("新規認証に成功しました")
-                return self.id_token
+        return self.get_new_tokens()
+
+    def get_valid_token(self) -> Optional[str]:
+        """有効なIDトークンを取得（必要に応じて更新）"""
+        # 共有キャッシュのトークンが期限の手前まで有効ならAPIを呼ばずに使い、
+        # 期限が近い場合のみリフレッシュ・新規認証を行う（ロック内で1プロセスのみ）
+        id_token = self.token_cache.get_id_token(self._refresh_with, self._authenticate)
+        if id_token:
+            self.id_token = id_token
+            self.refresh_token = self.token_cache.refresh_token() or self.refresh_token
+            logger.info("有効なトークンを取得しました")
+            return id_token
 
         logger.error("すべての認証方法が失敗しました")
         return None
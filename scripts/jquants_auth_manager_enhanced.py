@@ -5,7 +5,7 @@ IDトークンの有効性チェックと自動再取得機能
 """
 
 import os
-import json
+import sys
 import requests
 import logging
 import time
@@ -29,6 +29,10 @@ except ImportError:
                     key, value = line.split("=", 1)
                     os.environ[key] = value
 
+# プロジェクトルートをパスに追加
+sys.path.append(str(Path(__file__).parent.parent))
+from core.jquants_client import JQUANTS_BASE_URL, get_shared_session, get_token_cache
+
 # 環境認証管理システムをインポート
 try:
     from core.environment_auth_manager import EnvironmentAuthManager
@@ -64,9 +68,9 @@ class JQuantsAuthManagerEnhanced:
             self.refresh_token = os.getenv("JQUANTS_REFRESH_TOKEN")
 
         # APIエンドポイント
-        self.auth_url = "https://api.jquants.com/v1/token/auth_user"
-        self.refresh_url = "https://api.jquants.com/v1/token/auth_refresh"
-        self.test_url = "https://api.jquants.com/v1/listed/info"
+        self.auth_url = f"{JQUANTS_BASE_URL}/token/auth_user"
+        self.refresh_url = f"{JQUANTS_BASE_URL}/token/auth_refresh"
+        self.test_url = f"{JQUANTS_BASE_URL}/listed/info"
 
         # トークン有効期限（秒）
         self.token_expiry_buffer = 300  # 5分前から更新
@@ -75,46 +79,27 @@ class JQuantsAuthManagerEnhanced:
         self.max_retries = 3
         self.retry_delay = 2  # 秒
 
-        # トークンキャッシュファイル
-        self.token_cache_file = Path("data/token_cache.json")
-        self.data_dir = Path("data")
-        if not self.data_dir.exists():
-            self.data_dir.mkdir(parents=True, exist_ok=True)
-
-        # セッション管理
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Content-Type": "application/json",
-                "User-Agent": "jQuants-Stock-Prediction/1.0",
-            }
-        )
+        # トークンキャッシュ（他のスクリプト・プロセスと共有）
+        self.token_cache = get_token_cache()
+        self.token_cache_file = self.token_cache.cache_file
+
+        # セッション管理（接続プール付きの共有セッション）
+        self.session = get_shared_session()
 
     def load_token_cache(self) -> Optional[Dict[str, Any]]:
         """トークンキャッシュを読み込み"""
-        try:
-            if self.token_cache_file.exists():
-                with open(self.token_cache_file, "r", encoding="utf-8") as f:
-                    cache = json.load(f)
-                logger.info("トークンキャッシュを読み込みました")
-                return cache
-        except Exception as e:
-            logger.warning(f"トークンキャッシュ読み込みエラー: {e}")
+        cache = self.token_cache.load()
+        if cache:
+            logger.info("トークンキャッシュを読み込みました")
+            return cache
         return None
 
     def save_token_cache(self, tokens: Dict[str, str]) -> bool:
         """トークンキャッシュを保存"""
         try:
-            cache_data = {
-                "id_token": tokens.get("id_token", ""),
-                "refresh_token": tokens.get("refresh_token", ""),
-                "cached_at": datetime.now().isoformat(),
-                "expires_at": self._calculate_token_expiry(tokens.get("id_token", "")),
-            }
-
-            with open(self.token_cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-
+            self.token_cache.save(
+                tokens.get("id_token", ""), tokens.get("refresh_token") or None
+            )
             logger.info("トークンキャッシュを保存しました")
             return True
         except Exception as e:
@@ -347,46 +332,37 @@ class JQuantsAuthManagerEnhanced:
         logger.error("すべてのトークン更新試行が失敗しました")
         return None
 
-    def get_valid_token(self) -> Optional[str]:
-        """有効なIDトークンを取得（強化版）"""
-        logger.info("=== 有効なトークン取得開始 ===")
+    def _refresh_with(self, refresh_token: str) -> Optional[str]:
+        """キャッシュ済みのリフレッシュトークンでIDトークンを更新"""
+        self.refresh_token = refresh_token
+        return self.refresh_id_token()
 
-        # 1. キャッシュからトークンを取得
-        cache = self.load_token_cache()
-        if cache and cache.get("id_token"):
-            self.id_token = cache["id_token"]
-            self.refresh_token = cache.get("refresh_token", self.refresh_token)
-            logger.info("キャッシュからトークンを取得しました")
+    def _authenticate(self) -> Optional[Dict[str, str]]:
+        """キャッシュにないトークンの取得（環境変数のトークン → 新規認証）"""
+        if self.id_token and self.is_token_valid():
+            return {"id_token": self.id_token, "refresh_token": self.refresh_token}
 
-        # 2. 現在のトークンが有効かチェック
-        if self.is_token_valid() and self.test_token_with_api():
-            logger.info("現在のトークンは有効です")
-            return self.id_token
-
-        # 3. リフレッシュトークンで更新を試行
         if self.refresh_token:
             logger.info("リフレッシュトークンで更新を試行...")
             new_id_token = self.refresh_id_token()
             if new_id_token:
-                self.id_token = new_id_token
-                if self.test_token_with_api():
-                    logger.info("リフレッシュトークンでの更新に成功しました")
-                    # 更新されたトークンをキャッシュに保存
-                    self.save_token_cache(
-                        {"id_token": new_id_token, "refresh_token": self.refresh_token}
-                    )
-                    return new_id_token
+                return {"id_token": new_id_token, "refresh_token": self.refresh_token}
 
-        # 4. メールアドレスとパスワードで新規取得
         logger.info("メールアドレスとパスワードで新規認証を試行...")
-        new_tokens = self.get_new_tokens()
-        if new_tokens:
-            self.id_token = new_tokens["id_token"]
-            self.refresh_token = new_tokens["refresh_token"]
+        return self.get_new_tokens()
+
+    def get_valid_token(self) -> Optional[str]:
+        """有効なIDトークンを取得（強化版）"""
+        logger.info("=== 有効なトークン取得開始 ===")
 
-            if self.test_token_with_api():
-                logger.info("新規認証に成功しました")
-                return self.id_token
+        # 共有キャッシュのトークンが期限の手前まで有効ならAPIを呼ばずに使い、
+        # 期限が近い場合のみリフレッシュ・新規認証を行う（ロック内で1プロセスのみ）
+        id_token = self.token_cache.get_id_token(self._refresh_with, self._authenticate)
+        if id_token:
+            self.id_token = id_token
+            self.refresh_token = self.token_cache.refresh_token() or self.refresh_token
+            logger.info("有効なトークンを取得しました")
+            return id_token
 
         logger.error("すべての認証方法が失敗しました")
         return None
@@ -436,9 +412,8 @@ class JQuantsAuthManagerEnhanced:
     def clear_token_cache(self) -> bool:
         """トークンキャッシュをクリア"""
         try:
-            if self.token_cache_file.exists():
-                self.token_cache_file.unlink()
-                logger.info("トークンキャッシュをクリアしました")
+            self.token_cache.clear()
+            logger.info("トークンキャッシュをクリアしました")
             return True
         except Exception as e:
             logger.error(f"トークンキャッシュクリアエラー: {e}")
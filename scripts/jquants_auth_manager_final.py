@@ -5,7 +5,7 @@ IDトークンを環境変数に保存せず、一時保存のみで再認証機
 """
 
 import os
-import json
+import sys
 import requests
 import logging
 import time
@@ -29,6 +29,10 @@ except ImportError:
                     key, value = line.split("=", 1)
                     os.environ[key] = value
 
+# プロジェクトルートをパスに追加
+sys.path.append(str(Path(__file__).parent.parent))
+from core.jquants_client import JQUANTS_BASE_URL, get_shared_session, get_token_cache
+
 # ログ設定
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -49,9 +53,9 @@ class JQuantsAuthManagerFinal:
         self.temp_refresh_token = None
 
         # APIエンドポイント
-        self.auth_url = "https://api.jquants.com/v1/token/auth_user"
-        self.refresh_url = "https://api.jquants.com/v1/token/auth_refresh"
-        self.test_url = "https://api.jquants.com/v1/listed/info"
+        self.auth_url = f"{JQUANTS_BASE_URL}/token/auth_user"
+        self.refresh_url = f"{JQUANTS_BASE_URL}/token/auth_refresh"
+        self.test_url = f"{JQUANTS_BASE_URL}/listed/info"
 
         # トークン有効期限（秒）
         self.token_expiry_buffer = 300  # 5分前から更新
@@ -60,46 +64,28 @@ class JQuantsAuthManagerFinal:
         self.max_retries = 3
         self.retry_delay = 2  # 秒
 
-        # 一時トークンキャッシュファイル（環境変数に保存しない）
-        self.temp_token_cache_file = Path("data/temp_token_cache.json")
-        self.data_dir = Path("data")
-        if not self.data_dir.exists():
-            self.data_dir.mkdir(parents=True, exist_ok=True)
-
-        # セッション管理
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Content-Type": "application/json",
-                "User-Agent": "jQuants-Stock-Prediction/1.0",
-            }
-        )
+        # 一時トークンキャッシュ（環境変数に保存しない）
+        # 他のスクリプト・プロセスと共有し、有効期限内は認証APIを呼ばない
+        self.token_cache = get_token_cache()
+        self.temp_token_cache_file = self.token_cache.cache_file
+
+        # セッション管理（接続プール付きの共有セッション）
+        self.session = get_shared_session()
 
     def load_temp_token_cache(self) -> Optional[Dict[str, Any]]:
         """一時トークンキャッシュを読み込み"""
-        try:
-            if self.temp_token_cache_file.exists():
-                with open(self.temp_token_cache_file, "r", encoding="utf-8") as f:
-                    cache = json.load(f)
-                logger.info("一時トークンキャッシュを読み込みました")
-                return cache
-        except Exception as e:
-            logger.warning(f"一時トークンキャッシュ読み込みエラー: {e}")
+        cache = self.token_cache.load()
+        if cache:
+            logger.info("一時トークンキャッシュを読み込みました")
+            return cache
         return None
 
     def save_temp_token_cache(self, tokens: Dict[str, str]) -> bool:
         """一時トークンキャッシュを保存（環境変数には保存しない）"""
         try:
-            cache_data = {
-                "id_token": tokens.get("id_token", ""),
-                "refresh_token": tokens.get("refresh_token", ""),
-                "cached_at": datetime.now().isoformat(),
-                "expires_at": self._calculate_token_expiry(tokens.get("id_token", "")),
-            }
-
-            with open(self.temp_token_cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-
+            self.token_cache.save(
+                tokens.get("id_token", ""), tokens.get("refresh_token") or None
+            )
             logger.info("一時トークンキャッシュを保存しました")
             return True
         except Exception as e:
@@ -336,49 +322,15 @@ class JQuantsAuthManagerFinal:
         """有効なIDトークンを取得（環境変数に保存せず、一時保存のみ）"""
         logger.info("=== 有効なトークン取得開始（環境変数非依存版） ===")
 
-        # 1. 一時キャッシュからトークンを取得
-        cache = self.load_temp_token_cache()
-        if cache and cache.get("id_token"):
-            self.temp_id_token = cache["id_token"]
-            self.temp_refresh_token = cache.get("refresh_token")
-            logger.info("一時キャッシュからトークンを取得しました")
-
-        # 2. 現在のトークンが有効かチェック
-        if (
-            self.temp_id_token
-            and self.is_token_valid(self.temp_id_token)
-            and self.test_token_with_api(self.temp_id_token)
-        ):
-            logger.info("一時保存されたトークンは有効です")
-            return self.temp_id_token
-
-        # 3. リフレッシュトークンで更新を試行
-        if self.temp_refresh_token:
-            logger.info("リフレッシュトークンで更新を試行...")
-            new_id_token = self.refresh_id_token(self.temp_refresh_token)
-            if new_id_token:
-                self.temp_id_token = new_id_token
-                if self.test_token_with_api(new_id_token):
-                    logger.info("リフレッシュトークンでの更新に成功しました")
-                    # 更新されたトークンを一時キャッシュに保存
-                    self.save_temp_token_cache(
-                        {
-                            "id_token": new_id_token,
-                            "refresh_token": self.temp_refresh_token,
-                        }
-                    )
-                    return new_id_token
-
-        # 4. メールアドレスとパスワードで新規取得
-        logger.info("メールアドレスとパスワードで新規認証を試行...")
-        new_tokens = self.get_new_tokens()
-        if new_tokens:
-            self.temp_id_token = new_tokens["id_token"]
-            self.temp_refresh_token = new_tokens["refresh_token"]
-
-            if self.test_token_with_api(self.temp_id_token):
-                logger.info("新規認証に成功しました")
-                return self.temp_id_token
+        # 1. 一時キャッシュのトークンが期限の手前まで有効ならAPIを呼ばずに使う
+        # 2. 期限が近ければリフレッシュトークンで更新（ロック内で1プロセスのみ）
+        # 3. リフレッシュに失敗したらメールアドレスとパスワードで新規取得
+        id_token = self.token_cache.get_id_token(self.refresh_id_token, self.get_new_tokens)
+        if id_token:
+            self.temp_id_token = id_token
+            self.temp_refresh_token = self.token_cache.refresh_token()
+            logger.info("有効なトークンを取得しました")
+            return id_token
 
         logger.error("すべての認証方法が失敗しました")
         return None
@@ -386,9 +338,10 @@ class JQuantsAuthManagerFinal:
     def clear_temp_token_cache(self) -> bool:
         """一時トークンキャッシュをクリア"""
         try:
-            if self.temp_token_cache_file.exists():
-                self.temp_token_cache_file.unlink()
-                logger.info("一時トークンキャッシュをクリアしました")
+            self.token_cache.clear()
+            self.temp_id_token = None
+            self.temp_refresh_token = None
+            logger.info("一時トークンキャッシュをクリアしました")
             return True
         except Exception as e:
             logger.error(f"一時トークンキャッシュクリアエラー: {e}")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+J-Quants API ローカルリプレイサーバー起動スクリプト
+合成データまたは記録済みレスポンスを返すサーバーを起動する
+
+使用例:
+    python scripts/run_jquants_replay_server.py --port 8765 --latency-ms 50 --throttle-rate 0.05
+    JQUANTS_API_BASE_URL=http://127.0.0.1:8765/v1 python scripts/sync_with_jquants_api.py --test
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.jquants_replay_server import JQuantsReplayServer, ReplayConfig, ReplayDataset
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="J-Quants API ローカルリプレイサーバー")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=8765, help="待ち受けポート")
+    parser.add_argument("--data-dir", type=Path, help="記録済みレスポンスのディレクトリ")
+    parser.add_argument("--symbols", type=int, default=50, help="合成データの銘柄数")
+    parser.add_argument("--days", type=int, default=60, help="合成データの営業日数")
+    parser.add_argument("--start", default="2024-01-04", help="合成データの開始日")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="応答遅延（ミリ秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="応答遅延の揺らぎ（ミリ秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500応答の割合")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="無作為な429応答の割合")
+    parser.add_argument("--rate-limit", type=float, help="秒間リクエスト数の上限（超過は429）")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429応答のRetry-After秒数")
+    parser.add_argument("--page-size", type=int, default=1000, help="1ページの件数")
+    parser.add_argument("--no-auth", action="store_true", help="Authorizationヘッダーを要求しない")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        dataset = ReplayDataset.from_directory(args.data_dir)
+    else:
+        dataset = ReplayDataset.synthetic(args.symbols, args.start, args.days, args.seed)
+
+    config = ReplayConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit_per_second=args.rate_limit,
+        retry_after_seconds=args.retry_after,
+        page_size=args.page_size,
+        require_auth=not args.no_auth,
+        seed=args.seed,
+    )
+    server = JQuantsReplayServer(dataset, config, args.host, args.port, logger)
+    logger.info(
+        f"銘柄数: {len(dataset.listed_info)}, 日足件数: {len(dataset.daily_quotes)}"
+    )
+    logger.info(f"JQUANTS_API_BASE_URL={server.base_url} を設定して各スクリプトを実行してください")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"応答統計: {server.get_stats()}")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
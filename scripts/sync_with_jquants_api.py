@@ -7,11 +7,9 @@ jQuants APIデータと完全同期するスクリプト
 import json
 import os
 import sys
-import requests
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
 import logging
 
 # プロジェクトルートをパスに追加
@@ -21,6 +19,12 @@ sys.path.append(str(project_root))
 # 認証管理クラスのインポート
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from jquants_auth_manager_final import JQuantsAuthManagerFinal
+from core.differential_updater import DifferentialUpdater
+from core.json_data_manager import STORAGE_MODE_SINGLE, STORAGE_MODES
+from core.fetch_planner import FetchPlan, IncrementalFetchPlanner
+from core.jquants_fetch_engine import JQUANTS_BASE_URL, AsyncFetchEngine, FetchRequest
+from core.sync_checkpoint import SyncCheckpointJournal
+from core.trading_calendar import TradingCalendar
 
 # ログ設定
 os.makedirs("logs", exist_ok=True)
@@ -38,8 +42,15 @@ logger = logging.getLogger(__name__)
 class JQuantsAPISyncer:
     """jQuants APIデータ同期クラス"""
 
-    def __init__(self):
+    def __init__(self, storage_mode: str = STORAGE_MODE_SINGLE):
+        """
+        初期化
+
+        Args:
+            storage_mode: 保存先のストレージモード（"single"、"sharded" または "columnar"）
+        """
         self.data_dir = Path("data")
+        self.storage_mode = storage_mode
         self.docs_data_dir = Path("docs/data")
         self.listed_index_file = self.docs_data_dir / "listed_index.json"
 
@@ -52,19 +63,29 @@ class JQuantsAPISyncer:
             raise ValueError("有効なIDトークンの取得に失敗しました")
 
         # API設定
-        self.base_url = "https://api.jquants.com/v1"
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Authorization": f"Bearer {self.id_token}",
-                "Content-Type": "application/json",
-                "User-Agent": "jQuants-Stock-Prediction/1.0",
-            }
-        )
+        self.base_url = JQUANTS_BASE_URL
 
         # レート制限設定
         self.rate_limit_delay = 0.1  # 100ms間隔
         self.max_retries = 3
+        self.max_concurrency = 8
+
+        # 並行取得エンジン（トークンバケットで rate_limit_delay 相当のレートに制御）
+        self.fetch_engine = AsyncFetchEngine(
+            id_token=self.id_token,
+            base_url=self.base_url,
+            rate_per_second=1 / self.rate_limit_delay,
+            max_concurrency=self.max_concurrency,
+            max_retries=self.max_retries,
+            logger=logger,
+        )
+        self.session = self.fetch_engine.session
+        self.differential_updater = None
+        self.trading_calendar = None
+
+        # チェックポイント（停止時に完了済み銘柄から再開する）
+        self.checkpoint_dir = self.data_dir / "checkpoints"
+        self.checkpoint_chunk_size = 200
 
     def load_listed_index(self) -> Dict[str, Any]:
         """listed_index.jsonを読み込み"""
@@ -79,82 +100,267 @@ class JQuantsAPISyncer:
             logger.error(f"listed_index.json読み込みエラー: {e}")
             return {}
 
-    def get_stock_prices_from_api(
-        self, code: str, days: int = 30
-    ) -> List[Dict[str, Any]]:
-        """jQuants APIから実際の株価データを取得"""
-        try:
-            # 日付範囲の計算
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
+    @staticmethod
+    def _date_range(days: int) -> Tuple[str, str]:
+        """取得期間（開始日, 終了日）"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _format_quotes(code: str, quotes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """APIの四本値をデータ形式に統一"""
+        formatted_quotes = []
+        for quote in quotes:
+            formatted_quote = {
+                "date": quote.get("Date", ""),
+                "code": quote.get("Code", code),
+                "open": float(quote.get("Open", 0)),
+                "high": float(quote.get("High", 0)),
+                "low": float(quote.get("Low", 0)),
+                "close": float(quote.get("Close", 0)),
+                "volume": int(quote.get("Volume", 0)),
+            }
+            formatted_quotes.append(formatted_quote)
+        return formatted_quotes
+
+    def _convert_batch(self, quotes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """四本値バッチの変換・検証（日付・終値がない行、数値変換できない行は除外）"""
+        converted = []
+        for quote in quotes:
+            code = str(quote.get("Code", ""))
+            if not code or not quote.get("Date") or quote.get("Close") is None:
+                continue
+            try:
+                converted.extend(self._format_quotes(code, [quote]))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"銘柄 {code} ({quote.get('Date')}) の日足変換エラー: {e}")
+        return converted
+
+    def iter_daily_quotes(
+        self, params: Dict[str, Any], batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        daily_quotes を逐次取得・変換して日足を1件ずつ返す
+
+        pagination_key を辿りながらレスポンスを逐次パースし、batch_size 件ごとに
+        変換・検証するため、期間や銘柄数に関わらず保持するのは1バッチ分のみ
+
+        Raises:
+            IOError: ページの取得に失敗した場合
+        """
+        for batch in self.fetch_engine.iter_batches(
+            "/prices/daily_quotes", params, "daily_quotes", batch_size=batch_size
+        ):
+            yield from self._convert_batch(batch)
+
+    def _iter_window_bars(
+        self,
+        windows: Iterable[Tuple[str, Dict[str, Any]]],
+        batch_size: int,
+        failed_codes: List[str],
+        last_dates: Dict[str, str],
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        銘柄ごとの取得期間を順に逐次取得し、日足を1件ずつ返す
+
+        取得に失敗した銘柄は failed_codes へ、取得できた銘柄の最終日付は
+        last_dates へ記録する
+        """
+        for code, params in windows:
+            try:
+                for bar in self.iter_daily_quotes(params, batch_size):
+                    last_dates[code] = max(last_dates.get(code, ""), bar["date"])
+                    yield bar
+            except IOError as e:
+                logger.warning(f"銘柄 {code} のAPIデータ取得失敗: {e}")
+                failed_codes.append(code)
+
+    def ingest_stock_prices(
+        self, codes: List[str], days: int = 30, batch_size: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        銘柄別の株価データを逐次取得しながらストレージへ書き込む（過去分の取得用）
+
+        Args:
+            codes: 銘柄コードのリスト
+            days: 取得日数
+            batch_size: 変換・検証の単位となる件数
+
+        Returns:
+            Dict[str, Any]: 取り込み結果のサマリー（failed_codes・銘柄ごとの last_dates を含む）
+        """
+        start_str, end_str = self._date_range(days)
+        windows = (
+            (code, {"code": code, "from": start_str, "to": end_str}) for code in codes
+        )
+        failed_codes: List[str] = []
+        last_dates: Dict[str, str] = {}
 
-            start_str = start_date.strftime("%Y-%m-%d")
-            end_str = end_date.strftime("%Y-%m-%d")
+        summary = self._get_differential_updater().ingest(
+            self._iter_window_bars(windows, batch_size, failed_codes, last_dates),
+            source="jquants_api",
+            chunk_size=batch_size,
+        )
+        summary["failed_codes"] = failed_codes
+        summary["last_dates"] = last_dates
+        return summary
+
+    def _get_differential_updater(self) -> DifferentialUpdater:
+        """storage_mode のストレージへの書き込みに使う DifferentialUpdater"""
+        if self.differential_updater is None:
+            self.differential_updater = DifferentialUpdater(
+                str(self.data_dir), logger, storage_mode=self.storage_mode
+            )
+        return self.differential_updater
+
+    def fetch_stock_prices_concurrently(
+        self, codes: List[str], days: int = 30
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """複数銘柄の株価データを並行取得（取得できなかった銘柄は空リスト）"""
+        start_str, end_str = self._date_range(days)
+        fetch_requests = [
+            FetchRequest(
+                key=code,
+                path="/prices/daily_quotes",
+                params={"code": code, "from": start_str, "to": end_str},
+            )
+            for code in codes
+        ]
+        responses = self.fetch_engine.run_many(fetch_requests)
 
-            logger.info(f"銘柄 {code} のAPIデータ取得中 ({start_str} - {end_str})")
+        results = {}
+        for code in codes:
+            data = responses.get(code)
+            try:
+                quotes = data.get("daily_quotes", []) if data else []
+                results[code] = self._format_quotes(code, quotes)
+            except (TypeError, ValueError) as e:
+                logger.error(f"銘柄 {code} のAPIデータ変換エラー: {e}")
+                results[code] = []
+        return results
+
+    def _get_checkpoint_journal(self, worker_index: int = 0) -> SyncCheckpointJournal:
+        """全銘柄同期のチェックポイントジャーナル"""
+        return SyncCheckpointJournal(
+            self.checkpoint_dir, "sync_stock_data", worker_id=str(worker_index), logger=logger
+        )
 
-            url = f"{self.base_url}/prices/daily_quotes"
+    def _store_code_results(
+        self,
+        journal: SyncCheckpointJournal,
+        codes: List[str],
+        days: int,
+        batch_size: int = 1000,
+    ):
+        """
+        並列ワーカー用: 銘柄ごとに逐次取得した日足を取得結果としてジャーナルへ保存
+
+        共有ストレージへの同時書き込みを避けるため、ストレージへの取り込みは
+        集約実行（_ingest_stored_results）で行う
+        """
+        start_str, end_str = self._date_range(days)
+        for code in codes:
             params = {"code": code, "from": start_str, "to": end_str}
+            try:
+                api_data = list(self.iter_daily_quotes(params, batch_size))
+            except IOError as e:
+                logger.warning(f"銘柄 {code} のAPIデータ取得失敗: {e}")
+                api_data = []
+            if api_data:
+                journal.save_result(code, api_data)
+                journal.mark_done(code, max(bar["date"] for bar in api_data), end_str)
+            else:
+                journal.mark_failed(code, "APIデータ取得失敗")
+
+    def _ingest_stored_results(
+        self, journal: SyncCheckpointJournal, codes: List[str]
+    ) -> Dict[str, Any]:
+        """並列ワーカーが保存した取得結果を銘柄ごとに逐次ストレージへ取り込み、取り込み後に削除"""
+        targets = set(codes)
+        stored = [code for code in journal.stored_results() if code in targets]
+        if not stored:
+            return {"added": 0, "updated": 0}
+
+        def bars() -> Iterator[Dict[str, Any]]:
+            for code in stored:
+                yield from journal.load_result(code) or []
+
+        logger.info(f"並列ワーカーの取得結果を取り込み: {len(stored)}銘柄")
+        summary = self._get_differential_updater().ingest(bars(), source="jquants_api")
+        if summary["success"]:
+            for code in stored:
+                journal.discard_result(code)
+        return summary
+
+    def _sync_pending_codes(
+        self,
+        journal: SyncCheckpointJournal,
+        codes: List[str],
+        days: int = 30,
+        store_results: bool = False,
+    ) -> Dict[str, int]:
+        """
+        未同期の銘柄をチャンク単位で逐次取得し、銘柄ごとに完了をジャーナルへ記録
+
+        単独実行ではチャンクごとにストレージへ取り込んでから完了を記録する。
+        store_results=True（並列ワーカー）では取得結果をジャーナルへ保存する
+
+        Returns:
+            Dict[str, int]: スキップ（同期済み）銘柄数・追加件数・更新件数
+        """
+        _, end_str = self._date_range(days)
+        pending = journal.pending(codes, end_str)
+        counts = {"skipped": len(codes) - len(pending), "added": 0, "updated": 0}
+        if counts["skipped"]:
+            logger.info(
+                f"チェックポイントから再開: {counts['skipped']}銘柄は同期済みのためスキップ"
+            )
 
-            # リトライ機能付きAPI呼び出し
-            for attempt in range(self.max_retries):
-                try:
-                    response = self.session.get(url, params=params, timeout=30)
-
-                    if response.status_code == 200:
-                        data = response.json()
-                        quotes = data.get("daily_quotes", [])
-
-                        # データ形式を統一
-                        formatted_quotes = []
-                        for quote in quotes:
-                            formatted_quote = {
-                                "date": quote.get("Date", ""),
-                                "code": quote.get("Code", code),
-                                "open": float(quote.get("Open", 0)),
-                                "high": float(quote.get("High", 0)),
-                                "low": float(quote.get("Low", 0)),
-                                "close": float(quote.get("Close", 0)),
-                                "volume": int(quote.get("Volume", 0)),
-                            }
-                            formatted_quotes.append(formatted_quote)
-
-                        logger.info(
-                            f"銘柄 {code} のAPIデータ取得成功: {len(formatted_quotes)}件"
-                        )
-                        return formatted_quotes
-
-                    elif response.status_code == 429:  # レート制限
-                        wait_time = 2**attempt
-                        logger.warning(f"レート制限エラー、{wait_time}秒待機...")
-                        time.sleep(wait_time)
-                        continue
-
+        # チャンク単位で取得・記録し、途中で停止しても取得済み分は失わない
+        for start in range(0, len(pending), self.checkpoint_chunk_size):
+            chunk = pending[start : start + self.checkpoint_chunk_size]
+            if store_results:
+                self._store_code_results(journal, chunk, days)
+            else:
+                summary = self.ingest_stock_prices(chunk, days)
+                counts["added"] += summary["added"]
+                counts["updated"] += summary["updated"]
+                # 取り込みに失敗したチャンクは再実行時に取得し直す
+                failed = set(summary["failed_codes"]) if summary["success"] else set(chunk)
+                for code in chunk:
+                    last_date = summary["last_dates"].get(code)
+                    if code in failed or not last_date:
+                        journal.mark_failed(code, "APIデータ取得失敗")
                     else:
-                        logger.warning(
-                            f"API呼び出しエラー: HTTP {response.status_code}"
-                        )
-                        if attempt == self.max_retries - 1:
-                            return []
-                        continue
-
-                except requests.exceptions.RequestException as e:
-                    logger.warning(
-                        f"API呼び出しエラー (試行 {attempt + 1}/{self.max_retries}): {e}"
-                    )
-                    if attempt == self.max_retries - 1:
-                        return []
-                    time.sleep(1)
-                    continue
-
-            return []
-
-        except Exception as e:
-            logger.error(f"銘柄 {code} のAPIデータ取得エラー: {e}")
-            return []
-
-    def sync_stock_data(self, max_stocks: int = None) -> Dict[str, Any]:
-        """jQuants APIデータと同期"""
+                        journal.mark_done(code, last_date, end_str)
+            logger.info(
+                f"チェックポイント記録: {min(start + len(chunk), len(pending))}/{len(pending)}銘柄"
+            )
+        return counts
+
+    def sync_stock_data(
+        self,
+        max_stocks: int = None,
+        worker_index: int = 0,
+        worker_count: int = 1,
+        resume: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        jQuants APIデータと同期
+
+        銘柄ごとの日足を逐次取得しながらストレージへ取り込むため、全銘柄分の
+        データをメモリ上に保持しない
+
+        Args:
+            max_stocks: 処理する最大銘柄数
+            worker_index: 並列実行時のワーカー番号（0始まり）
+            worker_count: 並列実行時のワーカー数（銘柄を重複のない範囲に分割）
+            resume: チェックポイントから再開する（False で全銘柄を取得し直す）
+
+        Returns:
+            Dict[str, Any]: 同期結果のサマリー（synced・failed_codes など）
+        """
         logger.info("=== jQuants APIデータ同期開始 ===")
 
         # listed_index.jsonを読み込み
@@ -172,90 +378,214 @@ class JQuantsAPISyncer:
             stocks = stocks[:max_stocks]
             logger.info(f"最大銘柄数制限: {max_stocks}")
 
-        synced_data = {}
-        processed_count = 0
-        error_count = 0
-        api_success_count = 0
+        # 並列ワーカーは重複のない連続範囲を担当
+        if worker_count > 1:
+            stocks = SyncCheckpointJournal.partition(stocks, worker_index, worker_count)
+            logger.info(f"ワーカー {worker_index + 1}/{worker_count}: {len(stocks)}銘柄を担当")
+
+        journal = self._get_checkpoint_journal(worker_index)
+        if not resume:
+            # 単独実行では他ワーカーの記録も含めて破棄し、全銘柄を取得し直す
+            journal.reset(all_workers=worker_count == 1)
+        journal.compact()
+
+        codes = [stock.get("code", "") for stock in stocks if stock.get("code", "")]
+        if len(codes) < len(stocks):
+            logger.warning(f"銘柄コードが空の銘柄: {len(stocks) - len(codes)}件")
+
+        # 単独実行（集約実行）では並列ワーカーの取得結果を先に取り込む
+        stored = {"added": 0, "updated": 0}
+        if worker_count == 1:
+            stored = self._ingest_stored_results(journal, codes)
+
+        # jQuants APIから未同期銘柄の実際のデータを逐次取得（レート制限はエンジン側で制御）
+        counts = self._sync_pending_codes(
+            journal, codes, store_results=worker_count > 1
+        )
+        logger.info(f"逐次取得完了: {self.fetch_engine.get_stats()}")
+
+        _, end_str = self._date_range(days=30)
+        synced = [code for code in codes if journal.is_current(code, end_str)]
+        synced_set = set(synced)
+        failed_codes = [code for code in codes if code not in synced_set]
+        summary = {
+            "success": not failed_codes,
+            "processed": len(codes),
+            "synced": synced,
+            "failed_codes": failed_codes,
+            "skipped": counts["skipped"],
+            "added": counts["added"] + stored["added"],
+            "updated": counts["updated"] + stored["updated"],
+        }
 
-        for i, stock in enumerate(stocks):
-            code = stock.get("code", "")
-            name = stock.get("name", "")
+        logger.info("=== API同期完了 ===")
+        logger.info(f"処理済み銘柄数: {summary['processed']}")
+        logger.info(f"同期済み銘柄数: {len(synced)}")
+        logger.info(f"エラー数: {len(failed_codes)}")
+        logger.info(f"チェックポイントによるスキップ数: {summary['skipped']}")
+        logger.info(f"追加 {summary['added']} / 更新 {summary['updated']}")
+
+        return summary
+
+    def _get_trading_calendar(self) -> TradingCalendar:
+        """取引カレンダー（キャッシュ範囲外は /markets/trading_calendar から取得）"""
+        if self.trading_calendar is None:
+            self.trading_calendar = TradingCalendar(
+                self.data_dir / "trading_calendar.json",
+                fetcher=lambda date_from, date_to: self.fetch_engine.run_all_pages(
+                    "/markets/trading_calendar",
+                    {"from": date_from, "to": date_to},
+                    "trading_calendar",
+                ),
+                logger=logger,
+            )
+        return self.trading_calendar
+
+    def plan_incremental_fetch(
+        self, codes: List[str], days: int = 30, as_of=None
+    ) -> FetchPlan:
+        """
+        保存済みの最終日付から銘柄ごとの不足期間を求める
+
+        Args:
+            codes: 銘柄コードのリスト
+            days: 保存データがない銘柄の取得日数
+            as_of: 基準日（省略時は本日）
+        """
+        last_dates = self._get_differential_updater().json_manager.get_last_dates(codes)
+        planner = IncrementalFetchPlanner(
+            self._get_trading_calendar(), initial_days=days, logger=logger
+        )
+        return planner.plan(last_dates, as_of)
+
+    def sync_incremental(
+        self, max_stocks: int = None, days: int = 30, as_of=None
+    ) -> Dict[str, Any]:
+        """
+        不足期間のみを取得してストレージへ追記する増分同期
+
+        最新営業日まで保存済みの銘柄はリクエストしない。休業日は取引カレンダーで
+        判定するため、週末・祝日明けにも不要な再取得は発生しない
+
+        Args:
+            max_stocks: 処理する最大銘柄数
+            days: 保存データがない銘柄の取得日数
+            as_of: 基準日（省略時は本日）
+
+        Returns:
+            Dict[str, Any]: 取り込み結果のサマリー
+        """
+        logger.info("=== jQuants API増分同期開始 ===")
+        stocks = self.load_listed_index().get("stocks", [])
+        if max_stocks:
+            stocks = stocks[:max_stocks]
+        codes = [stock.get("code", "") for stock in stocks if stock.get("code", "")]
 
-            if not code:
-                logger.warning("銘柄コードが空です")
-                continue
+        plan = self.plan_incremental_fetch(codes, days, as_of)
+        windows = ((window.code, window.params) for window in plan.windows)
+        failed_codes: List[str] = []
 
-            try:
-                # jQuants APIから実際のデータを取得
-                api_data = self.get_stock_prices_from_api(code)
-
-                if api_data:
-                    synced_data[code] = api_data
-                    api_success_count += 1
-                    logger.info(
-                        f"銘柄 {code} ({name}) のAPIデータ同期成功: {len(api_data)}件"
-                    )
-                else:
-                    # APIデータが取得できない場合は、既存のサンプルデータを使用
-                    logger.warning(
-                        f"銘柄 {code} ({name}) のAPIデータ取得失敗、スキップ"
-                    )
-                    error_count += 1
-
-                processed_count += 1
-
-                # レート制限対応
-                time.sleep(self.rate_limit_delay)
-
-                # 進捗表示
-                if processed_count % 50 == 0:
-                    logger.info(
-                        f"進捗: {processed_count}/{len(stocks)}銘柄処理完了 (API成功: {api_success_count})"
-                    )
-
-            except Exception as e:
-                logger.error(f"銘柄 {code} の処理エラー: {e}")
-                error_count += 1
-                continue
-
-        logger.info("=== API同期完了 ===")
-        logger.info(f"処理済み銘柄数: {processed_count}")
-        logger.info(f"API成功銘柄数: {api_success_count}")
-        logger.info(f"エラー数: {error_count}")
-        logger.info(f"同期後データ銘柄数: {len(synced_data)}")
+        summary = self._get_differential_updater().ingest(
+            self._iter_window_bars(windows, 1000, failed_codes, {}),
+            source="jquants_api",
+        )
+        summary["target_date"] = plan.target_date
+        summary["requested"] = len(plan.windows)
+        summary["up_to_date"] = len(plan.up_to_date)
+        summary["failed_codes"] = failed_codes
+        if failed_codes:
+            summary["success"] = False
+
+        logger.info(
+            f"=== 増分同期完了: 取得 {summary['requested']}銘柄 / "
+            f"最新のためスキップ {summary['up_to_date']}銘柄 "
+            f"(追加 {summary['added']} / 更新 {summary['updated']}) ==="
+        )
+        return summary
 
-        return synced_data
+    def fetch_daily_quotes_by_date(self, date: str) -> Optional[List[Dict[str, Any]]]:
+        """指定営業日の全上場銘柄の日足を一括取得（pagination_key を辿る）"""
+        logger.info(f"{date} の全銘柄日足を一括取得中")
+        quotes = self.fetch_engine.run_all_pages(
+            "/prices/daily_quotes", {"date": date}, "daily_quotes"
+        )
+        if quotes is None:
+            logger.error(f"{date} の日足一括取得に失敗しました")
+        else:
+            logger.info(f"{date} の日足一括取得完了: {len(quotes)}件")
+        return quotes
+
+    def _iter_bulk_bars(
+        self, dates: List[str], codes: Optional[Set[str]], failed_dates: List[str]
+    ) -> Iterator[Dict[str, Any]]:
+        """営業日ごとの一括取得結果を銘柄別の日足として逐次返す"""
+        for date in dates:
+            logger.info(f"{date} の全銘柄日足を一括取得中")
+            try:
+                for bar in self.iter_daily_quotes({"date": date}):
+                    if codes is None or bar["code"] in codes:
+                        yield bar
+            except IOError as e:
+                logger.error(f"{date} の日足一括取得に失敗しました: {e}")
+                failed_dates.append(date)
+
+    def sync_by_date(
+        self, dates: List[str], listed_only: bool = True
+    ) -> Dict[str, Any]:
+        """
+        営業日単位の一括同期（日次更新用）
+
+        /prices/daily_quotes を date 指定で呼び出し、1営業日の全銘柄分を
+        ページングで取得して DifferentialUpdater で銘柄ごとに振り分けて保存する。
+        銘柄ごとの呼び出しは過去分の取得（sync_stock_data）にのみ使用する
+
+        Args:
+            dates: 対象営業日（YYYY-MM-DD）のリスト
+            listed_only: listed_index.json に含まれる銘柄のみ保存する
+
+        Returns:
+            Dict[str, Any]: 取り込み結果のサマリー
+        """
+        logger.info(f"=== 営業日単位の一括同期開始: {dates} ===")
+
+        codes = None
+        if listed_only:
+            stocks = self.load_listed_index().get("stocks", [])
+            codes = {str(stock["code"]) for stock in stocks if stock.get("code")}
+            if not codes:
+                logger.warning("listed_index.jsonが空のため全銘柄を対象にします")
+                codes = None
+
+        failed_dates: List[str] = []
+        summary = self._get_differential_updater().ingest(
+            self._iter_bulk_bars(dates, codes, failed_dates), source="jquants_bulk"
+        )
+        summary["dates"] = list(dates)
+        summary["failed_dates"] = failed_dates
+        if failed_dates:
+            summary["success"] = False
+
+        logger.info(
+            f"=== 一括同期完了: {summary['symbols']}銘柄 "
+            f"(追加 {summary['added']} / 更新 {summary['updated']}) ==="
+        )
+        return summary
 
-    def save_synced_data(self, data: Dict[str, Any]):
-        """同期されたデータを保存"""
+    def save_sync_metadata(self, summary: Dict[str, Any]):
+        """同期結果のメタデータを保存（株価データは同期中にストレージへ取り込み済み）"""
         try:
-            # バックアップを作成
-            original_file = self.data_dir / "stock_data.json"
-            if original_file.exists():
-                backup_file = (
-                    self.data_dir
-                    / f"stock_data_api_sync_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                )
-                original_file.rename(backup_file)
-                logger.info(f"バックアップファイル作成: {backup_file}")
-
-            # 同期されたデータを保存
-            with open(original_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"jQuants API同期データを保存: {original_file}")
-
-            # メタデータを保存
             metadata = {
                 "generated_at": datetime.now().isoformat(),
                 "version": "3.0",
-                "total_stocks": len(data),
+                "total_stocks": len(summary.get("synced", [])),
+                "failed_stocks": len(summary.get("failed_codes", [])),
                 "data_type": "jquants_api_synced",
                 "description": "jQuants APIから取得した実際の株価データ",
                 "api_sync": True,
                 "data_source": "jquants_api",
             }
 
+            self.data_dir.mkdir(parents=True, exist_ok=True)
             metadata_file = self.data_dir / "stock_data_metadata.json"
             with open(metadata_file, "w", encoding="utf-8") as f:
                 json.dump(metadata, f, ensure_ascii=False, indent=2)
@@ -263,21 +593,36 @@ class JQuantsAPISyncer:
             logger.info(f"メタデータファイル保存: {metadata_file}")
 
         except Exception as e:
-            logger.error(f"データ保存エラー: {e}")
+            logger.error(f"メタデータ保存エラー: {e}")
             raise
 
-    def run_sync(self, max_stocks: int = None):
+    def run_sync(
+        self,
+        max_stocks: int = None,
+        worker_index: int = 0,
+        worker_count: int = 1,
+        resume: bool = True,
+    ):
         """API同期処理を実行"""
         try:
             # jQuants APIデータと同期
-            synced_data = self.sync_stock_data(max_stocks)
+            summary = self.sync_stock_data(
+                max_stocks, worker_index, worker_count, resume
+            )
 
-            if not synced_data:
-                logger.error("同期されたデータが生成されませんでした")
+            if not summary.get("synced"):
+                logger.error("同期されたデータがありません")
                 return False
 
-            # データを保存
-            self.save_synced_data(synced_data)
+            if worker_count > 1:
+                # 各ワーカーは担当範囲の取得結果をチェックポイントに記録するのみ。
+                # 全ワーカー完了後に --worker-count 1 で再実行すると、
+                # 同期済み銘柄をスキップして取得結果をストレージへ取り込む
+                logger.info("ワーカー担当分の同期完了（取り込みは集約実行で行います）")
+                return True
+
+            # メタデータを保存
+            self.save_sync_metadata(summary)
 
             logger.info("=== jQuants APIデータ同期完了 ===")
             return True
@@ -296,6 +641,40 @@ def main():
     parser.add_argument(
         "--test", action="store_true", help="テストモード（5銘柄のみ処理）"
     )
+    parser.add_argument(
+        "--date",
+        action="append",
+        help="営業日単位の一括同期を行う日付（YYYY-MM-DD、複数指定可）",
+    )
+    parser.add_argument(
+        "--bulk", action="store_true", help="本日分を営業日単位で一括同期"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="保存済みの最終日付以降の不足期間のみを取得してストレージへ追記",
+    )
+    parser.add_argument(
+        "--worker-index", type=int, default=0, help="並列実行時のワーカー番号（0始まり）"
+    )
+    parser.add_argument(
+        "--worker-count", type=int, default=1, help="並列実行時のワーカー数"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help=(
+            "チェックポイントを破棄して全銘柄を取得し直す"
+            "（並列実行時は担当ワーカー分のみ破棄）"
+        ),
+    )
+
+    parser.add_argument(
+        "--storage-mode",
+        choices=STORAGE_MODES,
+        default=STORAGE_MODE_SINGLE,
+        help="保存先のストレージモード（sharded/columnar は銘柄ごとのファイルに保存）",
+    )
 
     args = parser.parse_args()
 
@@ -303,8 +682,19 @@ def main():
     max_stocks = 5 if args.test else args.max_stocks
 
     try:
-        syncer = JQuantsAPISyncer()
-        success = syncer.run_sync(max_stocks)
+        syncer = JQuantsAPISyncer(storage_mode=args.storage_mode)
+        if args.date or args.bulk:
+            dates = args.date or [datetime.now().strftime("%Y-%m-%d")]
+            success = syncer.sync_by_date(dates).get("success", False)
+        elif args.incremental:
+            success = syncer.sync_incremental(max_stocks).get("success", False)
+        else:
+            success = syncer.run_sync(
+                max_stocks,
+                worker_index=args.worker_index,
+                worker_count=args.worker_count,
+                resume=not args.no_resume,
+            )
 
         if success:
             print("✅ jQuants APIデータ同期が完了しました")
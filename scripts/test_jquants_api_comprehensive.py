@@ -12,6 +12,9 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+# JQUANTS_API_BASE_URL でローカルのリプレイサーバーに向け先を切り替えられる
+BASE_URL = os.getenv("JQUANTS_API_BASE_URL", "https://api.jquants.com/v1")
+
 
 def load_env():
     """環境変数を読み込み"""
@@ -99,7 +102,7 @@ def test_id_token_validity(id_token=None):
         }
 
         # 簡単なAPI呼び出しでトークンの有効性をテスト
-        test_url = "https://api.jquants.com/v1/listed/info"
+        test_url = f"{BASE_URL}/listed/info"
         response = requests.get(test_url, headers=headers, timeout=10)
 
         if response.status_code == 200:
@@ -117,7 +120,7 @@ def perform_email_password_auth(email, password):
     """メール/パスワード認証を実行"""
     try:
         print("1. 認証リクエスト送信...")
-        auth_url = "https://api.jquants.com/v1/token/auth_user"
+        auth_url = f"{BASE_URL}/token/auth_user"
         auth_data = {"mailaddress": email, "password": password}
 
         response = requests.post(auth_url, json=auth_data, timeout=30)
@@ -133,7 +136,7 @@ def perform_email_password_auth(email, password):
 
                 # ステップ2: IDトークン取得
                 print("\n2. IDトークン取得...")
-                refresh_url = f"https://api.jquants.com/v1/token/auth_refresh?refreshtoken={refresh_token}"
+                refresh_url = f"{BASE_URL}/token/auth_refresh?refreshtoken={refresh_token}"
 
                 refresh_response = requests.post(refresh_url, timeout=30)
                 print(f"IDトークン取得レスポンス: {refresh_response.status_code}")
@@ -211,7 +214,7 @@ def test_api_endpoints():
         print("❌ IDトークンが提供されていません")
         assert False
 
-    base_url = "https://api.jquants.com/v1"
+    base_url = BASE_URL
     headers = {
         "Authorization": f"Bearer {id_token}",
         "Content-Type": "application/json",
@@ -312,7 +315,7 @@ def test_data_endpoints():
         print("❌ IDトークンが提供されていません")
         assert False
 
-    base_url = "https://api.jquants.com/v1"
+    base_url = BASE_URL
     headers = {
         "Authorization": f"Bearer {id_token}",
         "Content-Type": "application/json",
@@ -395,7 +398,7 @@ def test_rate_limits():
         print("❌ IDトークンが提供されていません")
         assert False
 
-    base_url = "https://api.jquants.com/v1"
+    base_url = BASE_URL
     headers = {
         "Authorization": f"Bearer {id_token}",
         "Content-Type": "application/json",
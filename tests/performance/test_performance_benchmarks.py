@@ -324,6 +324,122 @@ class TestPerformanceBenchmarks:
                 processing_time < 2.0
             ), f"ネットワーク処理時間が長すぎます: {processing_time:.3f}秒"
 
+    def test_replay_server_fetch_throughput(self):
+        """リプレイサーバーに対する並行取得スループットのテスト"""
+        import requests
+        from core.jquants_fetch_engine import AsyncFetchEngine, FetchRequest
+        from core.jquants_replay_server import (
+            JQuantsReplayServer,
+            ReplayConfig,
+            ReplayDataset,
+        )
+
+        dataset = ReplayDataset.synthetic(symbols=40, trading_days=20)
+        codes = [item["Code"] for item in dataset.listed_info]
+        # 1リクエスト50msの応答遅延
+        config = ReplayConfig(latency_ms=50)
+        with JQuantsReplayServer(dataset, config) as server:
+            engine = AsyncFetchEngine(
+                id_token="token",
+                base_url=server.base_url,
+                rate_per_second=1000.0,
+                burst=100,
+                max_concurrency=8,
+                session=requests.Session(),
+            )
+            start_time = time.time()
+            results = engine.run_many(
+                FetchRequest(code, "/prices/daily_quotes", {"code": code}) for code in codes
+            )
+            processing_time = time.time() - start_time
+
+        assert all(results.values())
+        # 逐次取得なら2秒（40 x 50ms）かかる処理を並行取得で1秒以内
+        assert processing_time < 1.0, f"取得時間が長すぎます: {processing_time:.3f}秒"
+
+    def test_vectorized_obv_benchmark(self):
+        """OBV のベクトル化前後のマイクロベンチマーク"""
+        import numpy as np
+        import pandas as pd
+        from core.technical_analysis import TechnicalAnalysis, calculate_technical_indicators
+
+        # 約10年分の日足
+        length = 2500
+        rng = np.random.default_rng(0)
+        close = pd.Series(1000 + rng.normal(0, 5, length).cumsum())
+        volume = pd.Series(rng.integers(1_000, 100_000, length).astype(float))
+
+        def loop_obv():
+            obv = pd.Series(index=close.index, dtype=float)
+            obv.iloc[0] = volume.iloc[0]
+            for i in range(1, len(close)):
+                if close.iloc[i] > close.iloc[i - 1]:
+                    obv.iloc[i] = obv.iloc[i - 1] + volume.iloc[i]
+                elif close.iloc[i] < close.iloc[i - 1]:
+                    obv.iloc[i] = obv.iloc[i - 1] - volume.iloc[i]
+                else:
+                    obv.iloc[i] = obv.iloc[i - 1]
+            return obv
+
+        start_time = time.perf_counter()
+        expected = loop_obv()
+        loop_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for _ in range(10):
+            result = TechnicalAnalysis.obv(close, volume)
+        vectorized_time = (time.perf_counter() - start_time) / 10
+
+        assert result.tolist() == expected.tolist()
+        # ベクトル化実装はループ実装の1/20以下
+        assert (
+            vectorized_time * 20 < loop_time
+        ), f"OBV {vectorized_time * 1000:.2f}ms / ループ {loop_time * 1000:.2f}ms"
+
+        df = pd.DataFrame(
+            {"high": close + 5, "low": close - 5, "close": close, "volume": volume}
+        )
+        start_time = time.perf_counter()
+        calculate_technical_indicators(df)
+        indicators_time = time.perf_counter() - start_time
+        # 全指標の一括計算も、ループ実装の OBV 単体より速い
+        assert indicators_time < loop_time, f"一括計算: {indicators_time:.3f}秒"
+
+    def test_panel_indicator_benchmark(self):
+        """複数銘柄の一括計算と銘柄ごとの計算の比較"""
+        import numpy as np
+        import pandas as pd
+        from core.indicator_panel import calculate_long_panel_indicators
+        from core.technical_analysis import calculate_technical_indicators
+
+        symbols, days = 300, 500
+        rng = np.random.default_rng(0)
+        close = 1000 + rng.normal(0, 5, (days, symbols)).cumsum(axis=0)
+        prices = pd.DataFrame(
+            {
+                "code": np.tile([f"{1300 + i}" for i in range(symbols)], days),
+                "date": np.repeat(pd.bdate_range("2022-01-03", periods=days), symbols),
+                "close": close.ravel(),
+                "high": close.ravel() + 5,
+                "low": close.ravel() - 5,
+                "volume": rng.integers(1_000, 100_000, days * symbols).astype(float),
+            }
+        )
+
+        start_time = time.perf_counter()
+        calculate_long_panel_indicators(prices)
+        panel_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for _, rows in prices.groupby("code"):
+            calculate_technical_indicators(rows)
+        per_symbol_time = time.perf_counter() - start_time
+
+        # 一括計算は銘柄ごとの計算の1/3以下
+        assert (
+            panel_time * 3 < per_symbol_time
+        ), f"一括 {panel_time:.3f}秒 / 銘柄ごと {per_symbol_time:.3f}秒"
+
     def test_database_operation_performance(self):
         """データベース操作のパフォーマンステスト"""
         with patch("builtins.open", mock_open()) as mock_file:
@@ -277,7 +277,7 @@ class TestAutomatedScheduler:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_api_call_success(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -309,7 +309,7 @@ class TestAutomatedScheduler:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_api_call_failure(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -340,7 +340,7 @@ class TestAutomatedScheduler:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_api_call_timeout(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -446,7 +446,7 @@ class TestAutomatedScheduler:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_slack_notification_success(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -186,7 +186,7 @@ class TestAutomatedSchedulerComprehensive:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_api_call_with_job_id(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -223,7 +223,7 @@ class TestAutomatedSchedulerComprehensive:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_api_call_direct_result(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -255,7 +255,7 @@ class TestAutomatedSchedulerComprehensive:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_api_call_404_error(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -286,7 +286,7 @@ class TestAutomatedSchedulerComprehensive:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_api_call_connection_error(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -315,7 +315,7 @@ class TestAutomatedSchedulerComprehensive:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_api_call_timeout_error(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -346,7 +346,7 @@ class TestAutomatedSchedulerComprehensive:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.get")
+    @patch("requests.Session.get")
     @patch("automated_scheduler.time.sleep")
     def test_wait_for_job_completion_running(
         self, mock_sleep, mock_get, mock_error_handler, mock_logging, mock_config
@@ -379,7 +379,7 @@ class TestAutomatedSchedulerComprehensive:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.get")
+    @patch("requests.Session.get")
     @patch("automated_scheduler.time.sleep")
     def test_wait_for_job_completion_queued(
         self, mock_sleep, mock_get, mock_error_handler, mock_logging, mock_config
@@ -551,7 +551,7 @@ class TestAutomatedSchedulerComprehensive:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_slack_notification_exception(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
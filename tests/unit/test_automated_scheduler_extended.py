@@ -283,7 +283,7 @@ class TestAutomatedSchedulerExtended:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.get")
+    @patch("requests.Session.get")
     def test_wait_for_job_completion_success(
         self, mock_get, mock_error_handler, mock_logging, mock_config
     ):
@@ -321,7 +321,7 @@ class TestAutomatedSchedulerExtended:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.get")
+    @patch("requests.Session.get")
     def test_wait_for_job_completion_failed(
         self, mock_get, mock_error_handler, mock_logging, mock_config
     ):
@@ -353,7 +353,7 @@ class TestAutomatedSchedulerExtended:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.get")
+    @patch("requests.Session.get")
     @patch("automated_scheduler.time.sleep")
     def test_wait_for_job_completion_timeout(
         self, mock_sleep, mock_get, mock_error_handler, mock_logging, mock_config
@@ -386,7 +386,7 @@ class TestAutomatedSchedulerExtended:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.get")
+    @patch("requests.Session.get")
     @patch("automated_scheduler.time.sleep")
     def test_wait_for_job_completion_http_error(
         self, mock_sleep, mock_get, mock_error_handler, mock_logging, mock_config
@@ -418,7 +418,7 @@ class TestAutomatedSchedulerExtended:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.get")
+    @patch("requests.Session.get")
     @patch("automated_scheduler.time.sleep")
     def test_wait_for_job_completion_exception(
         self, mock_sleep, mock_get, mock_error_handler, mock_logging, mock_config
@@ -676,7 +676,7 @@ class TestAutomatedSchedulerExtended:
     @patch("automated_scheduler.ConfigManager")
     @patch("automated_scheduler.LoggingManager")
     @patch("automated_scheduler.ErrorHandler")
-    @patch("automated_scheduler.requests.post")
+    @patch("requests.Session.post")
     def test_slack_notification_http_error(
         self, mock_post, mock_error_handler, mock_logging, mock_config
     ):
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+コンテンツアドレス型バックアップストアのテスト
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.backup_chunk_store import BackupChunkStore
+from core.differential_updater import DifferentialUpdater
+
+
+def _make_series(months=12, close=100.0):
+    return [
+        {
+            "date": f"2023-{month:02d}-{day:02d}",
+            "code": "7203",
+            "open": close,
+            "high": close + 50,
+            "low": close - 10,
+            "close": close + month + day,
+            "volume": 1000,
+        }
+        for month in range(1, months + 1)
+        for day in range(1, 21)
+    ]
+
+
+class TestBackupChunkStore:
+    """バックアップストアのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = BackupChunkStore(Path(self.temp_dir), Mock())
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_save_and_restore_roundtrip(self):
+        """保存と復元で元の並びが再現されるテスト"""
+        data = _make_series(3)
+        data.append({"code": "7203", "close": 1.0})  # 日付なしレコード
+
+        saved = self.store.save("7203", data)
+
+        assert saved["chunks_written"] == 4
+        assert self.store.restore("7203") == data
+
+    def test_unchanged_months_are_reused(self):
+        """変更のない月のチャンクが再利用されるテスト"""
+        data = _make_series(12)
+        self.store.save("7203", data)
+        usage_before = self.store.disk_usage()["chunk_bytes"]
+
+        data[-1] = dict(data[-1], close=999.0)
+        saved = self.store.save("7203", data)
+
+        assert saved["chunks_written"] == 1
+        assert saved["chunks_reused"] == 11
+        # 追加のチャンク容量は変更された1か月分のみ
+        growth = self.store.disk_usage()["chunk_bytes"] - usage_before
+        assert growth < usage_before / 6
+
+    def test_restore_specific_manifest(self):
+        """過去のマニフェストからの復元テスト"""
+        first = _make_series(2)
+        self.store.save("7203", first)
+        self.store.save("7203", _make_series(2, close=200.0))
+
+        backups = self.store.list_backups("7203")
+        assert len(backups) == 2
+        assert self.store.restore("7203", backups[0]) == first
+
+    def test_restore_detects_corrupted_chunk(self):
+        """チャンク破損の検出テスト"""
+        self.store.save("7203", _make_series(1))
+        manifest = json.loads(self.store.list_backups("7203")[0].read_text())
+        chunk_path = self.store._chunk_path(manifest["chunks"][0]["hash"])
+        chunk_path.write_text("[]")
+
+        with pytest.raises(ValueError):
+            self.store.restore("7203")
+
+    def test_prune_and_collect_garbage(self):
+        """古いマニフェストの削除と未参照チャンクの回収テスト"""
+        self.store.save("7203", _make_series(2))
+        latest = _make_series(2, close=300.0)
+        self.store.save("7203", latest)
+
+        assert self.store.prune("7203", keep=1) == 1
+        assert self.store.collect_garbage() == 2
+        assert self.store.restore("7203") == latest
+
+    def test_manifest_written_under_lock(self):
+        """マニフェストをチャンクと同じロック内で書き込み、回収と競合しないテスト"""
+        write_manifest = self.store._write_manifest
+
+        def check_locked(manifest_path, manifest):
+            assert self.store._lock.locked()
+            write_manifest(manifest_path, manifest)
+
+        with patch.object(self.store, "_write_manifest", side_effect=check_locked):
+            self.store.save("7203", _make_series(2))
+
+        assert self.store.collect_garbage() == 0
+        assert self.store.restore("7203") == _make_series(2)
+
+    def test_symbol_is_sanitized(self):
+        """パス区切りを含む銘柄名がバックアップディレクトリ外に書き込まれないテスト"""
+        data = _make_series(1)
+        saved = self.store.save("../escape/7203", data)
+
+        manifest_path = Path(saved["manifest_file"]).resolve()
+        assert manifest_path.parent.parent == Path(self.temp_dir).resolve()
+        assert self.store.restore("../escape/7203") == data
+
+
+class TestDifferentialUpdaterBackup:
+    """DifferentialUpdaterのバックアップ連携テスト"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.updater = DifferentialUpdater(self.temp_dir, Mock())
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_backup_before_update_can_be_restored(self):
+        """更新前に作成したバックアップから復元でき、更新自体はバックアップしないテスト"""
+        original = _make_series(2)
+        self.updater.update_stock_data("7203", original)
+        self.updater._create_backup("7203", original)
+        updated = original + [dict(original[-1], date="2023-03-01")]
+        self.updater.update_stock_data("7203", updated)
+
+        backups = self.updater.backup_store.list_backups("7203")
+        assert len(backups) == 1
+        assert self.updater.restore_backup("7203") == original
+
+    def test_create_backup_result(self):
+        """バックアップ結果の形式テスト"""
+        result = self.updater._create_backup("7203", _make_series(1))
+
+        assert result["success"] is True
+        assert result["backup_file"].endswith(BackupChunkStore.MANIFEST_SUFFIX)
+        assert result["chunks_written"] == 1
+
+    def test_restore_legacy_full_copy(self):
+        """旧形式の全件コピーバックアップの復元テスト"""
+        data = _make_series(1)
+        legacy = Path(self.temp_dir) / "backups" / "7203" / "backup_legacy.json"
+        legacy.parent.mkdir(parents=True, exist_ok=True)
+        legacy.write_text(json.dumps(data), encoding="utf-8")
+
+        assert self.updater.restore_backup("7203", str(legacy)) == data
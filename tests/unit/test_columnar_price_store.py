@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+列指向株価ストアのテスト
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.columnar_price_store import (
+    ColumnarPriceStore,
+    PYARROW_AVAILABLE,
+    records_to_frame,
+)
+from core.json_data_manager import JSONDataManager
+
+
+def _make_records(symbol, count=5):
+    return [
+        {
+            "date": f"2024-01-{day:02d}",
+            "code": symbol,
+            "open": 100.0 + day,
+            "high": 110.0 + day,
+            "low": 90.0 + day,
+            "close": 105.0 + day,
+            "volume": 1000 * day,
+        }
+        for day in range(1, count + 1)
+    ]
+
+
+class TestColumnarPriceStore:
+    """列指向株価ストアのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = ColumnarPriceStore(Path(self.temp_dir), Mock(), engine="npz")
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parquet_requires_pyarrow(self):
+        """pyarrow未導入時のParquet指定テスト"""
+        if PYARROW_AVAILABLE:
+            pytest.skip("pyarrowがインストールされています")
+        with pytest.raises(ValueError):
+            ColumnarPriceStore(Path(self.temp_dir), engine="parquet")
+
+    def test_read_frame_typed_columns(self):
+        """DataFrame取得時の型と列のテスト"""
+        assert self.store.write("1234", _make_records("1234")) is True
+
+        frame = self.store.read_frame("1234")
+
+        assert list(frame.columns) == ["Open", "High", "Low", "Close", "Volume"]
+        assert isinstance(frame.index, pd.DatetimeIndex)
+        assert frame["Close"].dtype == np.float64
+        assert frame["Volume"].dtype == np.int64
+        assert frame["Close"].iloc[-1] == 110.0
+
+    def test_read_frame_date_range(self):
+        """日付範囲指定のテスト"""
+        self.store.write("1234", _make_records("1234"))
+
+        frame = self.store.read_frame("1234", "2024-01-02", "2024-01-04")
+
+        assert len(frame) == 3
+        assert frame.index[0] == pd.Timestamp("2024-01-02")
+        assert frame.index[-1] == pd.Timestamp("2024-01-04")
+
+    def test_read_records_round_trip_with_extra_fields(self):
+        """追加フィールドを含むレコードの往復変換テスト"""
+        records = _make_records("1234", 2)
+        records[1]["adjustment_factor"] = 1.5
+
+        self.store.write("1234", records)
+
+        assert self.store.read_records("1234") == records
+
+    def test_missing_symbol(self):
+        """存在しない銘柄のテスト"""
+        assert self.store.read_frame("9999").empty
+        assert self.store.read_records("9999") == []
+        assert self.store.delete("9999") is False
+
+
+class TestJSONDataManagerColumnar:
+    """JSONDataManagerの列指向モードのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.logger = Mock()
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_get_stock_frame_columnar(self):
+        """列指向モードでのDataFrame取得テスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger, storage_mode="columnar")
+        manager.save_stock_data("1234", _make_records("1234"))
+
+        frame = manager.get_stock_frame("1234", start_date="2024-01-04")
+
+        assert len(frame) == 2
+        assert manager.get_stock_data("1234") == _make_records("1234")
+        assert manager.get_all_symbols() == ["1234"]
+
+    def test_get_stock_frame_matches_across_modes(self):
+        """単一ファイルモードと列指向モードのDataFrame一致テスト"""
+        single = JSONDataManager(self.temp_dir, self.logger)
+        single.save_stock_data("1234", _make_records("1234"))
+        expected = single.get_stock_frame("1234")
+
+        result = single.migrate_storage("columnar", remove_source=True)
+
+        assert result["success"] is True
+        assert not single.stock_data_file.exists()
+        pd.testing.assert_frame_equal(
+            single.get_stock_frame("1234"), expected, check_freq=False
+        )
+
+    def test_export_data_stays_json(self):
+        """列指向モードでもJSONエクスポートできるテスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger, storage_mode="columnar")
+        manager.save_stock_data("1234", _make_records("1234"))
+        output_file = Path(self.temp_dir) / "export" / "1234.json"
+
+        assert manager.export_data("1234", str(output_file)) is True
+
+        with open(output_file, "r", encoding="utf-8") as f:
+            exported = json.load(f)
+        assert exported["data"] == _make_records("1234")
+
+    def test_records_to_frame_empty(self):
+        """空レコードのDataFrame変換テスト"""
+        frame = records_to_frame([])
+
+        assert frame.empty
+        assert "Close" in frame.columns
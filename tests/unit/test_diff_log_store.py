@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+追記専用差分ログストアのテスト
+"""
+
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+
+from core.diff_log_store import DiffLogStore
+from core.json_data_manager import JSONDataManager
+
+
+def _entry(symbol, timestamp, **extra):
+    entry = {"symbol": symbol, "timestamp": timestamp, "diff": {"added_count": 1}}
+    entry.update(extra)
+    return entry
+
+
+class TestDiffLogStore:
+    """差分ログストアのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = DiffLogStore(Path(self.temp_dir), Mock())
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_append_and_tail(self):
+        """追記と最新エントリ取得のテスト"""
+        for i in range(5):
+            self.store.append(_entry("1234", f"2024-01-0{i + 1}T00:00:00"))
+        self.store.append(_entry("5678", "2024-01-06T00:00:00"))
+
+        assert self.store.count() == 6
+        tail = self.store.tail(symbol="1234", limit=2)
+        assert [e["timestamp"] for e in tail] == [
+            "2024-01-04T00:00:00",
+            "2024-01-05T00:00:00",
+        ]
+        assert self.store.tail(limit=1)[0]["symbol"] == "5678"
+
+    def test_iter_entries_seeks_by_timestamp_and_symbol(self):
+        """時刻・銘柄によるインデックス検索のテスト"""
+        self.store.append_many(
+            [
+                _entry("1234", "2024-01-01T00:00:00"),
+                _entry("5678", "2024-01-02T00:00:00"),
+                _entry("1234", "2024-01-03T00:00:00", note="最新"),
+            ]
+        )
+
+        entries = list(
+            self.store.iter_entries(symbol="1234", since="2024-01-01T00:00:00")
+        )
+
+        assert len(entries) == 1
+        assert entries[0]["note"] == "最新"
+
+    def test_iter_entries_with_out_of_order_timestamps(self):
+        """時刻順でない追記でも since 以降のエントリを漏らさないテスト"""
+        self.store.append_many(
+            [
+                _entry("1234", "2024-01-03T00:00:00"),
+                _entry("1234", "2024-01-01T00:00:00"),
+                _entry("1234", "2024-01-04T00:00:00"),
+                _entry("1234", "2024-01-02T00:00:00"),
+            ]
+        )
+
+        entries = list(self.store.iter_entries(since="2024-01-02T12:00:00"))
+
+        assert [entry["timestamp"][:10] for entry in entries] == [
+            "2024-01-03",
+            "2024-01-04",
+        ]
+        # 時刻を省略した追記はロック内で時刻を付与する
+        self.store.append({"symbol": "5678"})
+        assert self.store.tail(limit=1)[0]["timestamp"] > "2024-01-04"
+
+    def test_size_based_rotation_and_retention(self):
+        """サイズによるローテーションと保持数のテスト"""
+        store = DiffLogStore(
+            Path(self.temp_dir) / "rotating", max_segment_bytes=1, max_segments=3
+        )
+        for i in range(5):
+            store.append(_entry("1234", f"2024-01-0{i + 1}T00:00:00"))
+
+        segments = store._segments()
+        assert len(segments) == 3
+        assert segments[-1].name == "diff_000005.jsonl"
+        assert [e["timestamp"][:10] for e in store.iter_entries()] == [
+            "2024-01-03",
+            "2024-01-04",
+            "2024-01-05",
+        ]
+
+    def test_age_based_rotation(self):
+        """経過時間によるローテーションのテスト"""
+        old = (datetime.now() - timedelta(hours=25)).isoformat()
+        self.store.append(_entry("1234", old))
+        self.store.append(_entry("1234", datetime.now().isoformat()))
+
+        assert len(self.store._segments()) == 2
+
+    def test_prune(self):
+        """古いセグメント削除のテスト"""
+        store = DiffLogStore(Path(self.temp_dir) / "prune", max_segment_bytes=1)
+        store.append(_entry("1234", "2024-01-01T00:00:00"))
+        store.append(_entry("1234", "2024-03-01T00:00:00"))
+
+        assert store.prune("2024-02-01T00:00:00") == 1
+        assert store.count() == 1
+
+
+class TestJSONDataManagerDiffLog:
+    """JSONDataManagerの差分ログ連携テストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.logger = Mock()
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_save_appends_without_rewriting(self):
+        """保存ごとに差分ログが追記されるテスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger)
+        record = {
+            "date": "2024-01-01",
+            "code": "1234",
+            "open": 100.0,
+            "high": 110.0,
+            "low": 90.0,
+            "close": 105.0,
+            "volume": 1000,
+        }
+        manager.save_stock_data("1234", [record])
+        first_size = manager.diff_log_file.stat().st_size
+        before = datetime.now().isoformat()
+
+        manager.save_stock_data("1234", [record, dict(record, date="2024-01-02")])
+
+        assert manager.diff_log_file.stat().st_size > first_size
+        incremental = manager.get_incremental_data("1234", last_update=before)
+        assert [item["date"] for item in incremental["data"]] == ["2024-01-02"]
+
+        metadata = manager.get_metadata()
+        assert "added" not in metadata["data_sources"]["1234"]["last_diff"]
+
+    def test_legacy_diff_log_is_imported(self):
+        """旧形式の差分ログ取り込みのテスト"""
+        legacy_file = Path(self.temp_dir) / "diff_log.json"
+        with open(legacy_file, "w", encoding="utf-8") as f:
+            json.dump([_entry("1234", "2024-01-01T00:00:00")], f)
+
+        manager = JSONDataManager(self.temp_dir, self.logger)
+
+        assert not legacy_file.exists()
+        assert manager.get_diff_log("1234")[0]["timestamp"] == "2024-01-01T00:00:00"
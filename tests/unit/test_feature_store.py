@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+特徴量ストアのテスト
+"""
+
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from core.article_method_analyzer import ImprovedMethodAnalyzer
+from core.feature_store import FeatureStore
+from core.improved_trading_system import ImprovedTradingSystem
+from core.method_comparison_engine import MethodComparisonEngine
+from core.technical_analysis import calculate_technical_indicators
+
+
+def _prices(length=900, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 1000 + rng.normal(0, 10, length).cumsum()
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 1, length),
+            "High": close + rng.random(length) * 5,
+            "Low": close - rng.random(length) * 5,
+            "Close": close,
+            "Volume": rng.integers(1_000, 50_000, length).astype(float),
+        },
+        index=pd.date_range("2021-01-01", periods=length),
+    )
+
+
+class CountingCompute:
+    """呼び出し回数と入力行数を記録する計算関数"""
+
+    def __init__(self, compute):
+        self.compute = compute
+        self.rows = []
+
+    def __call__(self, data):
+        self.rows.append(len(data))
+        return self.compute(data)
+
+
+class TestFeatureStore:
+    """特徴量ストアのテストクラス"""
+
+    def setup_method(self):
+        """テスト前準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data = _prices()
+
+    def teardown_method(self):
+        """テスト後処理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_hit_returns_independent_copy(self):
+        """同じデータは再計算せず、返した結果を変更してもキャッシュに影響しないテスト"""
+        store = FeatureStore()
+        compute = CountingCompute(lambda df: df.assign(MA=df["Close"].rolling(5).mean()))
+
+        first = store.get_or_compute(self.data, compute, "test/1", symbol="7203")
+        first["MA"] = 0.0
+        second = store.get_or_compute(self.data.copy(), compute, "test/1", symbol="7203")
+
+        assert compute.rows == [len(self.data)]
+        assert not (second["MA"].fillna(1) == 0).any()
+        assert store.get_stats()["hits"] == 1
+
+        # 定義のバージョンが変われば別のエントリ
+        store.get_or_compute(self.data, compute, "test/2", symbol="7203")
+        assert len(compute.rows) == 2
+
+    def test_tail_change_recomputes_only_tail(self):
+        """末尾の行が追加・変更された場合は末尾とウォームアップ分だけを再計算するテスト"""
+        store = FeatureStore()
+        system = ImprovedTradingSystem(feature_store=store)
+        compute = CountingCompute(system._build_features)
+        data = _prices(1600)
+
+        store.get_or_compute(data.iloc[:-5], compute, "its/1", lookback=600)
+        changed = data.copy()
+        changed.iloc[-3, changed.columns.get_loc("Close")] += 50
+        result = store.get_or_compute(changed, compute, "its/1", lookback=600)
+
+        # 変更のない先頭 1595 行のうち、ウォームアップ 600 行と照合用の 600 行から再計算
+        assert compute.rows == [len(data) - 5, 1205]
+        assert store.get_stats()["partial_hits"] == 1
+        pd.testing.assert_frame_equal(
+            result, system._build_features(changed), check_freq=False, rtol=1e-9
+        )
+
+    def test_short_history_falls_back_to_full_compute(self):
+        """ウォームアップ分の履歴がない場合は全体を再計算するテスト"""
+        store = FeatureStore()
+        compute = CountingCompute(lambda df: df.assign(Total=df["Volume"].cumsum()))
+
+        store.get_or_compute(self.data.iloc[:100], compute, "cum/1", lookback=600)
+        store.get_or_compute(self.data.iloc[:101], compute, "cum/1", lookback=600)
+        # ウォームアップが足りても累積値は照合範囲で一致しないため全体を再計算
+        result = store.get_or_compute(self.data, compute, "cum/1", lookback=10)
+
+        assert compute.rows == [100, 101, len(self.data) - 81, len(self.data)]
+        assert store.get_stats()["partial_hits"] == 0
+        assert result["Total"].iloc[-1] == self.data["Volume"].sum()
+
+    def test_whole_overlap_must_match(self):
+        """照合範囲の最後の1行だけが一致しても末尾の再計算結果をつながないテスト"""
+        store = FeatureStore()
+        compute = CountingCompute(
+            lambda df: df.assign(High50=df["Close"].rolling(50, min_periods=1).max())
+        )
+        data = self.data.iloc[:205].copy()
+        # 直前の行を最大値にして、その行だけは短い履歴でも同じ値になるようにする
+        data.iloc[199, data.columns.get_loc("Close")] = 5000.0
+
+        store.get_or_compute(data.iloc[:200], compute, "max/1", lookback=10)
+        result = store.get_or_compute(data, compute, "max/1", lookback=10)
+
+        assert compute.rows == [200, 25, 205]
+        assert store.get_stats()["partial_hits"] == 0
+        pd.testing.assert_frame_equal(result, compute.compute(data), check_freq=False)
+
+    def test_default_callers_reuse_features(self):
+        """ストアを渡さない場合もインスタンスごとのストアで特徴量を再利用するテスト"""
+        system = ImprovedTradingSystem()
+        analyzer = ImprovedMethodAnalyzer()
+        engine = MethodComparisonEngine(self.temp_dir)
+        frame = self.data.reset_index().rename(columns={"index": "Date"})
+
+        assert system.feature_store is not ImprovedTradingSystem().feature_store
+        system.train_models(self.data)
+        system.generate_signals(self.data)
+        analyzer._create_advanced_features(frame)
+        analyzer._create_advanced_features(frame)
+
+        assert system.feature_store.get_stats()["hits"] == 1
+        assert analyzer.feature_store.get_stats()["hits"] == 1
+        assert engine.trading_system.feature_store is engine.improved_analyzer.feature_store
+
+    def test_eviction_spills_to_disk_and_reloads(self):
+        """追い出した特徴量を列指向ファイルに退避し、次回は読み込んで使うテスト"""
+        store = FeatureStore(max_cells=self.data.size * 2 + 1, spill_dir=self.temp_dir)
+        compute = CountingCompute(lambda df: df.assign(MA=df["Close"].rolling(5).mean()))
+
+        first = store.get_or_compute(self.data, compute, "test/1", symbol="A")
+        store.get_or_compute(self.data * 2, compute, "test/1", symbol="B")
+        reloaded = store.get_or_compute(self.data, compute, "test/1", symbol="A")
+
+        stats = store.get_stats()
+        assert len(compute.rows) == 2
+        assert stats["spills"] >= 1 and stats["disk_loads"] == 1
+        pd.testing.assert_frame_equal(reloaded, first, check_freq=False)
+
+        store.invalidate()
+        assert store.get_stats()["entries"] == 0
+        assert not list(store.spill_dir.iterdir())
+
+    def test_callers_use_store(self):
+        """特徴量作成・テクニカル指標の計算がストアを経由するテスト"""
+        store = FeatureStore()
+        system = ImprovedTradingSystem(feature_store=store)
+        analyzer = ImprovedMethodAnalyzer(feature_store=store)
+        frame = self.data.reset_index().rename(columns={"index": "Date"})
+        lower = self.data.rename(columns=str.lower)
+
+        for _ in range(2):
+            features = system._create_features(self.data)
+            advanced = analyzer._create_advanced_features(frame)
+            indicators = calculate_technical_indicators(lower, feature_store=store)
+
+        assert store.get_stats()["hits"] == 3
+        assert "ADX" in features.columns and "ATR" in advanced.columns
+        assert "vwap" in indicators.columns
+        assert "ATR" not in frame.columns
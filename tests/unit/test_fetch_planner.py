@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+取引カレンダーと増分取得プランナーのテスト
+"""
+
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest.mock import Mock
+
+from core.fetch_planner import IncrementalFetchPlanner
+from core.json_data_manager import JSONDataManager
+from core.trading_calendar import TradingCalendar
+
+# 2024-01-08 は成人の日（祝日）
+CALENDAR = [
+    {"Date": f"2024-01-{day:02d}", "HolidayDivision": "0" if day in (6, 7, 8) else "1"}
+    for day in range(4, 13)
+]
+
+
+class TestTradingCalendar:
+    """取引カレンダーのテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.cache_file = self.temp_dir / "trading_calendar.json"
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cached_calendar_handles_holidays(self):
+        """キャッシュしたカレンダーで祝日を休業日と判定するテスト"""
+        fetcher = Mock(return_value=CALENDAR)
+        calendar = TradingCalendar(self.cache_file, fetcher=fetcher)
+
+        assert calendar.ensure("2024-01-04", "2024-01-12")
+        assert not calendar.is_trading_day("2024-01-08")
+        assert calendar.next_trading_day("2024-01-05") == date(2024, 1, 9)
+
+        # 2回目以降はキャッシュファイルを使い取得しない
+        cached = TradingCalendar(self.cache_file, fetcher=fetcher)
+        assert cached.ensure("2024-01-05", "2024-01-09")
+        assert fetcher.call_count == 1
+
+    def test_gap_between_cached_ranges_is_not_covered(self):
+        """キャッシュ済みの期間の間にある未取得の日は範囲外と判定するテスト"""
+        calendar = TradingCalendar(self.cache_file)
+        calendar.update(CALENDAR[:2] + CALENDAR[-2:])
+
+        assert calendar.covers("2024-01-04", "2024-01-05")
+        assert calendar.covers("2024-01-11", "2024-01-12")
+        assert not calendar.covers("2024-01-04", "2024-01-12")
+        assert not calendar.covers("2024-01-03", "2024-01-05")
+
+        fetcher = Mock(return_value=CALENDAR)
+        cached = TradingCalendar(self.cache_file, fetcher=fetcher)
+        assert cached.ensure("2024-01-05", "2024-01-11")
+        assert fetcher.call_count == 1
+        assert cached.covers("2024-01-04", "2024-01-12")
+
+    def test_fallback_rules_without_calendar(self):
+        """カレンダー取得失敗時は土日・年末年始を休業日とするテスト"""
+        calendar = TradingCalendar(self.cache_file, fetcher=Mock(return_value=None))
+
+        assert not calendar.ensure("2023-12-29", "2024-01-05")
+        assert calendar.previous_trading_day("2024-01-03") == date(2023, 12, 29)
+        assert len(calendar.trading_days("2023-12-29", "2024-01-05")) == 3
+
+
+class TestIncrementalFetchPlanner:
+    """増分取得プランナーのテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        calendar = TradingCalendar(self.temp_dir / "calendar.json")
+        calendar.update(CALENDAR)
+        self.planner = IncrementalFetchPlanner(calendar, initial_days=7, logger=Mock())
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_plans_only_missing_range(self):
+        """不足期間のみを取得対象にし、最新の銘柄はスキップするテスト"""
+        plan = self.planner.plan(
+            {"1301": "2024-01-09", "1332": "2024-01-05", "7203": None},
+            as_of=date(2024, 1, 9),
+        )
+
+        assert plan.target_date == "2024-01-09"
+        assert plan.up_to_date == ["1301"]
+        windows = {w.code: (w.date_from, w.date_to) for w in plan.windows}
+        # 連休明けの翌営業日から取得
+        assert windows["1332"] == ("2024-01-09", "2024-01-09")
+        # 保存データがない銘柄は initial_days 分
+        assert windows["7203"] == ("2024-01-04", "2024-01-09")
+        assert plan.summary() == {"to_fetch": 2, "up_to_date": 1, "new_symbols": 1}
+
+    def test_holiday_as_of_targets_previous_trading_day(self):
+        """基準日が休業日なら直前の営業日まで保存済みで最新とみなすテスト"""
+        plan = self.planner.plan({"1301": "2024-01-05"}, as_of=date(2024, 1, 8))
+
+        assert plan.target_date == "2024-01-05"
+        assert plan.windows == []
+
+    def test_last_dates_from_data_manager(self):
+        """JSONDataManager のメタデータから最終日付を取得するテスト"""
+        manager = JSONDataManager(str(self.temp_dir / "data"), Mock())
+        rows = [
+            {"date": d, "code": "1301", "open": 1, "high": 2, "low": 1, "close": 2, "volume": 10}
+            for d in ("2024-01-04", "2024-01-05")
+        ]
+        manager.save_stock_data("1301", rows)
+        manager.append_stock_data(
+            "1301", [dict(rows[-1], date="2024-01-09")], source="test"
+        )
+
+        last_dates = manager.get_last_dates(["1301", "7203"])
+
+        assert last_dates == {"1301": "2024-01-09", "7203": None}
+        assert manager.get_metadata()["data_sources"]["1301"]["last_date"] == "2024-01-09"
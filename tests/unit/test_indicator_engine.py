@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+共通テクニカル指標エンジンのテスト
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.indicator_engine import IndicatorEngine, ewm_mean, rolling_std, true_range
+
+
+def _ohlcv(length=200, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, length).cumsum()
+    return pd.DataFrame(
+        {
+            "high": close + rng.random(length),
+            "low": close - rng.random(length),
+            "close": close,
+            "volume": rng.integers(1_000, 5_000, length).astype(float),
+        },
+        index=pd.date_range("2024-01-01", periods=length),
+    )
+
+
+class TestIndicatorEngine:
+    """共通テクニカル指標エンジンのテストクラス"""
+
+    def setup_method(self):
+        """テストデータの準備"""
+        self.df = _ohlcv()
+        self.engine = IndicatorEngine.from_frame(self.df)
+
+    def test_rolling_and_ewm_match_pandas(self):
+        """ローリング統計とEMAが pandas と一致するテスト（欠損を含む）"""
+        close = self.df["close"].copy()
+        close.iloc[30:33] = np.nan
+        values = close.to_numpy()
+
+        np.testing.assert_allclose(
+            ewm_mean(values, 12), close.ewm(span=12).mean().to_numpy(), rtol=1e-10
+        )
+        np.testing.assert_allclose(
+            rolling_std(values, 20), close.rolling(20).std().to_numpy(), rtol=1e-10
+        )
+        engine = IndicatorEngine(close=close)
+        np.testing.assert_allclose(
+            engine.rolling_max("close", 5), close.rolling(5).max().to_numpy()
+        )
+
+    def test_indicators_match_pandas_reference(self):
+        """ATR・CCI・ストキャスティクスが pandas による定義どおりのテスト"""
+        high, low, close = self.df["high"], self.df["low"], self.df["close"]
+        tr = pd.concat(
+            [high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1
+        ).max(axis=1)
+        tp = (high + low + close) / 3
+        mad = tp.rolling(20).apply(lambda x: np.mean(np.abs(x - x.mean())))
+        lowest, highest = low.rolling(14).min(), high.rolling(14).max()
+
+        np.testing.assert_allclose(self.engine.atr(14), tr.rolling(14).mean(), rtol=1e-10)
+        np.testing.assert_allclose(
+            self.engine.cci(20), (tp - tp.rolling(20).mean()) / (0.015 * mad), rtol=1e-8
+        )
+        k, d = self.engine.stochastic()
+        expected_k = 100 * (close - lowest) / (highest - lowest)
+        np.testing.assert_allclose(k, expected_k, rtol=1e-10)
+        np.testing.assert_allclose(d, expected_k.rolling(3).mean(), rtol=1e-10)
+
+    def test_intermediates_are_shared(self):
+        """True Range・ローリング最大/最小などの中間結果を再計算しないテスト"""
+        atr = self.engine.atr(14)
+        self.engine.adx(14)
+        self.engine.williams_r(14)
+        self.engine.stochastic(14)
+
+        assert self.engine.atr(14) is atr
+        assert self.engine.rolling_max("high", 14) is self.engine.rolling_max("high", 14)
+        assert self.engine.series("tr") is self.engine.true_range()
+
+    def test_compute_spec_and_frame(self):
+        """出力指定による一括計算のテスト"""
+        frame = self.engine.to_frame(
+            {
+                "rsi": "rsi",
+                "sma_5": ("sma", {"window": 5}),
+                "macd_signal": ("macd", {}, 1),
+            }
+        )
+
+        assert list(frame.columns) == ["rsi", "sma_5", "macd_signal"]
+        assert frame.index.equals(self.df.index)
+        np.testing.assert_allclose(frame["macd_signal"], self.engine.macd()[1])
+
+    def test_capitalized_columns_and_edge_cases(self):
+        """先頭大文字の列名・空データ・短いデータのテスト"""
+        engine = IndicatorEngine.from_frame(self.df.rename(columns=str.capitalize))
+        np.testing.assert_allclose(engine.adx(), self.engine.adx(), equal_nan=True)
+
+        empty = IndicatorEngine(close=[], high=[], low=[])
+        assert len(empty.rsi()) == 0
+        assert len(empty.atr()) == 0
+        assert len(empty.ema(12)) == 0
+
+        short = IndicatorEngine(close=[1.0, 2.0], high=[2.0, 3.0], low=[0.5, 1.5])
+        assert np.isnan(short.sma(5)).all()
+        # 先頭は高値-安値、以降は前日終値との差も含めた最大値
+        np.testing.assert_allclose(
+            true_range(short.series("high"), short.series("low"), short.series("close")),
+            [1.5, 2.0],
+        )
+
+    def test_invalid_inputs(self):
+        """不正な窓・長さの異なる入力はエラーになるテスト"""
+        with pytest.raises(ValueError):
+            self.engine.sma(0)
+        with pytest.raises(ValueError):
+            IndicatorEngine(close=[1.0, 2.0], high=[1.0])
+        with pytest.raises(ValueError):
+            IndicatorEngine(close=[1.0, 2.0]).atr()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+複数銘柄（パネル）のテクニカル指標一括計算のテスト
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.indicator_panel import (
+    align_start,
+    calculate_long_panel_indicators,
+    calculate_panel_indicators,
+    restore_start,
+)
+from core.technical_analysis import TechnicalAnalysis, calculate_technical_indicators
+
+
+def _long_prices():
+    """上場日・日数の異なる3銘柄の縦持ち価格（行はシャッフル済み）"""
+    rng = np.random.default_rng(3)
+    frames = []
+    for code, start, days in (("1301", 0, 120), ("7203", 30, 90), ("9984", 100, 20)):
+        close = 1000 + rng.normal(0, 10, days).cumsum()
+        frames.append(
+            pd.DataFrame(
+                {
+                    "code": code,
+                    "date": pd.bdate_range("2024-01-01", periods=start + days)[start:],
+                    "close": close,
+                    "high": close + rng.random(days) * 10,
+                    "low": close - rng.random(days) * 10,
+                    "volume": rng.integers(1_000, 10_000, days).astype(float),
+                }
+            )
+        )
+    return pd.concat(frames).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+class TestIndicatorPanel:
+    """パネル計算のテストクラス"""
+
+    def setup_method(self):
+        """テストデータの準備"""
+        self.prices = _long_prices()
+
+    def test_long_panel_matches_per_symbol(self):
+        """縦持ちの一括計算が銘柄ごとの計算と一致するテスト"""
+        result = calculate_long_panel_indicators(self.prices)
+
+        assert result.index.equals(self.prices.index)
+        for code, rows in result.groupby("code"):
+            expected = calculate_technical_indicators(
+                self.prices.loc[rows.index].sort_values("date")
+            )
+            for column in ("sma_50", "rsi", "macd_signal", "bb_lower", "stoch_d", "obv", "vwap"):
+                np.testing.assert_allclose(
+                    rows[column].to_numpy(),
+                    expected[column].reindex(rows.index).to_numpy(),
+                    rtol=1e-10,
+                    err_msg=f"{code} {column}",
+                )
+
+    def test_wide_panel_warm_up_per_symbol(self):
+        """横持ちの計算で上場日ごとにウォームアップの NaN が付くテスト"""
+        wide = {
+            name: self.prices.pivot(index="date", columns="code", values=name)
+            for name in ("close", "high", "low")
+        }
+
+        result = calculate_panel_indicators(wide, {"sma_5": ("sma", {"window": 5}), "atr": "atr"})
+
+        sma = result["sma_5"]
+        assert list(sma.columns) == ["1301", "7203", "9984"]
+        # 7203 は30営業日目に上場: 上場から4日目まではNaN、5日目から値が出る
+        assert sma["7203"].iloc[:34].isna().all()
+        assert not np.isnan(sma["7203"].iloc[34])
+        listed = wide["close"]["9984"].dropna()
+        expected = TechnicalAnalysis.atr(
+            wide["high"]["9984"].dropna(), wide["low"]["9984"].dropna(), listed
+        )
+        pd.testing.assert_series_equal(
+            result["atr"]["9984"].dropna(), expected.dropna(), check_names=False
+        )
+
+    def test_no_cross_symbol_leakage(self):
+        """他の銘柄の価格を変えても結果が変わらないテスト"""
+        changed = self.prices.copy()
+        changed.loc[changed["code"] == "1301", ["close", "high", "low"]] *= 3
+
+        before = calculate_long_panel_indicators(self.prices)
+        after = calculate_long_panel_indicators(changed)
+
+        others = self.prices["code"] != "1301"
+        pd.testing.assert_frame_equal(before[others], after[others])
+        assert not np.allclose(
+            before.loc[~others, "vwap"], after.loc[~others, "vwap"]
+        )
+
+    def test_align_round_trip_and_errors(self):
+        """先頭そろえの往復変換と不正な入力のテスト"""
+        matrix = np.array([[np.nan, 1.0], [2.0, 3.0], [4.0, np.nan]])
+        offsets = np.array([1, 0])
+
+        aligned = align_start(matrix, offsets)
+
+        np.testing.assert_array_equal(aligned[:, 0], [2.0, 4.0, np.nan])
+        np.testing.assert_array_equal(restore_start(aligned, offsets), matrix)
+        with pytest.raises(ValueError):
+            calculate_panel_indicators({"open": pd.DataFrame(matrix)})
+        with pytest.raises(ValueError):
+            calculate_long_panel_indicators(self.prices.drop(columns="close"))
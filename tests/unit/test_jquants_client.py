@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+J-Quants API 共有HTTPクライアント（共有セッション・トークンキャッシュ）のテスト
+"""
+
+import base64
+import json
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+from core.jquants_client import (
+    JQuantsClient,
+    TokenCache,
+    get_shared_session,
+    token_expiry,
+)
+
+
+def _jwt(exp):
+    """exp だけを持つJWT形式のトークン"""
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode()
+    return f"header.{payload.rstrip('=')}.signature"
+
+
+def _response(status_code, body=None):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = body or {}
+    return response
+
+
+class TestTokenCache:
+    """トークンキャッシュのテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.cache_file = self.temp_dir / "token_cache.json"
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_shared_session_is_reused(self):
+        """プロセス内で同じセッションが返るテスト"""
+        assert get_shared_session() is get_shared_session()
+
+    def test_shared_session_grows_pool(self):
+        """作成済みより大きい接続数の指定でプールを広げ、小さい指定では縮めないテスト"""
+        session = get_shared_session()
+        current = session.get_adapter("https://api.jquants.com")._pool_maxsize
+
+        assert get_shared_session(pool_maxsize=current + 8) is session
+        assert session.get_adapter("https://api.jquants.com")._pool_maxsize == current + 8
+        assert session.get_adapter("http://127.0.0.1")._pool_maxsize == current + 8
+
+        get_shared_session(pool_maxsize=1)
+        assert session.get_adapter("https://api.jquants.com")._pool_maxsize == current + 8
+
+    def test_token_expiry_from_jwt(self):
+        """JWTの exp を有効期限として読むテスト"""
+        assert token_expiry(_jwt(1700000000)) == 1700000000
+        assert token_expiry("not-a-jwt") is None
+
+    def test_fresh_token_skips_auth(self):
+        """期限まで余裕があれば更新しないテスト"""
+        cache = TokenCache(self.cache_file)
+        cache.save(_jwt(time.time() + 3600), "refresh")
+        refresh, login = Mock(), Mock()
+
+        # 別インスタンス（別プロセス相当）からもファイル経由で参照できる
+        token = TokenCache(self.cache_file).get_id_token(refresh, login)
+
+        assert token_expiry(token) > time.time()
+        refresh.assert_not_called()
+        login.assert_not_called()
+
+    def test_refreshes_ahead_of_expiry(self):
+        """期限の手前でリフレッシュトークンにより更新するテスト"""
+        cache = TokenCache(self.cache_file, refresh_margin_seconds=300)
+        cache.save(_jwt(time.time() + 60), "refresh")
+        new_token = _jwt(time.time() + 3600)
+        refresh = Mock(return_value=new_token)
+        login = Mock()
+
+        assert cache.get_id_token(refresh, login) == new_token
+        refresh.assert_called_once_with("refresh")
+        login.assert_not_called()
+        assert json.loads(self.cache_file.read_text())["id_token"] == new_token
+
+    def test_falls_back_to_login(self):
+        """リフレッシュ失敗時に新規認証するテスト"""
+        cache = TokenCache(self.cache_file)
+        cache.save(_jwt(time.time() - 10), "expired-refresh")
+        new_token = _jwt(time.time() + 3600)
+        login = Mock(return_value={"id_token": new_token, "refresh_token": "new"})
+
+        assert cache.get_id_token(Mock(return_value=None), login) == new_token
+        assert cache.refresh_token() == "new"
+
+    def test_concurrent_callers_refresh_once(self):
+        """同時に期限切れを検出しても更新は1回のみのテスト"""
+        TokenCache(self.cache_file).save(_jwt(time.time() - 10), "refresh")
+        new_token = _jwt(time.time() + 3600)
+
+        def slow_refresh(refresh_token):
+            time.sleep(0.05)
+            return new_token
+
+        refresh = Mock(side_effect=slow_refresh)
+        # 別インスタンスはファイルロックで排他される
+        caches = [TokenCache(self.cache_file) for _ in range(4)]
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda c=c: results.append(c.get_id_token(refresh, Mock()))
+            )
+            for c in caches
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [new_token] * 4
+        assert refresh.call_count == 1
+
+
+class TestJQuantsClient:
+    """認証クライアントのテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.cache = TokenCache(self.temp_dir / "token_cache.json")
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_login_and_reuse_cached_token(self):
+        """新規認証後はキャッシュのトークンを使い認証APIを呼ばないテスト"""
+        id_token = _jwt(time.time() + 3600)
+        session = Mock()
+        session.post.side_effect = [
+            _response(200, {"refreshToken": "refresh"}),
+            _response(200, {"idToken": id_token}),
+        ]
+        session.get.return_value = _response(200)
+        client = JQuantsClient(
+            "user@example.com", "secret", token_cache=self.cache, session=session
+        )
+
+        client.get("/listed/info")
+        client.get("/listed/info")
+
+        assert session.post.call_count == 2
+        headers = session.get.call_args.kwargs["headers"]
+        assert headers == {"Authorization": f"Bearer {id_token}"}
+
+    def test_get_retries_once_on_401(self):
+        """401応答時にトークンを更新して再送するテスト"""
+        self.cache.save(_jwt(time.time() + 3600), "refresh")
+        new_token = _jwt(time.time() + 7200)
+        session = Mock()
+        session.post.return_value = _response(200, {"idToken": new_token})
+        session.get.side_effect = [_response(401), _response(200)]
+        client = JQuantsClient(token_cache=self.cache, session=session)
+
+        response = client.get("/listed/info")
+
+        assert response.status_code == 200
+        assert session.get.call_args.kwargs["headers"] == {
+            "Authorization": f"Bearer {new_token}"
+        }
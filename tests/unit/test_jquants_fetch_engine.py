@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+J-Quants API 非同期取得エンジンのテスト（ローカルのスタブHTTPサーバーを使用）
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from core.jquants_fetch_engine import AsyncFetchEngine, FetchRequest, TokenBucket
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """daily_quotes / listed/info を返すスタブ"""
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with server.lock:
+            server.request_count += 1
+            throttle = server.throttle_remaining > 0
+            if throttle:
+                server.throttle_remaining -= 1
+
+        if throttle:
+            self._send(429, {"message": "Rate limit exceeded"}, {"Retry-After": "0"})
+        elif url.path.endswith("/prices/daily_quotes"):
+            code = query.get("code", "")
+            if code == "0000":
+                self._send(404, {"message": "not found"})
+                return
+            quotes = [{"Code": code, "Date": "2024-01-04", "Close": 100.0}]
+            self._send(200, {"daily_quotes": quotes})
+        elif url.path.endswith("/listed/info"):
+            page = int(query.get("pagination_key", "0"))
+            body = {"info": [{"Code": f"{page}000"}]}
+            if page < 2:
+                body["pagination_key"] = str(page + 1)
+            self._send(200, body)
+        else:
+            self._send(404, {})
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAsyncFetchEngine:
+    """非同期取得エンジンのテストクラス"""
+
+    def setup_method(self):
+        """スタブサーバーの起動"""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self.server.lock = threading.Lock()
+        self.server.request_count = 0
+        self.server.throttle_remaining = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def teardown_method(self):
+        """スタブサーバーの停止"""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _engine(self, **kwargs):
+        kwargs.setdefault("rate_per_second", 200.0)
+        kwargs.setdefault("burst", 20)
+        kwargs.setdefault("backoff_seconds", 0.01)
+        return AsyncFetchEngine(
+            id_token="token", base_url=self.base_url, logger=Mock(), **kwargs
+        )
+
+    def _quote_requests(self, codes):
+        return [
+            FetchRequest(code, "/prices/daily_quotes", {"code": code}) for code in codes
+        ]
+
+    def test_fetch_many_returns_results_by_key(self):
+        """並行取得結果がキーごとに返るテスト"""
+        engine = self._engine()
+        codes = [f"{1000 + i}" for i in range(20)]
+
+        results = engine.run_many(self._quote_requests(codes + ["0000"]))
+
+        assert results["0000"] is None
+        for code in codes:
+            assert results[code]["daily_quotes"][0]["Code"] == code
+        stats = engine.get_stats()
+        assert stats["succeeded"] == 20
+        assert stats["failed"] == 1
+
+    def test_retries_after_429(self):
+        """429応答後に待機して再試行し、レートを下げるテスト"""
+        self.server.throttle_remaining = 3
+        engine = self._engine()
+
+        results = engine.run_many(self._quote_requests(["1301", "1332"]))
+
+        assert all(results.values())
+        stats = engine.get_stats()
+        assert stats["throttled"] == 3
+        assert stats["current_rate_per_second"] < 200.0
+
+    def test_rate_limit_is_enforced(self):
+        """トークンバケットでリクエストレートが制限されるテスト"""
+        engine = self._engine(rate_per_second=50.0, burst=1)
+
+        started = time.perf_counter()
+        engine.run_many(self._quote_requests([f"{2000 + i}" for i in range(11)]))
+
+        # バースト1件の後は 1/50 秒間隔
+        assert time.perf_counter() - started >= 10 / 50 * 0.9
+        assert self.server.request_count == 11
+
+    def test_fetch_all_pages(self):
+        """pagination_key を辿る全ページ取得のテスト"""
+        engine = self._engine()
+
+        info = engine.run_all_pages("/listed/info", {}, "info")
+
+        assert [item["Code"] for item in info] == ["0000", "1000", "2000"]
+
+    def test_iter_batches_streams_all_pages(self):
+        """全ページの要素を逐次パースしてバッチで返すテスト"""
+        self.server.throttle_remaining = 1
+        engine = self._engine()
+
+        batches = list(engine.iter_batches("/listed/info", {}, "info", batch_size=2))
+
+        assert [[item["Code"] for item in batch] for batch in batches] == [
+            ["0000", "1000"],
+            ["2000"],
+        ]
+        assert engine.get_stats()["throttled"] == 1
+
+    def test_iter_batches_raises_on_failed_page(self):
+        """ページ取得失敗時に IOError となるテスト"""
+        engine = self._engine()
+
+        with pytest.raises(IOError):
+            list(engine.iter_batches("/unknown", {}, "info"))
+
+    def test_token_bucket_recovers_rate(self):
+        """成功時にレートが上限まで回復するテスト"""
+
+        async def scenario():
+            bucket = TokenBucket(100.0, 5)
+            bucket.throttle(0)
+            throttled_rate = bucket.rate
+            for _ in range(20):
+                bucket.recover()
+            return throttled_rate, bucket.rate
+
+        throttled_rate, recovered_rate = asyncio.run(scenario())
+        assert throttled_rate == 50.0
+        assert recovered_rate == 100.0
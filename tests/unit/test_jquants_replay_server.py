@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+J-Quants API ローカルリプレイサーバーのテスト
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import requests
+
+from core.jquants_client import JQuantsClient, TokenCache, token_expiry
+from core.jquants_fetch_engine import AsyncFetchEngine, FetchRequest
+from core.jquants_replay_server import (
+    JQuantsReplayServer,
+    ReplayConfig,
+    ReplayDataset,
+    record_dataset,
+)
+
+
+def _engine(server, **kwargs):
+    """リプレイサーバー向けの取得エンジン"""
+    options = dict(
+        id_token="token",
+        base_url=server.base_url,
+        rate_per_second=1000.0,
+        burst=100,
+        backoff_seconds=0.01,
+        session=requests.Session(),
+        logger=Mock(),
+    )
+    options.update(kwargs)
+    return AsyncFetchEngine(**options)
+
+
+class TestReplayDataset:
+    """リプレイ用データセットのテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_synthetic_dataset_is_deterministic(self):
+        """合成データがシードごとに同一で、営業日のみを含むテスト"""
+        first = ReplayDataset.synthetic(symbols=3, start="2024-01-05", trading_days=3)
+        second = ReplayDataset.synthetic(symbols=3, start="2024-01-05", trading_days=3)
+
+        assert first.daily_quotes == second.daily_quotes
+        assert len(first.daily_quotes) == 9
+        # 2024-01-06, 07 は土日
+        assert sorted({q["Date"] for q in first.daily_quotes}) == [
+            "2024-01-05",
+            "2024-01-08",
+            "2024-01-09",
+        ]
+        holidays = [c["Date"] for c in first.trading_calendar if c["HolidayDivision"] == "0"]
+        assert holidays == ["2024-01-06", "2024-01-07"]
+
+    def test_recorded_responses_round_trip(self):
+        """記録済みレスポンスの保存と読み込みテスト"""
+        source = ReplayDataset.synthetic(symbols=2, trading_days=2)
+        record_dataset(self.temp_dir, source.listed_info, source.daily_quotes)
+
+        dataset = ReplayDataset.from_directory(self.temp_dir)
+
+        assert dataset.listed_info == source.listed_info
+        assert dataset.daily_quotes == source.daily_quotes
+
+
+class TestJQuantsReplayServer:
+    """リプレイサーバーのテストクラス"""
+
+    def setup_method(self):
+        """データセットの準備"""
+        self.dataset = ReplayDataset.synthetic(symbols=5, start="2024-01-04", trading_days=10)
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_paginated_queries_through_fetch_engine(self):
+        """取得エンジンで pagination_key を辿り code・date・期間指定で取得するテスト"""
+        config = ReplayConfig(page_size=3)
+        with JQuantsReplayServer(self.dataset, config) as server:
+            engine = _engine(server)
+            code = self.dataset.listed_info[0]["Code"]
+
+            by_code = engine.run_all_pages(
+                "/prices/daily_quotes",
+                {"code": code[:4], "from": "20240105", "to": "2024-01-10"},
+                "daily_quotes",
+            )
+            by_date = engine.run_all_pages(
+                "/prices/daily_quotes", {"date": "2024-01-04"}, "daily_quotes"
+            )
+            listed = engine.run_all_pages("/listed/info", {}, "info")
+            stats = server.get_stats()
+
+        assert [q["Date"] for q in by_code] == [
+            "2024-01-05",
+            "2024-01-08",
+            "2024-01-09",
+            "2024-01-10",
+        ]
+        assert {q["Code"] for q in by_date} == {i["Code"] for i in self.dataset.listed_info}
+        assert len(listed) == 5
+        # 4件・5件・5件を3件ずつのページで返す
+        assert stats["by_path"]["/prices/daily_quotes"] == 4
+        assert stats["ok"] == stats["requests"]
+
+    def test_auth_flow_and_missing_token(self):
+        """認証エンドポイントでIDトークンを取得し、トークンなしは401とするテスト"""
+        with JQuantsReplayServer(self.dataset) as server:
+            client = JQuantsClient(
+                email="replay@example.com",
+                password="password",
+                base_url=server.base_url,
+                token_cache=TokenCache(self.temp_dir / "token_cache.json"),
+                session=requests.Session(),
+                logger=Mock(),
+            )
+            id_token = client.get_id_token()
+            response = client.get("/listed/info")
+            unauthorized = requests.get(f"{server.base_url}/listed/info")
+            stats = server.get_stats()
+
+        assert token_expiry(id_token) is not None
+        assert response.status_code == 200
+        assert len(response.json()["info"]) == 5
+        assert unauthorized.status_code == 401
+        assert stats["unauthorized"] == 1
+
+    def test_rate_limit_returns_retry_after(self):
+        """秒間上限を超えたリクエストに Retry-After 付きの429を返すテスト"""
+        config = ReplayConfig(rate_limit_per_second=2, retry_after_seconds=0.05)
+        with JQuantsReplayServer(self.dataset, config) as server:
+            headers = {"Authorization": "Bearer token"}
+            statuses = []
+            for _ in range(3):
+                response = requests.get(f"{server.base_url}/listed/info", headers=headers)
+                statuses.append(response.status_code)
+
+        assert statuses == [200, 200, 429]
+        assert response.headers["Retry-After"] == "0.05"
+
+    def test_fetch_engine_recovers_from_injected_faults(self):
+        """注入した429・500応答を取得エンジンが再試行で吸収するテスト"""
+        config = ReplayConfig(throttle_rate=0.2, error_rate=0.1, retry_after_seconds=0.01, seed=1)
+        with JQuantsReplayServer(self.dataset, config) as server:
+            engine = _engine(server, max_retries=10, max_throttle_retries=20)
+            codes = [item["Code"] for item in self.dataset.listed_info]
+            results = engine.run_many(
+                FetchRequest(code, "/prices/daily_quotes", {"code": code}) for code in codes
+            )
+            server_stats = server.get_stats()
+
+        engine_stats = engine.get_stats()
+        assert all(len(results[code]["daily_quotes"]) == 10 for code in codes)
+        assert server_stats["throttled"] + server_stats["errors"] > 0
+        assert engine_stats["throttled"] == server_stats["throttled"]
+        assert engine_stats["retries"] == server_stats["errors"]
+        assert engine_stats["succeeded"] == len(codes)
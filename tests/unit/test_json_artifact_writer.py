@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+ダッシュボード向けJSON成果物書き出しのテスト
+"""
+
+import gzip
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from core.json_artifact_writer import BROTLI_AVAILABLE, JSONArtifactWriter
+from core.static_site_publisher import IncrementalPublisher
+
+
+def _feed(count):
+    return {
+        "metadata": {"total_stocks": count},
+        "stocks": [{"code": f"{1300 + i}", "name": f"銘柄{i}", "price": i} for i in range(count)],
+    }
+
+
+class TestJSONArtifactWriter:
+    """JSON成果物書き出しのテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_minified_with_compressed_siblings(self):
+        """インデントなしの本体と、同じ内容の gzip ファイルを出力するテスト"""
+        writer = JSONArtifactWriter(self.temp_dir, logger=Mock())
+
+        report = writer.write("listed_index.json", _feed(50))
+
+        raw = (self.temp_dir / "listed_index.json").read_bytes()
+        assert b"\n" not in raw and b", " not in raw
+        assert gzip.decompress((self.temp_dir / "listed_index.json.gz").read_bytes()) == raw
+        assert report.raw_bytes == len(raw)
+        assert report.transfer_bytes < report.raw_bytes
+        assert (self.temp_dir / "listed_index.json.br").exists() == BROTLI_AVAILABLE
+        # 内容が同じなら圧縮済みファイルも同じバイト列
+        first = (self.temp_dir / "listed_index.json.gz").read_bytes()
+        writer.write("listed_index.json", _feed(50))
+        assert (self.temp_dir / "listed_index.json.gz").read_bytes() == first
+
+    def test_without_compression_removes_stale_siblings(self):
+        """圧縮しない書き出しで、以前の圧縮済みファイルを残さないテスト"""
+        JSONArtifactWriter(self.temp_dir, logger=Mock()).write("stocks/1301.json", _feed(1))
+        assert (self.temp_dir / "stocks" / "1301.json.gz").exists()
+
+        writer = JSONArtifactWriter(self.temp_dir, compression=(), logger=Mock())
+        report = writer.write("stocks/1301.json", _feed(2))
+
+        assert report.compressed_bytes == {}
+        assert sorted(p.name for p in (self.temp_dir / "stocks").iterdir()) == ["1301.json"]
+
+    def test_unknown_compression_rejected(self):
+        """未対応の圧縮形式を指定するとエラーになるテスト"""
+        with pytest.raises(ValueError):
+            JSONArtifactWriter(self.temp_dir, compression=("zstd",))
+
+    def test_oversized_feed_is_paged(self):
+        """page_bytes を超えるフィードをページに分割するテスト"""
+        writer = JSONArtifactWriter(
+            self.temp_dir, compression=(), page_bytes=1024, logger=Mock()
+        )
+
+        report = writer.write("listed_index.json", _feed(100), items_key="stocks")
+
+        first = json.loads((self.temp_dir / "listed_index.json").read_text(encoding="utf-8"))
+        pagination = first["pagination"]
+        assert report.pages == pagination["pages"] > 1
+        assert pagination["page_files"][0] == "listed_index.json"
+        assert first["metadata"] == {"total_stocks": 100}
+
+        codes = []
+        for page_file in pagination["page_files"]:
+            page = json.loads((self.temp_dir / page_file).read_text(encoding="utf-8"))
+            codes.extend(stock["code"] for stock in page["stocks"])
+            assert (self.temp_dir / page_file).stat().st_size <= 1024 * 1.2
+        assert codes == [f"{1300 + i}" for i in range(100)]
+
+    def test_size_budget_report(self):
+        """成果物ごとの予算との比較を報告するテスト"""
+        logger = Mock()
+        writer = JSONArtifactWriter(
+            self.temp_dir,
+            compression=(),
+            budgets={"stocks/*": 64, "*": 10_000},
+            logger=logger,
+        )
+
+        writer.write("prediction_results.json", _feed(5))
+        writer.write_many({f"stocks/{i}.json": {"code": i} for i in range(3)})
+        writer.write_many({"stocks/big.json": _feed(3)})
+        report = writer.log_report()
+
+        assert report["over_budget"] == ["stocks/big.json"]
+        # 予算内の銘柄別ファイルは報告に含めない
+        assert [a["name"] for a in report["artifacts"]] == [
+            "prediction_results.json",
+            "stocks/big.json",
+        ]
+        assert logger.warning.call_count == 1
+
+    def test_publisher_writes_and_prunes_siblings(self):
+        """差分公開で圧縮済みファイルも出力・削除するテスト"""
+        writer = JSONArtifactWriter(self.temp_dir, compression=("gzip",), logger=Mock())
+        publisher = IncrementalPublisher(self.temp_dir, writer=writer, logger=Mock())
+
+        publisher.publish({"risk_alerts.json": {"alerts": [1]}, "old.json": {}})
+        assert (self.temp_dir / "old.json.gz").exists()
+        publisher.publish({"risk_alerts.json": {"alerts": [1]}})
+
+        assert (self.temp_dir / "risk_alerts.json.gz").exists()
+        assert not (self.temp_dir / "old.json").exists()
+        assert not (self.temp_dir / "old.json.gz").exists()
@@ -239,8 +239,10 @@ class TestJSONDataManager:
 
         with open(self.manager.metadata_file, "r") as f:
             metadata = json.load(f)
-        assert "last_updated" in metadata
-        assert "data_sources" in metadata
+        assert metadata["last_updated"] is not None
+        # 銘柄ごとの記録は metadata.json に蓄積せず、追記専用ログから組み立てる
+        assert "data_sources" not in metadata
+        assert "1234" in self.manager.get_metadata()["data_sources"]
 
     def test_log_diff(self):
         """差分ログテスト"""
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+JSONデータ管理システムの日付範囲クエリのテスト
+"""
+
+import json
+import shutil
+import tempfile
+from unittest.mock import Mock, patch
+
+from core.json_data_manager import JSONDataManager
+
+
+def _make_records(symbol, dates):
+    return [
+        {
+            "date": date,
+            "code": symbol,
+            "open": 100.0,
+            "high": 110.0,
+            "low": 90.0,
+            "close": 105.0,
+            "volume": 1000,
+        }
+        for date in dates
+    ]
+
+
+class TestDateIndexedQueries:
+    """日付範囲クエリのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = JSONDataManager(self.temp_dir, Mock())
+        dates = [f"2024-01-{day:02d}" for day in range(1, 11)]
+        self.manager.save_stock_data("1234", _make_records("1234", dates))
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_range_matches_linear_scan(self):
+        """二分探索による範囲取得が線形走査と一致するテスト"""
+        data = self.manager.get_stock_data("1234")
+        ranges = [
+            ("2024-01-03", "2024-01-05"),
+            ("2023-12-01", "2024-01-02"),
+            ("2024-01-09", "2025-01-01"),
+            ("2024-01-06", None),
+            (None, "2024-01-04"),
+            ("2024-01-05", "2024-01-04"),
+            ("2024-01-03T00:00:00", "2024-01-05"),
+        ]
+        for start_date, end_date in ranges:
+            expected = [
+                item
+                for item in data
+                if (not start_date or item["date"] >= start_date)
+                and (not end_date or item["date"] <= end_date)
+            ]
+            assert self.manager.get_stock_data("1234", start_date, end_date) == expected
+
+    def test_latest_data_newest_first(self):
+        """最新N件が新しい順で返るテスト"""
+        latest = self.manager.get_latest_data("1234", days=3)
+
+        assert [item["date"] for item in latest] == [
+            "2024-01-10",
+            "2024-01-09",
+            "2024-01-08",
+        ]
+        assert len(self.manager.get_latest_data("1234", days=100)) == 10
+        assert self.manager.get_latest_data("1234", days=0) == []
+
+    def test_latest_data_copies_only_returned_rows(self):
+        """全期間をコピーせず、返す行だけがコピーされるテスト"""
+        with patch.object(
+            JSONDataManager, "get_stock_data", side_effect=AssertionError
+        ):
+            latest = self.manager.get_latest_data("1234", days=2)
+
+        assert [item["date"] for item in latest] == ["2024-01-10", "2024-01-09"]
+        latest[0]["close"] = 0.0
+        assert self.manager.get_latest_data("1234", days=1)[0]["close"] == 105.0
+
+    def test_export_date_range(self):
+        """期間指定エクスポートのテスト"""
+        output_file = f"{self.temp_dir}/export/1234.json"
+
+        assert self.manager.export_data("1234", output_file, start_date="2024-01-09")
+
+        with open(output_file, "r", encoding="utf-8") as f:
+            exported = json.load(f)
+        assert [item["date"] for item in exported["data"]] == [
+            "2024-01-09",
+            "2024-01-10",
+        ]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+JSONデータ管理システム（銘柄別シャード形式）のテスト
+"""
+
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from core.json_data_manager import JSONDataManager
+
+
+def _make_records(symbol, dates):
+    return [
+        {
+            "date": date,
+            "code": symbol,
+            "open": 100.0,
+            "high": 110.0,
+            "low": 90.0,
+            "close": 105.0,
+            "volume": 1000,
+        }
+        for date in dates
+    ]
+
+
+class TestShardedStorage:
+    """シャード形式ストレージのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.logger = Mock()
+        self.manager = JSONDataManager(
+            self.temp_dir, self.logger, storage_mode="sharded"
+        )
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_invalid_storage_mode(self):
+        """未対応ストレージモードのテスト"""
+        with pytest.raises(ValueError):
+            JSONDataManager(self.temp_dir, self.logger, storage_mode="unknown")
+
+    def test_save_writes_only_symbol_shard(self):
+        """保存時に銘柄シャードとマニフェストのみ書き込まれるテスト"""
+        records = _make_records("1234", ["2024-01-02", "2024-01-01"])
+
+        assert self.manager.save_stock_data("1234", records) is True
+
+        assert not self.manager.stock_data_file.exists()
+        shard_path = self.manager._shard_path("1234")
+        with open(shard_path, "r") as f:
+            saved = json.load(f)
+        assert [item["date"] for item in saved] == ["2024-01-01", "2024-01-02"]
+
+        # マニフェストは書き直さずジャーナルへ追記し、close で反映する
+        assert not self.manager.manifest_file.exists()
+        self.manager.close()
+        with open(self.manager.manifest_file, "r") as f:
+            manifest = json.load(f)
+        entry = manifest["symbols"]["1234"]
+        assert entry["total_records"] == 2
+        assert entry["start_date"] == "2024-01-01"
+        assert entry["end_date"] == "2024-01-02"
+        assert self.manager.manifest_journal.latest() == {}
+
+    def test_manifest_journal_appends_without_rewrite(self):
+        """一括コミット外の保存でマニフェスト全体を書き直さないテスト"""
+        self.manager.save_stock_data("1000", _make_records("1000", ["2024-01-01"]))
+        self.manager.compact_manifest()
+        mtime = self.manager.manifest_file.stat().st_mtime_ns
+
+        for i in range(1, 20):
+            symbol = str(1000 + i)
+            self.manager.save_stock_data(symbol, _make_records(symbol, ["2024-01-01"]))
+
+        assert self.manager.manifest_file.stat().st_mtime_ns == mtime
+        other = JSONDataManager(self.temp_dir, self.logger, storage_mode="sharded")
+        assert len(other.get_all_symbols()) == 20
+        assert other.get_last_dates(["1019"]) == {"1019": "2024-01-01"}
+
+        # 一括コミットで manifest.json へ反映してジャーナルを空にする
+        with self.manager.batch_commit():
+            self.manager.save_stock_data("2000", _make_records("2000", ["2024-01-01"]))
+        with open(self.manager.manifest_file, "r") as f:
+            assert len(json.load(f)["symbols"]) == 21
+        assert self.manager.manifest_journal.journal_file.stat().st_size == 0
+
+    def test_get_stock_data_and_symbols(self):
+        """銘柄データ取得と銘柄一覧のテスト"""
+        self.manager.save_stock_data("1234", _make_records("1234", ["2024-01-01"]))
+        self.manager.save_stock_data(
+            "5678", _make_records("5678", ["2024-01-01", "2024-01-02"])
+        )
+
+        assert len(self.manager.get_stock_data("5678")) == 2
+        assert self.manager.get_stock_data("9999") == []
+        assert set(self.manager.get_all_symbols()) == {"1234", "5678"}
+
+        stats = self.manager.get_statistics()
+        assert stats["storage_mode"] == "sharded"
+        assert stats["total_symbols"] == 2
+        assert stats["total_records"] == 3
+
+    def test_cleanup_old_data_rewrites_only_stale_shards(self):
+        """クリーンアップで古いレコードを含むシャードのみ更新されるテスト"""
+        today = datetime.now()
+        old = (today - timedelta(days=400)).strftime("%Y-%m-%d")
+        recent = (today - timedelta(days=10)).strftime("%Y-%m-%d")
+
+        self.manager.save_stock_data("1234", _make_records("1234", [old, recent]))
+        self.manager.save_stock_data("5678", _make_records("5678", [recent]))
+        self.manager.save_stock_data("9999", _make_records("9999", [old]))
+        untouched_mtime = self.manager._shard_path("5678").stat().st_mtime_ns
+
+        assert self.manager.cleanup_old_data(days_to_keep=365) is True
+
+        assert [item["date"] for item in self.manager.get_stock_data("1234")] == [
+            recent
+        ]
+        assert self.manager._shard_path("5678").stat().st_mtime_ns == untouched_mtime
+        assert not self.manager._shard_path("9999").exists()
+        assert set(self.manager.get_all_symbols()) == {"1234", "5678"}
+
+
+class TestMigrateToSharded:
+    """単一ファイル形式からの移行テストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.logger = Mock()
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_migrate_from_single_file(self):
+        """単一ファイル形式のデータ移行テスト"""
+        single = JSONDataManager(self.temp_dir, self.logger)
+        single.save_stock_data("1234", _make_records("1234", ["2024-01-01"]))
+        single.save_stock_data("5678", _make_records("5678", ["2024-01-01"]))
+
+        result = single.migrate_to_sharded(remove_source=True)
+
+        assert result == {"success": True, "migrated_symbols": 2}
+        assert single.storage_mode == "sharded"
+        assert not single.stock_data_file.exists()
+
+        sharded = JSONDataManager(self.temp_dir, self.logger, storage_mode="sharded")
+        assert set(sharded.get_all_symbols()) == {"1234", "5678"}
+        assert sharded.get_stock_data("1234")[0]["close"] == 105.0
+
+    def test_warns_when_unmigrated_single_file_exists(self):
+        """未移行の単一ファイルが存在する場合の警告テスト"""
+        single = JSONDataManager(self.temp_dir, self.logger)
+        single.save_stock_data("1234", _make_records("1234", ["2024-01-01"]))
+
+        JSONDataManager(self.temp_dir, self.logger, storage_mode="sharded")
+
+        self.logger.warning.assert_called()
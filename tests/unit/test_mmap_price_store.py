@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+メモリマップ株価ストアのテスト
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+
+from core.differential_updater import DifferentialUpdater
+from core.json_data_manager import JSONDataManager
+from core.mmap_price_store import MmapPriceStore
+
+
+def _make_records(symbol, count=5):
+    return [
+        {
+            "date": f"2024-01-{day:02d}",
+            "code": symbol,
+            "open": 100.0 + day,
+            "high": 110.0 + day,
+            "low": 90.0 + day,
+            "close": 105.0 + day,
+            "volume": 1000 * day,
+        }
+        for day in range(1, count + 1)
+    ]
+
+
+class TestMmapPriceStore:
+    """メモリマップ株価ストアのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = MmapPriceStore(Path(self.temp_dir), Mock())
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_arrays_are_readonly_views(self):
+        """取得配列がメモリマップの読み取り専用ビューであるテスト"""
+        self.store.write("1234", _make_records("1234"))
+
+        arrays = self.store.get_arrays("1234")
+
+        prices = self.store._open("1234")
+        assert isinstance(prices, np.memmap)
+        assert np.shares_memory(arrays["close"], prices)
+        assert not arrays["close"].flags.writeable
+        assert arrays["close"].tolist() == [106.0, 107.0, 108.0, 109.0, 110.0]
+
+    def test_date_range_slicing(self):
+        """日付範囲の切り出しテスト"""
+        self.store.write("1234", _make_records("1234"))
+
+        arrays = self.store.get_arrays("1234", "2024-01-02", "2024-01-03")
+
+        assert arrays["date"].tolist() == [
+            np.datetime64("2024-01-02", "D"),
+            np.datetime64("2024-01-03", "D"),
+        ]
+        assert arrays["volume"].tolist() == [2000.0, 3000.0]
+
+    def test_reopens_after_rewrite(self):
+        """再書き込み後に新しいデータを参照するテスト"""
+        self.store.write("1234", _make_records("1234", 2))
+        assert len(self.store.get_arrays("1234")["date"]) == 2
+
+        self.store.write("1234", _make_records("1234", 4))
+
+        assert len(self.store.get_arrays("1234")["date"]) == 4
+
+    def test_dates_and_prices_in_single_file(self):
+        """日付とOHLCVを1ファイルで置き換え、食い違った組を参照しないテスト"""
+        self.store.write("1234", _make_records("1234", 2))
+        old = self.store.get_arrays("1234")
+
+        self.store.write("1234", _make_records("1234", 4))
+        new = self.store.get_arrays("1234")
+
+        assert [p.name for p in Path(self.temp_dir).iterdir()] == ["1234.prices.npy"]
+        # 置き換え前のビューは古い組のまま参照できる
+        assert len(old["date"]) == len(old["close"]) == 2
+        assert len(new["date"]) == len(new["close"]) == 4
+
+    def test_missing_symbol_and_delete(self):
+        """存在しない銘柄と削除のテスト"""
+        assert self.store.get_arrays("9999") is None
+
+        self.store.write("1234", _make_records("1234"))
+        assert self.store.symbols() == ["1234"]
+        assert self.store.delete("1234") is True
+        assert self.store.get_arrays("1234") is None
+
+
+class TestJSONDataManagerMmap:
+    """JSONDataManagerのメモリマップ連携テストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.logger = Mock()
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_written_on_differential_update(self):
+        """差分更新後にメモリマップ配列が書き出されるテスト"""
+        updater = DifferentialUpdater(self.temp_dir, self.logger, enable_mmap=True)
+
+        updater.update_stock_data("1234", _make_records("1234"))
+
+        arrays = updater.json_manager.get_price_arrays("1234", start_date="2024-01-04")
+        assert arrays["close"].tolist() == [109.0, 110.0]
+        assert not arrays["close"].flags.writeable
+
+    def test_fallback_without_mmap(self):
+        """メモリマップ無効時のフォールバックテスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger)
+        manager.save_stock_data("1234", _make_records("1234"))
+
+        arrays = manager.get_price_arrays("1234", end_date="2024-01-02")
+
+        assert arrays["open"].tolist() == [101.0, 102.0]
+        assert not (Path(self.temp_dir) / "mmap").exists()
+
+    def test_build_mmap_store(self):
+        """既存データからのメモリマップ作成テスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger)
+        manager.save_stock_data("1234", _make_records("1234"))
+        manager.save_stock_data("5678", _make_records("5678"))
+
+        assert manager.build_mmap_store() == 2
+        assert manager.mmap_store.symbols() == ["1234", "5678"]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+並列バッチ更新と一括コミットのテスト
+"""
+
+import shutil
+import tempfile
+from unittest.mock import Mock, patch
+
+from core.differential_updater import DifferentialUpdater
+from core.json_data_manager import JSONDataManager
+
+
+def _make_records(symbol, count=3, close=100.0):
+    return [
+        {
+            "date": f"2024-01-{day:02d}",
+            "code": symbol,
+            "open": close,
+            "high": close + 10,
+            "low": close - 10,
+            "close": close + day,
+            "volume": 1000,
+        }
+        for day in range(1, count + 1)
+    ]
+
+
+class TestParallelBatchUpdate:
+    """並列バッチ更新のテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.updater = DifferentialUpdater(self.temp_dir, Mock())
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parallel_updates_commit_once(self):
+        """並列更新で共有ファイルが最後に1回だけ書き込まれるテスト"""
+        manager = self.updater.json_manager
+        updates = [
+            {"symbol": f"{1000 + i}", "data": _make_records(f"{1000 + i}")}
+            for i in range(20)
+        ]
+
+        with patch.object(manager, "_save_json", wraps=manager._save_json) as mock_save:
+            result = self.updater.batch_update(updates, max_workers=4)
+
+        assert result["success"] is True
+        assert result["successful"] == 20
+        assert [r["symbol"] for r in result["results"]] == [
+            u["symbol"] for u in updates
+        ]
+        saved_files = [call.args[0] for call in mock_save.call_args_list]
+        assert saved_files.count(manager.stock_data_file) == 1
+        assert saved_files.count(manager.metadata_file) == 1
+
+        assert len(manager.get_all_symbols()) == 20
+        assert len(manager.get_metadata()["data_sources"]) == 20
+        assert len(manager.get_diff_log(symbol="1005")) == 2
+
+        timing = result["timing"]
+        assert timing["workers"] == 4
+        assert timing["max_update_time"] <= timing["update_time_total"]
+        assert timing["updates_per_second"] > 0
+
+    def test_same_symbol_updates_keep_input_order(self):
+        """同一銘柄の更新が入力順に適用されるテスト"""
+        updates = [
+            {"symbol": "1234", "data": _make_records("1234", 2)},
+            {"symbol": "5678", "data": _make_records("5678", 2)},
+            {"symbol": "1234", "data": _make_records("1234", 4)},
+        ]
+
+        result = self.updater.batch_update(updates, max_workers=3)
+
+        assert result["success"] is True
+        assert result["results"][2]["diff"]["added"] == 2
+        assert len(self.updater.json_manager.get_stock_data("1234")) == 4
+
+    def test_sequential_mode_reports_timing(self):
+        """逐次モードでも集計時間が返るテスト"""
+        result = self.updater.batch_update(
+            [{"symbol": "1234", "data": _make_records("1234")}]
+        )
+
+        assert result["success"] is True
+        assert result["timing"]["workers"] == 1
+
+
+class TestBatchCommit:
+    """JSONDataManagerの一括コミットのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = JSONDataManager(self.temp_dir, Mock(), storage_mode="sharded")
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_manifest_and_diff_log_deferred_until_commit(self):
+        """マニフェストと差分ログがコミットまで保留されるテスト"""
+        with self.manager.batch_commit():
+            with self.manager.batch_commit():
+                self.manager.save_stock_data("1234", _make_records("1234"))
+                self.manager.save_stock_data("5678", _make_records("5678"))
+            # 入れ子の内側を抜けても未反映
+            assert not self.manager.manifest_file.exists()
+            assert self.manager.diff_log_store.count() == 0
+            assert len(self.manager.get_stock_data("1234")) == 3
+
+        assert set(self.manager.get_all_symbols()) == {"1234", "5678"}
+        assert self.manager.diff_log_store.count() == 2
+        assert set(self.manager.get_metadata()["data_sources"]) == {"1234", "5678"}
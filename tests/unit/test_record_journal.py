@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+追記専用レコードジャーナルと銘柄メタデータログのテスト
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+from core.json_data_manager import JSONDataManager
+from core.record_journal import RecordJournal
+
+
+def _make_records(symbol, dates):
+    return [
+        {
+            "date": date,
+            "code": symbol,
+            "open": 100.0,
+            "high": 110.0,
+            "low": 90.0,
+            "close": 105.0,
+            "volume": 1000,
+        }
+        for date in dates
+    ]
+
+
+class TestRecordJournal:
+    """追記専用レコードジャーナルのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "journal.jsonl"
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_latest_and_history(self):
+        """キーごとの最新レコードと直近の追記レコードのテスト"""
+        journal = RecordJournal(self.path, history_limit=2)
+        journal.append({"symbol": "1301", "value": 1})
+        journal.append_many([{"symbol": "1332", "value": 2}, {"symbol": "1301", "value": 3}])
+
+        assert journal.latest() == {
+            "1301": {"symbol": "1301", "value": 3},
+            "1332": {"symbol": "1332", "value": 2},
+        }
+        assert [r["value"] for r in journal.history()] == [2, 3]
+
+    def test_reads_appends_from_other_instance(self):
+        """他のインスタンスの追記を差分のみ読み込み、書き込み途中の行は読み飛ばすテスト"""
+        writer = RecordJournal(self.path)
+        reader = RecordJournal(self.path)
+        writer.append({"symbol": "1301", "value": 1})
+        assert reader.get("1301")["value"] == 1
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"symbol":"1332","value":2}\n{"symbol":"7203"')
+        assert set(reader.latest()) == {"1301", "1332"}
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(',"value":3}\n')
+        assert reader.get("7203")["value"] == 3
+
+    def test_compacts_to_latest_records(self):
+        """行数が増えたら最新レコードと直近の追記レコードのみに書き直すテスト"""
+        journal = RecordJournal(self.path, history_limit=2, compact_factor=2)
+        for value in range(10):
+            journal.append({"symbol": str(value % 2), "value": value})
+
+        lines = self.path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) <= 2 * 2 + 2
+        assert {k: r["value"] for k, r in journal.latest().items()} == {"0": 8, "1": 9}
+
+        other = RecordJournal(self.path, history_limit=2)
+        assert [r["value"] for r in other.history()] == [8, 9]
+
+
+class TestJSONDataManagerSymbolMetadata:
+    """JSONDataManagerの銘柄メタデータログ連携テストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.logger = Mock()
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_metadata_file_does_not_grow_with_symbols(self):
+        """銘柄数が増えても metadata.json は全体の集計のみで大きくならないテスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger)
+        manager.save_stock_data("1000", _make_records("1000", ["2024-01-04"]))
+        size = manager.metadata_file.stat().st_size
+
+        for i in range(1, 30):
+            symbol = str(1000 + i)
+            manager.save_stock_data(symbol, _make_records(symbol, ["2024-01-04"]))
+
+        assert manager.metadata_file.stat().st_size <= size + 8
+        metadata = manager.get_metadata()
+        assert metadata["update_count"] == 30
+        assert len(metadata["data_sources"]) == 30
+        assert metadata["update_history"][-1]["symbol"] == "1029"
+        assert manager.get_last_dates(["1005"]) == {"1005": "2024-01-04"}
+
+    def test_imports_legacy_data_sources(self):
+        """旧形式の metadata.json の data_sources をログへ移行するテスト"""
+        legacy = {
+            "created_at": "2024-01-01T00:00:00",
+            "last_updated": "2024-01-05T00:00:00",
+            "version": "1.0",
+            "data_sources": {
+                "1301": {
+                    "source": "jquants_api",
+                    "last_updated": "2024-01-05T00:00:00",
+                    "total_records": 2,
+                    "last_date": "2024-01-05",
+                }
+            },
+            "update_history": [],
+        }
+        Path(self.temp_dir, "metadata.json").write_text(json.dumps(legacy))
+
+        manager = JSONDataManager(self.temp_dir, self.logger)
+
+        assert "data_sources" not in json.loads(manager.metadata_file.read_text())
+        assert manager.get_metadata()["data_sources"]["1301"]["source"] == "jquants_api"
+        assert manager.get_last_dates(["1301"]) == {"1301": "2024-01-05"}
+
+    def test_empty_legacy_data_sources(self):
+        """旧形式でも移行する銘柄がなければログを作らず、キーのみ取り除くテスト"""
+        legacy = {
+            "created_at": "2024-01-01T00:00:00",
+            "last_updated": None,
+            "version": "1.0",
+            "data_sources": {},
+            "update_history": [],
+        }
+        Path(self.temp_dir, "metadata.json").write_text(json.dumps(legacy))
+
+        manager = JSONDataManager(self.temp_dir, self.logger)
+
+        assert "data_sources" not in json.loads(manager.metadata_file.read_text())
+        assert not manager.symbol_metadata_log.journal_file.exists()
+        self.logger.info.assert_not_called()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+静的サイト向けデータの差分公開のテスト
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+from core.static_site_publisher import IncrementalPublisher, content_hash
+from core.structured_data_builder import build_index_shards, build_structured_data
+
+
+def _stock(price):
+    return {"name": "銘柄", "current_price": {"last_price": price, "updated_at": "now"}}
+
+
+class TestIncrementalPublisher:
+    """差分公開のテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.publisher = IncrementalPublisher(self.temp_dir, logger=Mock())
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _files(self, prices):
+        data = build_structured_data(
+            {code: _stock(price) for code, price in prices.items()}, "full"
+        )
+        files = {f"stocks/{code}.json": stock for code, stock in data["stocks"].items()}
+        files.update(build_index_shards(data))
+        return files
+
+    def test_content_hash_ignores_timestamps_and_key_order(self):
+        """ハッシュがキー順・日時項目に依存しないテスト"""
+        first = {"a": 1, "b": {"generated_at": "2024-01-01", "c": [1, 2]}}
+        second = {"b": {"c": [1, 2], "generated_at": "2024-02-01"}, "a": 1}
+
+        assert content_hash(first) == content_hash(second)
+        assert content_hash(first) != content_hash({"a": 2, "b": {"c": [1, 2]}})
+
+    def test_data_dates_are_content(self):
+        """最終取引日など、データに由来する日時の変化はハッシュに反映するテスト"""
+        first = {"metadata": {"last_trade_date": "2024-01-04", "updated_at": "2024-01-04"}}
+        second = {"metadata": {"last_trade_date": "2024-01-05", "updated_at": "2024-01-04"}}
+
+        assert content_hash(first) != content_hash(second)
+        assert content_hash(first) != content_hash(
+            {"metadata": {"last_trade_date": "2024-01-04", "updated_at": "2024-01-05"}}
+        )
+
+    def test_rewrites_only_changed_files(self):
+        """変更のあった銘柄ファイルとインデックスシャードのみを書き換えるテスト"""
+        first = self.publisher.publish(self._files({"1301": 100, "1332": 200, "7203": 300}))
+        assert len(first.written) == 6
+        manifest_before = self.publisher.load_manifest()
+
+        second = self.publisher.publish(self._files({"1301": 100, "1332": 201, "7203": 300}))
+
+        assert second.written == ["index/13.json", "stocks/1332.json"]
+        assert second.unchanged == 4
+        manifest = self.publisher.load_manifest()
+        assert manifest["files"]["stocks/7203.json"] == manifest_before["files"]["stocks/7203.json"]
+        assert manifest["files"]["stocks/1332.json"]["hash"] != (
+            manifest_before["files"]["stocks/1332.json"]["hash"]
+        )
+        shard = json.loads((self.temp_dir / "index" / "13.json").read_text(encoding="utf-8"))
+        assert [s["last_price"] for s in shard["stocks"]] == [100, 201]
+
+    def test_no_changes_leaves_tree_untouched(self):
+        """変更がなければマニフェストを含め何も書き換えないテスト"""
+        self.publisher.publish(self._files({"1301": 100}))
+        mtime = self.publisher.manifest_file.stat().st_mtime_ns
+
+        result = self.publisher.publish(self._files({"1301": 100}))
+
+        assert not result.changed
+        assert self.publisher.manifest_file.stat().st_mtime_ns == mtime
+
+    def test_prunes_removed_files_and_restores_deleted(self):
+        """公開対象から外れたファイルの削除と、消えたファイルの再出力テスト"""
+        unrelated = self.temp_dir / "listed_index.json"
+        unrelated.write_text("{}", encoding="utf-8")
+        self.publisher.publish(self._files({"1301": 100, "7203": 300}))
+        (self.temp_dir / "stocks" / "1301.json").unlink()
+
+        result = self.publisher.publish(self._files({"1301": 100}))
+
+        # シャード一覧の変わった index.json と、削除された 1301 のみ書き換える
+        assert result.written == ["index.json", "stocks/1301.json"]
+        assert result.removed == ["index/72.json", "stocks/7203.json"]
+        assert not (self.temp_dir / "stocks" / "7203.json").exists()
+        # マニフェストに記録のないファイルには触れない
+        assert unrelated.exists()
+        assert self.publisher.cache_busted_path("stocks/1301.json").startswith(
+            "stocks/1301.json?v="
+        )
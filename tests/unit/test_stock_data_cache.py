@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+解析済み株価データキャッシュのテスト
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from core.json_data_manager import JSONDataManager
+from core.stock_data_cache import ParsedDataCache, file_token
+
+
+def _make_records(symbol, dates):
+    return [
+        {
+            "date": date,
+            "code": symbol,
+            "open": 100.0,
+            "high": 110.0,
+            "low": 90.0,
+            "close": 105.0,
+            "volume": 1000,
+        }
+        for date in dates
+    ]
+
+
+class TestParsedDataCache:
+    """LRUキャッシュ本体のテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / "a.json"
+        self.path.write_text("[]")
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_hit_and_stale_token(self):
+        """トークン一致時のヒットと不一致時の破棄のテスト"""
+        cache = ParsedDataCache()
+        token = file_token(self.path)
+        cache.put(self.path, token, ["x"], 1)
+
+        assert cache.get(self.path, token) == ["x"]
+        assert cache.get(self.path, (0, 0)) is None
+        assert cache.get(self.path, token) is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["entries"] == 0
+
+    def test_eviction_by_record_count(self):
+        """総レコード数による追い出しのテスト"""
+        cache = ParsedDataCache(max_records=10)
+        token = file_token(self.path)
+        cache.put("a", token, "A", 6)
+        cache.put("b", token, "B", 3)
+        cache.get("a", token)
+        cache.put("c", token, "C", 4)
+
+        assert cache.get("b", token) is None
+        assert cache.get("a", token) == "A"
+        assert cache.get_stats()["evictions"] == 1
+
+        cache.put("huge", token, "H", 11)
+        assert cache.get("huge", token) is None
+
+    def test_parts_share_file_token(self):
+        """ファイル内の部分ごとの登録・古いトークンの部分の破棄・一括無効化のテスト"""
+        cache = ParsedDataCache(max_records=10)
+        cache.put(self.path, (1, 1), "A1", 4, part="A")
+        cache.put(self.path, (1, 1), "B1", 4, part="B")
+        cache.put(self.path, (2, 2), "A2", 4, part="A")
+
+        # ファイルが更新されたため、古いトークンの部分はまとめて破棄
+        assert cache.get_stats()["records"] == 4
+        assert cache.get(self.path, (2, 2), part="A") == "A2"
+        assert cache.get(self.path, (2, 2), part="B") is None
+
+        cache.put(self.path, (2, 2), "B2", 4, part="B")
+        cache.put(self.path, (2, 2), "C2", 4, part="C")
+        assert cache.get(self.path, (2, 2), part="A") is None
+        assert cache.get_stats()["evictions"] == 1
+
+        cache.invalidate(self.path)
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestJSONDataManagerCache:
+    """JSONDataManagerのキャッシュ連携テストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.logger = Mock()
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_repeated_reads_skip_parsing(self):
+        """繰り返し読み込みでJSON解析を行わないテスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger)
+        manager.save_stock_data("1234", _make_records("1234", ["2024-01-01"]))
+
+        with patch("core.json_data_manager.json.load") as mock_load:
+            for _ in range(3):
+                assert len(manager.get_stock_data("1234")) == 1
+            assert manager.get_all_symbols() == ["1234"]
+
+        mock_load.assert_not_called()
+
+    def test_single_file_cached_per_symbol(self):
+        """単一ファイルが上限を超えても銘柄単位でキャッシュ・追い出しされるテスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger)
+        manager.series_cache = ParsedDataCache(max_records=25)
+        dates = [f"2024-01-{day:02d}" for day in range(1, 11)]
+        manager.begin_batch()
+        for symbol in ("1111", "2222", "3333", "4444"):
+            manager.save_stock_data(symbol, _make_records(symbol, dates))
+        manager.commit_batch()
+
+        # 全銘柄（40件）は上限を超えるが、最近使った銘柄はキャッシュから返す
+        with patch("core.json_data_manager.json.load") as mock_load:
+            assert len(manager.get_stock_data("4444")) == 10
+            assert len(manager.get_stock_data("3333")) == 10
+            assert sorted(manager.get_all_symbols()) == ["1111", "2222", "3333", "4444"]
+        mock_load.assert_not_called()
+
+        # 追い出された銘柄はファイルを解析し直して返す
+        assert len(manager.get_stock_data("1111")) == 10
+        assert manager.series_cache.get_stats()["records"] <= 25
+
+    def test_shared_between_instances_and_external_edit(self):
+        """インスタンス間の共有と外部更新の検知テスト"""
+        for mode in ("single", "sharded"):
+            data_dir = Path(self.temp_dir) / mode
+            writer = JSONDataManager(str(data_dir), self.logger, storage_mode=mode)
+            reader = JSONDataManager(str(data_dir), self.logger, storage_mode=mode)
+            writer.save_stock_data("1234", _make_records("1234", ["2024-01-01"]))
+            assert len(reader.get_stock_data("1234")) == 1
+
+            writer.save_stock_data(
+                "1234", _make_records("1234", ["2024-01-01", "2024-01-02"])
+            )
+            assert len(reader.get_stock_data("1234")) == 2
+
+            # ファイルの直接編集も mtime・サイズで検知する
+            path = writer._symbol_file("1234") if mode == "sharded" else None
+            path = path or writer.stock_data_file
+            content = json.loads(path.read_text())
+            if mode == "single":
+                content["1234"] = content["1234"][:1]
+            else:
+                content = content[:1]
+            path.write_text(json.dumps(content))
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+            assert len(reader.get_stock_data("1234")) == 1
+
+    def test_returned_list_is_not_cached_object(self):
+        """取得結果の変更がキャッシュに影響しないテスト"""
+        manager = JSONDataManager(self.temp_dir, self.logger)
+        manager.save_stock_data("1234", _make_records("1234", ["2024-01-01"]))
+
+        manager.get_stock_data("1234").clear()
+        manager.get_stock_data("1234")[0]["close"] = 0.0
+        manager.get_stock_data("1234", start_date="2024-01-01")[0]["close"] = 0.0
+
+        other = JSONDataManager(self.temp_dir, self.logger)
+        assert other.get_stock_data("1234")[0]["close"] == 105.0
+        assert len(manager.get_stock_data("1234")) == 1
+        assert "cache" in manager.get_statistics()
+
+    def test_pending_batch_not_visible_through_cache(self):
+        """一括コミット前の単一ファイルへの保存が他のインスタンスから見えないテスト"""
+        writer = JSONDataManager(self.temp_dir, self.logger)
+        reader = JSONDataManager(self.temp_dir, self.logger)
+        writer.save_stock_data("1234", _make_records("1234", ["2024-01-01"]))
+        assert reader.get_all_symbols() == ["1234"]
+
+        writer.begin_batch()
+        writer.save_stock_data("5678", _make_records("5678", ["2024-01-01"]))
+        assert reader.get_all_symbols() == ["1234"]
+        assert reader.get_stock_data("5678") == []
+
+        writer.commit_batch()
+        assert sorted(reader.get_all_symbols()) == ["1234", "5678"]
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+ストリーミング（逐次更新）テクニカル指標のテスト
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from core.indicator_engine import IndicatorEngine
+from core.realtime_risk_monitor import RealtimeRiskMonitor
+from core.realtime_stop_loss_system import RealtimeStopLossSystem, VolatilityCalculator
+from core.streaming_indicators import (
+    LiveIndicators,
+    RollingExtreme,
+    RollingStats,
+    StreamingATR,
+    StreamingEMA,
+    StreamingWilderRSI,
+)
+
+
+def _bars(length=300, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, length).cumsum()
+    return close + rng.random(length), close - rng.random(length), close
+
+
+def _values(results):
+    return np.array([np.nan if value is None else value for value in results])
+
+
+class TestStreamingIndicators:
+    """ストリーミング指標のテストクラス"""
+
+    def setup_method(self):
+        """テストデータの準備"""
+        self.high, self.low, self.close = _bars()
+        self.engine = IndicatorEngine(close=self.close, high=self.high, low=self.low)
+
+    def test_incremental_matches_batch_engine(self):
+        """1件ずつの更新結果が一括計算と一致するテスト"""
+        ema, rsi, atr = StreamingEMA(20), StreamingWilderRSI(14), StreamingATR(14)
+        stats = RollingStats(20)
+        highest, lowest = RollingExtreme(20, "max"), RollingExtreme(20, "min")
+        std = []
+        rows = []
+        for high, low, close in zip(self.high, self.low, self.close):
+            rows.append(
+                (
+                    ema.update(close),
+                    rsi.update(close),
+                    atr.update(high, low, close),
+                    stats.update(close),
+                    highest.update(high),
+                    lowest.update(low),
+                )
+            )
+            std.append(stats.std())
+        columns = [_values(column) for column in zip(*rows)]
+
+        expected = [
+            self.engine.ema(20),
+            self.engine.wilder_rsi(14),
+            self.engine.atr(14),
+            self.engine.sma(20),
+            self.engine.rolling_max("high", 20),
+            self.engine.rolling_min("low", 20),
+        ]
+        for actual, reference in zip(columns, expected):
+            np.testing.assert_allclose(actual, reference, rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(
+            _values(std), self.engine.rolling_std("close", 20), rtol=1e-8, equal_nan=True
+        )
+
+    def test_seeded_from_history_continues_like_batch(self):
+        """履歴から作成した後の逐次更新が全期間の一括計算と一致するテスト"""
+        live = LiveIndicators.from_history(self.close[:200], self.high[:200], self.low[:200])
+        for high, low, close in zip(self.high[200:], self.low[200:], self.close[200:]):
+            latest = live.update(close, high, low)
+
+        assert latest["bars"] == len(self.close)
+        assert latest["ema"] == pytest.approx(self.engine.ema(20)[-1], rel=1e-10)
+        assert latest["rsi"] == pytest.approx(self.engine.wilder_rsi(14)[-1], rel=1e-10)
+        assert latest["atr"] == pytest.approx(self.engine.atr(14)[-1], rel=1e-10)
+        assert latest["std"] == pytest.approx(
+            self.engine.rolling_std("close", 20)[-1], rel=1e-8
+        )
+        assert latest["rolling_high"] == self.engine.rolling_max("high", 20)[-1]
+
+    def test_snapshot_round_trip(self):
+        """JSON 経由で保存・復元した状態から同じ値で更新を続けられるテスト"""
+        live = LiveIndicators.from_history(self.close[:100], self.high[:100], self.low[:100])
+        restored = LiveIndicators.from_snapshot(json.loads(json.dumps(live.snapshot())))
+
+        for high, low, close in zip(self.high[100:], self.low[100:], self.close[100:]):
+            assert restored.update(close, high, low) == live.update(close, high, low)
+
+    def test_warmup_missing_values_and_invalid_windows(self):
+        """窓がそろうまでは None・欠損は無視・不正な窓はエラーになるテスト"""
+        stats = RollingStats(3)
+        assert stats.update(1.0) is None
+        assert stats.update(float("nan")) is None
+        stats.update(2.0)
+        assert stats.update(3.0) == pytest.approx(2.0)
+        assert stats.std(ddof=0) == pytest.approx(np.std([1.0, 2.0, 3.0]))
+
+        rsi = StreamingWilderRSI(3)
+        for close in [1.0, 2.0, 3.0, 4.0]:
+            value = rsi.update(close)
+        assert value == 100.0
+
+        with pytest.raises(ValueError):
+            StreamingEMA(0)
+        with pytest.raises(ValueError):
+            RollingExtreme(5, "median")
+
+
+class TestLiveIndicatorIntegration:
+    """リアルタイム監視での逐次更新のテストクラス"""
+
+    def setup_method(self):
+        """テストデータの準備"""
+        self.high, self.low, self.close = _bars(60)
+
+    def test_stop_loss_system_updates_incrementally(self):
+        """価格更新ごとに指標が逐次更新され、ATR が履歴からの計算と一致するテスト"""
+        system = RealtimeStopLossSystem()
+        for high, low, close in zip(self.high, self.low, self.close):
+            system.update_price_data("TEST", {"price": close, "high": high, "low": low})
+
+        live = system.live_indicators["TEST"]
+        assert live.bars == len(self.close)
+        expected = IndicatorEngine(close=self.close, high=self.high, low=self.low).atr(14)[-1]
+        assert system.get_live_indicators("TEST")["atr"] == pytest.approx(expected)
+        assert VolatilityCalculator().calculate_atr(
+            list(self.high), list(self.low), list(self.close)
+        ) == pytest.approx(expected)
+
+        # 価格データを差し替えた場合は履歴から作り直す
+        system.price_data["TEST"] = [
+            {"price": close, "high": close, "low": close} for close in self.close[:30]
+        ]
+        assert system.get_live_indicators("TEST")["bars"] == 30
+
+        states = system.snapshot_live_indicators()
+        other = RealtimeStopLossSystem()
+        other.restore_live_indicators(json.loads(json.dumps(states)))
+        assert (
+            other.live_indicators["TEST"].to_dict()
+            == system.live_indicators["TEST"].to_dict()
+        )
+
+    def test_risk_monitor_tracks_price_indicators(self):
+        """リスク監視が銘柄ごとの価格指標を保持するテスト"""
+        monitor = RealtimeRiskMonitor()
+        for close in self.close:
+            monitor.update_risk_data("TEST", close, 100, {})
+
+        status = monitor.get_current_risk_status("TEST")
+
+        assert status["price_indicators"]["bars"] == len(self.close)
+        assert status["price_indicators"]["ema"] == pytest.approx(
+            IndicatorEngine(close=self.close).ema(20)[-1]
+        )
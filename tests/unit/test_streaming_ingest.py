@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+ストリーミング取り込み（末尾ウィンドウ差分）のテスト
+"""
+
+import json
+import shutil
+import tempfile
+from unittest.mock import Mock, patch
+
+from core.differential_updater import DifferentialUpdater
+from core.json_data_manager import JSONDataManager
+
+
+def _bar(symbol, date, close=105.0):
+    return {
+        "date": date,
+        "code": symbol,
+        "open": 100.0,
+        "high": 110.0,
+        "low": 90.0,
+        "close": close,
+        "volume": 1000,
+    }
+
+
+def _history(symbol, days):
+    return [_bar(symbol, f"2024-01-{day:02d}") for day in range(1, days + 1)]
+
+
+class TestAppendStockData:
+    """JSONDataManager.append_stock_data のテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = JSONDataManager(self.temp_dir, Mock(), storage_mode="sharded")
+        self.manager.save_stock_data("1234", _history("1234", 20))
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_tail_append_does_not_rewrite_shard(self):
+        """末尾追加でシャード全体を書き直さないテスト"""
+        shard_path = self.manager._shard_path("1234")
+        head = shard_path.read_bytes()[:-2]
+
+        with patch.object(self.manager, "_save_json") as mock_save:
+            mock_save.return_value = True
+            result = self.manager.append_stock_data(
+                "1234", [_bar("1234", "2024-01-21"), _bar("1234", "2024-01-20")]
+            )
+        saved_files = [call.args[0] for call in mock_save.call_args_list]
+
+        assert result["added_count"] == 1
+        assert result["unchanged_count"] == 1
+        assert shard_path not in saved_files
+        assert shard_path.read_bytes().startswith(head)
+        with open(shard_path, "r") as f:
+            saved = json.load(f)
+        assert [item["date"] for item in saved[-2:]] == ["2024-01-20", "2024-01-21"]
+        assert len(self.manager.get_stock_data("1234")) == 21
+
+    def test_updates_within_tail_window(self):
+        """末尾ウィンドウ内の変更と挿入のテスト"""
+        result = self.manager.append_stock_data(
+            "1234",
+            [_bar("1234", "2024-01-19", close=200.0), _bar("1234", "2024-01-22")],
+        )
+
+        assert (result["added_count"], result["updated_count"]) == (1, 1)
+        data = self.manager.get_stock_data("1234")
+        assert len(data) == 21
+        assert data[18]["close"] == 200.0
+        assert data[-1]["date"] == "2024-01-22"
+
+        incremental = self.manager.get_diff_log("1234", limit=1)[0]["diff"]
+        assert incremental["total_old"] == 20
+        assert len(incremental["added"]) == 1
+
+    def test_no_change_skips_write(self):
+        """変更がない場合に保存しないテスト"""
+        with patch.object(self.manager, "_store_symbol_data") as mock_store:
+            result = self.manager.append_stock_data(
+                "1234", [_bar("1234", "2024-01-05")]
+            )
+
+        mock_store.assert_not_called()
+        assert result["unchanged_count"] == 1
+
+
+class TestStreamingIngest:
+    """DifferentialUpdater.ingest のテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.updater = DifferentialUpdater(self.temp_dir, Mock())
+
+    def teardown_method(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_ingest_generator_across_symbols(self):
+        """複数銘柄のジェネレータ取り込みのテスト"""
+        self.updater.json_manager.save_stock_data("1234", _history("1234", 10))
+
+        def bars():
+            for day in (10, 11, 12):
+                for symbol in ("1234", "5678"):
+                    yield _bar(symbol, f"2024-01-{day:02d}")
+            yield {"date": "2024-01-12"}
+
+        result = self.updater.ingest(bars(), chunk_size=4)
+
+        assert result["success"] is True
+        assert result["total_bars"] == 7
+        assert result["skipped_bars"] == 1
+        assert result["symbols"] == 2
+        assert (result["added"], result["unchanged"]) == (5, 1)
+
+        manager = self.updater.json_manager
+        assert len(manager.get_stock_data("1234")) == 12
+        assert len(manager.get_stock_data("5678")) == 3
+        assert set(manager.get_metadata()["data_sources"]) == {"1234", "5678"}
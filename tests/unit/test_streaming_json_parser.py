@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+ストリーミングJSONパーサーのテスト
+"""
+
+import json
+
+import pytest
+
+from core.streaming_json_parser import StreamingArrayParser, iter_json_array
+
+
+def _chunks(payload: bytes, size: int):
+    return [payload[i : i + size] for i in range(0, len(payload), size)]
+
+
+class TestStreamingJsonParser:
+    """ストリーミングJSONパーサーのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.document = {
+            "daily_quotes": [
+                {"Code": f"{1300 + i}0", "Name": "日本水産", "Close": 100.5 + i}
+                for i in range(30)
+            ],
+            "pagination_key": "next-page",
+        }
+        self.payload = json.dumps(self.document, ensure_ascii=False).encode("utf-8")
+
+    @pytest.mark.parametrize("size", [1, 2, 7, 64, 100000])
+    def test_items_and_metadata_across_chunk_boundaries(self, size):
+        """チャンク境界（マルチバイト文字の途中を含む）に関わらず同じ結果になるテスト"""
+        metadata = {}
+        items = list(
+            iter_json_array(_chunks(self.payload, size), "daily_quotes", metadata)
+        )
+
+        assert items == self.document["daily_quotes"]
+        assert metadata == {"pagination_key": "next-page"}
+
+    def test_items_are_yielded_before_body_is_complete(self):
+        """本体を受信し終える前に要素が取り出されるテスト"""
+        parser = StreamingArrayParser("daily_quotes")
+        half = self.payload[: len(self.payload) // 2]
+
+        items = list(parser.feed(half))
+
+        assert 0 < len(items) < 30
+        assert items[0] == self.document["daily_quotes"][0]
+
+    def test_metadata_before_array(self):
+        """配列より前にあるトップレベル項目の取得テスト"""
+        payload = b'{"pagination_key": "k", "info": [{"Code": "13010"}], "n": 1}'
+        metadata = {}
+
+        items = list(iter_json_array(_chunks(payload, 5), "info", metadata))
+
+        assert items == [{"Code": "13010"}]
+        assert metadata == {"pagination_key": "k", "n": 1}
+
+    def test_response_without_array(self):
+        """配列を含まない応答（エラーメッセージ等）のテスト"""
+        metadata = {}
+        items = list(iter_json_array([b'{"message": "error"}'], "info", metadata))
+
+        assert items == []
+        assert metadata == {"message": "error"}
+
+    def test_truncated_body_raises(self):
+        """途中で切れた本体の検出テスト"""
+        parser = StreamingArrayParser("daily_quotes")
+        list(parser.feed(self.payload[:-40]))
+
+        with pytest.raises(ValueError):
+            parser.metadata()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+構造化データ一括生成のテスト
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from core.structured_data_builder import (
+    build_index,
+    build_stock_structures,
+    build_structured_data,
+    quotes_to_frame,
+    summarize_quotes,
+    write_stock_files,
+)
+
+
+def _quotes(closes, volume=1000):
+    return [
+        {
+            "Date": f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}",
+            "Open": None if close is None else close - 1,
+            "Close": close,
+            "Volume": volume,
+        }
+        for i, close in enumerate(closes)
+    ]
+
+
+def _loop_summary(price_data):
+    """従来の銘柄ごとのループによる計算"""
+    latest = price_data[-1]
+    prices = [float(q["Close"]) for q in price_data if q.get("Close")]
+    volumes = [int(q["Volume"]) for q in price_data if q.get("Volume")]
+    sma_5 = sum(prices[-5:]) / 5 if len(prices) >= 5 else prices[-1] if prices else 0
+    sma_25 = sum(prices[-25:]) / 25 if len(prices) >= 25 else prices[-1] if prices else 0
+    change_percent = (
+        (prices[-1] - prices[-2]) / prices[-2] * 100 if len(prices) >= 2 else 0
+    )
+    return {
+        "last_price": float(latest.get("Close") or 0),
+        "change_percent": change_percent,
+        "average_volume": sum(volumes) / len(volumes) if volumes else 0,
+        "sma_5": round(sma_5, 2),
+        "sma_25": round(sma_25, 2),
+        "sma_75": round(sum(prices[-75:]) / 75, 2) if len(prices) >= 75 else round(sma_25, 2),
+        "bollinger_upper": round(round(sma_25, 2) * 1.02, 2),
+    }
+
+
+class TestSummarizeQuotes:
+    """全銘柄一括集計のテストクラス"""
+
+    def test_matches_per_symbol_loop(self):
+        """groupby による一括集計が従来のループ計算と一致するテスト"""
+        prices_by_code = {
+            "1301": _quotes([100.0 + i * 0.7 for i in range(80)]),
+            "1332": _quotes([200.0, 0, 210.0, None, 205.5] * 6),
+            "7203": _quotes([300.0, 301.0]),
+            "9984": _quotes([400.0]),
+        }
+
+        summary = summarize_quotes(quotes_to_frame(prices_by_code))
+
+        assert list(summary.index) == list(prices_by_code)
+        for code, quotes in prices_by_code.items():
+            expected = _loop_summary(quotes)
+            for field, value in expected.items():
+                assert summary.loc[code, field] == pytest.approx(value), (code, field)
+        assert summary.loc["1332", "updated_at"] == prices_by_code["1332"][-1]["Date"]
+
+    def test_empty_quotes(self):
+        """日足がない場合は空のサマリーを返すテスト"""
+        summary = summarize_quotes(quotes_to_frame({"1301": []}))
+
+        assert summary.empty
+        assert build_stock_structures(summary) == {}
+
+
+class TestStockStructures:
+    """銘柄データ構造の作成と書き込みのテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_defaults_and_nested_fields(self):
+        """欠損項目を既定値で補い、入れ子の構造に変換するテスト"""
+        summary = summarize_quotes(quotes_to_frame({"7203": _quotes([300.0, 306.0])}))
+        summary["name"] = "トヨタ自動車"
+
+        stocks = build_stock_structures(summary)
+        stock = stocks["7203"]
+
+        assert stock["name"] == "トヨタ自動車"
+        assert stock["sector"] == ""
+        assert stock["current_price"]["change_percent"] == pytest.approx(2.0)
+        assert stock["technical_indicators"]["rsi"] == 50
+        # 日時の欠損は実行時刻ではなく最終取引日で補う
+        assert stock["prediction"]["prediction_date"] == "2024-01-02"
+        assert stock["metadata"]["created_at"] == "2024-01-02"
+        assert stock["metadata"]["last_trade_date"] == "2024-01-02"
+        assert build_stock_structures(summary) == stocks
+        # NumPy の型を含まずJSONに書ける
+        assert isinstance(stock["volume"]["current_volume"], int)
+        json.dumps(stocks)
+
+    def test_writes_compact_files_in_parallel(self):
+        """銘柄別ファイルをインデントなしで並行に書き込むテスト"""
+        prices_by_code = {f"{1300 + i}": _quotes([100.0 + i, 101.0 + i]) for i in range(20)}
+        stocks = build_stock_structures(summarize_quotes(quotes_to_frame(prices_by_code)))
+        data = build_structured_data(stocks, "full")
+
+        written = write_stock_files(stocks, self.temp_dir / "stocks", max_workers=4, logger=Mock())
+
+        assert written == 20
+        text = (self.temp_dir / "stocks" / "1305.json").read_text(encoding="utf-8")
+        assert "\n" not in text and ", " not in text
+        assert json.loads(text)["stock"] == stocks["1305"]
+        assert list(self.temp_dir.glob("stocks/*.tmp")) == []
+
+        index = build_index(data)
+        assert index["stocks"][0]["code"] == "1319"
+        assert index["metadata"]["total_stocks"] == 20
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+営業日単位の一括 daily_quotes 同期のテスト（ローカルのスタブHTTPサーバーを使用）
+"""
+
+import json
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date
+from pathlib import Path
+from unittest.mock import Mock, patch
+from urllib.parse import parse_qs, urlparse
+
+from core.jquants_fetch_engine import AsyncFetchEngine
+from scripts.sync_with_jquants_api import JQuantsAPISyncer
+
+CODES = ["13010", "13320", "72030"]
+
+
+def _quote(code, date, close):
+    return {
+        "Code": code,
+        "Date": date,
+        "Open": close - 1,
+        "High": close + 1,
+        "Low": close - 2,
+        "Close": close,
+        "Volume": 1000,
+    }
+
+
+class _DailyQuotesHandler(BaseHTTPRequestHandler):
+    """date 指定の daily_quotes を1銘柄1ページで返すスタブ"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.endswith("/markets/trading_calendar"):
+            days = [(4, "1"), (5, "1"), (6, "0"), (7, "0"), (8, "0"), (9, "1")]
+            calendar = [
+                {"Date": f"2024-01-{day:02d}", "HolidayDivision": division}
+                for day, division in days
+            ]
+            self._send(200, {"trading_calendar": calendar})
+            return
+        self.server.queries.append(query)
+        if "code" in query:
+            self._send_range(query)
+            return
+        date = query["date"]
+        if date == "2024-01-05":
+            self._send(500, {})
+            return
+        page = int(query.get("pagination_key", "0"))
+        body = {"daily_quotes": [_quote(CODES[page], date, 100.0 + page)]}
+        if page + 1 < len(CODES):
+            body["pagination_key"] = str(page + 1)
+        self._send(200, body)
+
+    def _send_range(self, query):
+        code = query["code"]
+        if code == "99990":
+            self._send(404, {})
+            return
+        quotes = [_quote(code, f"2024-01-{day:02d}", 100.0 + day) for day in (4, 5)]
+        # 終値のない行（売買停止など）は検証で除外される
+        if self.server.include_suspended:
+            quotes.append(dict(_quote(code, "2024-01-09", 0), Close=None))
+        self._send(200, {"daily_quotes": quotes})
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSyncByDate:
+    """営業日単位の一括同期のテストクラス"""
+
+    def setup_method(self):
+        """スタブサーバーと同期クラスの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _DailyQuotesHandler)
+        self.server.queries = []
+        self.server.include_suspended = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        listed_index = self.temp_dir / "listed_index.json"
+        listed_index.write_text(
+            json.dumps({"stocks": [{"code": code} for code in CODES[:2]]}),
+            encoding="utf-8",
+        )
+
+        with patch("scripts.sync_with_jquants_api.JQuantsAuthManagerFinal") as auth:
+            auth.return_value.get_valid_token.return_value = "token"
+            self.syncer = JQuantsAPISyncer()
+        self.syncer.data_dir = self.temp_dir / "data"
+        self.syncer.listed_index_file = listed_index
+        self.syncer.fetch_engine = AsyncFetchEngine(
+            id_token="token",
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+            backoff_seconds=0.01,
+            max_retries=1,
+            logger=Mock(),
+        )
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fans_out_listed_symbols(self):
+        """1営業日の全銘柄を一括取得し、上場銘柄のみ銘柄別に保存するテスト"""
+        summary = self.syncer.sync_by_date(["2024-01-04"])
+
+        assert summary["success"] is True
+        assert summary["symbols"] == 2
+        assert summary["added"] == 2
+        # 銘柄ごとではなく date 指定のページングで取得している
+        assert all("code" not in query for query in self.server.queries)
+        assert len(self.server.queries) == len(CODES)
+
+        manager = self.syncer.differential_updater.json_manager
+        assert manager.get_stock_data("13010")[0]["close"] == 100.0
+        assert manager.get_stock_data("72030") == []
+
+    def test_sharded_storage_mode(self):
+        """storage_mode 指定時は銘柄ごとのファイルへ保存するテスト"""
+        self.syncer.storage_mode = "sharded"
+        self.syncer.sync_by_date(["2024-01-04"])
+
+        manager = self.syncer.differential_updater.json_manager
+        assert manager.storage_mode == "sharded"
+        assert not (self.syncer.data_dir / "stock_data.json").exists()
+        assert manager.get_stock_data("13320")[0]["close"] == 101.0
+
+    def test_multiple_dates_and_failed_date(self):
+        """複数営業日の取り込みと取得失敗日の記録テスト"""
+        summary = self.syncer.sync_by_date(
+            ["2024-01-04", "2024-01-05", "2024-01-09"], listed_only=False
+        )
+
+        assert summary["success"] is False
+        assert summary["failed_dates"] == ["2024-01-05"]
+        assert summary["added"] == 6
+
+        manager = self.syncer.differential_updater.json_manager
+        dates = [row["date"] for row in manager.get_stock_data("72030")]
+        assert dates == ["2024-01-04", "2024-01-09"]
+
+    def test_ingest_stock_prices_streams_to_storage(self):
+        """銘柄別の期間取得を逐次ストレージへ書き込むテスト"""
+        summary = self.syncer.ingest_stock_prices(["13010", "99990", "72030"])
+
+        assert summary["failed_codes"] == ["99990"]
+        assert summary["added"] == 4
+
+        manager = self.syncer.differential_updater.json_manager
+        dates = [row["date"] for row in manager.get_stock_data("13010")]
+        assert dates == ["2024-01-04", "2024-01-05"]
+
+    def test_sync_stock_data_resumes_from_checkpoint(self):
+        """再実行時は同期済み銘柄を取得せずチェックポイントから再開するテスト"""
+        self.syncer.checkpoint_dir = self.temp_dir / "checkpoints"
+        self.server.include_suspended = False
+
+        first = self.syncer.sync_stock_data()
+        requests_after_first = len(self.server.queries)
+        second = self.syncer.sync_stock_data()
+
+        assert sorted(first["synced"]) == ["13010", "13320"]
+        assert first["added"] == 4
+        assert second["synced"] == first["synced"]
+        assert second["skipped"] == 2
+        assert len(self.server.queries) == requests_after_first
+
+        # 取得しながらストレージへ取り込み、全銘柄分の結果は保持しない
+        manager = self.syncer.differential_updater.json_manager
+        dates = [row["date"] for row in manager.get_stock_data("13320")]
+        assert dates == ["2024-01-04", "2024-01-05"]
+        journal = self.syncer._get_checkpoint_journal()
+        assert journal.stored_results() == []
+
+        # ワーカー分割時は担当範囲のみ取得する
+        worker = self.syncer.sync_stock_data(
+            worker_index=1, worker_count=2, resume=False
+        )
+        assert worker["synced"] == ["13320"]
+
+    def test_parallel_workers_ingested_by_aggregate_run(self):
+        """並列ワーカーの取得結果を集約実行でストレージへ取り込むテスト"""
+        self.syncer.checkpoint_dir = self.temp_dir / "checkpoints"
+        self.server.include_suspended = False
+
+        for index in range(2):
+            worker = self.syncer.sync_stock_data(worker_index=index, worker_count=2)
+            assert worker["success"] is True
+        # ワーカーは共有ストレージへ書き込まない
+        assert not (self.syncer.data_dir / "stock_data.json").exists()
+
+        self.server.queries.clear()
+        summary = self.syncer.sync_stock_data()
+
+        assert self.server.queries == []
+        assert summary["skipped"] == 2
+        assert summary["added"] == 4
+        manager = self.syncer.differential_updater.json_manager
+        assert sorted(manager.get_all_symbols()) == ["13010", "13320"]
+        assert self.syncer._get_checkpoint_journal().stored_results() == []
+
+    def test_sync_incremental_fetches_missing_range_only(self):
+        """保存済みの最終日付以降のみを取得し、最新の銘柄はスキップするテスト"""
+        self.syncer.ingest_stock_prices(["13010"])
+        self.server.queries.clear()
+
+        # 土曜基準: 直前の営業日 2024-01-05 まで保存済みの 13010 は取得しない
+        summary = self.syncer.sync_incremental(days=3, as_of=date(2024, 1, 6))
+
+        assert summary["target_date"] == "2024-01-05"
+        assert summary["up_to_date"] == 1
+        assert summary["requested"] == 1
+        assert [q["code"] for q in self.server.queries] == ["13320"]
+        assert self.server.queries[0]["from"] == "2024-01-04"
+
+        # 連休明けは翌営業日からのみ取得
+        self.server.queries.clear()
+        self.syncer.sync_incremental(as_of=date(2024, 1, 9))
+        assert {q["from"] for q in self.server.queries} == {"2024-01-09"}
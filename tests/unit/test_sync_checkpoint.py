@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+同期チェックポイントジャーナルのテスト
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from core.sync_checkpoint import SyncCheckpointJournal
+
+
+class TestSyncCheckpointJournal:
+    """同期チェックポイントジャーナルのテストクラス"""
+
+    def setup_method(self):
+        """一時ディレクトリの準備"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """クリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _journal(self, worker_id="0"):
+        return SyncCheckpointJournal(self.temp_dir, "sync", worker_id=worker_id)
+
+    def test_resume_skips_current_symbols(self):
+        """再読み込み後も完了済み銘柄は同期済みとして扱うテスト"""
+        journal = self._journal()
+        journal.save_result("1301", [{"close": 1.0}])
+        journal.mark_done("1301", "2024-01-05", "2024-01-06")
+        journal.mark_failed("1332", "HTTP 500")
+
+        resumed = self._journal()
+
+        assert resumed.pending(["1301", "1332", "7203"], "2024-01-06") == [
+            "1332",
+            "7203",
+        ]
+        assert resumed.load_result("1301") == [{"close": 1.0}]
+        assert resumed.load_result("1332") is None
+        # ジャーナルには取得結果を書き込まない
+        assert "close" not in journal.journal_file.read_text(encoding="utf-8")
+        # 翌日の同期では再取得対象
+        assert resumed.pending(["1301"], "2024-01-07") == ["1301"]
+
+    def test_failure_keeps_last_date(self):
+        """失敗時も前回の最終日付を維持するテスト"""
+        journal = self._journal()
+        journal.mark_done("1301", "2024-01-05", "2024-01-05")
+        journal.mark_failed("1301", "timeout")
+
+        assert journal.last_date("1301") == "2024-01-05"
+        assert not journal.is_current("1301", "2024-01-05")
+
+    def test_torn_last_line_is_ignored(self):
+        """書き込み途中で停止した末尾行を読み飛ばすテスト"""
+        journal = self._journal()
+        journal.mark_done("1301", "2024-01-05", "2024-01-05")
+        with open(journal.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"symbol": "1332", "sta')
+
+        assert list(self._journal().load()) == ["1301"]
+
+    def test_workers_merge_and_compact(self):
+        """ワーカー別ジャーナルの統合と圧縮のテスト"""
+        first, second = self._journal("0"), self._journal("1")
+        first.mark_failed("1301", "timeout")
+        first.mark_done("1301", "2024-01-05", "2024-01-05")
+        second.mark_done("7203", "2024-01-05", "2024-01-05")
+
+        merged = self._journal("0")
+        assert merged.summary() == {"done": 2, "failed": 0}
+
+        merged.compact()
+        lines = merged.journal_file.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert self._journal("0").is_current("7203", "2024-01-05")
+
+    def test_reset_keeps_other_workers(self):
+        """リセットは自ワーカーの進捗のみを削除するテスト"""
+        first, second = self._journal("0"), self._journal("1")
+        first.save_result("1301", [{"close": 1.0}])
+        first.mark_done("1301", "2024-01-05", "2024-01-05")
+        second.save_result("7203", [{"close": 2.0}])
+        second.mark_done("7203", "2024-01-05", "2024-01-05")
+
+        self._journal("0").reset()
+
+        resumed = self._journal("0")
+        assert resumed.pending(["1301", "7203"], "2024-01-05") == ["1301"]
+        assert resumed.load_result("7203") == [{"close": 2.0}]
+        assert not (resumed.results_dir / "1301.json").exists()
+
+        # 全ワーカー分の破棄（単独実行で最初から取得し直す場合）
+        resumed.reset(all_workers=True)
+        assert self._journal("0").pending(["1301", "7203"], "2024-01-05") == [
+            "1301",
+            "7203",
+        ]
+        assert not list(self.temp_dir.glob("*.jsonl"))
+        assert not resumed.results_dir.exists()
+
+    def test_partition_is_disjoint(self):
+        """ワーカーの担当範囲が重複せず全銘柄を覆うテスト"""
+        symbols = [str(1000 + i) for i in range(10)]
+
+        parts = [SyncCheckpointJournal.partition(symbols, i, 3) for i in range(3)]
+
+        assert [len(part) for part in parts] == [4, 4, 2]
+        assert sum(parts, []) == symbols
+        with pytest.raises(ValueError):
+            SyncCheckpointJournal.partition(symbols, 3, 3)
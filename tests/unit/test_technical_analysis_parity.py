@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+テクニカル分析のベクトル化前後の一致テスト
+ループ・pandas で書かれていた従来の実装を参照実装として、同じ出力になることを確認する
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.technical_analysis import TechnicalAnalysis, calculate_technical_indicators
+
+
+def _reference_obv(close: pd.Series, volume: pd.Series) -> pd.Series:
+    """従来の OBV（1行ずつ加減する実装）"""
+    if len(close) == 0 or len(volume) == 0:
+        return pd.Series(dtype=float)
+
+    obv = pd.Series(index=close.index, dtype=float)
+    obv.iloc[0] = volume.iloc[0]
+
+    for i in range(1, len(close)):
+        if close.iloc[i] > close.iloc[i - 1]:
+            obv.iloc[i] = obv.iloc[i - 1] + volume.iloc[i]
+        elif close.iloc[i] < close.iloc[i - 1]:
+            obv.iloc[i] = obv.iloc[i - 1] - volume.iloc[i]
+        else:
+            obv.iloc[i] = obv.iloc[i - 1]
+
+    return obv
+
+
+def _reference_vwap(high, low, close, volume) -> pd.Series:
+    """従来の VWAP"""
+    typical_price = (high + low + close) / 3
+    return (typical_price * volume).cumsum() / volume.cumsum()
+
+
+def _reference_true_range(high, low, close) -> pd.Series:
+    return pd.concat(
+        [high - low, (high - close.shift(1)).abs(), (low - close.shift(1)).abs()], axis=1
+    ).max(axis=1)
+
+
+def _reference_cci(high, low, close, window=20) -> pd.Series:
+    """従来の CCI（窓ごとに平均偏差を求める実装）"""
+    typical_price = (high + low + close) / 3
+    sma_tp = typical_price.rolling(window=window).mean()
+    mean_deviation = typical_price.rolling(window=window).apply(
+        lambda x: np.mean(np.abs(x - x.mean()))
+    )
+    return (typical_price - sma_tp) / (0.015 * mean_deviation)
+
+
+def _reference_adx(high, low, close, window=14) -> pd.Series:
+    """従来の ADX"""
+    tr = _reference_true_range(high, low, close)
+    dm_plus = high.diff()
+    dm_minus = -low.diff()
+    dm_plus = dm_plus.where((dm_plus > dm_minus) & (dm_plus > 0), 0)
+    dm_minus = dm_minus.where((dm_minus > dm_plus) & (dm_minus > 0), 0)
+    atr = tr.rolling(window=window).mean()
+    di_plus = 100 * (dm_plus.rolling(window=window).mean() / atr)
+    di_minus = 100 * (dm_minus.rolling(window=window).mean() / atr)
+    dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus)
+    return dx.rolling(window=window).mean()
+
+
+def _market(case: str, length: int = 300) -> pd.DataFrame:
+    """検証用の株価データ（欠損・横ばい・出来高0 を含むケース）"""
+    rng = np.random.default_rng(7)
+    close = np.round(1000 + rng.normal(0, 5, length).cumsum(), 0)
+    volume = rng.integers(0, 50_000, length).astype(float)
+    if case == "flat":
+        close[100:140] = close[100]
+    elif case == "missing":
+        close[50:53] = np.nan
+        volume[120] = np.nan
+    elif case == "zero_volume":
+        volume[:10] = 0
+    return pd.DataFrame(
+        {
+            "high": close + rng.integers(0, 10, length),
+            "low": close - rng.integers(0, 10, length),
+            "close": close,
+            "volume": volume,
+        },
+        index=pd.date_range("2020-01-01", periods=length, freq="B"),
+    )
+
+
+CASES = ["random", "flat", "missing", "zero_volume"]
+
+
+class TestTechnicalAnalysisParity:
+    """ベクトル化前後の一致テストクラス"""
+
+    @pytest.mark.parametrize("case", CASES)
+    def test_obv_matches_loop(self, case):
+        """OBV がループ実装と一致するテスト"""
+        df = _market(case)
+
+        result = TechnicalAnalysis.obv(df["close"], df["volume"])
+
+        pd.testing.assert_series_equal(result, _reference_obv(df["close"], df["volume"]))
+
+    @pytest.mark.parametrize("case", CASES)
+    def test_vwap_matches_cumulative(self, case):
+        """VWAP が従来の累積計算と一致するテスト"""
+        df = _market(case)
+
+        result = TechnicalAnalysis.vwap(df["high"], df["low"], df["close"], df["volume"])
+
+        expected = _reference_vwap(df["high"], df["low"], df["close"], df["volume"])
+        pd.testing.assert_series_equal(result, expected, check_names=False, rtol=1e-12)
+
+    @pytest.mark.parametrize("case", CASES)
+    def test_range_indicators_match_reference(self, case):
+        """ATR・CCI・ADX が従来の pandas 実装と一致するテスト"""
+        df = _market(case)
+        high, low, close = df["high"], df["low"], df["close"]
+
+        pd.testing.assert_series_equal(
+            TechnicalAnalysis.atr(high, low, close),
+            _reference_true_range(high, low, close).rolling(14).mean(),
+            check_names=False,
+            rtol=1e-10,
+        )
+        pd.testing.assert_series_equal(
+            TechnicalAnalysis.cci(high, low, close),
+            _reference_cci(high, low, close),
+            check_names=False,
+            rtol=1e-8,
+        )
+        pd.testing.assert_series_equal(
+            TechnicalAnalysis.adx(high, low, close),
+            _reference_adx(high, low, close),
+            check_names=False,
+            rtol=1e-8,
+        )
+
+    def test_obv_small_examples(self):
+        """OBV の小さな例（上昇で加算・下落で減算・横ばいで据え置き）"""
+        close = pd.Series([10.0, 11.0, 11.0, 9.0, np.nan, 12.0])
+        volume = pd.Series([100, 200, 300, 400, 500, 600])
+
+        result = TechnicalAnalysis.obv(close, volume)
+
+        assert result.tolist() == [100.0, 300.0, 300.0, -100.0, -100.0, -100.0]
+        assert result.tolist() == _reference_obv(close, volume).tolist()
+
+    def test_calculate_technical_indicators_columns_unchanged(self):
+        """一括計算の OBV・VWAP 列が個別計算と一致するテスト"""
+        df = _market("missing")
+
+        result = calculate_technical_indicators(df)
+
+        np.testing.assert_array_equal(
+            result["obv"].to_numpy(), _reference_obv(df["close"], df["volume"]).to_numpy()
+        )
+        np.testing.assert_allclose(
+            result["vwap"],
+            _reference_vwap(df["high"], df["low"], df["close"], df["volume"]),
+            rtol=1e-12,
+        )
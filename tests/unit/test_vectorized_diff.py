@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+ベクトル化差分計算のテスト
+"""
+
+import random
+from unittest.mock import Mock, patch
+
+from core.differential_updater import DataHashCalculator, DiffCalculator
+
+
+def _make_records(count, start_day=1, close=100.0):
+    return [
+        {
+            "Date": f"2024-{(i // 28) + 1:02d}-{(i % 28) + 1:02d}",
+            "Code": "1234",
+            "Open": close,
+            "High": close + 5,
+            "Low": close - 5,
+            "Close": close + i,
+            "Volume": 1000 + i,
+        }
+        for i in range(start_day - 1, start_day - 1 + count)
+    ]
+
+
+class TestVectorizedDiff:
+    """ベクトル化差分計算のテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.vectorized = DiffCalculator(Mock(), vectorized=True, vectorized_min_rows=0)
+        self.scalar = DiffCalculator(Mock(), vectorized=False)
+
+    def _counts(self, calculator, existing, new):
+        result = calculator.calculate_comprehensive_diff(existing, new)
+        return (
+            result.added_count,
+            result.updated_count,
+            result.removed_count,
+            result.unchanged_count,
+            result.is_significant_change,
+        )
+
+    def test_parity_with_scalar_diff(self):
+        """従来方式と同じ差分結果になるテスト"""
+        rng = random.Random(0)
+        existing = [
+            {key.lower(): value for key, value in item.items()}
+            for item in _make_records(200)
+        ]
+        new = _make_records(200, start_day=21)
+        for item in rng.sample(new[:180], 30):
+            item["Close"] += 1.5
+        # 保存済みデータは int、新規データは float でも差分にならない
+        for item in new:
+            item["Volume"] = float(item["Volume"])
+            item["AdjustmentClose"] = item["Close"]
+
+        assert self._counts(self.vectorized, existing, new) == self._counts(
+            self.scalar, existing, new
+        )
+        assert self._counts(self.vectorized, existing, new)[:4] == (20, 30, 20, 150)
+
+    def test_parity_with_null_values(self):
+        """欠損値の訂正（None -> 値）が従来方式と同じく更新になるテスト"""
+        existing = [
+            {key.lower(): value for key, value in item.items()}
+            for item in _make_records(600)
+        ]
+        for index in (3, 50, 100, 200, 400):
+            existing[index]["close"] = None
+        # 両側とも欠損・片側にしか項目がない場合は変更にならない
+        existing[10]["open"] = None
+        existing[20]["volume"] = None
+        new = _make_records(600)
+        new[10]["Open"] = None
+        del new[20]["Volume"]
+
+        assert self._counts(self.vectorized, existing, new) == self._counts(
+            self.scalar, existing, new
+        )
+        assert self._counts(self.vectorized, existing, new) == (0, 5, 0, 595, True)
+
+    def test_duplicate_dates_and_empty_inputs(self):
+        """重複日付・空データの扱いのテスト"""
+        new = _make_records(3) + _make_records(1)
+        for existing in ([], _make_records(2)):
+            assert self._counts(self.vectorized, existing, new) == self._counts(
+                self.scalar, existing, new
+            )
+        assert self._counts(self.vectorized, [], []) == (0, 0, 0, 0, False)
+
+    def test_data_hash_independent_of_diff_mode(self):
+        """データハッシュが差分の計算方式・件数によらず同じになるテスト"""
+        existing = _make_records(50)
+        new = _make_records(50, start_day=2)
+
+        vectorized = self.vectorized.calculate_comprehensive_diff(existing, new)
+        scalar = self.scalar.calculate_comprehensive_diff(existing, new)
+
+        assert vectorized.data_hash == scalar.data_hash
+        assert vectorized.data_hash == DataHashCalculator.calculate_data_hash(new)
+        assert (vectorized.added_count, vectorized.removed_count) == (1, 1)
+
+    def test_data_hash_without_json_serialization(self):
+        """データハッシュは行ハッシュから求め、全件をJSON化しないテスト"""
+        existing = _make_records(50)
+        new = _make_records(50, start_day=2)
+
+        with patch.object(
+            DataHashCalculator, "_json_hash", side_effect=AssertionError
+        ):
+            for calculator in (self.vectorized, self.scalar):
+                calculator.calculate_comprehensive_diff(existing, new)
+
+        # 丸め誤差・列順・int/float の違いではハッシュは変わらない
+        reordered = [
+            dict(reversed(list(item.items())), Close=item["Close"] + 1e-9)
+            for item in new
+        ]
+        assert DataHashCalculator.calculate_data_hash(
+            reordered
+        ) == DataHashCalculator.calculate_data_hash(new)
+        changed = [dict(item) for item in new]
+        changed[-1]["Close"] += 1
+        assert DataHashCalculator.calculate_data_hash(
+            changed
+        ) != DataHashCalculator.calculate_data_hash(new)
+
+    def test_falls_back_for_unsupported_input(self):
+        """ベクトル化できない入力で従来方式に切り替わるテスト"""
+        result = self.vectorized.calculate_comprehensive_diff(None, None)
+        assert result.added_count == 0
+
+        mixed = [{"Date": "2024-01-01", "date": "2024-01-02", "Close": 1.0}]
+        assert self._counts(self.vectorized, mixed, mixed) == self._counts(
+            self.scalar, mixed, mixed
+        )